@@ -0,0 +1,107 @@
+"""
+Benchmark de arranque en frío: instantánea binaria mapeada frente a CSV.
+
+Genera un catálogo y usuarios sintéticos, los guarda como CSV y como
+instantánea binaria, y mide el tiempo hasta atender la primera búsqueda por
+ISBN y hasta obtener los libros disponibles en cada caso. La instantánea
+incluye además un historial de préstamos devueltos por usuario, que no debe
+encarecer la apertura, y se mide la primera consulta de un historial.
+
+Uso:
+    python -m benchmarks.bench_arranque --n 1000000 --historial 20
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from biblioteca import Biblioteca, Libro, Prestamo, Usuario
+from biblioteca.instantanea_binaria import cargar_instantanea, escribir_instantanea
+
+
+def _arrancar(abrir) -> Dict[str, float]:
+    """Mide apertura, primera búsqueda por ISBN y listado de disponibles."""
+    inicio = time.perf_counter()
+    biblioteca = abrir()
+    apertura = time.perf_counter() - inicio
+    biblioteca.buscar_libro_por_isbn("978-0000000007").titulo
+    primera = time.perf_counter() - inicio
+    biblioteca.libros_disponibles()
+    disponibles = time.perf_counter() - inicio
+    biblioteca.prestamos_usuario("U00000007")
+    historial = time.perf_counter() - inicio
+    return {'apertura_s': apertura, 'primera_busqueda_s': primera, 'disponibles_s': disponibles,
+            'historial_s': historial}
+
+
+def ejecutar(n: int, historial: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        n: Número de libros (se registran n // 10 usuarios)
+        historial: Préstamos devueltos por usuario guardados en la instantánea
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Segundos acumulados de cada etapa por formato
+    """
+    usuarios = max(1, n // 10)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_libros = os.path.join(directorio, 'libros.csv')
+        ruta_usuarios = os.path.join(directorio, 'usuarios.csv')
+        ruta_binaria = os.path.join(directorio, 'biblioteca.bin')
+        with open(ruta_libros, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['isbn', 'titulo', 'autor'])
+            escritor.writerows((f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 5000}") for i in range(n))
+        with open(ruta_usuarios, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['id', 'nombre'])
+            escritor.writerows((f"U{i:08d}", f"Usuario {i}") for i in range(usuarios))
+        
+        biblioteca = Biblioteca()
+        biblioteca.importar_libros(Libro(f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 5000}")
+                                   for i in range(n))
+        biblioteca.importar_usuarios(Usuario(f"U{i:08d}", f"Usuario {i}") for i in range(usuarios))
+        referencia = datetime(2024, 1, 1)
+        for k in range(usuarios * historial):
+            prestamo = Prestamo(f"PREST-{k + 1:08d}", f"978-{k * 7 % n:010d}",
+                                f"U{k % usuarios:08d}", 14)
+            prestamo.fecha_prestamo = referencia + timedelta(minutes=k)
+            prestamo.fecha_devolucion = prestamo.fecha_prestamo + timedelta(days=7)
+            biblioteca.restaurar_prestamo(prestamo)
+        escribir_instantanea(biblioteca, ruta_binaria)
+        del biblioteca
+        
+        def desde_csv() -> Biblioteca:
+            reimportada = Biblioteca()
+            reimportada.importar_libros(ruta_libros)
+            reimportada.importar_usuarios(ruta_usuarios)
+            return reimportada
+        
+        return {
+            'csv': _arrancar(desde_csv),
+            'binaria': _arrancar(lambda: cargar_instantanea(ruta_binaria)),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--n', type=int, default=1_000_000, help='Número de libros')
+    parser.add_argument('--historial', type=int, default=20,
+                        help='Préstamos devueltos por usuario')
+    args = parser.parse_args()
+    
+    print(f"Arranque en frío con {args.n:,} libros y {args.historial} préstamos devueltos "
+          f"por usuario (tiempos acumulados)")
+    print(f"{'formato':<10} {'apertura':>10} {'1a búsqueda':>12} {'disponibles':>12} {'historial':>10}")
+    for formato, tiempos in ejecutar(args.n, args.historial).items():
+        print(f"{formato:<10} {tiempos['apertura_s']:>9.4f}s {tiempos['primera_busqueda_s']:>11.4f}s "
+              f"{tiempos['disponibles_s']:>11.4f}s {tiempos['historial_s']:>9.4f}s")
+
+
+if __name__ == '__main__':
+    main()
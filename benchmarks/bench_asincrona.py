@@ -0,0 +1,108 @@
+"""
+Benchmark de peticiones por segundo de AsyncBiblioteca frente a run_in_executor.
+
+Varios clientes asyncio concurrentes envían una mezcla de búsquedas por ISBN,
+préstamos y devoluciones, búsquedas por autor y estadísticas. Se compara
+``AsyncBiblioteca`` con una fachada ingenua que delega toda llamada en
+``loop.run_in_executor``.
+
+Uso:
+    python -m benchmarks.bench_asincrona --clientes 200 --peticiones 200
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict
+
+from biblioteca import Libro, Usuario
+from biblioteca.asincrona import AsyncBiblioteca
+from biblioteca.concurrente import BibliotecaConcurrente
+
+
+class FachadaIngenua:
+    """Fachada que ejecuta cualquier llamada en el executor por defecto."""
+    
+    def __init__(self, biblioteca):
+        self.biblioteca = biblioteca
+    
+    def __getattr__(self, nombre: str):
+        metodo = getattr(self.biblioteca, nombre)
+        
+        async def llamar(*args: Any) -> Any:
+            return await asyncio.get_running_loop().run_in_executor(None, metodo, *args)
+        return llamar
+
+
+def _crear_biblioteca(libros: int) -> BibliotecaConcurrente:
+    biblioteca = BibliotecaConcurrente()
+    biblioteca.importar_libros(Libro(f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 500}")
+                               for i in range(libros))
+    biblioteca.importar_usuarios(Usuario(f"U{i:08d}", f"Usuario {i}", limite_prestamos=50)
+                                 for i in range(max(1, libros // 10)))
+    biblioteca.buscar_libros_por_autor("autor")
+    return biblioteca
+
+
+async def _cliente(fachada: Any, semilla: int, peticiones: int, libros: int) -> None:
+    azar = random.Random(semilla)
+    usuarios = max(1, libros // 10)
+    for _ in range(peticiones):
+        tirada = azar.random()
+        isbn = f"978-{azar.randrange(libros):010d}"
+        if tirada < 0.85:
+            await fachada.buscar_libro_por_isbn(isbn)
+        elif tirada < 0.95:
+            try:
+                if tirada < 0.9:
+                    await fachada.prestar_libro(isbn, f"U{azar.randrange(usuarios):08d}")
+                else:
+                    await fachada.devolver_libro(isbn, f"U{azar.randrange(usuarios):08d}")
+            except ValueError:
+                pass
+        elif tirada < 0.99:
+            await fachada.buscar_libros_por_autor(f"autor {azar.randrange(5)}")
+        else:
+            await fachada.estadisticas()
+
+
+async def _medir(fachada: Any, clientes: int, peticiones: int, libros: int) -> float:
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(fachada, i, peticiones, libros) for i in range(clientes)))
+    return clientes * peticiones / (time.perf_counter() - inicio)
+
+
+def ejecutar(clientes: int, peticiones: int, libros: int) -> Dict[str, float]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        clientes: Clientes concurrentes
+        peticiones: Peticiones por cliente
+        libros: Libros del catálogo
+    
+    Returns:
+        Dict[str, float]: Peticiones por segundo de cada fachada
+    """
+    return {
+        'run_in_executor': asyncio.run(
+            _medir(FachadaIngenua(_crear_biblioteca(libros)), clientes, peticiones, libros)),
+        'AsyncBiblioteca': asyncio.run(
+            _medir(AsyncBiblioteca(_crear_biblioteca(libros)), clientes, peticiones, libros)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clientes', type=int, default=200, help='Clientes concurrentes')
+    parser.add_argument('--peticiones', type=int, default=200, help='Peticiones por cliente')
+    parser.add_argument('--libros', type=int, default=100_000, help='Libros del catálogo')
+    args = parser.parse_args()
+    
+    print(f"{args.clientes} clientes x {args.peticiones} peticiones, {args.libros:,} libros")
+    for nombre, tasa in ejecutar(args.clientes, args.peticiones, args.libros).items():
+        print(f"{nombre:<16} {tasa:>12,.0f} peticiones/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark de la latencia del autocompletado de títulos y autores.
+
+Mide la construcción del índice de prefijos (en la primera llamada a
+``autocompletar``) y la latencia de las sugerencias por longitud del prefijo
+escrito, con un límite de 10 sugerencias ordenadas por popularidad. Los
+prefijos de una letra son el peor caso: coinciden con una fracción grande del
+catálogo (todos los títulos sintéticos contienen la palabra "y"); la primera
+consulta de esos prefijos recorre todas sus coincidencias y guarda las
+mejores, y las siguientes las leen de la lista guardada. Como
+referencia, se mide ``buscar_libros_por_titulo`` con los mismos textos, que
+busca subcadenas y no ordena, y el alta de un libro seguida de una consulta.
+
+Uso:
+    python -m benchmarks.bench_autocompletado --libros 200000
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from biblioteca import Libro
+
+from .datos import crear_biblioteca
+
+
+PREFIJOS = {
+    'titulo': {
+        '1 letra': ["a", "m", "s", "y"],
+        '2 letras': ["co", "si", "ve", "lu"],
+        '3+ letras': ["cor", "somb", "inviern", "jardin y"],
+    },
+    'autor': {
+        '1 letra': ["g", "m", "r"],
+        '2 letras': ["ga", "ma", "lu"],
+        '3+ letras': ["garc", "mart", "lucia r"],
+    },
+}
+
+
+def _latencias(funcion: Callable[[str], List], prefijos: List[str],
+               repeticiones: int) -> Dict[str, float]:
+    """
+    Retorna la latencia media de la primera consulta de cada prefijo y, tras
+    ella, la media y el percentil 99 en milisegundos.
+    """
+    primeras = []
+    for prefijo in prefijos:
+        inicio = time.perf_counter()
+        funcion(prefijo)
+        primeras.append((time.perf_counter() - inicio) * 1000)
+    tiempos = []
+    for _ in range(repeticiones):
+        for prefijo in prefijos:
+            inicio = time.perf_counter()
+            funcion(prefijo)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return {'primera_ms': statistics.fmean(primeras), 'media_ms': statistics.fmean(tiempos),
+            'p99_ms': tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))]}
+
+
+def ejecutar(libros: int, repeticiones: int) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        libros: Libros del catálogo (con un préstamo por cada diez libros)
+        repeticiones: Repeticiones de cada lista de prefijos
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Caso medido -> latencias en milisegundos
+    """
+    biblioteca = crear_biblioteca(libros)
+    resultados = {}
+    
+    inicio = time.perf_counter()
+    biblioteca.autocompletar("a")
+    resultados['construccion'] = {'media_ms': (time.perf_counter() - inicio) * 1000}
+    
+    for campo, grupos in PREFIJOS.items():
+        for grupo, prefijos in grupos.items():
+            resultados[f"{campo} {grupo}"] = _latencias(
+                lambda prefijo: biblioteca.autocompletar(prefijo, campo), prefijos, repeticiones)
+    resultados['buscar_libros_por_titulo 3+ letras'] = _latencias(
+        biblioteca.buscar_libros_por_titulo, PREFIJOS['titulo']['3+ letras'], repeticiones)
+    
+    contador = iter(range(libros, libros + 10 ** 6))
+    
+    def agregar_y_consultar(prefijo: str) -> List[str]:
+        i = next(contador)
+        biblioteca.agregar_libro(Libro(f"AUTO-{i}", f"{prefijo.capitalize()} nuevo {i}", "Autor"))
+        return biblioteca.autocompletar(prefijo)
+    
+    resultados['agregar + consultar'] = _latencias(
+        agregar_y_consultar, PREFIJOS['titulo']['3+ letras'], repeticiones)
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--libros', type=int, default=200_000, help='Libros del catálogo')
+    parser.add_argument('--repeticiones', type=int, default=20,
+                        help='Repeticiones de cada lista de prefijos')
+    args = parser.parse_args()
+    
+    print(f"{args.libros:,} libros")
+    print(f"{'caso':>36} {'primera':>10} {'media':>10} {'p99':>10}")
+    for caso, medidas in ejecutar(args.libros, args.repeticiones).items():
+        primera, p99 = (f"{medidas[clave]:>8.3f}ms" if clave in medidas else f"{'-':>10}"
+                        for clave in ('primera_ms', 'p99_ms'))
+        print(f"{caso:>36} {primera} {medidas['media_ms']:>8.3f}ms {p99}")
+
+
+if __name__ == '__main__':
+    main()
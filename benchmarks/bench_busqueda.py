@@ -0,0 +1,127 @@
+"""
+Benchmark de las búsquedas sin acentos frente a las búsquedas en minúsculas.
+
+Compara el índice de trigramas con las claves de búsqueda actuales (casefold
+y NFKD sin acentos, calculadas una vez al crear cada libro) con el mismo
+índice normalizando solo con ``lower()``, como antes. Se miden la
+indexación, que incluye el cálculo de las claves, las consultas de tres o más
+caracteres, que usan los trigramas, y las consultas cortas, que recorren los
+textos normalizados. Como referencia, se mide también un recorrido que
+normaliza cada registro en cada consulta.
+
+Los títulos y autores sintéticos incluyen acentos ("jardín", "García"). Las
+latencias se miden con consultas escritas con acentos, que obtienen los mismos
+resultados con ambas normalizaciones; la última columna cuenta los aciertos
+de esas consultas escritas sin acentos, que la búsqueda en minúsculas pierde.
+
+Uso:
+    python -m benchmarks.bench_busqueda --libros 200000
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from biblioteca.indice_texto import IndiceTrigramas, normalizar
+
+from .datos import generar_libros
+
+
+CONSULTAS = ["jardín", "río", "corazón", "sueño", "García", "López", "Martínez", "Álvarez",
+             "Lucía", "Raúl", "Tomás", "memoria", "sombra", "destino", "invierno"]
+CONSULTAS_SIN_ACENTOS = [normalizar(consulta) for consulta in CONSULTAS]
+CONSULTAS_CORTAS = ["ía", "ez", "ón", "ra", "ma", "lu"]
+
+
+class IndiceMinusculas(IndiceTrigramas):
+    """Índice de trigramas con la normalización anterior: solo minúsculas."""
+    
+    normalizar = staticmethod(str.lower)
+
+
+def _cronometrar(funcion: Callable[[str], List[str]], consultas: List[str],
+                 repeticiones: int) -> Dict[str, float]:
+    """Retorna la latencia media en milisegundos y el número de aciertos por consulta."""
+    aciertos = sum(len(funcion(consulta)) for consulta in consultas)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        for consulta in consultas:
+            funcion(consulta)
+    milisegundos = (time.perf_counter() - inicio) / (max(1, repeticiones) * len(consultas)) * 1000
+    return {'ms': milisegundos, 'aciertos': aciertos / len(consultas)}
+
+
+def ejecutar(libros: int, repeticiones: int) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        libros: Libros indexados
+        repeticiones: Repeticiones de cada lista de consultas
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Normalización -> tiempos y aciertos medidos
+    """
+    textos = [(libro.isbn, libro.titulo, libro.autor) for libro in generar_libros(libros)]
+    resultados = {}
+    
+    inicio = time.perf_counter()
+    titulos, autores = IndiceMinusculas(), IndiceMinusculas()
+    for isbn, titulo, autor in textos:
+        titulos.agregar(isbn, titulo)
+        autores.agregar(isbn, autor)
+    indexacion = time.perf_counter() - inicio
+    resultados['minusculas'] = {'indexacion_s': indexacion}
+    
+    inicio = time.perf_counter()
+    titulos_nuevos, autores_nuevos = IndiceTrigramas(), IndiceTrigramas()
+    for isbn, titulo, autor in textos:
+        # Lo que hacen Libro (claves de búsqueda) y Biblioteca._indexar_libro
+        titulos_nuevos.agregar_normalizado(isbn, normalizar(titulo))
+        autores_nuevos.agregar_normalizado(isbn, normalizar(autor))
+    indexacion = time.perf_counter() - inicio
+    resultados['sin_acentos'] = {'indexacion_s': indexacion}
+    
+    def por_registro(consulta: str) -> List[str]:
+        normalizada = normalizar(consulta)
+        return [isbn for isbn, _, autor in textos if normalizada in normalizar(autor)]
+    
+    for nombre, (titulo, autor) in [('minusculas', (titulos, autores)),
+                                    ('sin_acentos', (titulos_nuevos, autores_nuevos))]:
+        def buscar(consulta: str, titulo=titulo, autor=autor) -> List[str]:
+            return titulo.buscar(consulta) + autor.buscar(consulta)
+        trigramas = _cronometrar(buscar, CONSULTAS, repeticiones)
+        cortas = _cronometrar(autor.buscar, CONSULTAS_CORTAS, repeticiones)
+        resultados[nombre].update({
+            'trigramas_ms': trigramas['ms'],
+            'aciertos': trigramas['aciertos'],
+            'aciertos_sin_acentos': _cronometrar(buscar, CONSULTAS_SIN_ACENTOS, 0)['aciertos'],
+            'cortas_ms': cortas['ms'],
+        })
+    resultados['por_registro'] = {
+        'indexacion_s': 0.0,
+        'cortas_ms': _cronometrar(por_registro, CONSULTAS_CORTAS, 1)['ms'],
+    }
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--libros', type=int, default=200_000, help='Libros indexados')
+    parser.add_argument('--repeticiones', type=int, default=20,
+                        help='Repeticiones de cada lista de consultas')
+    args = parser.parse_args()
+    
+    print(f"{args.libros:,} libros")
+    print(f"{'normalización':>14} {'indexar':>10} {'trigramas':>11} {'aciertos':>9} "
+          f"{'cortas':>10} {'sin acentos':>12}")
+    for nombre, medidas in ejecutar(args.libros, args.repeticiones).items():
+        trigramas = (f"{medidas['trigramas_ms']:>9.3f}ms {medidas['aciertos']:>9.0f}"
+                     if 'trigramas_ms' in medidas else f"{'-':>11} {'-':>9}")
+        sin_acentos = medidas.get('aciertos_sin_acentos')
+        print(f"{nombre:>14} {medidas['indexacion_s']:>9.2f}s {trigramas} "
+              f"{medidas['cortas_ms']:>8.2f}ms "
+              f"{'-' if sin_acentos is None else f'{sin_acentos:.0f}':>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark del catálogo en memoria frente al catálogo columnar.
+
+Mide la memoria del catálogo y el tiempo de contar y filtrar libros
+disponibles en ambos almacenamientos.
+
+Uso:
+    python -m benchmarks.bench_catalogo --n 1000000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Dict
+
+from biblioteca import Libro
+from biblioteca.catalogo import CatalogoMemoria
+from biblioteca.catalogo_columnar import CatalogoColumnar
+
+
+def _llenar(catalogo, n: int):
+    for i in range(n):
+        libro = Libro(f"978-{i:010d}", f"Titulo del libro {i}", f"Autor {i % 5000}")
+        if i % 3 == 0:
+            libro.prestar()
+        catalogo[libro.isbn] = libro
+    return catalogo
+
+
+def _cronometrar(funcion) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def ejecutar(n: int) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta el benchmark con ``n`` libros por catálogo.
+    
+    Args:
+        n: Número de libros
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Métricas por tipo de catálogo
+    """
+    resultados = {}
+    for nombre, clase in [('memoria', CatalogoMemoria), ('columnar', CatalogoColumnar)]:
+        gc.collect()
+        tracemalloc.start()
+        catalogo = _llenar(clase(), n)
+        gc.collect()
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[nombre] = {
+            'bytes_por_libro': memoria / n,
+            'contar_disponibles_s': _cronometrar(catalogo.contar_disponibles),
+            'disponibles_s': _cronometrar(lambda: list(catalogo.disponibles())),
+            'buscar_isbn_s': _cronometrar(
+                lambda: [catalogo.get(f"978-{i:010d}") for i in range(0, n, max(1, n // 10000))]
+            ),
+        }
+        del catalogo
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--n', type=int, default=1_000_000, help='Número de libros')
+    args = parser.parse_args()
+    
+    resultados = ejecutar(args.n)
+    metricas = list(next(iter(resultados.values())))
+    print(f"Catálogo con {args.n:,} libros")
+    print(f"{'Métrica':<22}" + "".join(f"{nombre:>14}" for nombre in resultados))
+    for metrica in metricas:
+        print(f"{metrica:<22}" + "".join(f"{r[metrica]:>14.4f}" for r in resultados.values()))
+
+
+if __name__ == '__main__':
+    main()
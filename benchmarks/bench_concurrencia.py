@@ -0,0 +1,134 @@
+"""
+Benchmark de rendimiento con varios hilos: cerrojos finos frente a uno global.
+
+Varios hilos ejecutan una mezcla de lecturas por ISBN, préstamos y
+devoluciones sobre libros y usuarios aleatorios. Se compara
+``BibliotecaConcurrente`` con una biblioteca que serializa todas las
+operaciones detrás de un único cerrojo. El diario simula una escritura
+durable con una latencia fija por operación, como ocurre con ``Persistencia``.
+
+Uso:
+    python -m benchmarks.bench_concurrencia --hilos 8 --latencia-ms 0.2
+"""
+import argparse
+import random
+import threading
+import time
+from typing import Dict, List
+
+from biblioteca import Biblioteca, Libro, Usuario
+from biblioteca.concurrente import BibliotecaConcurrente
+
+
+class DiarioLento:
+    """Diario que simula una escritura durable con latencia fija."""
+    
+    def __init__(self, latencia: float):
+        self.latencia = latencia
+    
+    def _escribir(self, *_) -> None:
+        if self.latencia:
+            time.sleep(self.latencia)
+    
+    libro_agregado = usuario_registrado = prestamo_realizado = libro_devuelto = _escribir
+
+
+class BibliotecaCerrojoGlobal(Biblioteca):
+    """Biblioteca que serializa todas las operaciones con un único cerrojo."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cerrojo = threading.RLock()
+    
+    def buscar_libro_por_isbn(self, isbn):
+        with self._cerrojo:
+            return super().buscar_libro_por_isbn(isbn)
+    
+    def prestar_libro(self, isbn, id_usuario, dias_prestamo=14):
+        with self._cerrojo:
+            return super().prestar_libro(isbn, id_usuario, dias_prestamo)
+    
+    def devolver_libro(self, isbn, id_usuario):
+        with self._cerrojo:
+            return super().devolver_libro(isbn, id_usuario)
+
+
+def _medir(biblioteca: Biblioteca, hilos: int, operaciones: int, libros: int,
+           usuarios: int) -> float:
+    """Ejecuta la carga y retorna operaciones por segundo."""
+    barrera = threading.Barrier(hilos + 1)
+    
+    def trabajar(semilla: int) -> None:
+        azar = random.Random(semilla)
+        barrera.wait()
+        for _ in range(operaciones):
+            isbn = f"978-{azar.randrange(libros):010d}"
+            tirada = azar.random()
+            if tirada < 0.8:
+                biblioteca.buscar_libro_por_isbn(isbn)
+                continue
+            id_usuario = f"U{azar.randrange(usuarios):08d}"
+            try:
+                if tirada < 0.9:
+                    biblioteca.prestar_libro(isbn, id_usuario)
+                else:
+                    biblioteca.devolver_libro(isbn, id_usuario)
+            except ValueError:
+                pass
+    
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for trabajador in trabajadores:
+        trabajador.join()
+    return hilos * operaciones / (time.perf_counter() - inicio)
+
+
+def ejecutar(hilos: List[int], operaciones: int, latencia: float,
+             libros: int = 10_000) -> Dict[int, Dict[str, float]]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        hilos: Números de hilos a probar
+        operaciones: Operaciones por hilo
+        latencia: Segundos de latencia del diario por escritura
+        libros: Libros del catálogo (se registran libros // 10 usuarios)
+    
+    Returns:
+        Dict[int, Dict[str, float]]: Operaciones por segundo de cada variante por número de hilos
+    """
+    usuarios = max(1, libros // 10)
+    resultados: Dict[int, Dict[str, float]] = {}
+    for n in hilos:
+        resultados[n] = {}
+        for nombre, clase in (('global', BibliotecaCerrojoGlobal), ('finos', BibliotecaConcurrente)):
+            biblioteca = clase()
+            biblioteca.importar_libros(Libro(f"978-{i:010d}", f"Titulo {i}", "Autor")
+                                       for i in range(libros))
+            biblioteca.importar_usuarios(Usuario(f"U{i:08d}", f"Usuario {i}", limite_prestamos=50)
+                                         for i in range(usuarios))
+            biblioteca.diario = DiarioLento(latencia)
+            resultados[n][nombre] = _medir(biblioteca, n, operaciones, libros, usuarios)
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 2, 4, 8], help='Números de hilos')
+    parser.add_argument('--operaciones', type=int, default=20_000, help='Operaciones por hilo')
+    parser.add_argument('--latencia-ms', type=float, default=0.2,
+                        help='Latencia simulada del diario por escritura, en milisegundos')
+    args = parser.parse_args()
+    
+    print(f"Operaciones por segundo (latencia del diario {args.latencia_ms} ms)")
+    print(f"{'hilos':>5} {'global':>12} {'finos':>12} {'mejora':>8}")
+    for n, tasas in ejecutar(args.hilos, args.operaciones, args.latencia_ms / 1000).items():
+        print(f"{n:>5} {tasas['global']:>12,.0f} {tasas['finos']:>12,.0f} "
+              f"{tasas['finos'] / tasas['global']:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
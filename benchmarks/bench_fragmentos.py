@@ -0,0 +1,112 @@
+"""
+Benchmark de escalado de BibliotecaFragmentada de 1 a N fragmentos.
+
+Para cada número de fragmentos se arranca la biblioteca con procesos locales,
+se importa el mismo catálogo y se miden la latencia de las consultas que se
+difunden a todos los fragmentos (búsquedas por título y autor, estadísticas)
+y el ritmo de préstamos y devoluciones, que tocan uno o dos fragmentos.
+
+Las consultas difundidas solo escalan si hay al menos tantos núcleos libres
+como fragmentos; con menos, el reparto añade el coste de comunicación sin
+paralelismo real.
+
+Uso:
+    python -m benchmarks.bench_fragmentos --libros 200000 --max-fragmentos 8
+"""
+import argparse
+import os
+import random
+import time
+from typing import Callable, Dict, List
+
+from biblioteca import Libro, Usuario
+from biblioteca.fragmentada import BibliotecaFragmentada
+
+
+def _cronometrar(funcion: Callable[[int], object], repeticiones: int) -> float:
+    """Retorna la latencia media de ``funcion(i)`` en milisegundos."""
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        funcion(i)
+    return (time.perf_counter() - inicio) / repeticiones * 1000
+
+
+def _prestamos_por_segundo(biblioteca: BibliotecaFragmentada, operaciones: int,
+                           libros: int, usuarios: int) -> float:
+    azar = random.Random(0)
+    inicio = time.perf_counter()
+    for _ in range(operaciones):
+        isbn = f"978-{azar.randrange(libros):010d}"
+        id_usuario = f"U{azar.randrange(usuarios):08d}"
+        try:
+            biblioteca.prestar_libro(isbn, id_usuario)
+            biblioteca.devolver_libro(isbn, id_usuario)
+        except ValueError:
+            pass
+    return 2 * operaciones / (time.perf_counter() - inicio)
+
+
+def ejecutar(libros: int, fragmentos: List[int], consultas: int,
+             operaciones: int) -> Dict[int, Dict[str, float]]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        libros: Libros del catálogo
+        fragmentos: Números de fragmentos a medir
+        consultas: Repeticiones de cada consulta difundida
+        operaciones: Pares préstamo/devolución
+    
+    Returns:
+        Dict[int, Dict[str, float]]: Fragmentos -> tiempos y ritmos medidos
+    """
+    usuarios = max(1, libros // 10)
+    resultados = {}
+    for n in fragmentos:
+        with BibliotecaFragmentada(n) as biblioteca:
+            inicio = time.perf_counter()
+            biblioteca.importar_libros(Libro(f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 500}")
+                                       for i in range(libros))
+            biblioteca.importar_usuarios(Usuario(f"U{i:08d}", f"Usuario {i}")
+                                         for i in range(usuarios))
+            importacion = time.perf_counter() - inicio
+            biblioteca.buscar_libros_por_autor("autor")
+            
+            resultados[n] = {
+                'importacion_s': importacion,
+                'titulo_ms': _cronometrar(
+                    lambda i: biblioteca.buscar_libros_por_titulo(f"titulo {i % 90 + 10}1"), consultas),
+                'autor_ms': _cronometrar(
+                    lambda i: biblioteca.buscar_libros_por_autor(f"autor {i % 500}"), consultas),
+                'estadisticas_ms': _cronometrar(lambda i: biblioteca.estadisticas(), consultas),
+                'prestamos_s': _prestamos_por_segundo(biblioteca, operaciones, libros, usuarios),
+            }
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--libros', type=int, default=200_000, help='Libros del catálogo')
+    parser.add_argument('--max-fragmentos', type=int, default=os.cpu_count() or 1,
+                        help='Número máximo de fragmentos (se mide 1, 2, 4, ... hasta este valor)')
+    parser.add_argument('--consultas', type=int, default=50, help='Repeticiones por consulta')
+    parser.add_argument('--operaciones', type=int, default=2000, help='Pares préstamo/devolución')
+    args = parser.parse_args()
+    
+    fragmentos = [1]
+    while fragmentos[-1] * 2 <= args.max_fragmentos:
+        fragmentos.append(fragmentos[-1] * 2)
+    if fragmentos[-1] != args.max_fragmentos:
+        fragmentos.append(args.max_fragmentos)
+    
+    print(f"{args.libros:,} libros, {os.cpu_count()} núcleos")
+    print(f"{'fragmentos':>10} {'importar':>10} {'título':>10} {'autor':>10} "
+          f"{'estadíst.':>10} {'préstamos/s':>12}")
+    for n, medidas in ejecutar(args.libros, fragmentos, args.consultas, args.operaciones).items():
+        print(f"{n:>10} {medidas['importacion_s']:>9.2f}s {medidas['titulo_ms']:>8.2f}ms "
+              f"{medidas['autor_ms']:>8.2f}ms {medidas['estadisticas_ms']:>8.2f}ms "
+              f"{medidas['prestamos_s']:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
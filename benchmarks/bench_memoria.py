@@ -0,0 +1,129 @@
+"""
+Benchmark de memoria por objeto para Libro, Usuario y Prestamo.
+
+Compara las clases actuales (con ``__slots__`` y, en Usuario, un conjunto vacío
+compartido) contra objetos equivalentes basados en ``__dict__`` con los mismos
+atributos y una lista propia por usuario, que es como se almacenaban antes. Los textos de cada registro se generan antes de medir, de modo que solo
+se cuenta el costo de los objetos y de sus contenedores propios.
+
+Uso:
+    python -m benchmarks.bench_memoria --n 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from biblioteca import Libro, Prestamo, Usuario
+
+
+class _LibroConDict:
+    """Libro con ``__dict__`` usado como referencia del formato anterior."""
+
+
+class _UsuarioConDict:
+    """Usuario con ``__dict__`` usado como referencia del formato anterior."""
+
+
+class _PrestamoConDict:
+    """Préstamo con ``__dict__`` usado como referencia del formato anterior."""
+
+
+def _libro_con_dict(isbn: str, titulo: str, autor: str) -> _LibroConDict:
+    objeto = _LibroConDict()
+    objeto.isbn = isbn
+    objeto.titulo = titulo
+    objeto.autor = autor
+    objeto.disponible = True
+    objeto.fecha_publicacion = None
+    return objeto
+
+
+def _usuario_con_dict(id: str, nombre: str) -> _UsuarioConDict:
+    objeto = _UsuarioConDict()
+    objeto.id = id
+    objeto.nombre = nombre
+    objeto.email = None
+    objeto.libros_prestados = []
+    objeto.limite_prestamos = 3
+    return objeto
+
+
+def _prestamo_con_dict(id: str, isbn: str, id_usuario: str) -> _PrestamoConDict:
+    objeto = _PrestamoConDict()
+    objeto.id = id
+    objeto.isbn_libro = isbn
+    objeto.id_usuario = id_usuario
+    objeto.fecha_prestamo = datetime.now()
+    objeto.fecha_devolucion = None
+    objeto.dias_prestamo = 14
+    return objeto
+
+
+def medir_bytes_por_objeto(fabrica: Callable, argumentos: List[tuple]) -> float:
+    """
+    Mide los bytes asignados por objeto al construir un objeto por argumento.
+    
+    Args:
+        fabrica: Función que construye un objeto
+        argumentos: Tuplas de argumentos ya generadas
+    
+    Returns:
+        float: Bytes promedio por objeto
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio, _ = tracemalloc.get_traced_memory()
+    objetos = [fabrica(*args) for args in argumentos]
+    fin, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # La lista contenedora no forma parte del costo por objeto
+    total = fin - inicio - objetos.__sizeof__()
+    del objetos
+    return total / len(argumentos)
+
+
+def ejecutar(n: int) -> Dict[str, Dict[str, float]]:
+    """
+    Ejecuta el benchmark para ``n`` instancias de cada clase.
+    
+    Args:
+        n: Número de instancias por clase
+    
+    Returns:
+        Dict[str, Dict[str, float]]: Bytes por objeto antes y después por clase
+    """
+    libros = [(f"ISBN-{i:08d}", f"Titulo {i}", f"Autor {i % 1000}") for i in range(n)]
+    usuarios = [(f"U{i:08d}", f"Usuario {i}") for i in range(n)]
+    prestamos = [(f"PREST-{i:08d}", libros[i][0], usuarios[i][0]) for i in range(n)]
+    
+    casos = {
+        'Libro': (_libro_con_dict, Libro, libros),
+        'Usuario': (_usuario_con_dict, Usuario, usuarios),
+        'Prestamo': (_prestamo_con_dict, Prestamo, prestamos),
+    }
+    resultados = {}
+    for nombre, (antes, despues, argumentos) in casos.items():
+        resultados[nombre] = {
+            'antes': medir_bytes_por_objeto(antes, argumentos),
+            'despues': medir_bytes_por_objeto(despues, argumentos),
+        }
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--n', type=int, default=1_000_000,
+                        help='Instancias por clase (por defecto 1.000.000)')
+    args = parser.parse_args()
+    
+    print(f"Bytes por objeto con {args.n:,} instancias")
+    print(f"{'Clase':<10} {'__dict__':>10} {'__slots__':>10} {'Ahorro':>8}")
+    for nombre, r in ejecutar(args.n).items():
+        ahorro = 1 - r['despues'] / r['antes']
+        print(f"{nombre:<10} {r['antes']:>10.1f} {r['despues']:>10.1f} {ahorro:>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
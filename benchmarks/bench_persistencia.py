@@ -0,0 +1,84 @@
+"""
+Benchmark de recuperación desde instantánea y diario frente a reimportar CSV.
+
+Genera un catálogo y usuarios sintéticos, los guarda como CSV y como
+instantánea más un diario con las operaciones posteriores, y compara el tiempo
+de reconstruir la biblioteca con ``importar_libros``/``importar_usuarios``
+contra el de ``Persistencia.abrir``.
+
+Uso:
+    python -m benchmarks.bench_persistencia --n 200000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from typing import Dict
+
+from biblioteca import Biblioteca, Libro, Usuario
+from biblioteca.persistencia import Persistencia
+
+
+def ejecutar(n: int, cola: int) -> Dict[str, float]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        n: Número de libros (se registran n // 10 usuarios)
+        cola: Número de préstamos registrados en el diario tras la instantánea
+    
+    Returns:
+        Dict[str, float]: Segundos de cada forma de reconstrucción
+    """
+    usuarios = max(1, n // 10)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_libros = os.path.join(directorio, 'libros.csv')
+        ruta_usuarios = os.path.join(directorio, 'usuarios.csv')
+        with open(ruta_libros, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['isbn', 'titulo', 'autor'])
+            escritor.writerows((f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 5000}") for i in range(n))
+        with open(ruta_usuarios, 'w', newline='', encoding='utf-8') as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(['id', 'nombre'])
+            escritor.writerows((f"U{i:08d}", f"Usuario {i}") for i in range(usuarios))
+        
+        persistencia = Persistencia(os.path.join(directorio, 'datos'), instantanea_cada=10 ** 9)
+        biblioteca = persistencia.abrir()
+        biblioteca.importar_libros(Libro(f"978-{i:010d}", f"Titulo {i}", f"Autor {i % 5000}")
+                                   for i in range(n))
+        biblioteca.importar_usuarios(Usuario(f"U{i:08d}", f"Usuario {i}") for i in range(usuarios))
+        persistencia.instantanea()
+        for i in range(min(cola, n)):
+            biblioteca.prestar_libro(f"978-{i:010d}", f"U{i % usuarios:08d}")
+            biblioteca.devolver_libro(f"978-{i:010d}", f"U{i % usuarios:08d}")
+        persistencia.cerrar()
+        
+        inicio = time.perf_counter()
+        reimportada = Biblioteca()
+        reimportada.importar_libros(ruta_libros)
+        reimportada.importar_usuarios(ruta_usuarios)
+        importar = time.perf_counter() - inicio
+        
+        inicio = time.perf_counter()
+        Persistencia(os.path.join(directorio, 'datos')).abrir()
+        recuperar = time.perf_counter() - inicio
+    
+    return {'reimportar_csv_s': importar, 'instantanea_mas_diario_s': recuperar}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--n', type=int, default=200_000, help='Número de libros')
+    parser.add_argument('--cola', type=int, default=10_000,
+                        help='Préstamos y devoluciones en el diario tras la instantánea')
+    args = parser.parse_args()
+    
+    print(f"Reconstrucción con {args.n:,} libros y {args.cola:,} préstamos en el diario")
+    for nombre, segundos in ejecutar(args.n, args.cola).items():
+        print(f"{nombre:<28} {segundos:>8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
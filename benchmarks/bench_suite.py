@@ -0,0 +1,340 @@
+"""
+Suite de benchmarks de las operaciones de Biblioteca a distintas escalas.
+
+Para cada escala (número de libros) se genera una biblioteca determinista con
+``benchmarks.datos`` y se mide cada operación repetidamente hasta agotar un
+tiempo máximo por operación. Los resultados (mediana, p95 y mínimo por
+llamada) se pueden guardar en JSON y compararse con una ejecución anterior:
+las operaciones cuya mediana empeora más que la tolerancia se marcan como
+regresiones y el proceso termina con código 1.
+
+Uso:
+    python -m benchmarks.bench_suite --escalas 1000,10000,100000 --salida base.json
+    python -m benchmarks.bench_suite --escalas 1000,10000,100000 --comparar base.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from biblioteca import Biblioteca, Libro, Usuario
+from biblioteca.catalogo_columnar import CatalogoColumnar
+
+from .datos import APELLIDOS, NOMBRES, PALABRAS, crear_biblioteca, id_usuario, isbn
+
+
+VERSION_RESULTADOS = 1
+USUARIO_BENCHMARK = "BENCH"
+
+
+class _Contexto:
+    """Estado compartido por las operaciones medidas en una escala."""
+    
+    def __init__(self, biblioteca: Biblioteca, n_libros: int, semilla: int):
+        self.biblioteca = biblioteca
+        self.n_libros = n_libros
+        self.n_usuarios = max(1, n_libros // 10)
+        self.azar = random.Random(semilla)
+        self.altas = 0
+        biblioteca.registrar_usuario(Usuario(USUARIO_BENCHMARK, "Benchmark", limite_prestamos=10 ** 9))
+    
+    def isbn_al_azar(self) -> str:
+        return isbn(self.azar.randrange(self.n_libros))
+    
+    def usuario_al_azar(self) -> str:
+        return id_usuario(self.azar.randrange(self.n_usuarios))
+    
+    def isbn_prestable(self) -> str:
+        """Retorna un libro con ejemplares que el usuario del benchmark no tiene."""
+        prestados = self.biblioteca.buscar_usuario(USUARIO_BENCHMARK).libros_prestados
+        while True:
+            candidato = self.isbn_al_azar()
+            if candidato not in prestados and self.biblioteca.buscar_libro_por_isbn(candidato).disponible:
+                return candidato
+
+
+Medicion = Tuple[Callable[[], Any], Optional[Callable[[], Any]]]
+
+
+def _agregar_libro(ctx: _Contexto) -> Medicion:
+    ctx.altas += 1
+    libro = Libro(f"BENCH-{ctx.altas}", "Libro del benchmark", "Autor del benchmark")
+    return (lambda: ctx.biblioteca.agregar_libro(libro)), None
+
+
+def _registrar_usuario(ctx: _Contexto) -> Medicion:
+    ctx.altas += 1
+    usuario = Usuario(f"BENCH-{ctx.altas}", "Usuario del benchmark")
+    return (lambda: ctx.biblioteca.registrar_usuario(usuario)), None
+
+
+def _buscar_libro_por_isbn(ctx: _Contexto) -> Medicion:
+    clave = ctx.isbn_al_azar()
+    return (lambda: ctx.biblioteca.buscar_libro_por_isbn(clave)), None
+
+
+def _buscar_libros_por_titulo(ctx: _Contexto) -> Medicion:
+    texto = f"{ctx.azar.choice(PALABRAS)} y {ctx.azar.choice(PALABRAS)}"
+    return (lambda: ctx.biblioteca.buscar_libros_por_titulo(texto)), None
+
+
+def _buscar_libros_por_autor(ctx: _Contexto) -> Medicion:
+    texto = f"{ctx.azar.choice(NOMBRES)} {ctx.azar.choice(APELLIDOS)}"
+    return (lambda: ctx.biblioteca.buscar_libros_por_autor(texto)), None
+
+
+def _buscar_usuario(ctx: _Contexto) -> Medicion:
+    clave = ctx.usuario_al_azar()
+    return (lambda: ctx.biblioteca.buscar_usuario(clave)), None
+
+
+def _prestar_libro(ctx: _Contexto) -> Medicion:
+    clave = ctx.isbn_prestable()
+    return ((lambda: ctx.biblioteca.prestar_libro(clave, USUARIO_BENCHMARK)),
+            (lambda: ctx.biblioteca.devolver_libro(clave, USUARIO_BENCHMARK)))
+
+
+def _devolver_libro(ctx: _Contexto) -> Medicion:
+    clave = ctx.isbn_prestable()
+    ctx.biblioteca.prestar_libro(clave, USUARIO_BENCHMARK)
+    return (lambda: ctx.biblioteca.devolver_libro(clave, USUARIO_BENCHMARK)), None
+
+
+def _prestar_lote(ctx: _Contexto) -> Medicion:
+    claves = set()
+    while len(claves) < 10:
+        claves.add(ctx.isbn_prestable())
+    pares = [(clave, USUARIO_BENCHMARK) for clave in claves]
+    return ((lambda: ctx.biblioteca.prestar_lote(pares)),
+            (lambda: ctx.biblioteca.devolver_lote(pares)))
+
+
+def _prestamos_usuario(ctx: _Contexto) -> Medicion:
+    clave = ctx.usuario_al_azar()
+    return (lambda: ctx.biblioteca.prestamos_usuario(clave)), None
+
+
+def _ultimos_prestamos_usuario(ctx: _Contexto) -> Medicion:
+    clave = ctx.usuario_al_azar()
+    return (lambda: ctx.biblioteca.ultimos_prestamos_usuario(clave, 5)), None
+
+
+def _sin_argumentos(nombre: str) -> Callable[[_Contexto], Medicion]:
+    def preparar(ctx: _Contexto) -> Medicion:
+        return getattr(ctx.biblioteca, nombre), None
+    return preparar
+
+
+# Operación -> función que prepara una llamada (sin medir) y retorna la llamada
+# a medir y, opcionalmente, la que deshace su efecto (tampoco se mide). Las
+# altas no se pueden deshacer, así que van al final para no alterar el tamaño
+# de los datos con que se miden las demás operaciones.
+OPERACIONES: Dict[str, Callable[[_Contexto], Medicion]] = {
+    'buscar_libro_por_isbn': _buscar_libro_por_isbn,
+    'buscar_libros_por_titulo': _buscar_libros_por_titulo,
+    'buscar_libros_por_autor': _buscar_libros_por_autor,
+    'libros_disponibles': _sin_argumentos('libros_disponibles'),
+    'buscar_usuario': _buscar_usuario,
+    'prestar_libro': _prestar_libro,
+    'devolver_libro': _devolver_libro,
+    'prestar_lote': _prestar_lote,
+    'prestamos_activos': _sin_argumentos('prestamos_activos'),
+    'prestamos_vencidos': _sin_argumentos('prestamos_vencidos'),
+    'prestamos_usuario': _prestamos_usuario,
+    'ultimos_prestamos_usuario': _ultimos_prestamos_usuario,
+    'estadisticas': _sin_argumentos('estadisticas'),
+    'agregar_libro': _agregar_libro,
+    'registrar_usuario': _registrar_usuario,
+}
+
+
+def medir_operacion(preparar: Callable[[_Contexto], Medicion], ctx: _Contexto,
+                    tiempo_maximo: float, repeticiones_maximas: int,
+                    repeticiones_minimas: int = 5) -> Dict[str, float]:
+    """
+    Mide una operación repetidamente.
+    
+    Args:
+        preparar: Prepara cada llamada (ver ``OPERACIONES``)
+        ctx: Contexto de la escala
+        tiempo_maximo: Segundos tras los que se deja de repetir
+        repeticiones_maximas: Número máximo de llamadas
+        repeticiones_minimas: Número mínimo de llamadas, aunque se supere el tiempo
+    
+    Returns:
+        Dict[str, float]: ``repeticiones`` y segundos por llamada ``mediana_s``,
+            ``p95_s`` y ``min_s``
+    """
+    muestras: List[float] = []
+    limite = time.perf_counter() + tiempo_maximo
+    while len(muestras) < repeticiones_minimas or (
+            len(muestras) < repeticiones_maximas and time.perf_counter() < limite):
+        llamada, deshacer = preparar(ctx)
+        inicio = time.perf_counter()
+        llamada()
+        muestras.append(time.perf_counter() - inicio)
+        if deshacer is not None:
+            deshacer()
+    muestras.sort()
+    return {
+        'repeticiones': len(muestras),
+        'mediana_s': statistics.median(muestras),
+        'p95_s': muestras[int(0.95 * (len(muestras) - 1))],
+        'min_s': muestras[0],
+    }
+
+
+def ejecutar(escalas: List[int], operaciones: List[str], semilla: int = 0,
+             catalogo: str = 'memoria', tiempo_maximo: float = 0.5,
+             repeticiones_maximas: int = 2000) -> Dict[str, Any]:
+    """
+    Ejecuta la suite.
+    
+    Args:
+        escalas: Números de libros a medir
+        operaciones: Nombres de las operaciones a medir (claves de ``OPERACIONES``)
+        semilla: Semilla de los datos y de la elección de argumentos
+        catalogo: 'memoria' o 'columnar'
+        tiempo_maximo: Segundos máximos de medición por operación y escala
+        repeticiones_maximas: Llamadas máximas por operación y escala
+    
+    Returns:
+        Dict[str, Any]: Resultados serializables como JSON
+    """
+    fabrica = Biblioteca if catalogo == 'memoria' else (
+        lambda: Biblioteca(catalogo=CatalogoColumnar()))
+    resultados: Dict[str, Any] = {
+        'version': VERSION_RESULTADOS,
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'entorno': {'python': platform.python_version(), 'plataforma': platform.platform()},
+        'parametros': {'semilla': semilla, 'catalogo': catalogo, 'tiempo_maximo': tiempo_maximo,
+                       'repeticiones_maximas': repeticiones_maximas},
+        'escalas': {},
+    }
+    for n in escalas:
+        inicio = time.perf_counter()
+        biblioteca = crear_biblioteca(n, semilla, fabrica)
+        construccion = time.perf_counter() - inicio
+        ctx = _Contexto(biblioteca, n, semilla)
+        # Las búsquedas por texto construyen sus índices en la primera llamada
+        biblioteca.buscar_libros_por_titulo("")
+        resultados['escalas'][str(n)] = {
+            'construccion_s': construccion,
+            'operaciones': {
+                nombre: medir_operacion(OPERACIONES[nombre], ctx, tiempo_maximo, repeticiones_maximas)
+                for nombre in operaciones
+            },
+        }
+        del ctx, biblioteca
+    return resultados
+
+
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], tolerancia: float,
+             diferencia_minima: float = 5e-6) -> List[Dict[str, Any]]:
+    """
+    Compara dos resultados y retorna las operaciones que empeoraron.
+    
+    Solo se comparan las escalas y operaciones presentes en ambos. Una
+    operación empeora si su mediana supera la de referencia en más de la
+    tolerancia relativa y, además, en más de ``diferencia_minima`` segundos,
+    para no marcar el ruido de medición de las operaciones de microsegundos.
+    
+    Args:
+        actual: Resultados de la ejecución actual
+        base: Resultados de referencia
+        tolerancia: Empeoramiento relativo admitido de la mediana (0.25 = 25 %)
+        diferencia_minima: Empeoramiento absoluto mínimo, en segundos
+    
+    Returns:
+        List[Dict[str, Any]]: Regresiones con ``escala``, ``operacion``,
+            ``base_s``, ``actual_s`` y ``cambio`` (relativo)
+    """
+    regresiones = []
+    for escala, medidas in actual['escalas'].items():
+        referencia = base['escalas'].get(escala)
+        if referencia is None:
+            continue
+        for operacion, medida in medidas['operaciones'].items():
+            anterior = referencia['operaciones'].get(operacion)
+            if anterior is None:
+                continue
+            cambio = medida['mediana_s'] / anterior['mediana_s'] - 1
+            if cambio > tolerancia and medida['mediana_s'] - anterior['mediana_s'] > diferencia_minima:
+                regresiones.append({'escala': int(escala), 'operacion': operacion,
+                                    'base_s': anterior['mediana_s'],
+                                    'actual_s': medida['mediana_s'], 'cambio': cambio})
+    return regresiones
+
+
+def _formato(segundos: float) -> str:
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:.1f}µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:.2f}ms"
+    return f"{segundos:.2f}s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--escalas', default='1000,10000,100000',
+                        help='Números de libros separados por comas (hasta 10000000)')
+    parser.add_argument('--operaciones', default=','.join(OPERACIONES),
+                        help='Operaciones separadas por comas')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla de los datos')
+    parser.add_argument('--catalogo', choices=('memoria', 'columnar'), default='memoria',
+                        help='Almacenamiento del catálogo')
+    parser.add_argument('--tiempo-maximo', type=float, default=0.5,
+                        help='Segundos de medición por operación y escala')
+    parser.add_argument('--repeticiones', type=int, default=2000,
+                        help='Llamadas máximas por operación y escala')
+    parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--comparar', help='Archivo JSON de referencia para detectar regresiones')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='Empeoramiento relativo admitido al comparar (0.25 = 25 %%)')
+    parser.add_argument('--diferencia-minima', type=float, default=5e-6,
+                        help='Empeoramiento absoluto mínimo, en segundos, para marcar una regresión')
+    args = parser.parse_args()
+    
+    escalas = [int(escala) for escala in args.escalas.split(',')]
+    operaciones = args.operaciones.split(',')
+    desconocidas = [nombre for nombre in operaciones if nombre not in OPERACIONES]
+    if desconocidas:
+        parser.error(f"Operaciones desconocidas: {', '.join(desconocidas)}")
+    
+    resultados = ejecutar(escalas, operaciones, args.semilla, args.catalogo,
+                          args.tiempo_maximo, args.repeticiones)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    
+    print(f"Mediana por llamada ({args.catalogo})")
+    print(f"{'operación':<28}" + "".join(f"{escala:>12,}" for escala in escalas))
+    print(f"{'(construcción)':<28}" + "".join(
+        f"{_formato(resultados['escalas'][str(escala)]['construccion_s']):>12}" for escala in escalas))
+    for nombre in operaciones:
+        print(f"{nombre:<28}" + "".join(
+            f"{_formato(resultados['escalas'][str(escala)]['operaciones'][nombre]['mediana_s']):>12}"
+            for escala in escalas))
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(resultados, base, args.tolerancia, args.diferencia_minima)
+        if not regresiones:
+            print(f"\nSin regresiones respecto a {args.comparar} (tolerancia {args.tolerancia:.0%})")
+            return
+        print(f"\nRegresiones respecto a {args.comparar} (tolerancia {args.tolerancia:.0%}):")
+        for regresion in regresiones:
+            print(f"  {regresion['operacion']:<28} {regresion['escala']:>12,} "
+                  f"{_formato(regresion['base_s']):>10} -> {_formato(regresion['actual_s']):>10} "
+                  f"(+{regresion['cambio']:.0%})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
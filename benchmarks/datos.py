@@ -0,0 +1,135 @@
+"""
+Generadores deterministas de datos sintéticos para los benchmarks.
+
+La misma semilla y el mismo tamaño producen siempre los mismos libros,
+usuarios y préstamos, de modo que los resultados de distintas ejecuciones
+son comparables. Las fechas de los préstamos son relativas a una fecha de
+referencia (por defecto, el momento de la llamada).
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, Optional
+
+from biblioteca import Biblioteca, Libro, Prestamo, Usuario
+
+
+PALABRAS = (
+    "amor", "guerra", "paz", "tiempo", "noche", "ciudad", "mar", "sombra", "viento",
+    "fuego", "silencio", "memoria", "jardín", "camino", "invierno", "verano", "río",
+    "luz", "piedra", "sueño", "historia", "casa", "tierra", "cielo", "voz", "puerta",
+    "espejo", "isla", "libro", "bosque", "montaña", "desierto", "ventana", "reino",
+    "secreto", "destino", "lluvia", "nieve", "hierro", "oro", "plata", "sangre",
+    "corazón", "alma", "ojos", "mano", "viaje", "regreso", "olvido", "principio",
+)
+NOMBRES = (
+    "Ana", "Carlos", "Lucía", "Miguel", "Sofía", "Javier", "Elena", "Pablo", "Marta",
+    "Diego", "Laura", "Andrés", "Isabel", "Tomás", "Carmen", "Raúl", "Paula", "Jorge",
+    "Irene", "Hugo", "Clara", "Mateo", "Julia", "Gabriel", "Rosa",
+)
+APELLIDOS = (
+    "García", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Fernández", "Díaz",
+    "Ruiz", "Moreno", "Álvarez", "Romero", "Navarro", "Torres", "Domínguez", "Vázquez",
+    "Ramos", "Gil", "Serrano", "Blanco", "Molina", "Castro", "Ortiz", "Rubio", "Marín",
+)
+
+
+def isbn(i: int) -> str:
+    """Retorna el ISBN sintético del libro ``i``."""
+    return f"978-{i:010d}"
+
+
+def id_usuario(i: int) -> str:
+    """Retorna el ID sintético del usuario ``i``."""
+    return f"U{i:08d}"
+
+
+def generar_libros(n: int, semilla: int = 0, inicio: int = 0) -> Iterator[Libro]:
+    """
+    Genera libros con títulos de dos palabras y autores de un conjunto de 625 nombres.
+    
+    Args:
+        n: Número de libros
+        semilla: Semilla del generador aleatorio
+        inicio: Índice del primer libro (para generar lotes adicionales)
+    
+    Returns:
+        Iterator[Libro]: Libros ``isbn(inicio)`` a ``isbn(inicio + n - 1)``
+    """
+    azar = random.Random(f"libros-{semilla}-{inicio}")
+    for i in range(inicio, inicio + n):
+        titulo = f"{azar.choice(PALABRAS).capitalize()} y {azar.choice(PALABRAS)} {i}"
+        autor = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}"
+        yield Libro(isbn(i), titulo, autor, ejemplares=2 if i % 7 == 0 else 1)
+
+
+def generar_usuarios(n: int, semilla: int = 0, inicio: int = 0) -> Iterator[Usuario]:
+    """
+    Genera usuarios con nombre aleatorio y límites de 3 a 5 préstamos.
+    
+    Args:
+        n: Número de usuarios
+        semilla: Semilla del generador aleatorio
+        inicio: Índice del primer usuario
+    
+    Returns:
+        Iterator[Usuario]: Usuarios ``id_usuario(inicio)`` a ``id_usuario(inicio + n - 1)``
+    """
+    azar = random.Random(f"usuarios-{semilla}-{inicio}")
+    for i in range(inicio, inicio + n):
+        yield Usuario(id_usuario(i), f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)}",
+                      limite_prestamos=azar.randint(3, 5))
+
+
+def generar_prestamos(n_libros: int, n_usuarios: int, semilla: int = 0,
+                      referencia: Optional[datetime] = None) -> Iterator[Prestamo]:
+    """
+    Genera un préstamo por cada diez libros, repartidos entre los usuarios.
+    
+    Los préstamos se realizaron en los 90 días anteriores a la referencia;
+    la mitad ya se devolvieron y, de los activos, los más antiguos están vencidos.
+    Los préstamos se reparten de forma cíclica entre los usuarios; con un
+    usuario por cada diez libros, como en ``crear_biblioteca``, cada usuario
+    recibe uno.
+    
+    Args:
+        n_libros: Número de libros generados
+        n_usuarios: Número de usuarios generados
+        semilla: Semilla del generador aleatorio
+        referencia: Fecha de referencia (por defecto, ahora)
+    
+    Returns:
+        Iterator[Prestamo]: Préstamos ordenados por fecha de préstamo
+    """
+    referencia = referencia or datetime.now()
+    azar = random.Random(f"prestamos-{semilla}")
+    total = n_libros // 10
+    for k in range(total):
+        prestamo = Prestamo(f"PREST-{k + 1:05d}", isbn(k * 10), id_usuario(k % n_usuarios),
+                            azar.choice((7, 14, 21)))
+        prestamo.fecha_prestamo = referencia - timedelta(days=90 * (total - k) / total)
+        if k % 2:
+            prestamo.fecha_devolucion = prestamo.fecha_prestamo + timedelta(days=azar.randint(1, 20))
+        yield prestamo
+
+
+def crear_biblioteca(n_libros: int, semilla: int = 0,
+                     fabrica: Callable[[], Biblioteca] = Biblioteca) -> Biblioteca:
+    """
+    Crea una biblioteca con ``n_libros`` libros, ``n_libros // 10`` usuarios y
+    ``n_libros // 10`` préstamos generados de forma determinista.
+    
+    Args:
+        n_libros: Número de libros
+        semilla: Semilla de los generadores
+        fabrica: Crea la biblioteca vacía (por ejemplo, con un catálogo columnar)
+    
+    Returns:
+        Biblioteca: Biblioteca poblada
+    """
+    n_usuarios = max(1, n_libros // 10)
+    biblioteca = fabrica()
+    biblioteca.importar_libros(generar_libros(n_libros, semilla), tamano_lote=100_000)
+    biblioteca.importar_usuarios(generar_usuarios(n_usuarios, semilla), tamano_lote=100_000)
+    for prestamo in generar_prestamos(n_libros, n_usuarios, semilla):
+        biblioteca.restaurar_prestamo(prestamo)
+    return biblioteca
@@ -0,0 +1,204 @@
+"""
+Módulo que define el archivo en disco de préstamos devueltos antiguos.
+"""
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .prestamo import Prestamo
+
+
+def _escribir_atomico(ruta: str, datos: bytes) -> None:
+    """Escribe un archivo completo en un temporal y lo renombra sobre ``ruta``."""
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(datos)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+def _registro(prestamo: Prestamo) -> List[Any]:
+    return [prestamo.id, prestamo.isbn_libro, prestamo.dias_prestamo,
+            prestamo.fecha_prestamo.isoformat(), prestamo.fecha_devolucion.isoformat()]
+
+
+def _prestamo(id_usuario: str, registro: List[Any]) -> Prestamo:
+    id, isbn, dias, fecha_prestamo, fecha_devolucion = registro
+    prestamo = Prestamo(id, isbn, id_usuario, dias)
+    prestamo.fecha_prestamo = datetime.fromisoformat(fecha_prestamo)
+    prestamo.fecha_devolucion = datetime.fromisoformat(fecha_devolucion)
+    return prestamo
+
+
+class ArchivoPrestamos:
+    """
+    Almacén en disco, por segmentos comprimidos, de préstamos ya devueltos.
+    
+    Cada llamada a ``archivar`` escribe un segmento inmutable: un JSON
+    comprimido con gzip con los préstamos agrupados por usuario y ordenados
+    por fecha de préstamo. Un manifiesto registra los usuarios de cada
+    segmento, de modo que una consulta de historial solo descomprime los
+    segmentos de ese usuario; los últimos segmentos leídos se conservan
+    decodificados en memoria. Es seguro usarlo desde varios hilos.
+    
+    Attributes:
+        directorio (str): Directorio de los segmentos y el manifiesto
+        antiguedad (timedelta): Tiempo desde la devolución a partir del cual
+            ``Biblioteca.archivar_prestamos`` archiva un préstamo
+    """
+    
+    ARCHIVO_MANIFIESTO = 'manifiesto.json'
+    VERSION = 1
+    
+    def __init__(self, directorio: str, antiguedad: timedelta = timedelta(days=365),
+                 segmentos_en_cache: int = 4):
+        """
+        Abre el archivo, creando el directorio si no existe.
+        
+        Args:
+            directorio: Directorio del archivo
+            antiguedad: Antigüedad mínima de la devolución para archivar
+            segmentos_en_cache: Segmentos decodificados que se conservan en memoria
+            
+        Raises:
+            ValueError: Si la antigüedad es negativa o el manifiesto tiene una
+                versión no soportada
+        """
+        if antiguedad < timedelta(0):
+            raise ValueError("La antigüedad para archivar no puede ser negativa")
+        self.directorio = directorio
+        self.antiguedad = antiguedad
+        self._segmentos_en_cache = segmentos_en_cache
+        self._segmentos: List[Dict[str, Any]] = []
+        self._por_usuario: Dict[str, List[int]] = {}
+        self._cache: 'OrderedDict[int, Dict[str, List[List[Any]]]]' = OrderedDict()
+        self._total = 0
+        self._bloqueo = threading.Lock()
+        
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, self.ARCHIVO_MANIFIESTO)
+        if os.path.exists(ruta):
+            with open(ruta, encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+            if manifiesto.get('version') != self.VERSION:
+                raise ValueError(f"Versión de archivo no soportada: {manifiesto.get('version')}")
+            for segmento in manifiesto['segmentos']:
+                self._indexar_segmento(segmento)
+    
+    def _indexar_segmento(self, segmento: Dict[str, Any]) -> None:
+        """Agrega un segmento del manifiesto al índice en memoria."""
+        numero = len(self._segmentos)
+        self._segmentos.append(segmento)
+        for id_usuario in segmento['usuarios']:
+            self._por_usuario.setdefault(id_usuario, []).append(numero)
+        self._total += segmento['prestamos']
+    
+    def archivar(self, prestamos: Iterable[Prestamo]) -> int:
+        """
+        Escribe un segmento nuevo con préstamos devueltos.
+        
+        El segmento se confirma en disco antes de actualizar el manifiesto, de
+        modo que una caída a mitad deja el archivo en su estado anterior. Los
+        préstamos que ya estaban archivados se omiten.
+        
+        Args:
+            prestamos: Préstamos a archivar
+            
+        Returns:
+            int: Número de préstamos archivados por primera vez
+            
+        Raises:
+            ValueError: Si algún préstamo sigue activo
+        """
+        por_usuario: Dict[str, List[Prestamo]] = {}
+        for prestamo in prestamos:
+            if prestamo.esta_activo():
+                raise ValueError(f"El préstamo {prestamo.id} sigue activo")
+            por_usuario.setdefault(prestamo.id_usuario, []).append(prestamo)
+        for id_usuario in [u for u in por_usuario if self.contiene_usuario(u)]:
+            archivados = self.ids_usuario(id_usuario)
+            nuevos = [p for p in por_usuario[id_usuario] if p.id not in archivados]
+            if nuevos:
+                por_usuario[id_usuario] = nuevos
+            else:
+                del por_usuario[id_usuario]
+        if not por_usuario:
+            return 0
+        
+        contenido = {
+            id_usuario: [_registro(p) for p in sorted(lista, key=lambda p: p.epoch_prestamo)]
+            for id_usuario, lista in por_usuario.items()
+        }
+        datos = gzip.compress(
+            json.dumps(contenido, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        with self._bloqueo:
+            nombre = f"segmento-{len(self._segmentos) + 1:06d}.json.gz"
+            _escribir_atomico(os.path.join(self.directorio, nombre), datos)
+            segmento = {'archivo': nombre, 'usuarios': list(contenido),
+                        'prestamos': sum(len(lista) for lista in contenido.values())}
+            manifiesto = {'version': self.VERSION, 'segmentos': self._segmentos + [segmento]}
+            _escribir_atomico(os.path.join(self.directorio, self.ARCHIVO_MANIFIESTO),
+                              json.dumps(manifiesto, ensure_ascii=False).encode('utf-8'))
+            self._indexar_segmento(segmento)
+        return segmento['prestamos']
+    
+    def _leer_segmento(self, numero: int) -> Dict[str, List[List[Any]]]:
+        """Retorna el contenido decodificado de un segmento, usando la caché."""
+        with self._bloqueo:
+            contenido = self._cache.get(numero)
+            if contenido is not None:
+                self._cache.move_to_end(numero)
+                return contenido
+            ruta = os.path.join(self.directorio, self._segmentos[numero]['archivo'])
+        with open(ruta, 'rb') as archivo:
+            contenido = json.loads(gzip.decompress(archivo.read()))
+        if self._segmentos_en_cache > 0:
+            with self._bloqueo:
+                self._cache[numero] = contenido
+                if len(self._cache) > self._segmentos_en_cache:
+                    self._cache.popitem(last=False)
+        return contenido
+    
+    def prestamos_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                          hasta: Optional[datetime] = None) -> List[Prestamo]:
+        """
+        Retorna los préstamos archivados de un usuario, opcionalmente en un rango de fechas.
+        
+        Args:
+            id_usuario: ID del usuario
+            desde: Fecha de préstamo mínima, inclusiva (opcional)
+            hasta: Fecha de préstamo máxima, inclusiva (opcional)
+            
+        Returns:
+            List[Prestamo]: Préstamos del más antiguo al más reciente; si un
+                préstamo se archivó dos veces, aparece una sola vez
+        """
+        prestamos: Dict[str, Prestamo] = {}
+        for numero in list(self._por_usuario.get(id_usuario, ())):
+            for registro in self._leer_segmento(numero)[id_usuario]:
+                prestamo = _prestamo(id_usuario, registro)
+                if desde is not None and prestamo.fecha_prestamo < desde:
+                    continue
+                if hasta is not None and prestamo.fecha_prestamo > hasta:
+                    continue
+                prestamos[prestamo.id] = prestamo
+        return sorted(prestamos.values(), key=lambda p: p.epoch_prestamo)
+    
+    def ids_usuario(self, id_usuario: str) -> Set[str]:
+        """Retorna los IDs de los préstamos archivados de un usuario."""
+        return {registro[0]
+                for numero in list(self._por_usuario.get(id_usuario, ()))
+                for registro in self._leer_segmento(numero)[id_usuario]}
+    
+    def contiene_usuario(self, id_usuario: str) -> bool:
+        """Indica si hay préstamos archivados del usuario."""
+        return id_usuario in self._por_usuario
+    
+    def __len__(self) -> int:
+        """Retorna el número de préstamos archivados."""
+        return self._total
@@ -0,0 +1,203 @@
+"""
+Módulo que define una fachada asyncio sobre Biblioteca.
+"""
+import asyncio
+import copy
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .biblioteca import Biblioteca
+from .concurrente import BibliotecaConcurrente
+from .importacion import Origen
+from .libro import Libro
+from .prestamo import Prestamo
+from .usuario import Usuario
+
+
+# Datos de los que depende cada consulta compartida
+_LIBROS = ('libros',)
+_PRESTAMOS = ('prestamos',)
+_LIBROS_Y_PRESTAMOS = ('libros', 'prestamos')
+_TODO = ('libros', 'usuarios', 'prestamos')
+
+
+class AsyncBiblioteca:
+    """
+    Fachada asíncrona de una Biblioteca para servidores basados en asyncio.
+    
+    Las operaciones O(1) (búsquedas por clave, altas, préstamos y
+    devoluciones) se ejecutan directamente en el bucle de eventos, ya que
+    delegarlas a un hilo cuesta más que ejecutarlas. Los recorridos, las
+    búsquedas por texto, los préstamos y devoluciones en lote, las
+    importaciones y, si la biblioteca tiene un archivo en disco, los
+    historiales de usuario se ejecutan en un ``Executor`` para no bloquear el
+    bucle, y las consultas idénticas simultáneas comparten un único cálculo.
+    
+    Una consulta solo se comparte con las que llegan mientras está en curso y
+    sin modificaciones intermedias de los datos de los que depende: tras un
+    alta de libro se repiten las búsquedas por texto, y tras un préstamo o una
+    devolución, los listados de disponibles y préstamos. Cada llamador recibe
+    su propia copia superficial del resultado.
+    
+    Como las consultas se ejecutan en otros hilos mientras el bucle sigue
+    modificando la biblioteca, esta debe ser segura para hilos; por defecto se
+    crea una ``BibliotecaConcurrente``.
+    
+    Attributes:
+        biblioteca (Biblioteca): Biblioteca envuelta
+    """
+    
+    def __init__(self, biblioteca: Optional[Biblioteca] = None,
+                 executor: Optional[Executor] = None):
+        """
+        Inicializa la fachada.
+        
+        Args:
+            biblioteca: Biblioteca a envolver (por defecto, una ``BibliotecaConcurrente`` vacía)
+            executor: Executor para las operaciones costosas (por defecto, el del bucle)
+        """
+        self.biblioteca = biblioteca if biblioteca is not None else BibliotecaConcurrente()
+        self._executor = executor
+        self._versiones = {'libros': 0, 'usuarios': 0, 'prestamos': 0}
+        self._en_curso: Dict[Tuple[Any, ...], asyncio.Future] = {}
+    
+    # ==================== EJECUCIÓN ====================
+    
+    def _modificado(self, datos: str) -> None:
+        """Registra una modificación para no compartir consultas anteriores a ella."""
+        self._versiones[datos] += 1
+    
+    async def _delegar(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta una función en el executor sin compartir el resultado."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, funcion, *args)
+    
+    async def _consultar(self, depende: Tuple[str, ...], nombre: str, *args: Any) -> Any:
+        """
+        Ejecuta una consulta de la biblioteca en el executor, compartiendo el
+        cálculo con las consultas idénticas en curso.
+        
+        Args:
+            depende: Datos de los que depende el resultado ('libros',
+                'usuarios' y/o 'prestamos')
+            nombre: Nombre del método de la biblioteca
+            *args: Argumentos del método (deben ser hashables)
+        
+        Returns:
+            Any: Copia superficial del resultado
+        """
+        clave = (nombre, args) + tuple(self._versiones[datos] for datos in depende)
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            loop = asyncio.get_running_loop()
+            futuro = loop.run_in_executor(self._executor, getattr(self.biblioteca, nombre), *args)
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        # shield: cancelar a un llamador no cancela el cálculo compartido
+        return copy.copy(await asyncio.shield(futuro))
+    
+    # ==================== LIBROS ====================
+    
+    async def agregar_libro(self, libro: Libro) -> bool:
+        resultado = self.biblioteca.agregar_libro(libro)
+        self._modificado('libros')
+        return resultado
+    
+    async def buscar_libro_por_isbn(self, isbn: str) -> Optional[Libro]:
+        return self.biblioteca.buscar_libro_por_isbn(isbn)
+    
+    async def buscar_libros_por_titulo(self, titulo: str) -> List[Libro]:
+        return await self._consultar(_LIBROS, 'buscar_libros_por_titulo', titulo)
+    
+    async def buscar_libros_por_autor(self, autor: str) -> List[Libro]:
+        return await self._consultar(_LIBROS, 'buscar_libros_por_autor', autor)
+    
+    async def libros_disponibles(self) -> List[Libro]:
+        return await self._consultar(_LIBROS_Y_PRESTAMOS, 'libros_disponibles')
+    
+    async def total_libros(self) -> int:
+        return self.biblioteca.total_libros()
+    
+    # ==================== USUARIOS ====================
+    
+    async def registrar_usuario(self, usuario: Usuario) -> bool:
+        resultado = self.biblioteca.registrar_usuario(usuario)
+        self._modificado('usuarios')
+        return resultado
+    
+    async def buscar_usuario(self, id_usuario: str) -> Optional[Usuario]:
+        return self.biblioteca.buscar_usuario(id_usuario)
+    
+    async def total_usuarios(self) -> int:
+        return self.biblioteca.total_usuarios()
+    
+    # ==================== PRÉSTAMOS ====================
+    
+    async def prestar_libro(self, isbn: str, id_usuario: str, dias_prestamo: int = 14) -> Prestamo:
+        prestamo = self.biblioteca.prestar_libro(isbn, id_usuario, dias_prestamo)
+        self._modificado('prestamos')
+        return prestamo
+    
+    async def devolver_libro(self, isbn: str, id_usuario: str) -> bool:
+        resultado = self.biblioteca.devolver_libro(isbn, id_usuario)
+        self._modificado('prestamos')
+        return resultado
+    
+    async def prestar_lote(self, pares: Iterable[Tuple[str, str]], dias_prestamo: int = 14,
+                           atomico: bool = True) -> Dict[str, Any]:
+        try:
+            return await self._delegar(self.biblioteca.prestar_lote, pares, dias_prestamo, atomico)
+        finally:
+            self._modificado('prestamos')
+    
+    async def devolver_lote(self, pares: Iterable[Tuple[str, str]],
+                            atomico: bool = True) -> Dict[str, Any]:
+        try:
+            return await self._delegar(self.biblioteca.devolver_lote, pares, atomico)
+        finally:
+            self._modificado('prestamos')
+    
+    async def prestamos_activos(self) -> List[Prestamo]:
+        return await self._consultar(_PRESTAMOS, 'prestamos_activos')
+    
+    async def prestamos_vencidos(self) -> List[Prestamo]:
+        return await self._consultar(_PRESTAMOS, 'prestamos_vencidos')
+    
+    async def vencidos_hasta(self, fecha: datetime) -> List[Prestamo]:
+        return await self._consultar(_PRESTAMOS, 'vencidos_hasta', fecha)
+    
+    async def prestamos_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                                hasta: Optional[datetime] = None) -> List[Prestamo]:
+        if self.biblioteca.archivo is not None:
+            return await self._consultar(_PRESTAMOS, 'prestamos_usuario', id_usuario, desde, hasta)
+        return self.biblioteca.prestamos_usuario(id_usuario, desde, hasta)
+    
+    async def ultimos_prestamos_usuario(self, id_usuario: str, n: int) -> List[Prestamo]:
+        if self.biblioteca.archivo is not None:
+            return await self._consultar(_PRESTAMOS, 'ultimos_prestamos_usuario', id_usuario, n)
+        return self.biblioteca.ultimos_prestamos_usuario(id_usuario, n)
+    
+    async def total_prestamos(self) -> int:
+        return self.biblioteca.total_prestamos()
+    
+    # ==================== IMPORTACIÓN MASIVA ====================
+    
+    async def importar_libros(self, origen: Origen, tamano_lote: int = 10000,
+                              indexar_al_final: bool = True) -> Dict[str, Any]:
+        try:
+            return await self._delegar(self.biblioteca.importar_libros, origen,
+                                       tamano_lote, indexar_al_final)
+        finally:
+            self._modificado('libros')
+    
+    async def importar_usuarios(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        try:
+            return await self._delegar(self.biblioteca.importar_usuarios, origen, tamano_lote)
+        finally:
+            self._modificado('usuarios')
+    
+    # ==================== ESTADÍSTICAS ====================
+    
+    async def estadisticas(self) -> Dict:
+        return await self._consultar(_TODO, 'estadisticas')
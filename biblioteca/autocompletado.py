@@ -0,0 +1,244 @@
+"""
+Módulo que define el índice de prefijos usado para autocompletar títulos y autores.
+"""
+import heapq
+import re
+from array import array
+from bisect import insort
+from itertools import chain
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .indice_texto import normalizar
+
+
+_PALABRA = re.compile(r'\S+')
+
+# Desplazamiento máximo (exclusivo) de una palabra dentro de un texto indexado
+_MAX_DESPLAZAMIENTO = 256
+
+
+def _biseccion(entradas: array, objetivo: Any, clave: Callable[[int], Any],
+               derecha: bool = False, desde: int = 0) -> int:
+    """
+    Búsqueda binaria sobre ``entradas`` comparando ``clave(entrada)`` con el objetivo.
+    
+    Equivale a ``bisect_left``/``bisect_right`` con el parámetro ``key``, que
+    solo existe desde Python 3.10.
+    
+    Args:
+        entradas: Entradas ordenadas según ``clave``
+        objetivo: Valor buscado
+        clave: Función que calcula la clave de orden de una entrada
+        derecha: Si es True, retorna la posición tras las entradas iguales
+        desde: Posición inicial de la búsqueda
+    
+    Returns:
+        int: Posición de inserción del objetivo
+    """
+    hasta = len(entradas)
+    while desde < hasta:
+        medio = (desde + hasta) // 2
+        valor = clave(entradas[medio])
+        if valor < objetivo or (derecha and valor == objetivo):
+            desde = medio + 1
+        else:
+            hasta = medio
+    return desde
+
+
+class IndicePrefijos:
+    """
+    Índice de prefijos sobre arreglos ordenados para sugerencias de autocompletado.
+    
+    Cada texto distinto (según su forma normalizada) es una sugerencia con un
+    contador de popularidad. El índice guarda, en un ``array`` ordenado, una
+    entrada por cada palabra de cada sugerencia: un entero que codifica la
+    sugerencia y la posición de la palabra, de modo que la clave de orden (el
+    texto desde esa palabra) se obtiene al comparar sin guardar una cadena por
+    entrada. Un prefijo se resuelve con dos búsquedas binarias, así que
+    "mart" encuentra "Robert C. Martin", y las coincidencias se ordenan por
+    popularidad; a igual popularidad, por orden alfabético del texto desde la
+    palabra coincidente.
+    
+    Las entradas nuevas se acumulan y se incorporan en la siguiente consulta:
+    las pocas, con inserciones en su posición; las muchas (por ejemplo, al
+    construir el índice), reordenando todo.
+    
+    Los prefijos cortos coinciden con gran parte del índice, así que para los
+    que abarcan más de ``MIN_ENTRADAS_MEJORES`` entradas se guardan sus
+    ``MAX_MEJORES`` mejores sugerencias. Como la popularidad solo crece, esas
+    listas se mantienen exactas actualizando solo la sugerencia que cambia.
+    
+    Attributes:
+        _textos (List[str]): Texto original de cada sugerencia
+        _normalizados (List[str]): Texto normalizado de cada sugerencia
+        _ids (Dict[str, int]): Sugerencia de cada texto normalizado
+        _popularidad (List[int]): Popularidad de cada sugerencia
+        _entradas (array): Entradas ordenadas (sugerencia * 256 + posición)
+        _sugerencias (array): Sugerencia de cada entrada, en el mismo orden
+        _pendientes (List[int]): Entradas aún no incorporadas
+        _mejores (Dict[str, List[Tuple]]): Mejores sugerencias guardadas de
+            cada prefijo, como tuplas (orden, sugerencia)
+        _largos_mejores (Set[int]): Longitudes de los prefijos con mejores guardadas
+    """
+    
+    MAX_INSERCIONES = 64
+    MIN_ENTRADAS_MEJORES = 2000
+    MAX_MEJORES = 32
+    
+    def __init__(self):
+        """Inicializa un índice vacío."""
+        self._textos: List[str] = []
+        self._normalizados: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._popularidad: List[int] = []
+        self._entradas = array('q')
+        self._sugerencias = array('q')
+        self._pendientes: List[int] = []
+        self._mejores: Dict[str, List[Tuple]] = {}
+        self._largos_mejores: Set[int] = set()
+    
+    def _clave(self, entrada: int) -> Tuple[str, int]:
+        """Retorna la clave de orden de una entrada: el texto desde su palabra."""
+        return self._normalizados[entrada >> 8][entrada & 0xFF:], entrada
+    
+    def agregar(self, texto: str, normalizado: Optional[str] = None) -> int:
+        """
+        Agrega un texto como sugerencia, si no existía ya.
+        
+        Args:
+            texto: Texto original, tal como se sugiere
+            normalizado: Texto ya normalizado (opcional); por defecto se calcula
+        
+        Returns:
+            int: Identificador de la sugerencia
+        """
+        if normalizado is None:
+            normalizado = normalizar(texto)
+        sugerencia = self._ids.get(normalizado)
+        if sugerencia is not None:
+            return sugerencia
+        sugerencia = self._ids[normalizado] = len(self._textos)
+        self._textos.append(texto)
+        self._normalizados.append(normalizado)
+        self._popularidad.append(0)
+        for desplazamiento in self._palabras(normalizado):
+            self._pendientes.append(sugerencia << 8 | desplazamiento)
+        if self._mejores:
+            self._actualizar_mejores(sugerencia)
+        return sugerencia
+    
+    @staticmethod
+    def _palabras(normalizado: str) -> List[int]:
+        """Retorna las posiciones indexadas de las palabras de un texto normalizado."""
+        return [palabra.start() for palabra in _PALABRA.finditer(normalizado)
+                if palabra.start() < _MAX_DESPLAZAMIENTO]
+    
+    def sumar(self, normalizado: str, cantidad: int = 1) -> None:
+        """
+        Suma popularidad a la sugerencia de un texto normalizado, si existe.
+        
+        Args:
+            normalizado: Texto normalizado de la sugerencia
+            cantidad: Popularidad a sumar
+        """
+        sugerencia = self._ids.get(normalizado)
+        if sugerencia is not None:
+            self._popularidad[sugerencia] += cantidad
+            if self._mejores:
+                self._actualizar_mejores(sugerencia)
+    
+    def popularidad(self, texto: str) -> int:
+        """Retorna la popularidad de un texto, o 0 si no es una sugerencia."""
+        sugerencia = self._ids.get(normalizar(texto))
+        return 0 if sugerencia is None else self._popularidad[sugerencia]
+    
+    def _orden(self, sugerencia: int, prefijo: str) -> Tuple:
+        """
+        Retorna la clave de orden de una sugerencia para un prefijo.
+        
+        Ordena por popularidad descendente y, a igualdad, por la primera
+        entrada de la sugerencia que empieza por el prefijo, como la consulta
+        sin listas guardadas.
+        """
+        normalizado = self._normalizados[sugerencia]
+        primera = min(self._clave(sugerencia << 8 | desplazamiento)
+                      for desplazamiento in self._palabras(normalizado)
+                      if normalizado.startswith(prefijo, desplazamiento))
+        return -self._popularidad[sugerencia], primera
+    
+    def _actualizar_mejores(self, sugerencia: int) -> None:
+        """Recoloca una sugerencia nueva o más popular en las listas guardadas que la incluyen."""
+        normalizado = self._normalizados[sugerencia]
+        prefijos = {normalizado[desplazamiento:desplazamiento + largo]
+                    for desplazamiento in self._palabras(normalizado)
+                    for largo in self._largos_mejores}
+        for prefijo in prefijos:
+            mejores = self._mejores.get(prefijo)
+            if mejores is None:
+                continue
+            for i, (_, guardada) in enumerate(mejores):
+                if guardada == sugerencia:
+                    del mejores[i]
+                    break
+            insort(mejores, (self._orden(sugerencia, prefijo), sugerencia))
+            if len(mejores) > self.MAX_MEJORES:
+                mejores.pop()
+    
+    def _guardar_mejores(self, prefijo: str, elegidas: List[int]) -> None:
+        """Guarda las mejores sugerencias de un prefijo que abarca muchas entradas."""
+        self._mejores[prefijo] = sorted((self._orden(sugerencia, prefijo), sugerencia)
+                                        for sugerencia in elegidas)
+        self._largos_mejores.add(len(prefijo))
+    
+    def _incorporar_pendientes(self) -> None:
+        """Incorpora las entradas pendientes al arreglo ordenado."""
+        pendientes, self._pendientes = self._pendientes, []
+        if len(pendientes) <= self.MAX_INSERCIONES:
+            for entrada in pendientes:
+                posicion = _biseccion(self._entradas, self._clave(entrada), self._clave, derecha=True)
+                self._entradas.insert(posicion, entrada)
+                self._sugerencias.insert(posicion, entrada >> 8)
+        else:
+            ordenadas = sorted(chain(self._entradas, pendientes), key=self._clave)
+            self._entradas = array('q', ordenadas)
+            self._sugerencias = array('q', [entrada >> 8 for entrada in ordenadas])
+    
+    def buscar(self, prefijo: str, limite: Optional[int] = None) -> List[str]:
+        """
+        Busca las sugerencias con alguna palabra que empieza por el prefijo.
+        
+        Args:
+            prefijo: Texto escrito hasta el momento; no distingue mayúsculas ni acentos
+            limite: Número máximo de sugerencias (opcional)
+        
+        Returns:
+            List[str]: Textos originales de las sugerencias, de más a menos populares
+        """
+        if self._pendientes:
+            self._incorporar_pendientes()
+        prefijo = normalizar(prefijo.lstrip())
+        largo = len(prefijo)
+        mejores = self._mejores.get(prefijo)
+        if mejores is not None and limite is not None and limite <= self.MAX_MEJORES:
+            return [self._textos[sugerencia] for _, sugerencia in mejores[:limite]]
+        
+        def inicio(entrada: int) -> str:
+            return self._normalizados[entrada >> 8][entrada & 0xFF:][:largo]
+        
+        desde = _biseccion(self._entradas, prefijo, inicio)
+        hasta = _biseccion(self._entradas, prefijo, inicio, derecha=True, desde=desde)
+        candidatas = dict.fromkeys(self._sugerencias[desde:hasta])
+        if limite is None:
+            elegidas = sorted(candidatas, key=self._popularidad.__getitem__, reverse=True)
+        elif hasta - desde >= self.MIN_ENTRADAS_MEJORES and limite <= self.MAX_MEJORES:
+            mejores = heapq.nlargest(self.MAX_MEJORES, candidatas, key=self._popularidad.__getitem__)
+            self._guardar_mejores(prefijo, mejores)
+            elegidas = mejores[:limite]
+        else:
+            elegidas = heapq.nlargest(limite, candidatas, key=self._popularidad.__getitem__)
+        return [self._textos[sugerencia] for sugerencia in elegidas]
+    
+    def __len__(self) -> int:
+        """Retorna el número de sugerencias."""
+        return len(self._textos)
@@ -1,11 +1,26 @@
 """
 Módulo que define la clase Biblioteca - sistema principal de gestión.
 """
-from typing import Dict, List, Optional
+import heapq
+from bisect import bisect_right
+from itertools import groupby, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 from datetime import datetime
+from .archivo import ArchivoPrestamos
+from .autocompletado import IndicePrefijos
+from .cache_consultas import CacheConsultas
 from .libro import Libro
 from .usuario import Usuario
 from .prestamo import Prestamo
+from .catalogo import CatalogoMemoria
+from .indice_texto import IndiceTrigramas, normalizar
+from .vencimientos import IndiceVencimientos
+from .historial import HistorialPrestamos
+from .importacion import Origen, en_lotes, filas_de, libro_desde_fila, usuario_desde_fila
+from .instrumentacion import ContadorRecorridos, Instrumentacion
+from .multas import ColumnasPrestamos, MotorMultas, ResultadoMultas, TarifaMultas
+from .paginacion import PrestamosOrdenados, clave_prestamo, clave_vencimiento, validar_limite
+from .reloj import RELOJ_SISTEMA, Reloj, epoch_a_fecha, fecha_a_epoch
 
 
 class Biblioteca:
@@ -14,23 +29,71 @@ class Biblioteca:
     
     Attributes:
         nombre (str): Nombre de la biblioteca
-        catalogo (Dict[str, Libro]): Catálogo de libros indexados por ISBN
+        catalogo (Mapping[str, Libro]): Catálogo de libros indexados por ISBN
         usuarios (Dict[str, Usuario]): Usuarios registrados indexados por ID
         prestamos (Dict[str, Prestamo]): Préstamos indexados por ID
+        reloj (Reloj): Fuente del instante actual para préstamos, devoluciones
+            y vencimientos
+        instrumentacion (Optional[Instrumentacion]): Métricas de los métodos,
+            si se activaron con ``instrumentar``
+        cache_consultas (Optional[CacheConsultas]): Caché de resultados de
+            las búsquedas y de ``libros_disponibles``, si se usa
     """
     
-    def __init__(self, nombre: str = "Biblioteca Central"):
+    def __init__(self, nombre: str = "Biblioteca Central", depuracion: bool = False,
+                 catalogo: Optional[Mapping[str, Libro]] = None, diario: Optional[Any] = None,
+                 archivo: Optional[ArchivoPrestamos] = None, reloj: Optional[Reloj] = None,
+                 cache_consultas: Optional[CacheConsultas] = None):
         """
         Inicializa una nueva biblioteca.
         
         Args:
             nombre: Nombre de la biblioteca
+            depuracion: Si es True, ``estadisticas`` verifica los contadores
+                incrementales contra un recuento completo
+            catalogo: Almacenamiento para el catálogo (por ejemplo, un
+                ``CatalogoColumnar``); por defecto un ``CatalogoMemoria`` vacío.
+                Los índices de búsqueda de los libros que ya contenga se
+                construyen en la primera búsqueda por título o autor
+            diario: Receptor opcional de las operaciones que modifican el estado
+                (por ejemplo, ``Persistencia``), con los métodos ``libro_agregado``,
+                ``usuario_registrado``, ``prestamo_realizado`` y ``libro_devuelto``
+                (este último recibe el préstamo y la fecha de devolución). Cada
+                operación se le comunica ya validada y antes de aplicarla
+            archivo: Archivo opcional en disco al que ``archivar_prestamos`` mueve
+                los préstamos devueltos antiguos; las consultas de historial lo
+                consultan de forma transparente
+            reloj: Reloj a usar (por ejemplo, un ``RelojSimulado`` en pruebas);
+                por defecto, el del sistema
+            cache_consultas: Caché opcional para los resultados de
+                ``buscar_libros_por_titulo``, ``buscar_libros_por_autor`` y
+                ``libros_disponibles``; la biblioteca la mantiene actualizada
+                al agregar libros y al prestar o devolver ejemplares
         """
         self.nombre = nombre
-        self.catalogo: Dict[str, Libro] = {}
+        self.depuracion = depuracion
+        self.diario = diario
+        self.archivo = archivo
+        self.reloj = reloj if reloj is not None else RELOJ_SISTEMA
+        self.catalogo: Mapping[str, Libro] = catalogo if catalogo is not None else CatalogoMemoria()
         self.usuarios: Dict[str, Usuario] = {}
         self.prestamos: Dict[str, Prestamo] = {}
+        self._indice_activos: Dict[Tuple[str, str], Prestamo] = {}
+        self._indice_titulos = IndiceTrigramas()
+        self._indice_autores = IndiceTrigramas()
+        self._indice_vencimientos = IndiceVencimientos()
+        self._orden_activos = PrestamosOrdenados(clave_prestamo)
+        self._orden_vencimientos = PrestamosOrdenados(clave_vencimiento)
+        self._historiales: Dict[str, HistorialPrestamos] = {}
         self._contador_prestamos = 0
+        self._total_disponibles = self.catalogo.contar_disponibles()
+        self._total_ejemplares, self._ejemplares_disponibles = self.catalogo.contar_ejemplares()
+        self._indices_pendientes = len(self.catalogo) > 0
+        self._isbns_ordenados: List[str] = []
+        self._recorridos: Optional[ContadorRecorridos] = None
+        self.instrumentacion: Optional[Instrumentacion] = None
+        self.cache_consultas = cache_consultas
+        self._autocompletado: Optional[Dict[str, IndicePrefijos]] = None
     
     # ==================== GESTIÓN DE LIBROS ====================
     
@@ -50,9 +113,48 @@ class Biblioteca:
         if libro.isbn in self.catalogo:
             raise ValueError(f"El libro con ISBN {libro.isbn} ya existe en el catálogo")
         
+        if self.diario is not None:
+            self.diario.libro_agregado(libro)
         self.catalogo[libro.isbn] = libro
+        self._indexar_libro(libro)
+        if self.cache_consultas is not None:
+            self.cache_consultas.libro_agregado(self.catalogo[libro.isbn])
         return True
     
+    def _indexar_libro(self, libro: Libro) -> None:
+        """
+        Agrega un libro del catálogo a los índices de búsqueda y contadores.
+        
+        Args:
+            libro: Libro ya almacenado en el catálogo
+        """
+        if not self._indices_pendientes:
+            self._indice_titulos.agregar_normalizado(libro.isbn, libro.titulo_busqueda)
+            self._indice_autores.agregar_normalizado(libro.isbn, libro.autor_busqueda)
+        if self._autocompletado is not None:
+            self._autocompletado['titulo'].agregar(libro.titulo, libro.titulo_busqueda)
+            self._autocompletado['autor'].agregar(libro.autor, libro.autor_busqueda)
+        if libro.disponible:
+            self._total_disponibles += 1
+        self._total_ejemplares += libro.ejemplares
+        self._ejemplares_disponibles += libro.ejemplares_disponibles
+    
+    def _construir_indices(self) -> None:
+        """
+        Construye los índices de búsqueda pendientes recorriendo el catálogo.
+        
+        Los libros presentes al crear la biblioteca (por ejemplo, desde una
+        instantánea mapeada en memoria) no se indexan hasta que se necesitan.
+        """
+        if not self._indices_pendientes:
+            return
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.catalogo)
+        for libro in self.catalogo.values():
+            self._indice_titulos.agregar_normalizado(libro.isbn, libro.titulo_busqueda)
+            self._indice_autores.agregar_normalizado(libro.isbn, libro.autor_busqueda)
+        self._indices_pendientes = False
+    
     def buscar_libro_por_isbn(self, isbn: str) -> Optional[Libro]:
         """
         Busca un libro por su ISBN.
@@ -75,11 +177,7 @@ class Biblioteca:
         Returns:
             List[Libro]: Lista de libros que coinciden
         """
-        titulo_lower = titulo.lower()
-        return [
-            libro for libro in self.catalogo.values()
-            if titulo_lower in libro.titulo.lower()
-        ]
+        return self._buscar_libros('titulo', self._indice_titulos, titulo)
     
     def buscar_libros_por_autor(self, autor: str) -> List[Libro]:
         """
@@ -91,20 +189,46 @@ class Biblioteca:
         Returns:
             List[Libro]: Lista de libros que coinciden
         """
-        autor_lower = autor.lower()
-        return [
-            libro for libro in self.catalogo.values()
-            if autor_lower in libro.autor.lower()
-        ]
+        return self._buscar_libros('autor', self._indice_autores, autor)
+    
+    def _buscar_libros(self, campo: str, indice: IndiceTrigramas, texto: str) -> List[Libro]:
+        """
+        Busca libros en un índice de texto, pasando por la caché de consultas si hay una.
+        
+        Args:
+            campo: Campo buscado ('titulo' o 'autor'), parte de la clave de la caché
+            indice: Índice de texto del campo
+            texto: Texto a buscar
+        
+        Returns:
+            List[Libro]: Libros coincidentes en orden de inserción
+        """
+        def buscar() -> List[Libro]:
+            return [self.catalogo[isbn] for isbn in self._buscar_isbns(indice, texto)]
+        
+        if self.cache_consultas is None:
+            return buscar()
+        return self.cache_consultas.consultar((campo, normalizar(texto)), buscar)
     
     def libros_disponibles(self) -> List[Libro]:
         """
-        Retorna todos los libros disponibles.
+        Retorna todos los libros con al menos un ejemplar disponible.
         
         Returns:
-            List[Libro]: Lista de libros disponibles
+            List[Libro]: Lista de libros disponibles (uno por título)
         """
-        return [libro for libro in self.catalogo.values() if libro.disponible]
+        if self.cache_consultas is not None:
+            return self.cache_consultas.consultar_disponibles(self._libros_catalogo)
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.catalogo)
+        return list(self.catalogo.disponibles())
+    
+    def _libros_catalogo(self) -> List[Libro]:
+        """Retorna todos los libros del catálogo en orden de inserción."""
+        libros = list(self.catalogo.values())
+        if self._recorridos is not None:
+            self._recorridos.total += len(libros)
+        return libros
     
     def total_libros(self) -> int:
         """Retorna el número total de libros en el catálogo."""
@@ -128,6 +252,8 @@ class Biblioteca:
         if usuario.id in self.usuarios:
             raise ValueError(f"El usuario con ID {usuario.id} ya está registrado")
         
+        if self.diario is not None:
+            self.diario.usuario_registrado(usuario)
         self.usuarios[usuario.id] = usuario
         return True
     
@@ -162,8 +288,9 @@ class Biblioteca:
             Prestamo: Objeto del préstamo creado
             
         Raises:
-            ValueError: Si el libro no existe, no está disponible,
-                       el usuario no existe o alcanzó el límite
+            ValueError: Si el libro no existe, no le quedan ejemplares,
+                       el usuario no existe, alcanzó el límite o ya tiene
+                       un ejemplar del libro
         """
         # Validar libro
         libro = self.buscar_libro_por_isbn(isbn)
@@ -178,19 +305,130 @@ class Biblioteca:
             raise ValueError(f"El usuario con ID {id_usuario} no está registrado")
         if not usuario.puede_prestar():
             raise ValueError(f"El usuario ha alcanzado el límite de {usuario.limite_prestamos} préstamos")
+        if isbn in usuario.libros_prestados:
+            raise ValueError("El usuario ya tiene este libro prestado")
         
         # Crear préstamo
-        self._contador_prestamos += 1
-        id_prestamo = f"PREST-{self._contador_prestamos:05d}"
-        prestamo = Prestamo(id_prestamo, isbn, id_usuario, dias_prestamo)
+        prestamo = Prestamo(self._generar_id_prestamo(), isbn, id_usuario, dias_prestamo,
+                            self.reloj.ahora())
         
         # Actualizar estados
-        libro.prestar()
-        usuario.agregar_prestamo(isbn)
-        self.prestamos[id_prestamo] = prestamo
+        if self.diario is not None:
+            self.diario.prestamo_realizado(prestamo)
+        self._registrar_prestamo(prestamo, libro, usuario)
         
         return prestamo
     
+    def _generar_id_prestamo(self) -> str:
+        """
+        Genera el ID del siguiente préstamo.
+        
+        Returns:
+            str: ID con formato ``PREST-nnnnn``
+        """
+        self._contador_prestamos += 1
+        return f"PREST-{self._contador_prestamos:05d}"
+    
+    @property
+    def contador_prestamos(self) -> int:
+        """Número del último ID de préstamo generado o restaurado."""
+        return self._contador_prestamos
+    
+    def restaurar_contador_prestamos(self, contador: int) -> None:
+        """
+        Restaura el contador de IDs de préstamo (por ejemplo, desde una instantánea).
+        
+        El contador nunca retrocede, de modo que no se repiten IDs ya usados.
+        
+        Args:
+            contador: Número del último ID de préstamo generado
+        """
+        self._contador_prestamos = max(self._contador_prestamos, contador)
+    
+    def _registrar_prestamo(self, prestamo: Prestamo, libro: Libro, usuario: Usuario) -> None:
+        """
+        Registra un préstamo ya validado y actualiza estados e índices.
+        
+        Si el préstamo está activo, se presta un ejemplar del libro y se agrega
+        a los préstamos del usuario; si ya fue devuelto, solo se agrega al historial.
+        
+        Args:
+            prestamo: Préstamo a registrar
+            libro: Libro del préstamo
+            usuario: Usuario del préstamo
+        """
+        if prestamo.esta_activo():
+            self._prestar_ejemplar(libro)
+        self._anotar_prestamo(prestamo, libro, usuario)
+    
+    def _prestar_ejemplar(self, libro: Libro) -> None:
+        """Presta un ejemplar de un libro del catálogo y actualiza los contadores."""
+        libro.prestar()
+        self._ejemplares_disponibles -= 1
+        if not libro.disponible:
+            self._total_disponibles -= 1
+            if self.cache_consultas is not None:
+                self.cache_consultas.disponibilidad_cambiada(libro)
+    
+    def _anotar_prestamo(self, prestamo: Prestamo, libro: Libro, usuario: Usuario) -> None:
+        """
+        Registra un préstamo en su usuario, los índices de préstamos y el historial.
+        
+        El libro solo se usa para la popularidad del autocompletado; su
+        ejemplar ya debe estar prestado si el préstamo está activo.
+        
+        Args:
+            prestamo: Préstamo a registrar
+            libro: Libro del préstamo
+            usuario: Usuario del préstamo
+        """
+        if prestamo.esta_activo():
+            usuario.agregar_prestamo(prestamo.isbn_libro)
+            self._indice_activos[(prestamo.isbn_libro, prestamo.id_usuario)] = prestamo
+            self._indice_vencimientos.agregar(prestamo)
+            self._orden_activos.agregar(prestamo)
+            self._orden_vencimientos.agregar(prestamo)
+        if self._autocompletado is not None:
+            self._autocompletado['titulo'].sumar(libro.titulo_busqueda)
+            self._autocompletado['autor'].sumar(libro.autor_busqueda)
+        self.prestamos[prestamo.id] = prestamo
+        historial = self._historiales.get(prestamo.id_usuario)
+        if historial is None:
+            historial = self._historiales[prestamo.id_usuario] = HistorialPrestamos()
+        historial.agregar(prestamo)
+    
+    def restaurar_prestamo(self, prestamo: Prestamo) -> None:
+        """
+        Restaura un préstamo existente (por ejemplo, desde almacenamiento persistente).
+        
+        Conserva el ID y las fechas del préstamo y ajusta el contador para que
+        los nuevos préstamos no repitan IDs.
+        
+        Args:
+            prestamo: Préstamo a restaurar
+            
+        Raises:
+            ValueError: Si el libro o el usuario no existen, el ID ya está
+                       registrado o, para un préstamo activo, el libro no tiene
+                       ejemplares disponibles o el usuario ya tiene uno
+        """
+        libro = self.buscar_libro_por_isbn(prestamo.isbn_libro)
+        usuario = self.buscar_usuario(prestamo.id_usuario)
+        if not libro or not usuario:
+            raise ValueError("Error en los datos del préstamo")
+        if prestamo.id in self.prestamos:
+            raise ValueError(f"El préstamo {prestamo.id} ya está registrado")
+        if prestamo.esta_activo():
+            if not libro.disponible:
+                raise ValueError(f"El libro '{libro.titulo}' no está disponible")
+            if prestamo.isbn_libro in usuario.libros_prestados:
+                raise ValueError("El usuario ya tiene este libro prestado")
+        
+        self._registrar_prestamo(prestamo, libro, usuario)
+        prefijo, _, numero = prestamo.id.rpartition('-')
+        if prefijo == 'PREST' and numero.isdigit():
+            self.restaurar_contador_prestamos(int(numero))
+    
     def devolver_libro(self, isbn: str, id_usuario: str) -> bool:
         """
         Procesa la devolución de un libro.
@@ -202,6 +440,41 @@ class Biblioteca:
         Returns:
             bool: True si se devolvió exitosamente
             
+        Raises:
+            ValueError: Si el préstamo no existe o ya fue devuelto
+        """
+        prestamo, libro, usuario = self._datos_devolucion(isbn, id_usuario)
+        
+        # Procesar devolución
+        fecha = self.reloj.ahora()
+        if self.diario is not None:
+            self.diario.libro_devuelto(prestamo, fecha)
+        self._cerrar_prestamo(prestamo, libro, usuario, fecha)
+        
+        return True
+    
+    def restaurar_devolucion(self, isbn: str, id_usuario: str, fecha: datetime) -> None:
+        """
+        Restaura la devolución de un préstamo activo con su fecha original.
+        
+        A diferencia de ``devolver_libro``, no usa el reloj ni notifica al
+        diario (por ejemplo, al reproducir el propio diario).
+        
+        Args:
+            isbn: ISBN del libro devuelto
+            id_usuario: ID del usuario que lo devolvió
+            fecha: Fecha de devolución
+            
+        Raises:
+            ValueError: Si el préstamo no existe o ya fue devuelto
+        """
+        prestamo, libro, usuario = self._datos_devolucion(isbn, id_usuario)
+        self._cerrar_prestamo(prestamo, libro, usuario, fecha)
+    
+    def _datos_devolucion(self, isbn: str, id_usuario: str) -> Tuple[Prestamo, Libro, Usuario]:
+        """
+        Busca el préstamo activo, el libro y el usuario de una devolución.
+        
         Raises:
             ValueError: Si el préstamo no existe o ya fue devuelto
         """
@@ -216,13 +489,32 @@ class Biblioteca:
         
         if not libro or not usuario:
             raise ValueError("Error en los datos del préstamo")
+        return prestamo, libro, usuario
+    
+    def _cerrar_prestamo(self, prestamo: Prestamo, libro: Libro, usuario: Usuario,
+                         fecha: datetime) -> None:
+        """
+        Marca un préstamo activo como devuelto y actualiza estados e índices.
         
-        # Procesar devolución
-        prestamo.devolver()
+        Args:
+            prestamo: Préstamo activo a cerrar
+            libro: Libro del préstamo
+            usuario: Usuario del préstamo
+            fecha: Fecha de devolución
+        """
+        prestamo.devolver(fecha)
+        reincorporado = not libro.disponible
         libro.devolver()
-        usuario.remover_prestamo(isbn)
-        
-        return True
+        if reincorporado:
+            self._total_disponibles += 1
+            if self.cache_consultas is not None:
+                self.cache_consultas.disponibilidad_cambiada(libro)
+        self._ejemplares_disponibles += 1
+        usuario.remover_prestamo(prestamo.isbn_libro)
+        del self._indice_activos[(prestamo.isbn_libro, prestamo.id_usuario)]
+        self._indice_vencimientos.marcar_devuelto()
+        self._orden_activos.marcar_devuelto()
+        self._orden_vencimientos.marcar_devuelto()
     
     def _buscar_prestamo_activo(self, isbn: str, id_usuario: str) -> Optional[Prestamo]:
         """
@@ -235,13 +527,38 @@ class Biblioteca:
         Returns:
             Optional[Prestamo]: El préstamo si existe y está activo
         """
-        for prestamo in self.prestamos.values():
-            if (prestamo.isbn_libro == isbn and 
-                prestamo.id_usuario == id_usuario and 
-                prestamo.esta_activo()):
-                return prestamo
+        prestamo = self._indice_activos.get((isbn, id_usuario))
+        if prestamo and prestamo.esta_activo():
+            return prestamo
         return None
     
+    def _reconstruir_indice_activos(self) -> Dict[Tuple[str, str], Prestamo]:
+        """
+        Reconstruye el índice de préstamos activos recorriendo todos los préstamos.
+        
+        Returns:
+            Dict[Tuple[str, str], Prestamo]: Índice (isbn, id_usuario) -> préstamo activo
+        """
+        return {
+            (p.isbn_libro, p.id_usuario): p
+            for p in self.prestamos.values() if p.esta_activo()
+        }
+    
+    def verificar_indice_activos(self) -> bool:
+        """
+        Verifica que el índice de préstamos activos coincide con los préstamos registrados.
+        
+        Returns:
+            bool: True si el índice es consistente con ``prestamos``
+        """
+        reconstruido = self._reconstruir_indice_activos()
+        if reconstruido.keys() != self._indice_activos.keys():
+            return False
+        return all(
+            self._indice_activos[clave] is prestamo
+            for clave, prestamo in reconstruido.items()
+        )
+    
     def prestamos_activos(self) -> List[Prestamo]:
         """
         Retorna todos los préstamos activos.
@@ -249,7 +566,9 @@ class Biblioteca:
         Returns:
             List[Prestamo]: Lista de préstamos activos
         """
-        return [p for p in self.prestamos.values() if p.esta_activo()]
+        if self._recorridos is not None:
+            self._recorridos.total += len(self._indice_activos)
+        return [p for p in self._indice_activos.values() if p.esta_activo()]
     
     def prestamos_vencidos(self) -> List[Prestamo]:
         """
@@ -258,23 +577,726 @@ class Biblioteca:
         Returns:
             List[Prestamo]: Lista de préstamos vencidos
         """
-        return [p for p in self.prestamos.values() if p.esta_vencido()]
+        return self.vencidos_hasta(self.reloj.ahora())
     
-    def prestamos_usuario(self, id_usuario: str) -> List[Prestamo]:
+    def vencidos_hasta(self, fecha: datetime) -> List[Prestamo]:
         """
-        Retorna todos los préstamos de un usuario.
+        Retorna los préstamos activos que estarán vencidos en una fecha dada.
+        
+        Solo recorre los préstamos cuyo vencimiento es anterior a la fecha.
+        
+        Args:
+            fecha: Fecha de referencia (por ejemplo, el cierre del proceso nocturno)
+            
+        Returns:
+            List[Prestamo]: Préstamos vencidos, ordenados por vencimiento
+        """
+        return self._indice_vencimientos.hasta(fecha)
+    
+    def calcular_multas(self, tarifa: Optional[TarifaMultas] = None,
+                        fecha: Optional[datetime] = None) -> ResultadoMultas:
+        """
+        Calcula atrasos, vencimientos y multas de todos los préstamos en memoria.
+        
+        Evalúa activos y devueltos en una sola pasada vectorizada (requiere
+        NumPy); los préstamos ya archivados en disco no se incluyen.
+        
+        Args:
+            tarifa: Tarifa por tramos a aplicar; por defecto, ``TarifaMultas()``
+            fecha: Fecha de evaluación de los préstamos activos; por defecto,
+                el instante del reloj
+            
+        Returns:
+            ResultadoMultas: Multas en céntimos alineadas con los IDs de los préstamos
+            
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        motor = MotorMultas(tarifa)
+        return motor.evaluar(self._columnas_prestamos(), fecha or self.reloj.ahora())
+    
+    def _columnas_prestamos(self) -> ColumnasPrestamos:
+        """Exporta las fechas y duraciones de los préstamos en memoria a columnas."""
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.prestamos)
+        return ColumnasPrestamos.desde_prestamos(self.prestamos.values())
+    
+    def prestamos_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                          hasta: Optional[datetime] = None) -> List[Prestamo]:
+        """
+        Retorna los préstamos de un usuario, opcionalmente en un rango de fechas.
         
         Args:
             id_usuario: ID del usuario
+            desde: Fecha de préstamo mínima, inclusiva (opcional)
+            hasta: Fecha de préstamo máxima, inclusiva (opcional)
             
         Returns:
-            List[Prestamo]: Lista de préstamos del usuario
+            List[Prestamo]: Lista de préstamos del usuario, del más antiguo al más reciente
         """
-        return [p for p in self.prestamos.values() if p.id_usuario == id_usuario]
+        historial = self._historiales.get(id_usuario)
+        recientes = historial.entre(desde, hasta) if historial is not None else []
+        archivados = self._archivados_usuario(id_usuario, desde, hasta)
+        if not archivados:
+            return recientes
+        return list(heapq.merge(archivados, recientes, key=lambda p: p.epoch_prestamo))
+    
+    def ultimos_prestamos_usuario(self, id_usuario: str, n: int) -> List[Prestamo]:
+        """
+        Retorna los préstamos más recientes de un usuario.
+        
+        Args:
+            id_usuario: ID del usuario
+            n: Número máximo de préstamos a retornar
+            
+        Returns:
+            List[Prestamo]: Préstamos del más reciente al más antiguo
+        """
+        historial = self._historiales.get(id_usuario)
+        recientes = historial.ultimos(n) if historial is not None else []
+        archivados = self._archivados_usuario(id_usuario)
+        if not archivados:
+            return recientes
+        return list(islice(heapq.merge(reversed(archivados), recientes,
+                                       key=lambda p: p.epoch_prestamo, reverse=True), n))
     
     def total_prestamos(self) -> int:
-        """Retorna el número total de préstamos registrados."""
-        return len(self.prestamos)
+        """Retorna el número total de préstamos registrados, incluidos los archivados."""
+        archivados = len(self.archivo) if self.archivo is not None else 0
+        return len(self.prestamos) + archivados
+    
+    # ==================== CONSULTAS PAGINADAS ====================
+    
+    def iter_libros_disponibles(self, limite: Optional[int] = None,
+                                despues: Optional[str] = None) -> Iterator[Libro]:
+        """
+        Itera los libros disponibles en orden de ISBN, con paginación por clave.
+        
+        Los libros se leen del catálogo a medida que se consumen: continuar
+        tras ``despues`` es una búsqueda binaria, no un recorrido desde el inicio.
+        
+        Args:
+            limite: Número máximo de libros (opcional)
+            despues: ISBN del último libro de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Libro]: Libros disponibles con ISBN posterior a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo
+        """
+        validar_limite(limite)
+        return islice(self._iter_disponibles(despues), limite)
+    
+    def _iter_disponibles(self, despues: Optional[str]) -> Iterator[Libro]:
+        """Genera los libros disponibles con ISBN posterior a ``despues``."""
+        isbns = self._ordenar_isbns()
+        inicio = bisect_right(isbns, despues) if despues is not None else 0
+        catalogo = self.catalogo
+        ultimo = inicio - 1
+        try:
+            for ultimo in range(inicio, len(isbns)):
+                libro = catalogo[isbns[ultimo]]
+                if libro.disponible:
+                    yield libro
+        finally:
+            if self._recorridos is not None:
+                self._recorridos.total += ultimo + 1 - inicio
+    
+    def _ordenar_isbns(self) -> List[str]:
+        """
+        Retorna los ISBN del catálogo en orden, ordenando solo los nuevos.
+        
+        El catálogo solo crece y se itera en orden de inserción, así que los
+        libros agregados desde la última llamada son los últimos del catálogo.
+        Se crea una lista nueva para no alterar la de las iteraciones en curso.
+        """
+        ordenados = self._isbns_ordenados
+        if len(ordenados) < len(self.catalogo):
+            nuevos = list(islice(self.catalogo, len(ordenados), None))
+            ordenados = self._isbns_ordenados = sorted(ordenados + nuevos)
+        return ordenados
+    
+    def iter_buscar_libros_por_titulo(self, titulo: str, limite: Optional[int] = None,
+                                      despues: Optional[str] = None) -> Iterator[Libro]:
+        """
+        Itera los libros cuyo título contiene el texto, en orden de ISBN.
+        
+        Args:
+            titulo: Título o parte del título a buscar
+            limite: Número máximo de libros (opcional)
+            despues: ISBN del último libro de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Libro]: Libros coincidentes con ISBN posterior a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo
+        """
+        validar_limite(limite)
+        isbns = self._iter_isbns(self._indice_titulos, titulo, despues)
+        return (self.catalogo[isbn] for isbn in islice(isbns, limite))
+    
+    def iter_buscar_libros_por_autor(self, autor: str, limite: Optional[int] = None,
+                                     despues: Optional[str] = None) -> Iterator[Libro]:
+        """
+        Itera los libros cuyo autor contiene el texto, en orden de ISBN.
+        
+        Args:
+            autor: Autor o parte del nombre a buscar
+            limite: Número máximo de libros (opcional)
+            despues: ISBN del último libro de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Libro]: Libros coincidentes con ISBN posterior a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo
+        """
+        validar_limite(limite)
+        isbns = self._iter_isbns(self._indice_autores, autor, despues)
+        return (self.catalogo[isbn] for isbn in islice(isbns, limite))
+    
+    def _buscar_isbns(self, indice: IndiceTrigramas, texto: str) -> List[str]:
+        """Retorna los ISBN coincidentes de un índice de texto, construyéndolo si falta."""
+        self._construir_indices()
+        return indice.buscar(texto)
+    
+    def _iter_isbns(self, indice: IndiceTrigramas, texto: str,
+                    despues: Optional[str]) -> Iterator[str]:
+        """Itera en orden los ISBN coincidentes de un índice de texto, construyéndolo si falta."""
+        self._construir_indices()
+        return indice.iterar(texto, despues)
+    
+    def iter_prestamos_activos(self, limite: Optional[int] = None,
+                               despues: Optional[str] = None) -> Iterator[Prestamo]:
+        """
+        Itera los préstamos activos por fecha de préstamo (e ID), con paginación por clave.
+        
+        Args:
+            limite: Número máximo de préstamos (opcional)
+            despues: ID del último préstamo de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Prestamo]: Préstamos activos posteriores a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo o ``despues`` no es un préstamo conocido
+        """
+        validar_limite(limite)
+        clave = clave_prestamo(self._prestamo_cursor(despues)) if despues is not None else None
+        return islice(self._orden_activos.iterar(clave), limite)
+    
+    def iter_prestamos_vencidos(self, limite: Optional[int] = None,
+                                despues: Optional[str] = None) -> Iterator[Prestamo]:
+        """
+        Itera los préstamos vencidos por instante de vencimiento (e ID).
+        
+        Args:
+            limite: Número máximo de préstamos (opcional)
+            despues: ID del último préstamo de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Prestamo]: Préstamos vencidos posteriores a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo o ``despues`` no es un préstamo conocido
+        """
+        validar_limite(limite)
+        clave = clave_vencimiento(self._prestamo_cursor(despues)) if despues is not None else None
+        return islice(self._orden_vencimientos.iterar(clave, self.reloj.ahora_epoch()), limite)
+    
+    def iter_prestamos_usuario(self, id_usuario: str, limite: Optional[int] = None,
+                               despues: Optional[str] = None) -> Iterator[Prestamo]:
+        """
+        Itera los préstamos de un usuario, incluidos los archivados, por fecha (e ID).
+        
+        Continuar tras ``despues`` localiza su fecha con búsqueda binaria en el
+        historial y solo lee del archivo los préstamos desde esa fecha.
+        
+        Args:
+            id_usuario: ID del usuario
+            limite: Número máximo de préstamos (opcional)
+            despues: ID del último préstamo de la página anterior (opcional)
+            
+        Returns:
+            Iterator[Prestamo]: Préstamos del usuario posteriores a ``despues``
+            
+        Raises:
+            ValueError: Si el límite es negativo o ``despues`` no es un préstamo conocido
+        """
+        validar_limite(limite)
+        clave = desde = None
+        if despues is not None:
+            cursor = self.prestamos.get(despues)
+            if cursor is None:
+                cursor = next((p for p in self._archivados_usuario(id_usuario) if p.id == despues),
+                              None)
+            if cursor is None:
+                raise ValueError(f"El préstamo {despues} no existe")
+            clave = clave_prestamo(cursor)
+            desde = epoch_a_fecha(cursor.epoch_prestamo)
+        
+        historial = self._historiales.get(id_usuario)
+        recientes = historial.entre(desde) if historial is not None else []
+        archivados = self._archivados_usuario(id_usuario, desde)
+        fusionados = heapq.merge(archivados, recientes, key=lambda p: p.epoch_prestamo)
+        return islice(self._iter_por_clave(fusionados, clave), limite)
+    
+    @staticmethod
+    def _iter_por_clave(prestamos: Iterable[Prestamo],
+                        despues: Optional[Tuple[int, str]]) -> Iterator[Prestamo]:
+        """Ordena por ID los préstamos de igual fecha y descarta los anteriores a la clave."""
+        for _, grupo in groupby(prestamos, key=lambda p: p.epoch_prestamo):
+            for prestamo in sorted(grupo, key=lambda p: p.id):
+                if despues is None or clave_prestamo(prestamo) > despues:
+                    yield prestamo
+    
+    def _prestamo_cursor(self, id_prestamo: str) -> Prestamo:
+        """
+        Retorna el préstamo usado como cursor de una consulta paginada.
+        
+        Raises:
+            ValueError: Si el préstamo no existe
+        """
+        prestamo = self.prestamos.get(id_prestamo)
+        if prestamo is None:
+            raise ValueError(f"El préstamo {id_prestamo} no existe")
+        return prestamo
+    
+    # ==================== AUTOCOMPLETADO ====================
+    
+    def autocompletar(self, prefijo: str, campo: str = 'titulo', limite: Optional[int] = 10) -> List[str]:
+        """
+        Sugiere títulos o autores que empiezan por lo escrito hasta el momento.
+        
+        El prefijo se compara con el comienzo de cada palabra ("mart" sugiere
+        "Robert C. Martin") sin distinguir mayúsculas ni acentos. Las
+        sugerencias se ordenan por popularidad: el número de préstamos de los
+        libros con ese título o autor. El índice se construye en la primera
+        llamada y después se actualiza con cada libro y préstamo nuevo.
+        
+        Args:
+            prefijo: Texto escrito en el cuadro de búsqueda
+            campo: 'titulo' o 'autor'
+            limite: Número máximo de sugerencias (None para todas)
+            
+        Returns:
+            List[str]: Títulos o autores distintos, de más a menos prestados
+            
+        Raises:
+            ValueError: Si el campo no es válido o el límite es negativo
+        """
+        if campo not in ('titulo', 'autor'):
+            raise ValueError(f"Campo de autocompletado no válido: {campo}")
+        validar_limite(limite)
+        return self._sugerencias(prefijo, campo, limite)
+    
+    def _sugerencias(self, prefijo: str, campo: str, limite: Optional[int]) -> List[str]:
+        """Consulta el índice de prefijos de un campo, construyéndolo si falta."""
+        if self._autocompletado is None:
+            self._construir_autocompletado()
+        return self._autocompletado[campo].buscar(prefijo, limite)
+    
+    def _construir_autocompletado(self) -> None:
+        """
+        Construye los índices de prefijos a partir del catálogo y de los
+        préstamos en memoria (los archivados no cuentan para la popularidad).
+        """
+        titulos, autores = IndicePrefijos(), IndicePrefijos()
+        libros = list(self.catalogo.values())
+        if self._recorridos is not None:
+            self._recorridos.total += len(libros)
+        for libro in libros:
+            titulos.agregar(libro.titulo, libro.titulo_busqueda)
+            autores.agregar(libro.autor, libro.autor_busqueda)
+        
+        prestamos = list(self.prestamos.values())
+        if self._recorridos is not None:
+            self._recorridos.total += len(prestamos)
+        por_libro: Dict[str, int] = {}
+        for prestamo in prestamos:
+            por_libro[prestamo.isbn_libro] = por_libro.get(prestamo.isbn_libro, 0) + 1
+        for isbn, cantidad in por_libro.items():
+            libro = self.catalogo[isbn]
+            titulos.sumar(libro.titulo_busqueda, cantidad)
+            autores.sumar(libro.autor_busqueda, cantidad)
+        self._autocompletado = {'titulo': titulos, 'autor': autores}
+    
+    # ==================== ARCHIVO DE PRÉSTAMOS ====================
+    
+    def archivar_prestamos(self, hasta: Optional[datetime] = None) -> int:
+        """
+        Mueve al archivo los préstamos devueltos antes de una fecha.
+        
+        Los préstamos se escriben primero en un segmento del archivo y solo
+        después se quitan de ``prestamos`` y de los historiales en memoria, de
+        modo que un fallo al escribir no pierde préstamos. Los préstamos que
+        ya estaban en el archivo (por ejemplo, recargados por el diario tras
+        una caída) se quitan de memoria sin volver a escribirse.
+        
+        Args:
+            hasta: Fecha de devolución límite (exclusiva); por defecto, ahora
+                menos la ``antiguedad`` configurada en el archivo
+            
+        Returns:
+            int: Número de préstamos archivados por primera vez
+            
+        Raises:
+            ValueError: Si la biblioteca no tiene un archivo configurado
+        """
+        if self.archivo is None:
+            raise ValueError("La biblioteca no tiene un archivo de préstamos configurado")
+        if hasta is None:
+            hasta = self.reloj.ahora() - self.archivo.antiguedad
+        
+        antiguos = self._prestamos_archivables(hasta)
+        if not antiguos:
+            return 0
+        archivados = self.archivo.archivar(antiguos)
+        self._retirar_prestamos(antiguos)
+        return archivados
+    
+    def retirar_ya_archivados(self) -> int:
+        """
+        Quita de memoria los préstamos devueltos que ya están en el archivo.
+        
+        Los usa la persistencia al abrir, porque el diario vuelve a cargar los
+        préstamos archivados después de la última instantánea.
+        
+        Returns:
+            int: Número de préstamos retirados
+        """
+        if self.archivo is None:
+            return 0
+        archivados: Dict[str, set] = {}
+        repetidos = []
+        for prestamo in list(self.prestamos.values()):
+            if prestamo.esta_activo() or not self.archivo.contiene_usuario(prestamo.id_usuario):
+                continue
+            ids = archivados.get(prestamo.id_usuario)
+            if ids is None:
+                ids = archivados[prestamo.id_usuario] = self.archivo.ids_usuario(prestamo.id_usuario)
+            if prestamo.id in ids:
+                repetidos.append(prestamo)
+        if repetidos:
+            self._retirar_prestamos(repetidos)
+        return len(repetidos)
+    
+    def _prestamos_archivables(self, hasta: datetime) -> List[Prestamo]:
+        """Retorna los préstamos devueltos antes de ``hasta``."""
+        limite = fecha_a_epoch(hasta)
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.prestamos)
+        return [p for p in self.prestamos.values()
+                if p.epoch_devolucion is not None and p.epoch_devolucion < limite]
+    
+    def _retirar_prestamos(self, prestamos: List[Prestamo]) -> None:
+        """Quita préstamos devueltos de ``prestamos`` y de los historiales en memoria."""
+        por_usuario: Dict[str, set] = {}
+        for prestamo in prestamos:
+            por_usuario.setdefault(prestamo.id_usuario, set()).add(prestamo.id)
+            del self.prestamos[prestamo.id]
+        for id_usuario, ids in por_usuario.items():
+            historial = self._historiales[id_usuario]
+            historial.retirar(ids)
+            if not historial:
+                del self._historiales[id_usuario]
+    
+    def _archivados_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                            hasta: Optional[datetime] = None) -> List[Prestamo]:
+        """Retorna los préstamos archivados de un usuario que no están también en memoria."""
+        if self.archivo is None or not self.archivo.contiene_usuario(id_usuario):
+            return []
+        return [p for p in self.archivo.prestamos_usuario(id_usuario, desde, hasta)
+                if p.id not in self.prestamos]
+    
+    # ==================== PRÉSTAMOS EN LOTE ====================
+    
+    def prestar_lote(self, pares: Iterable[Tuple[str, str]], dias_prestamo: int = 14,
+                     atomico: bool = True) -> Dict[str, Any]:
+        """
+        Realiza un lote de préstamos (por ejemplo, el de una clase completa).
+        
+        Todo el lote se valida antes de modificar nada, teniendo en cuenta los
+        préstamos anteriores del propio lote: cada libro tiene sus ejemplares
+        disponibles y cada usuario conserva su límite. Cada libro y usuario distinto se
+        busca una sola vez.
+        
+        Args:
+            pares: Pares (isbn, id_usuario)
+            dias_prestamo: Días de duración de los préstamos
+            atomico: Si es True, un solo error rechaza el lote completo; si es
+                False, se aplican los préstamos válidos y se reportan los errores
+            
+        Returns:
+            Dict[str, Any]: ``realizados`` (lista de Prestamo, en el orden del
+                lote) y ``errores`` (lista de tuplas (posición, mensaje), con
+                posición contada desde 1)
+            
+        Raises:
+            ValueError: Si los días son inválidos o, en modo atómico, si algún
+                       par del lote es inválido
+        """
+        if dias_prestamo < 1:
+            raise ValueError("Los días de préstamo deben ser al menos 1")
+        libros: Dict[str, Optional[Libro]] = {}
+        usuarios: Dict[str, Optional[Usuario]] = {}
+        
+        def obtener_libro(isbn: str) -> Optional[Tuple[str, int]]:
+            libro = libros[isbn] = self.buscar_libro_por_isbn(isbn)
+            return (libro.titulo, libro.ejemplares_disponibles) if libro else None
+        
+        def obtener_usuario(id_usuario: str) -> Optional[Tuple[int, int]]:
+            usuario = usuarios[id_usuario] = self.buscar_usuario(id_usuario)
+            return (usuario.limite_prestamos, usuario.numero_prestamos()) if usuario else None
+        
+        validos, errores = self._validar_prestamos(
+            pares, obtener_libro, obtener_usuario,
+            lambda isbn, id_usuario: isbn in usuarios[id_usuario].libros_prestados)
+        if atomico and errores:
+            raise ValueError(self._mensaje_lote(errores))
+        
+        realizados = []
+        ahora = self.reloj.ahora()
+        for isbn, id_usuario in validos:
+            prestamo = Prestamo(self._generar_id_prestamo(), isbn, id_usuario, dias_prestamo, ahora)
+            if self.diario is not None:
+                self.diario.prestamo_realizado(prestamo)
+            self._registrar_prestamo(prestamo, libros[isbn], usuarios[id_usuario])
+            realizados.append(prestamo)
+        return {'realizados': realizados, 'errores': errores}
+    
+    def devolver_lote(self, pares: Iterable[Tuple[str, str]],
+                      atomico: bool = True) -> Dict[str, Any]:
+        """
+        Procesa un lote de devoluciones (por ejemplo, el buzón de devoluciones).
+        
+        Args:
+            pares: Pares (isbn, id_usuario)
+            atomico: Si es True, un solo error rechaza el lote completo; si es
+                False, se aplican las devoluciones válidas y se reportan los errores
+            
+        Returns:
+            Dict[str, Any]: ``realizados`` (lista de los Prestamo cerrados) y
+                ``errores`` (lista de tuplas (posición, mensaje))
+            
+        Raises:
+            ValueError: En modo atómico, si algún par del lote es inválido
+        """
+        activos: Dict[Tuple[str, str], Prestamo] = {}
+        
+        def existe_activo(isbn: str, id_usuario: str) -> bool:
+            prestamo = self._buscar_prestamo_activo(isbn, id_usuario)
+            if prestamo is None:
+                return False
+            activos[(isbn, id_usuario)] = prestamo
+            return True
+        
+        validos, errores = self._validar_devoluciones(pares, existe_activo)
+        if atomico and errores:
+            raise ValueError(self._mensaje_lote(errores))
+        
+        realizados = []
+        ahora = self.reloj.ahora()
+        for isbn, id_usuario in validos:
+            prestamo = activos[(isbn, id_usuario)]
+            if self.diario is not None:
+                self.diario.libro_devuelto(prestamo, ahora)
+            self._cerrar_prestamo(prestamo, self.catalogo[isbn], self.usuarios[id_usuario], ahora)
+            realizados.append(prestamo)
+        return {'realizados': realizados, 'errores': errores}
+    
+    @staticmethod
+    def _validar_prestamos(pares: Iterable[Tuple[str, str]],
+                           obtener_libro: Callable[[str], Optional[Tuple[str, int]]],
+                           obtener_usuario: Callable[[str], Optional[Tuple[int, int]]],
+                           tiene_activo: Callable[[str, str], bool]
+                           ) -> Tuple[List[Tuple[str, str]], List[Tuple[int, str]]]:
+        """
+        Valida un lote de préstamos como si se aplicaran en orden.
+        
+        Args:
+            pares: Pares (isbn, id_usuario)
+            obtener_libro: Retorna (título, ejemplares disponibles) de un ISBN,
+                o None si no existe
+            obtener_usuario: Retorna (límite, préstamos activos) de un usuario,
+                o None si no está registrado
+            tiene_activo: Indica si un usuario registrado ya tiene prestado un libro
+            
+        Returns:
+            Tuple: Pares válidos y errores (posición, mensaje)
+        """
+        libros: Dict[str, Optional[List[Any]]] = {}
+        cupos: Dict[str, Optional[List[int]]] = {}
+        en_lote = set()
+        validos: List[Tuple[str, str]] = []
+        errores: List[Tuple[int, str]] = []
+        for posicion, (isbn, id_usuario) in enumerate(pares, 1):
+            if isbn not in libros:
+                libro = obtener_libro(isbn)
+                libros[isbn] = list(libro) if libro else None
+            if id_usuario not in cupos:
+                usuario = obtener_usuario(id_usuario)
+                cupos[id_usuario] = list(usuario) if usuario else None
+            libro = libros[isbn]
+            cupo = cupos[id_usuario]
+            
+            if libro is None:
+                errores.append((posicion, f"El libro con ISBN {isbn} no existe en el catálogo"))
+            elif libro[1] == 0:
+                errores.append((posicion, f"El libro '{libro[0]}' no está disponible"))
+            elif cupo is None:
+                errores.append((posicion, f"El usuario con ID {id_usuario} no está registrado"))
+            elif cupo[1] >= cupo[0]:
+                errores.append((posicion, f"El usuario ha alcanzado el límite de {cupo[0]} préstamos"))
+            elif (isbn, id_usuario) in en_lote or tiene_activo(isbn, id_usuario):
+                errores.append((posicion, "El usuario ya tiene este libro prestado"))
+            else:
+                libro[1] -= 1
+                cupo[1] += 1
+                en_lote.add((isbn, id_usuario))
+                validos.append((isbn, id_usuario))
+        return validos, errores
+    
+    @staticmethod
+    def _validar_devoluciones(pares: Iterable[Tuple[str, str]],
+                              existe_activo: Callable[[str, str], bool]
+                              ) -> Tuple[List[Tuple[str, str]], List[Tuple[int, str]]]:
+        """
+        Valida un lote de devoluciones; un par repetido en el lote es un error.
+        
+        Args:
+            pares: Pares (isbn, id_usuario)
+            existe_activo: Indica si hay un préstamo activo para un par
+            
+        Returns:
+            Tuple: Pares válidos y errores (posición, mensaje)
+        """
+        vistos = set()
+        validos: List[Tuple[str, str]] = []
+        errores: List[Tuple[int, str]] = []
+        for posicion, (isbn, id_usuario) in enumerate(pares, 1):
+            if (isbn, id_usuario) in vistos or not existe_activo(isbn, id_usuario):
+                errores.append((posicion, f"No existe un préstamo activo para el libro {isbn} "
+                                          f"y usuario {id_usuario}"))
+                continue
+            vistos.add((isbn, id_usuario))
+            validos.append((isbn, id_usuario))
+        return validos, errores
+    
+    @staticmethod
+    def _mensaje_lote(errores: List[Tuple[int, str]]) -> str:
+        """Construye el mensaje de un lote rechazado con los primeros errores."""
+        detalle = "; ".join(f"posición {posicion}: {mensaje}" for posicion, mensaje in errores[:5])
+        if len(errores) > 5:
+            detalle += "; ..."
+        return f"Lote rechazado con {len(errores)} error(es): {detalle}"
+    
+    # ==================== IMPORTACIÓN MASIVA ====================
+    
+    def importar_libros(self, origen: Origen, tamano_lote: int = 10000,
+                        indexar_al_final: bool = True) -> Dict[str, Any]:
+        """
+        Importa libros en lotes desde un CSV o un iterable.
+        
+        Cada lote se valida completo antes de insertarse. Los registros inválidos
+        o con ISBN repetido (en el catálogo o en la propia entrada) se reportan
+        en lugar de interrumpir la importación.
+        
+        Args:
+            origen: Ruta de un CSV con columnas isbn, titulo, autor y opcionalmente
+                fecha_publicacion, o iterable de objetos Libro o diccionarios
+            tamano_lote: Número de registros leídos y validados por lote
+            indexar_al_final: Si es True, los índices de búsqueda se construyen
+                una sola vez al terminar en lugar de con cada inserción
+            
+        Returns:
+            Dict[str, Any]: ``importados`` (int), ``duplicados`` (lista de ISBN) y
+                ``errores`` (lista de tuplas (posición, mensaje), con posición
+                contada desde 1)
+        """
+        inicio = len(self.catalogo)
+        
+        def insertar(libros: List[Libro]) -> None:
+            for libro in libros:
+                if self.diario is not None:
+                    self.diario.libro_agregado(libro)
+                self.catalogo[libro.isbn] = libro
+                if not indexar_al_final:
+                    self._indexar_libro(libro)
+        
+        resultado = self._importar(origen, tamano_lote, libro_desde_fila,
+                                   lambda libro: libro.isbn, self.catalogo, insertar)
+        if indexar_al_final:
+            for libro in islice(self.catalogo.values(), inicio, None):
+                self._indexar_libro(libro)
+        if self.cache_consultas is not None:
+            self.cache_consultas.vaciar()
+        return resultado
+    
+    def importar_usuarios(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        """
+        Importa usuarios en lotes desde un CSV o un iterable.
+        
+        Args:
+            origen: Ruta de un CSV con columnas id, nombre y opcionalmente email y
+                limite_prestamos, o iterable de objetos Usuario o diccionarios
+            tamano_lote: Número de registros leídos y validados por lote
+            
+        Returns:
+            Dict[str, Any]: ``importados`` (int), ``duplicados`` (lista de IDs) y
+                ``errores`` (lista de tuplas (posición, mensaje))
+        """
+        def insertar(usuarios: List[Usuario]) -> None:
+            for usuario in usuarios:
+                if self.diario is not None:
+                    self.diario.usuario_registrado(usuario)
+                self.usuarios[usuario.id] = usuario
+        
+        return self._importar(origen, tamano_lote, usuario_desde_fila,
+                              lambda usuario: usuario.id, self.usuarios, insertar)
+    
+    @staticmethod
+    def _importar(origen: Origen, tamano_lote: int, convertir: Callable[[Any], Any],
+                  clave: Callable[[Any], str], existentes: Mapping[str, Any],
+                  insertar: Callable[[List[Any]], None]) -> Dict[str, Any]:
+        """
+        Recorre un origen por lotes: valida cada lote completo y luego lo inserta.
+        
+        Args:
+            origen: Ruta de un CSV o iterable de registros
+            tamano_lote: Registros por lote
+            convertir: Construye y valida un objeto a partir de un registro
+            clave: Obtiene la clave única de un objeto
+            existentes: Colección donde se detectan claves ya registradas
+            insertar: Inserta los objetos válidos de un lote
+            
+        Returns:
+            Dict[str, Any]: Reporte de la importación
+        """
+        resultado: Dict[str, Any] = {'importados': 0, 'duplicados': [], 'errores': []}
+        posicion = 0
+        for lote in en_lotes(filas_de(origen), tamano_lote):
+            validos = []
+            claves_lote = set()
+            for fila in lote:
+                posicion += 1
+                try:
+                    objeto = convertir(fila)
+                except (ValueError, TypeError, AttributeError) as error:
+                    resultado['errores'].append((posicion, str(error)))
+                    continue
+                id_objeto = clave(objeto)
+                if id_objeto in existentes or id_objeto in claves_lote:
+                    resultado['duplicados'].append(id_objeto)
+                    continue
+                claves_lote.add(id_objeto)
+                validos.append(objeto)
+            
+            insertar(validos)
+            resultado['importados'] += len(validos)
+        return resultado
     
     # ==================== ESTADÍSTICAS ====================
     
@@ -282,19 +1304,122 @@ class Biblioteca:
         """
         Genera estadísticas de la biblioteca.
         
+        Usa contadores mantenidos por ``agregar_libro``, ``prestar_libro`` y
+        ``devolver_libro``; solo el número de préstamos vencidos requiere recorrer
+        los préstamos. Los libros se cuentan por título (disponible si le queda
+        algún ejemplar) y los ejemplares, por separado.
+        
+        Los vencimientos se evalúan en el instante del reloj o, dentro de un
+        bloque ``reloj.congelado(fecha)``, a fecha del instante congelado.
+        
         Returns:
             Dict: Diccionario con estadísticas
+            
+        Raises:
+            RuntimeError: En modo depuración, si los contadores no coinciden
+                         con un recuento completo
         """
+        if self.depuracion and not self.verificar_contadores():
+            raise RuntimeError(
+                f"Contadores inconsistentes: {self._contadores()} != {self._recontar()}"
+            )
+        
+        contadores = self._contadores()
         return {
             'total_libros': self.total_libros(),
-            'libros_disponibles': len(self.libros_disponibles()),
-            'libros_prestados': self.total_libros() - len(self.libros_disponibles()),
+            'libros_disponibles': contadores['libros_disponibles'],
+            'libros_prestados': contadores['libros_prestados'],
+            'total_ejemplares': contadores['total_ejemplares'],
+            'ejemplares_disponibles': contadores['ejemplares_disponibles'],
             'total_usuarios': self.total_usuarios(),
             'total_prestamos': self.total_prestamos(),
-            'prestamos_activos': len(self.prestamos_activos()),
+            'prestamos_activos': contadores['prestamos_activos'],
             'prestamos_vencidos': len(self.prestamos_vencidos())
         }
     
+    def _contadores(self) -> Dict[str, int]:
+        """Retorna los contadores incrementales de libros, ejemplares y préstamos activos."""
+        return {
+            'libros_disponibles': self._total_disponibles,
+            'libros_prestados': len(self.catalogo) - self._total_disponibles,
+            'total_ejemplares': self._total_ejemplares,
+            'ejemplares_disponibles': self._ejemplares_disponibles,
+            'prestamos_activos': len(self._indice_activos)
+        }
+    
+    def _recontar(self) -> Dict[str, int]:
+        """Recalcula los contadores recorriendo el catálogo y los préstamos."""
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.catalogo) + len(self.prestamos)
+        disponibles = self.catalogo.contar_disponibles()
+        ejemplares, ejemplares_disponibles = self.catalogo.contar_ejemplares()
+        return {
+            'libros_disponibles': disponibles,
+            'libros_prestados': len(self.catalogo) - disponibles,
+            'total_ejemplares': ejemplares,
+            'ejemplares_disponibles': ejemplares_disponibles,
+            'prestamos_activos': sum(1 for p in self.prestamos.values() if p.esta_activo())
+        }
+    
+    def verificar_contadores(self) -> bool:
+        """
+        Verifica los contadores incrementales contra un recuento completo.
+        
+        Returns:
+            bool: True si los contadores coinciden con el recuento
+        """
+        return self._contadores() == self._recontar()
+    
+    # ==================== INSTRUMENTACIÓN ====================
+    
+    def instrumentar(self, metodos: Optional[Iterable[str]] = None) -> Instrumentacion:
+        """
+        Activa la medición de llamadas, latencias y registros recorridos.
+        
+        Mientras no se llama, los métodos no tienen ningún coste adicional.
+        
+        Args:
+            metodos: Nombres de los métodos a medir; por defecto, todos los públicos
+            
+        Returns:
+            Instrumentacion: Instrumentación activa, que permite además perfilar
+                métodos y exportar las métricas a Prometheus
+            
+        Raises:
+            ValueError: Si la biblioteca ya está instrumentada o algún nombre no
+                es un método público
+        """
+        if self.instrumentacion is not None:
+            raise ValueError("La biblioteca ya está instrumentada")
+        self._recorridos = ContadorRecorridos()
+        self.instrumentacion = Instrumentacion(self, metodos)
+        return self.instrumentacion
+    
+    def desinstrumentar(self) -> None:
+        """Retira la instrumentación, descartando las métricas acumuladas."""
+        if self.instrumentacion is not None:
+            self.instrumentacion.desinstalar()
+            self.instrumentacion = None
+            self._recorridos = None
+    
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna una instantánea de las métricas por método.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Ver ``Instrumentacion.metricas``; vacío si
+                la biblioteca no está instrumentada
+        """
+        if self.instrumentacion is None:
+            return {}
+        return self.instrumentacion.metricas()
+    
+    def _registros_recorridos(self) -> int:
+        """Retorna el total de registros recorridos por las consultas hasta ahora."""
+        propios = self._recorridos.total if self._recorridos is not None else 0
+        return (propios + self._indice_titulos.recorridos
+                + self._indice_autores.recorridos + self._indice_vencimientos.recorridos)
+    
     def __str__(self) -> str:
         """Representación en string de la biblioteca."""
         return f"{self.nombre} - {self.total_libros()} libros, {self.total_usuarios()} usuarios"
\ No newline at end of file
@@ -0,0 +1,822 @@
+"""
+Módulo que define BibliotecaSQLite, una Biblioteca cuyo estado vive en SQLite.
+"""
+import copy
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .biblioteca import Biblioteca
+from .importacion import Origen, libro_desde_fila, usuario_desde_fila
+from .indice_texto import IndiceTrigramas, normalizar
+from .libro import Libro
+from .multas import ColumnasPrestamos
+from .paginacion import clave_prestamo, clave_vencimiento, validar_limite
+from .prestamo import Prestamo
+from .reloj import MICROSEGUNDOS_POR_DIA, Reloj, epoch_a_fecha, fecha_a_epoch
+from .usuario import Usuario
+
+
+_MIN_EPOCH = -2 ** 63 + 1
+_MAX_EPOCH = 2 ** 63 - 1
+
+# Versión del esquema (PRAGMA user_version)
+_VERSION_ESQUEMA = 1
+
+# Filas leídas por consulta al recorrer una consulta paginada
+_FILAS_POR_BLOQUE = 1000
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS libros (
+    orden INTEGER PRIMARY KEY,
+    isbn TEXT NOT NULL UNIQUE,
+    titulo TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    titulo_busqueda TEXT NOT NULL,
+    autor_busqueda TEXT NOT NULL,
+    fecha_publicacion INTEGER,
+    disponible INTEGER NOT NULL,
+    ejemplares INTEGER NOT NULL,
+    ejemplares_disponibles INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS libros_disponibles ON libros (orden) WHERE disponible = 1;
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    orden INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    nombre TEXT NOT NULL,
+    email TEXT,
+    limite_prestamos INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS prestamos (
+    orden INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    isbn TEXT NOT NULL,
+    id_usuario TEXT NOT NULL,
+    dias_prestamo INTEGER NOT NULL,
+    fecha_prestamo INTEGER NOT NULL,
+    fecha_devolucion INTEGER,
+    vencimiento INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS prestamos_activos
+    ON prestamos (isbn, id_usuario) WHERE fecha_devolucion IS NULL;
+CREATE INDEX IF NOT EXISTS prestamos_activos_orden
+    ON prestamos (orden) WHERE fecha_devolucion IS NULL;
+CREATE INDEX IF NOT EXISTS prestamos_activos_fecha
+    ON prestamos (fecha_prestamo, id) WHERE fecha_devolucion IS NULL;
+CREATE INDEX IF NOT EXISTS prestamos_usuario ON prestamos (id_usuario, fecha_prestamo);
+CREATE INDEX IF NOT EXISTS prestamos_libro ON prestamos (isbn);
+CREATE INDEX IF NOT EXISTS prestamos_vencimiento
+    ON prestamos (vencimiento) WHERE fecha_devolucion IS NULL;
+
+CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta VALUES ('contador_prestamos', 0);
+"""
+
+_LIBRO = ("SELECT isbn, titulo, autor, fecha_publicacion, ejemplares, ejemplares_disponibles "
+          "FROM libros")
+_USUARIO = "SELECT id, nombre, email, limite_prestamos FROM usuarios"
+_PRESTAMO = ("SELECT id, isbn, id_usuario, dias_prestamo, fecha_prestamo, fecha_devolucion "
+             "FROM prestamos")
+_INSERTAR_LIBRO = ("INSERT INTO libros (isbn, titulo, autor, titulo_busqueda, autor_busqueda, "
+                   "fecha_publicacion, disponible, ejemplares, ejemplares_disponibles) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERTAR_USUARIO = "INSERT INTO usuarios (id, nombre, email, limite_prestamos) VALUES (?, ?, ?, ?)"
+_INSERTAR_PRESTAMO = ("INSERT INTO prestamos (id, isbn, id_usuario, dias_prestamo, fecha_prestamo, "
+                      "fecha_devolucion, vencimiento) VALUES (?, ?, ?, ?, ?, ?, ?)")
+_ACTIVOS_USUARIO = "SELECT isbn FROM prestamos WHERE id_usuario = ? AND fecha_devolucion IS NULL"
+_TIENE_ACTIVO = ("SELECT 1 FROM prestamos "
+                 "WHERE isbn = ? AND id_usuario = ? AND fecha_devolucion IS NULL")
+# En un UPDATE, las expresiones usan los valores anteriores de la fila
+_PRESTAR_EJEMPLAR = ("UPDATE libros SET ejemplares_disponibles = ejemplares_disponibles - 1, "
+                     "disponible = ejemplares_disponibles > 1 WHERE isbn = ?")
+_DEVOLVER_EJEMPLAR = ("UPDATE libros SET ejemplares_disponibles = ejemplares_disponibles + 1, "
+                      "disponible = 1 WHERE isbn = ?")
+# Sugerencias de autocompletado: el prefijo debe empezar una palabra y cada
+# texto distinto cuenta los préstamos de todos sus libros
+_AUTOCOMPLETAR = ("SELECT {campo}, min(libros.orden), count(prestamos.orden) AS veces "
+                  "FROM libros LEFT JOIN prestamos ON prestamos.isbn = libros.isbn "
+                  "WHERE ' ' || {campo}_busqueda LIKE ? ESCAPE '\\' "
+                  "GROUP BY {campo}_busqueda ORDER BY veces DESC, {campo}_busqueda LIMIT ?")
+
+
+def _fecha(valor: Optional[int]) -> Optional[datetime]:
+    return epoch_a_fecha(valor) if valor is not None else None
+
+
+def _epoch(fecha: Optional[datetime]) -> Optional[int]:
+    return fecha_a_epoch(fecha) if fecha is not None else None
+
+
+def _libro_desde_sql(fila: Tuple) -> Libro:
+    isbn, titulo, autor, fecha, ejemplares, disponibles = fila
+    libro = Libro(isbn, titulo, autor, _fecha(fecha), ejemplares)
+    libro.ejemplares_disponibles = disponibles
+    return libro
+
+
+def _prestamo_desde_sql(fila: Tuple) -> Prestamo:
+    id, isbn, id_usuario, dias, fecha_prestamo, fecha_devolucion = fila
+    prestamo = Prestamo(id, isbn, id_usuario, dias)
+    prestamo.epoch_prestamo = fecha_prestamo
+    prestamo.epoch_devolucion = fecha_devolucion
+    return prestamo
+
+
+def _fila_libro(libro: Libro) -> Tuple:
+    return (libro.isbn, libro.titulo, libro.autor,
+            libro.titulo_busqueda, libro.autor_busqueda,
+            _epoch(libro.fecha_publicacion), 1 if libro.disponible else 0,
+            libro.ejemplares, libro.ejemplares_disponibles)
+
+
+def _fila_usuario(usuario: Usuario) -> Tuple:
+    return (usuario.id, usuario.nombre, usuario.email, usuario.limite_prestamos)
+
+
+def _fila_prestamo(prestamo: Prestamo) -> Tuple:
+    inicio = prestamo.epoch_prestamo
+    return (prestamo.id, prestamo.isbn_libro, prestamo.id_usuario, prestamo.dias_prestamo,
+            inicio, prestamo.epoch_devolucion,
+            inicio + (prestamo.dias_prestamo + 1) * MICROSEGUNDOS_POR_DIA)
+
+
+class _PoolConexiones:
+    """Pool acotado de conexiones de solo lectura compartidas entre hilos."""
+    
+    def __init__(self, abrir: Callable[[], sqlite3.Connection], tamano: int):
+        self._abrir = abrir
+        self._tamano = tamano
+        self._creadas = 0
+        self._libres: Queue = Queue()
+        self._bloqueo = threading.Lock()
+    
+    @contextmanager
+    def conexion(self) -> Iterator[sqlite3.Connection]:
+        """Presta una conexión del pool mientras dure el bloque ``with``."""
+        try:
+            conexion = self._libres.get_nowait()
+        except Empty:
+            conexion = None
+            with self._bloqueo:
+                if self._creadas < self._tamano:
+                    self._creadas += 1
+                    conexion = self._abrir()
+            if conexion is None:
+                conexion = self._libres.get()
+        try:
+            yield conexion
+        finally:
+            self._libres.put(conexion)
+    
+    def cerrar(self) -> None:
+        """Cierra las conexiones libres del pool."""
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except Empty:
+                return
+
+
+class _CacheLibros:
+    """
+    Caché LRU de lectura para ``buscar_libro_por_isbn``.
+    
+    Las escrituras invalidan los ISBN que modifican tras el COMMIT y antes de
+    soltar el bloqueo de escritura, y cada invalidación avanza la generación:
+    una lectura solo se guarda si no hubo invalidaciones desde que empezó, de
+    modo que una fila leída antes de un COMMIT no puede quedar en la caché.
+    Se entregan copias para que nadie modifique las entradas compartidas.
+    """
+    
+    def __init__(self, capacidad: int):
+        self.capacidad = capacidad
+        self.generacion = 0
+        self._libros: 'OrderedDict[str, Libro]' = OrderedDict()
+        self._bloqueo = threading.Lock()
+    
+    def obtener(self, isbn: str) -> Optional[Libro]:
+        with self._bloqueo:
+            libro = self._libros.get(isbn)
+            if libro is None:
+                return None
+            self._libros.move_to_end(isbn)
+            return copy.copy(libro)
+    
+    def guardar(self, libro: Libro, generacion: int) -> None:
+        if self.capacidad <= 0:
+            return
+        with self._bloqueo:
+            if generacion != self.generacion:
+                return
+            self._libros[libro.isbn] = copy.copy(libro)
+            self._libros.move_to_end(libro.isbn)
+            if len(self._libros) > self.capacidad:
+                self._libros.popitem(last=False)
+    
+    def invalidar(self, isbns: Iterable[str]) -> None:
+        with self._bloqueo:
+            self.generacion += 1
+            for isbn in isbns:
+                self._libros.pop(isbn, None)
+
+
+class _TablaSQLite(Mapping):
+    """Vista de solo lectura de una tabla como ``Mapping`` indexado por clave."""
+    
+    def __init__(self, biblioteca: 'BibliotecaSQLite', obtener: Callable[[str], Any],
+                 sql_valores: str, convertir: Callable[[Tuple], Any], tabla: str, clave: str):
+        self._biblioteca = biblioteca
+        self._obtener = obtener
+        self._sql_valores = sql_valores
+        self._convertir = convertir
+        self._tabla = tabla
+        self._clave = clave
+    
+    def __getitem__(self, clave: str) -> Any:
+        valor = self._obtener(clave)
+        if valor is None:
+            raise KeyError(clave)
+        return valor
+    
+    def __contains__(self, clave: object) -> bool:
+        return self._biblioteca._consultar_uno(
+            f"SELECT 1 FROM {self._tabla} WHERE {self._clave} = ?", (clave,)) is not None
+    
+    def __iter__(self) -> Iterator[str]:
+        sql = f"SELECT {self._clave} FROM {self._tabla} ORDER BY orden"
+        return (fila[0] for fila in self._biblioteca._consultar(sql))
+    
+    def __len__(self) -> int:
+        return self._biblioteca._consultar_uno(f"SELECT COUNT(*) FROM {self._tabla}")[0]
+    
+    def values(self) -> List[Any]:
+        return [self._convertir(fila)
+                for fila in self._biblioteca._consultar(self._sql_valores + " ORDER BY orden")]
+
+
+class _CatalogoSQLite(_TablaSQLite):
+    """Vista del catálogo con la interfaz de almacenamiento que usa ``Biblioteca``."""
+    
+    def disponibles(self) -> Iterator[Libro]:
+        return iter(self._biblioteca.libros_disponibles())
+    
+    def contar_disponibles(self) -> int:
+        return self._biblioteca._consultar_uno(
+            "SELECT COUNT(*) FROM libros WHERE disponible = 1")[0]
+    
+    def contar_ejemplares(self) -> Tuple[int, int]:
+        return self._biblioteca._consultar_uno(
+            "SELECT COALESCE(SUM(ejemplares), 0), COALESCE(SUM(ejemplares_disponibles), 0) "
+            "FROM libros")
+
+
+class BibliotecaSQLite(Biblioteca):
+    """
+    Biblioteca cuyo catálogo, usuarios y préstamos se almacenan en SQLite.
+    
+    Ofrece los mismos métodos que ``Biblioteca`` sin mantener el estado en
+    diccionarios de Python, de modo que admite conjuntos de datos mayores que
+    la memoria. Las búsquedas se apoyan en índices de SQLite (ISBN, usuario,
+    préstamos activos y vencimientos); las sentencias son constantes y quedan
+    preparadas en la caché de sentencias de cada conexión.
+    
+    Las escrituras se serializan en una única conexión dentro de transacciones
+    ``BEGIN IMMEDIATE``; las lecturas usan un pool de conexiones que pueden
+    compartir varios hilos. ``buscar_libro_por_isbn`` usa una caché LRU que
+    las escrituras invalidan.
+    
+    ``catalogo``, ``usuarios`` y ``prestamos`` son vistas ``Mapping`` de solo
+    lectura sobre las tablas. Los objetos retornados son copias: los cambios
+    deben hacerse mediante los métodos de la biblioteca.
+    """
+    
+    def __init__(self, ruta: str = ":memory:", nombre: str = "Biblioteca Central",
+                 depuracion: bool = False, tamano_pool: int = 4, tamano_cache: int = 1024,
+                 reloj: Optional[Reloj] = None):
+        """
+        Abre (o crea) una biblioteca almacenada en una base de datos SQLite.
+        
+        Args:
+            ruta: Ruta del archivo de base de datos, o ":memory:" para una base
+                temporal en un directorio que se borra al cerrar (en modo WAL,
+                como las demás, para que el pool lea mientras se escribe)
+            nombre: Nombre de la biblioteca
+            depuracion: Si es True, ``estadisticas`` verifica la consistencia
+                entre libros prestados y préstamos activos
+            tamano_pool: Número máximo de conexiones de lectura
+            tamano_cache: Número de libros en la caché de ``buscar_libro_por_isbn``
+            reloj: Reloj a usar; por defecto, el del sistema
+        
+        Raises:
+            ValueError: Si el tamaño del pool es menor que 1 o la base tiene una
+                versión de esquema no soportada
+        """
+        if tamano_pool < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1")
+        
+        self._temporal: Optional[tempfile.TemporaryDirectory] = None
+        if ruta == ":memory:":
+            self._temporal = tempfile.TemporaryDirectory(prefix="biblioteca-")
+            ruta = os.path.join(self._temporal.name, "biblioteca.db")
+        self._ruta = ruta
+        
+        self._escritor = self._abrir_conexion()
+        self._escritor.executescript(_ESQUEMA)
+        self._escritor.execute("PRAGMA journal_mode = WAL")
+        self._escritor.execute("PRAGMA synchronous = NORMAL")
+        version = self._escritor.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self._escritor.execute(f"PRAGMA user_version = {_VERSION_ESQUEMA}")
+        elif version != _VERSION_ESQUEMA:
+            self._escritor.close()
+            raise ValueError(f"Versión de esquema no soportada: {version}")
+        self._bloqueo_escritura = threading.Lock()
+        self._cache = _CacheLibros(tamano_cache)
+        self._isbns_modificados: List[str] = []
+        self._pool = _PoolConexiones(self._abrir_conexion, tamano_pool)
+        
+        super().__init__(nombre, depuracion, reloj=reloj,
+                         catalogo=_CatalogoSQLite(self, self.buscar_libro_por_isbn, _LIBRO,
+                                                  _libro_desde_sql, 'libros', 'isbn'))
+        self.usuarios = _TablaSQLite(self, self.buscar_usuario, _USUARIO,
+                                     self._usuario_desde_sql, 'usuarios', 'id')
+        self.prestamos = _TablaSQLite(self, self._buscar_prestamo, _PRESTAMO,
+                                      _prestamo_desde_sql, 'prestamos', 'id')
+    
+    # ==================== CONEXIONES ====================
+    
+    def _abrir_conexion(self) -> sqlite3.Connection:
+        """Abre una conexión en modo autocommit utilizable desde cualquier hilo."""
+        return sqlite3.connect(self._ruta, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+    
+    @contextmanager
+    def _escritura(self) -> Iterator[sqlite3.Connection]:
+        """
+        Ejecuta el bloque en una transacción de escritura; revierte si falla.
+        
+        Los ISBN anotados en ``_isbns_modificados`` durante el bloque se
+        invalidan en la caché tras el COMMIT, todavía bajo el bloqueo.
+        """
+        with self._bloqueo_escritura:
+            conexion = self._escritor
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                yield conexion
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                self._isbns_modificados.clear()
+                raise
+            conexion.execute("COMMIT")
+            if self._isbns_modificados:
+                self._cache.invalidar(self._isbns_modificados)
+                self._isbns_modificados.clear()
+    
+    def _consultar(self, sql: str, parametros: Tuple = ()) -> List[Tuple]:
+        """Ejecuta una consulta de lectura con una conexión del pool."""
+        with self._pool.conexion() as conexion:
+            filas = conexion.execute(sql, parametros).fetchall()
+        if self._recorridos is not None:
+            self._recorridos.total += len(filas)
+        return filas
+    
+    def _consultar_uno(self, sql: str, parametros: Tuple = ()) -> Optional[Tuple]:
+        """Ejecuta una consulta de lectura y retorna la primera fila."""
+        with self._pool.conexion() as conexion:
+            return conexion.execute(sql, parametros).fetchone()
+    
+    def cerrar(self) -> None:
+        """Cierra todas las conexiones de la biblioteca y borra la base temporal, si la hay."""
+        self._pool.cerrar()
+        self._escritor.close()
+        if self._temporal is not None:
+            self._temporal.cleanup()
+    
+    def _registros_recorridos(self) -> int:
+        # Filas leídas por las consultas: el recorrido interno de SQLite no es visible
+        return self._recorridos.total if self._recorridos is not None else 0
+    
+    # ==================== GESTIÓN DE LIBROS ====================
+    
+    def agregar_libro(self, libro: Libro) -> bool:
+        try:
+            with self._escritura() as conexion:
+                conexion.execute(_INSERTAR_LIBRO, _fila_libro(libro))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"El libro con ISBN {libro.isbn} ya existe en el catálogo") from None
+        return True
+    
+    def buscar_libro_por_isbn(self, isbn: str) -> Optional[Libro]:
+        libro = self._cache.obtener(isbn)
+        if libro is not None:
+            return libro
+        generacion = self._cache.generacion
+        fila = self._consultar_uno(_LIBRO + " WHERE isbn = ?", (isbn,))
+        if fila is None:
+            return None
+        libro = _libro_desde_sql(fila)
+        self._cache.guardar(libro, generacion)
+        return libro
+    
+    def buscar_libros_por_titulo(self, titulo: str) -> List[Libro]:
+        filas = self._consultar(_LIBRO + " WHERE instr(titulo_busqueda, ?) > 0 ORDER BY orden",
+                                (IndiceTrigramas.normalizar(titulo),))
+        return [_libro_desde_sql(fila) for fila in filas]
+    
+    def buscar_libros_por_autor(self, autor: str) -> List[Libro]:
+        filas = self._consultar(_LIBRO + " WHERE instr(autor_busqueda, ?) > 0 ORDER BY orden",
+                                (IndiceTrigramas.normalizar(autor),))
+        return [_libro_desde_sql(fila) for fila in filas]
+    
+    def libros_disponibles(self) -> List[Libro]:
+        return [_libro_desde_sql(fila)
+                for fila in self._consultar(_LIBRO + " WHERE disponible = 1 ORDER BY orden")]
+    
+    def total_libros(self) -> int:
+        return len(self.catalogo)
+    
+    # ==================== GESTIÓN DE USUARIOS ====================
+    
+    def registrar_usuario(self, usuario: Usuario) -> bool:
+        try:
+            with self._escritura() as conexion:
+                conexion.execute(_INSERTAR_USUARIO, _fila_usuario(usuario))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"El usuario con ID {usuario.id} ya está registrado") from None
+        return True
+    
+    def _usuario_desde_sql(self, fila: Tuple) -> Usuario:
+        usuario = Usuario(*fila)
+        isbns = {isbn for isbn, in self._consultar(_ACTIVOS_USUARIO, (usuario.id,))}
+        if isbns:
+            usuario.libros_prestados = isbns
+        return usuario
+    
+    def buscar_usuario(self, id_usuario: str) -> Optional[Usuario]:
+        fila = self._consultar_uno(_USUARIO + " WHERE id = ?", (id_usuario,))
+        return self._usuario_desde_sql(fila) if fila is not None else None
+    
+    def total_usuarios(self) -> int:
+        return len(self.usuarios)
+    
+    # ==================== GESTIÓN DE PRÉSTAMOS ====================
+    
+    def prestar_libro(self, isbn: str, id_usuario: str, dias_prestamo: int = 14) -> Prestamo:
+        with self._escritura() as conexion:
+            libro = conexion.execute(
+                "SELECT titulo, ejemplares_disponibles FROM libros WHERE isbn = ?", (isbn,)).fetchone()
+            if not libro:
+                raise ValueError(f"El libro con ISBN {isbn} no existe en el catálogo")
+            if not libro[1]:
+                raise ValueError(f"El libro '{libro[0]}' no está disponible")
+            
+            usuario = conexion.execute("SELECT limite_prestamos FROM usuarios WHERE id = ?",
+                                       (id_usuario,)).fetchone()
+            if not usuario:
+                raise ValueError(f"El usuario con ID {id_usuario} no está registrado")
+            activos = conexion.execute(
+                "SELECT COUNT(*) FROM prestamos WHERE id_usuario = ? AND fecha_devolucion IS NULL",
+                (id_usuario,)).fetchone()[0]
+            if activos >= usuario[0]:
+                raise ValueError(f"El usuario ha alcanzado el límite de {usuario[0]} préstamos")
+            if conexion.execute(_TIENE_ACTIVO, (isbn, id_usuario)).fetchone():
+                raise ValueError("El usuario ya tiene este libro prestado")
+            
+            conexion.execute("UPDATE meta SET valor = valor + 1 WHERE clave = 'contador_prestamos'")
+            contador = conexion.execute(
+                "SELECT valor FROM meta WHERE clave = 'contador_prestamos'").fetchone()[0]
+            prestamo = Prestamo(f"PREST-{contador:05d}", isbn, id_usuario, dias_prestamo,
+                                self.reloj.ahora())
+            conexion.execute(_INSERTAR_PRESTAMO, _fila_prestamo(prestamo))
+            conexion.execute(_PRESTAR_EJEMPLAR, (isbn,))
+            self._isbns_modificados.append(isbn)
+        return prestamo
+    
+    def devolver_libro(self, isbn: str, id_usuario: str) -> bool:
+        with self._escritura() as conexion:
+            fila = conexion.execute(
+                "SELECT orden FROM prestamos "
+                "WHERE isbn = ? AND id_usuario = ? AND fecha_devolucion IS NULL",
+                (isbn, id_usuario)).fetchone()
+            if not fila:
+                raise ValueError(f"No existe un préstamo activo para el libro {isbn} y usuario {id_usuario}")
+            conexion.execute("UPDATE prestamos SET fecha_devolucion = ? WHERE orden = ?",
+                             (self.reloj.ahora_epoch(), fila[0]))
+            conexion.execute(_DEVOLVER_EJEMPLAR, (isbn,))
+            self._isbns_modificados.append(isbn)
+        return True
+    
+    def restaurar_prestamo(self, prestamo: Prestamo) -> None:
+        with self._escritura() as conexion:
+            libro = conexion.execute(
+                "SELECT titulo, ejemplares_disponibles FROM libros WHERE isbn = ?",
+                (prestamo.isbn_libro,)).fetchone()
+            usuario = conexion.execute("SELECT 1 FROM usuarios WHERE id = ?",
+                                       (prestamo.id_usuario,)).fetchone()
+            if not libro or not usuario:
+                raise ValueError("Error en los datos del préstamo")
+            if prestamo.esta_activo():
+                if not libro[1]:
+                    raise ValueError(f"El libro '{libro[0]}' no está disponible")
+                if conexion.execute(_TIENE_ACTIVO,
+                                    (prestamo.isbn_libro, prestamo.id_usuario)).fetchone():
+                    raise ValueError("El usuario ya tiene este libro prestado")
+            try:
+                conexion.execute(_INSERTAR_PRESTAMO, _fila_prestamo(prestamo))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"El préstamo {prestamo.id} ya está registrado") from None
+            if prestamo.esta_activo():
+                conexion.execute(_PRESTAR_EJEMPLAR, (prestamo.isbn_libro,))
+                self._isbns_modificados.append(prestamo.isbn_libro)
+            prefijo, _, numero = prestamo.id.rpartition('-')
+            if prefijo == 'PREST' and numero.isdigit():
+                conexion.execute(
+                    "UPDATE meta SET valor = max(valor, ?) WHERE clave = 'contador_prestamos'",
+                    (int(numero),))
+    
+    def prestar_lote(self, pares: Iterable[Tuple[str, str]], dias_prestamo: int = 14,
+                     atomico: bool = True) -> Dict[str, Any]:
+        """Valida y aplica el lote en una sola transacción, con ``executemany``."""
+        if dias_prestamo < 1:
+            raise ValueError("Los días de préstamo deben ser al menos 1")
+        with self._escritura() as conexion:
+            def obtener_libro(isbn: str) -> Optional[Tuple[str, int]]:
+                return conexion.execute(
+                    "SELECT titulo, ejemplares_disponibles FROM libros WHERE isbn = ?",
+                    (isbn,)).fetchone()
+            
+            def obtener_usuario(id_usuario: str) -> Optional[Tuple[int, int]]:
+                return conexion.execute(
+                    "SELECT limite_prestamos, (SELECT COUNT(*) FROM prestamos "
+                    "WHERE id_usuario = ?1 AND fecha_devolucion IS NULL) "
+                    "FROM usuarios WHERE id = ?1", (id_usuario,)).fetchone()
+            
+            def tiene_activo(isbn: str, id_usuario: str) -> bool:
+                return conexion.execute(_TIENE_ACTIVO, (isbn, id_usuario)).fetchone() is not None
+            
+            validos, errores = self._validar_prestamos(pares, obtener_libro, obtener_usuario,
+                                                       tiene_activo)
+            if atomico and errores:
+                raise ValueError(self._mensaje_lote(errores))
+            
+            conexion.execute("UPDATE meta SET valor = valor + ? WHERE clave = 'contador_prestamos'",
+                             (len(validos),))
+            ultimo = conexion.execute(
+                "SELECT valor FROM meta WHERE clave = 'contador_prestamos'").fetchone()[0]
+            ahora = self.reloj.ahora()
+            realizados = [
+                Prestamo(f"PREST-{numero:05d}", isbn, id_usuario, dias_prestamo, ahora)
+                for numero, (isbn, id_usuario) in enumerate(validos, ultimo - len(validos) + 1)
+            ]
+            conexion.executemany(_INSERTAR_PRESTAMO, map(_fila_prestamo, realizados))
+            conexion.executemany(_PRESTAR_EJEMPLAR, ((isbn,) for isbn, _ in validos))
+            self._isbns_modificados.extend(isbn for isbn, _ in validos)
+        return {'realizados': realizados, 'errores': errores}
+    
+    def devolver_lote(self, pares: Iterable[Tuple[str, str]],
+                      atomico: bool = True) -> Dict[str, Any]:
+        """Valida y aplica el lote en una sola transacción, con ``executemany``."""
+        activos: Dict[Tuple[str, str], Tuple] = {}
+        with self._escritura() as conexion:
+            def existe_activo(isbn: str, id_usuario: str) -> bool:
+                fila = conexion.execute(
+                    "SELECT orden, id, isbn, id_usuario, dias_prestamo, fecha_prestamo, "
+                    "fecha_devolucion FROM prestamos "
+                    "WHERE isbn = ? AND id_usuario = ? AND fecha_devolucion IS NULL",
+                    (isbn, id_usuario)).fetchone()
+                if fila is None:
+                    return False
+                activos[(isbn, id_usuario)] = fila
+                return True
+            
+            validos, errores = self._validar_devoluciones(pares, existe_activo)
+            if atomico and errores:
+                raise ValueError(self._mensaje_lote(errores))
+            
+            ahora = self.reloj.ahora_epoch()
+            realizados = []
+            for par in validos:
+                prestamo = _prestamo_desde_sql(activos[par][1:])
+                prestamo.epoch_devolucion = ahora
+                realizados.append(prestamo)
+            conexion.executemany("UPDATE prestamos SET fecha_devolucion = ? WHERE orden = ?",
+                                 ((ahora, activos[par][0]) for par in validos))
+            conexion.executemany(_DEVOLVER_EJEMPLAR, ((isbn,) for isbn, _ in validos))
+            self._isbns_modificados.extend(isbn for isbn, _ in validos)
+        return {'realizados': realizados, 'errores': errores}
+    
+    def _buscar_prestamo(self, id_prestamo: str) -> Optional[Prestamo]:
+        fila = self._consultar_uno(_PRESTAMO + " WHERE id = ?", (id_prestamo,))
+        return _prestamo_desde_sql(fila) if fila is not None else None
+    
+    def _buscar_prestamo_activo(self, isbn: str, id_usuario: str) -> Optional[Prestamo]:
+        fila = self._consultar_uno(
+            _PRESTAMO + " WHERE isbn = ? AND id_usuario = ? AND fecha_devolucion IS NULL",
+            (isbn, id_usuario))
+        return _prestamo_desde_sql(fila) if fila is not None else None
+    
+    def verificar_indice_activos(self) -> bool:
+        """
+        Verifica que los ejemplares prestados de cada libro coinciden con sus
+        préstamos activos y que no hay préstamos activos de libros inexistentes.
+        
+        Returns:
+            bool: True si los préstamos activos son consistentes con el catálogo
+        """
+        huerfanos, inconsistentes = self._consultar_uno(
+            "SELECT (SELECT COUNT(*) FROM prestamos p WHERE p.fecha_devolucion IS NULL "
+            "        AND NOT EXISTS (SELECT 1 FROM libros l WHERE l.isbn = p.isbn)), "
+            "       (SELECT COUNT(*) FROM libros l "
+            "        WHERE l.disponible != (l.ejemplares_disponibles > 0) "
+            "           OR l.ejemplares - l.ejemplares_disponibles != "
+            "              (SELECT COUNT(*) FROM prestamos p "
+            "               WHERE p.isbn = l.isbn AND p.fecha_devolucion IS NULL))")
+        return huerfanos == 0 and inconsistentes == 0
+    
+    def prestamos_activos(self) -> List[Prestamo]:
+        filas = self._consultar(_PRESTAMO + " WHERE fecha_devolucion IS NULL ORDER BY orden")
+        return [_prestamo_desde_sql(fila) for fila in filas]
+    
+    def prestamos_vencidos(self) -> List[Prestamo]:
+        return self.vencidos_hasta(self.reloj.ahora())
+    
+    def vencidos_hasta(self, fecha: datetime) -> List[Prestamo]:
+        filas = self._consultar(
+            _PRESTAMO + " WHERE fecha_devolucion IS NULL AND vencimiento <= ? "
+            "ORDER BY vencimiento, orden", (fecha_a_epoch(fecha),))
+        return [_prestamo_desde_sql(fila) for fila in filas]
+    
+    def _columnas_prestamos(self) -> ColumnasPrestamos:
+        return ColumnasPrestamos.desde_filas(self._consultar(
+            "SELECT id, fecha_prestamo, fecha_devolucion, dias_prestamo FROM prestamos ORDER BY orden"))
+    
+    def prestamos_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                          hasta: Optional[datetime] = None) -> List[Prestamo]:
+        filas = self._consultar(
+            _PRESTAMO + " WHERE id_usuario = ? AND fecha_prestamo BETWEEN ? AND ? "
+            "ORDER BY fecha_prestamo, orden",
+            (id_usuario,
+             fecha_a_epoch(desde) if desde is not None else _MIN_EPOCH,
+             fecha_a_epoch(hasta) if hasta is not None else _MAX_EPOCH))
+        return [_prestamo_desde_sql(fila) for fila in filas]
+    
+    def ultimos_prestamos_usuario(self, id_usuario: str, n: int) -> List[Prestamo]:
+        if n <= 0:
+            return []
+        filas = self._consultar(
+            _PRESTAMO + " WHERE id_usuario = ? ORDER BY fecha_prestamo DESC, orden DESC LIMIT ?",
+            (id_usuario, n))
+        return [_prestamo_desde_sql(fila) for fila in filas]
+    
+    def total_prestamos(self) -> int:
+        return len(self.prestamos)
+    
+    # ==================== CONSULTAS PAGINADAS ====================
+    
+    def _iter_bloques(self, sql: str, parametros: Tuple, despues: Tuple,
+                      clave: Callable[[Tuple], Tuple], limite: Optional[int]) -> Iterator[Tuple]:
+        """
+        Recorre una consulta por bloques, continuando cada bloque tras la clave
+        de la última fila del anterior.
+        
+        Cada bloque es una consulta corta, de modo que no se mantiene ninguna
+        conexión del pool mientras se consumen las filas.
+        
+        Args:
+            sql: Consulta que recibe ``parametros``, la clave de inicio y el tamaño del bloque
+            parametros: Parámetros fijos de la consulta
+            despues: Clave a partir de la cual (exclusiva) se leen filas
+            clave: Función que calcula la clave de una fila
+            limite: Número máximo de filas (opcional)
+        """
+        restantes = limite
+        while restantes is None or restantes > 0:
+            tamano = _FILAS_POR_BLOQUE if restantes is None else min(restantes, _FILAS_POR_BLOQUE)
+            filas = self._consultar(sql, parametros + despues + (tamano,))
+            yield from filas
+            if len(filas) < tamano:
+                return
+            despues = clave(filas[-1])
+            if restantes is not None:
+                restantes -= len(filas)
+    
+    def _iter_libros(self, condicion: str, parametros: Tuple, limite: Optional[int],
+                     despues: Optional[str]) -> Iterator[Libro]:
+        validar_limite(limite)
+        filas = self._iter_bloques(
+            _LIBRO + f" WHERE {condicion} AND isbn > ? ORDER BY isbn LIMIT ?", parametros,
+            (despues if despues is not None else "",), lambda fila: (fila[0],), limite)
+        return (_libro_desde_sql(fila) for fila in filas)
+    
+    def iter_libros_disponibles(self, limite: Optional[int] = None,
+                                despues: Optional[str] = None) -> Iterator[Libro]:
+        return self._iter_libros("disponible = 1", (), limite, despues)
+    
+    def iter_buscar_libros_por_titulo(self, titulo: str, limite: Optional[int] = None,
+                                      despues: Optional[str] = None) -> Iterator[Libro]:
+        return self._iter_libros("instr(titulo_busqueda, ?) > 0",
+                                 (IndiceTrigramas.normalizar(titulo),), limite, despues)
+    
+    def iter_buscar_libros_por_autor(self, autor: str, limite: Optional[int] = None,
+                                     despues: Optional[str] = None) -> Iterator[Libro]:
+        return self._iter_libros("instr(autor_busqueda, ?) > 0",
+                                 (IndiceTrigramas.normalizar(autor),), limite, despues)
+    
+    def _iter_prestamos(self, condicion: str, parametros: Tuple, orden: str,
+                        clave: Callable[[Prestamo], Tuple[int, str]], limite: Optional[int],
+                        despues: Optional[str]) -> Iterator[Prestamo]:
+        validar_limite(limite)
+        inicio = clave(self._prestamo_cursor(despues)) if despues is not None else (_MIN_EPOCH, "")
+        filas = self._iter_bloques(
+            _PRESTAMO + f" WHERE {condicion} AND ({orden}, id) > (?, ?) ORDER BY {orden}, id LIMIT ?",
+            parametros, inicio, lambda fila: clave(_prestamo_desde_sql(fila)), limite)
+        return (_prestamo_desde_sql(fila) for fila in filas)
+    
+    def iter_prestamos_activos(self, limite: Optional[int] = None,
+                               despues: Optional[str] = None) -> Iterator[Prestamo]:
+        return self._iter_prestamos("fecha_devolucion IS NULL", (), "fecha_prestamo",
+                                    clave_prestamo, limite, despues)
+    
+    def iter_prestamos_vencidos(self, limite: Optional[int] = None,
+                                despues: Optional[str] = None) -> Iterator[Prestamo]:
+        return self._iter_prestamos("fecha_devolucion IS NULL AND vencimiento <= ?",
+                                    (self.reloj.ahora_epoch(),), "vencimiento",
+                                    clave_vencimiento, limite, despues)
+    
+    def iter_prestamos_usuario(self, id_usuario: str, limite: Optional[int] = None,
+                               despues: Optional[str] = None) -> Iterator[Prestamo]:
+        return self._iter_prestamos("id_usuario = ?", (id_usuario,), "fecha_prestamo",
+                                    clave_prestamo, limite, despues)
+    
+    # ==================== AUTOCOMPLETADO ====================
+    
+    def _sugerencias(self, prefijo: str, campo: str, limite: Optional[int]) -> List[str]:
+        patron = normalizar(prefijo.lstrip())
+        for especial in ('\\', '%', '_'):
+            patron = patron.replace(especial, '\\' + especial)
+        filas = self._consultar(_AUTOCOMPLETAR.format(campo=campo),
+                                ('% ' + patron + '%', -1 if limite is None else limite))
+        return [fila[0] for fila in filas]
+    
+    # ==================== IMPORTACIÓN MASIVA ====================
+    
+    def importar_libros(self, origen: Origen, tamano_lote: int = 10000,
+                        indexar_al_final: bool = True) -> Dict[str, Any]:
+        """
+        Importa libros en lotes con ``executemany``.
+        
+        ``indexar_al_final`` se acepta por compatibilidad: SQLite mantiene sus
+        índices dentro de cada transacción de lote.
+        """
+        def insertar(libros: List[Libro]) -> None:
+            with self._escritura() as conexion:
+                conexion.executemany(_INSERTAR_LIBRO, map(_fila_libro, libros))
+        
+        return self._importar(origen, tamano_lote, libro_desde_fila,
+                              lambda libro: libro.isbn, self.catalogo, insertar)
+    
+    def importar_usuarios(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        """Importa usuarios en lotes con ``executemany``."""
+        def insertar(usuarios: List[Usuario]) -> None:
+            with self._escritura() as conexion:
+                conexion.executemany(_INSERTAR_USUARIO, map(_fila_usuario, usuarios))
+        
+        return self._importar(origen, tamano_lote, usuario_desde_fila,
+                              lambda usuario: usuario.id, self.usuarios, insertar)
+    
+    # ==================== ESTADÍSTICAS ====================
+    
+    def _contadores(self) -> Dict[str, int]:
+        total, disponibles, ejemplares, ejemplares_disponibles, activos = self._consultar_uno(
+            "SELECT (SELECT COUNT(*) FROM libros), "
+            "(SELECT COUNT(*) FROM libros WHERE disponible = 1), "
+            "(SELECT COALESCE(SUM(ejemplares), 0) FROM libros), "
+            "(SELECT COALESCE(SUM(ejemplares_disponibles), 0) FROM libros), "
+            "(SELECT COUNT(*) FROM prestamos WHERE fecha_devolucion IS NULL)")
+        return {
+            'libros_disponibles': disponibles,
+            'libros_prestados': total - disponibles,
+            'total_ejemplares': ejemplares,
+            'ejemplares_disponibles': ejemplares_disponibles,
+            'prestamos_activos': activos
+        }
+    
+    def verificar_contadores(self) -> bool:
+        """
+        Verifica que el número de ejemplares prestados coincide con los préstamos activos.
+        
+        Returns:
+            bool: True si ambos recuentos coinciden
+        """
+        contadores = self._contadores()
+        prestados = contadores['total_ejemplares'] - contadores['ejemplares_disponibles']
+        return prestados == contadores['prestamos_activos']
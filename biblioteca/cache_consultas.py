@@ -0,0 +1,249 @@
+"""
+Módulo que define la caché de resultados de las consultas del catálogo.
+"""
+import threading
+import time
+from collections import OrderedDict
+from itertools import compress
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .libro import Libro
+
+
+# Clave de la entrada de ``libros_disponibles``
+CLAVE_DISPONIBLES = ('disponibles',)
+
+
+class _Resultado:
+    """Entrada de la caché con los libros de una búsqueda por título o autor."""
+    
+    __slots__ = ('libros', 'caduca')
+    
+    def __init__(self, libros: List[Libro], caduca: Optional[float]):
+        self.libros = libros
+        self.caduca = caduca
+    
+    def leer(self) -> List[Libro]:
+        return list(self.libros)
+
+
+class _Disponibles:
+    """
+    Entrada de la caché para ``libros_disponibles``.
+    
+    Guarda todos los libros del catálogo en orden de inserción junto con una
+    marca de disponibilidad por libro, de modo que un préstamo o una
+    devolución solo cambia una marca y la lectura filtra la lista sin
+    recorrer el catálogo.
+    """
+    
+    __slots__ = ('libros', 'marcas', 'posiciones', 'caduca')
+    
+    def __init__(self, libros: List[Libro], caduca: Optional[float]):
+        self.libros = libros
+        self.marcas = bytearray(1 if libro.disponible else 0 for libro in libros)
+        self.posiciones = {libro.isbn: i for i, libro in enumerate(libros)}
+        self.caduca = caduca
+    
+    def agregar(self, libro: Libro) -> None:
+        self.posiciones[libro.isbn] = len(self.libros)
+        self.libros.append(libro)
+        self.marcas.append(1 if libro.disponible else 0)
+    
+    def actualizar(self, libro: Libro) -> bool:
+        posicion = self.posiciones.get(libro.isbn)
+        if posicion is None:
+            return False
+        self.marcas[posicion] = 1 if libro.disponible else 0
+        return True
+    
+    def leer(self) -> List[Libro]:
+        return list(compress(self.libros, self.marcas))
+
+
+class CacheConsultas:
+    """
+    Caché LRU, con caducidad opcional, de los resultados de
+    ``buscar_libros_por_titulo``, ``buscar_libros_por_autor`` y
+    ``libros_disponibles``.
+    
+    Las búsquedas se guardan por campo y texto normalizado, así que "García"
+    y "garcia" comparten entrada. La biblioteca avisa a la caché de cada
+    cambio y la caché actualiza sus entradas en lugar de vaciarse: un libro
+    nuevo se agrega solo a las búsquedas cuyo texto contiene y a la lista de
+    disponibles, y un préstamo o una devolución que cambia la disponibilidad
+    de un libro solo cambia su marca en la lista de disponibles (las búsquedas
+    no dependen de la disponibilidad).
+    
+    La entrada de disponibles guarda una referencia y una posición por cada
+    libro del catálogo, por lo que su memoria crece con el catálogo.
+    
+    Es segura para hilos: cada cambio incrementa una versión, y un resultado
+    calculado mientras cambiaba la biblioteca no se guarda.
+    """
+    
+    def __init__(self, capacidad: int = 1024, ttl: Optional[float] = None,
+                 tiempo: Callable[[], float] = time.monotonic):
+        """
+        Inicializa una caché vacía.
+        
+        Args:
+            capacidad: Número máximo de consultas guardadas
+            ttl: Segundos que dura cada entrada (opcional); sin ttl las
+                entradas solo salen por LRU
+            tiempo: Función que retorna el instante actual en segundos
+        
+        Raises:
+            ValueError: Si la capacidad es menor que 1 o el ttl no es positivo
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("El ttl de la caché debe ser positivo")
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._tiempo = tiempo
+        self._entradas: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._bloqueo = threading.Lock()
+        self._version = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._desalojadas = 0
+        self._expiradas = 0
+        self._actualizaciones = 0
+    
+    # ==================== CONSULTAS ====================
+    
+    def consultar(self, clave: Hashable, calcular: Callable[[], List[Libro]]) -> List[Libro]:
+        """
+        Retorna el resultado guardado de una búsqueda o lo calcula y lo guarda.
+        
+        Args:
+            clave: Tupla (campo, texto normalizado), con campo 'titulo' o 'autor'
+            calcular: Función que ejecuta la búsqueda sin caché
+        
+        Returns:
+            List[Libro]: Copia del resultado
+        """
+        entrada, version = self._obtener(clave)
+        if entrada is not None:
+            return entrada.leer()
+        libros = calcular()
+        self._guardar(clave, _Resultado(list(libros), self._caducidad()), version)
+        return libros
+    
+    def consultar_disponibles(self, catalogo: Callable[[], List[Libro]]) -> List[Libro]:
+        """
+        Retorna los libros disponibles guardados o los calcula y los guarda.
+        
+        Args:
+            catalogo: Función que retorna todos los libros del catálogo en
+                orden de inserción
+        
+        Returns:
+            List[Libro]: Libros disponibles en orden de inserción
+        """
+        entrada, version = self._obtener(CLAVE_DISPONIBLES)
+        if entrada is None:
+            entrada = _Disponibles(catalogo(), self._caducidad())
+            self._guardar(CLAVE_DISPONIBLES, entrada, version)
+        return entrada.leer()
+    
+    def _caducidad(self) -> Optional[float]:
+        """Retorna el instante en que caduca una entrada creada ahora."""
+        return None if self.ttl is None else self._tiempo() + self.ttl
+    
+    def _obtener(self, clave: Hashable):
+        """Busca una entrada vigente y retorna (entrada o None, versión actual)."""
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is not None and entrada.caduca is not None and self._tiempo() >= entrada.caduca:
+                del self._entradas[clave]
+                self._expiradas += 1
+                entrada = None
+            if entrada is None:
+                self._fallos += 1
+            else:
+                self._aciertos += 1
+                self._entradas.move_to_end(clave)
+            return entrada, self._version
+    
+    def _guardar(self, clave: Hashable, entrada: Any, version: int) -> None:
+        """Guarda una entrada si la biblioteca no cambió desde ``version``."""
+        with self._bloqueo:
+            if version != self._version:
+                return
+            self._entradas[clave] = entrada
+            self._entradas.move_to_end(clave)
+            if len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self._desalojadas += 1
+    
+    # ==================== INVALIDACIÓN ====================
+    
+    def libro_agregado(self, libro: Libro) -> None:
+        """
+        Agrega un libro nuevo a las entradas a las que afecta.
+        
+        Args:
+            libro: Libro recién agregado al final del catálogo
+        """
+        textos = {'titulo': libro.titulo_busqueda, 'autor': libro.autor_busqueda}
+        with self._bloqueo:
+            self._version += 1
+            for clave, entrada in self._entradas.items():
+                if clave == CLAVE_DISPONIBLES:
+                    entrada.agregar(libro)
+                elif clave[1] in textos[clave[0]]:
+                    entrada.libros.append(libro)
+                else:
+                    continue
+                self._actualizaciones += 1
+    
+    def disponibilidad_cambiada(self, libro: Libro) -> None:
+        """
+        Actualiza la lista de disponibles tras prestar o devolver un libro.
+        
+        Args:
+            libro: Libro que pasó a estar disponible o dejó de estarlo
+        """
+        with self._bloqueo:
+            self._version += 1
+            entrada = self._entradas.get(CLAVE_DISPONIBLES)
+            if entrada is not None and entrada.actualizar(libro):
+                self._actualizaciones += 1
+    
+    def vaciar(self) -> None:
+        """Descarta todas las entradas (por ejemplo, tras una importación masiva)."""
+        with self._bloqueo:
+            self._version += 1
+            self._entradas.clear()
+    
+    # ==================== ESTADÍSTICAS ====================
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Retorna las estadísticas de uso de la caché.
+        
+        Returns:
+            Dict[str, Any]: ``aciertos``, ``fallos``, ``tasa_aciertos`` (entre 0 y 1),
+                ``entradas``, ``capacidad``, ``desalojadas`` (por LRU),
+                ``expiradas`` (por ttl) y ``actualizaciones`` (entradas
+                actualizadas en lugar de invalidadas)
+        """
+        with self._bloqueo:
+            consultas = self._aciertos + self._fallos
+            return {
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': self._aciertos / consultas if consultas else 0.0,
+                'entradas': len(self._entradas),
+                'capacidad': self.capacidad,
+                'desalojadas': self._desalojadas,
+                'expiradas': self._expiradas,
+                'actualizaciones': self._actualizaciones,
+            }
+    
+    def __len__(self) -> int:
+        """Retorna el número de entradas guardadas."""
+        return len(self._entradas)
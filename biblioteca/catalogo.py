@@ -0,0 +1,37 @@
+"""
+Módulo que define el almacenamiento en memoria del catálogo de libros.
+"""
+from typing import Dict, Iterator, Tuple
+
+from .libro import Libro
+
+
+class CatalogoMemoria(Dict[str, Libro]):
+    """
+    Catálogo por defecto: un diccionario de objetos Libro indexado por ISBN.
+    
+    Cualquier almacenamiento de catálogo usado por ``Biblioteca`` debe ofrecer
+    la interfaz de un ``Mapping[str, Libro]`` con asignación por clave, más los
+    métodos ``disponibles``, ``contar_disponibles`` y ``contar_ejemplares``.
+    """
+    
+    def disponibles(self) -> Iterator[Libro]:
+        """
+        Itera los libros con algún ejemplar disponible en orden de inserción.
+        
+        Returns:
+            Iterator[Libro]: Libros disponibles
+        """
+        return (libro for libro in self.values() if libro.disponible)
+    
+    def contar_disponibles(self) -> int:
+        """Retorna el número de libros disponibles."""
+        return sum(1 for libro in self.values() if libro.disponible)
+    
+    def contar_ejemplares(self) -> Tuple[int, int]:
+        """Retorna el número total de ejemplares y el de ejemplares disponibles."""
+        total = disponibles = 0
+        for libro in self.values():
+            total += libro.ejemplares
+            disponibles += libro.ejemplares_disponibles
+        return total, disponibles
@@ -0,0 +1,271 @@
+"""
+Módulo que define un catálogo columnar para catálogos muy grandes.
+"""
+import zlib
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+from .libro import Libro
+from .reloj import epoch_a_fecha, fecha_a_epoch
+
+
+_VACIO = -1
+
+
+class ArenaTextos:
+    """
+    Secuencia de textos empaquetados en un único buffer de bytes UTF-8.
+    
+    Attributes:
+        datos (bytearray): Bytes de todos los textos concatenados
+        desplazamientos (array): Inicio de cada texto; el último elemento marca el final
+    """
+    
+    __slots__ = ('datos', 'desplazamientos')
+    
+    def __init__(self):
+        """Inicializa una arena vacía."""
+        self.datos = bytearray()
+        self.desplazamientos = array('q', [0])
+    
+    def agregar(self, codificado: bytes) -> None:
+        """Agrega un texto ya codificado en UTF-8."""
+        self.datos += codificado
+        self.desplazamientos.append(len(self.datos))
+    
+    def bytes(self, i: int) -> bytes:
+        """Retorna los bytes del texto ``i``."""
+        return bytes(self.datos[self.desplazamientos[i]:self.desplazamientos[i + 1]])
+    
+    def __getitem__(self, i: int) -> str:
+        """Retorna el texto ``i`` decodificado."""
+        return self.datos[self.desplazamientos[i]:self.desplazamientos[i + 1]].decode('utf-8')
+    
+    def __len__(self) -> int:
+        """Retorna el número de textos almacenados."""
+        return len(self.desplazamientos) - 1
+
+
+class LibroColumnar(Libro):
+    """
+    Vista de un libro almacenado en un ``CatalogoColumnar``.
+    
+    Los campos y las claves de búsqueda se leen de las columnas al acceder a
+    ellos; los cambios de ejemplares
+    disponibles (``prestar``/``devolver``) se escriben directamente en las
+    columnas correspondientes.
+    """
+    
+    __slots__ = ('_catalogo', '_fila')
+    
+    def __init__(self, catalogo: 'CatalogoColumnar', fila: int):
+        """
+        Inicializa una vista sobre una fila del catálogo.
+        
+        Args:
+            catalogo: Catálogo columnar que contiene el libro
+            fila: Posición del libro en las columnas
+        """
+        self._catalogo = catalogo
+        self._fila = fila
+    
+    @property
+    def isbn(self) -> str:
+        return self._catalogo._isbns[self._fila]
+    
+    @property
+    def titulo(self) -> str:
+        return self._catalogo._titulos[self._fila]
+    
+    @property
+    def autor(self) -> str:
+        return self._catalogo._autores[self._fila]
+    
+    @property
+    def titulo_busqueda(self) -> str:
+        return self._catalogo._titulos_busqueda[self._fila]
+    
+    @property
+    def autor_busqueda(self) -> str:
+        return self._catalogo._autores_busqueda[self._fila]
+    
+    @property
+    def fecha_publicacion(self) -> Optional[datetime]:
+        return epoch_a_fecha(self._catalogo._fechas[self._fila])
+    
+    @property
+    def ejemplares(self) -> int:
+        return self._catalogo._ejemplares[self._fila]
+    
+    @property
+    def ejemplares_disponibles(self) -> int:
+        return self._catalogo._ejemplares_disponibles[self._fila]
+    
+    @ejemplares_disponibles.setter
+    def ejemplares_disponibles(self, valor: int) -> None:
+        self._catalogo._ejemplares_disponibles[self._fila] = valor
+        self._catalogo._disponibles[self._fila] = 1 if valor else 0
+    
+    @property
+    def disponible(self) -> bool:
+        return bool(self._catalogo._disponibles[self._fila])
+
+
+class CatalogoColumnar(Mapping):
+    """
+    Catálogo que almacena los libros por columnas en lugar de como objetos.
+    
+    ISBN, título, autor y las claves de búsqueda normalizadas de título y
+    autor se guardan en arenas de bytes, los ejemplares totales
+    y disponibles como enteros de 32 bits, si queda algún ejemplar disponible
+    en un ``bytearray`` (un byte por libro) y la fecha de publicación como
+    entero de 64 bits. Un índice hash de direccionamiento abierto sobre los ISBN permite
+    búsquedas O(1) sin mantener un objeto ``str`` por clave. Los objetos
+    ``Libro`` solo se materializan, como vistas ``LibroColumnar``, cuando se
+    accede a ellos.
+    
+    Al agregar un libro se copian sus campos: los cambios posteriores deben
+    hacerse sobre las vistas que retorna el catálogo, no sobre el objeto original.
+    """
+    
+    def __init__(self):
+        """Inicializa un catálogo vacío."""
+        self._isbns = ArenaTextos()
+        self._titulos = ArenaTextos()
+        self._autores = ArenaTextos()
+        self._titulos_busqueda = ArenaTextos()
+        self._autores_busqueda = ArenaTextos()
+        self._fechas = array('q')
+        self._ejemplares = array('I')
+        self._ejemplares_disponibles = array('I')
+        self._disponibles = bytearray()
+        self._hashes = array('Q')
+        self._tabla = array('q', [_VACIO]) * 8
+    
+    # ==================== ÍNDICE HASH ====================
+    
+    def _buscar_fila(self, isbn: str) -> int:
+        """
+        Busca la fila de un ISBN.
+        
+        Args:
+            isbn: ISBN a buscar
+        
+        Returns:
+            int: Fila del libro, o -1 si no existe
+        """
+        if not isinstance(isbn, str):
+            return _VACIO
+        clave = isbn.encode('utf-8')
+        codigo = zlib.crc32(clave)
+        tabla = self._tabla
+        mascara = len(tabla) - 1
+        i = codigo & mascara
+        while True:
+            fila = tabla[i]
+            if fila == _VACIO:
+                return _VACIO
+            if self._hashes[fila] == codigo and self._isbns.bytes(fila) == clave:
+                return fila
+            i = (i + 1) & mascara
+    
+    def _insertar_en_tabla(self, tabla: array, codigo: int, fila: int) -> None:
+        """Inserta una fila en la primera posición libre de la tabla."""
+        mascara = len(tabla) - 1
+        i = codigo & mascara
+        while tabla[i] != _VACIO:
+            i = (i + 1) & mascara
+        tabla[i] = fila
+    
+    def _redimensionar(self) -> None:
+        """Duplica la tabla hash y reinserta todas las filas."""
+        tabla = array('q', [_VACIO]) * (len(self._tabla) * 2)
+        for fila, codigo in enumerate(self._hashes):
+            self._insertar_en_tabla(tabla, codigo, fila)
+        self._tabla = tabla
+    
+    # ==================== INTERFAZ DE CATÁLOGO ====================
+    
+    def __setitem__(self, isbn: str, libro: Libro) -> None:
+        """
+        Agrega un libro al catálogo copiando sus campos a las columnas.
+        
+        Args:
+            isbn: ISBN del libro (debe coincidir con ``libro.isbn``)
+            libro: Libro a agregar
+        
+        Raises:
+            ValueError: Si el ISBN ya existe o no coincide con el del libro
+        """
+        if isbn != libro.isbn:
+            raise ValueError(f"El ISBN {isbn} no coincide con el del libro ({libro.isbn})")
+        if self._buscar_fila(isbn) != _VACIO:
+            raise ValueError(f"El libro con ISBN {isbn} ya existe en el catálogo")
+        
+        clave = isbn.encode('utf-8')
+        codigo = zlib.crc32(clave)
+        fila = len(self._hashes)
+        self._isbns.agregar(clave)
+        self._titulos.agregar(libro.titulo.encode('utf-8'))
+        self._autores.agregar(libro.autor.encode('utf-8'))
+        self._titulos_busqueda.agregar(libro.titulo_busqueda.encode('utf-8'))
+        self._autores_busqueda.agregar(libro.autor_busqueda.encode('utf-8'))
+        self._fechas.append(fecha_a_epoch(libro.fecha_publicacion))
+        self._ejemplares.append(libro.ejemplares)
+        self._ejemplares_disponibles.append(libro.ejemplares_disponibles)
+        self._disponibles.append(1 if libro.disponible else 0)
+        self._hashes.append(codigo)
+        
+        if (fila + 1) * 3 > len(self._tabla) * 2:
+            self._redimensionar()
+        else:
+            self._insertar_en_tabla(self._tabla, codigo, fila)
+    
+    def __getitem__(self, isbn: str) -> LibroColumnar:
+        """Retorna una vista del libro con el ISBN indicado."""
+        fila = self._buscar_fila(isbn)
+        if fila == _VACIO:
+            raise KeyError(isbn)
+        return LibroColumnar(self, fila)
+    
+    def __contains__(self, isbn: object) -> bool:
+        """Verifica si un ISBN está en el catálogo."""
+        return self._buscar_fila(isbn) != _VACIO
+    
+    def __iter__(self) -> Iterator[str]:
+        """Itera los ISBN en orden de inserción."""
+        return (self._isbns[fila] for fila in range(len(self._hashes)))
+    
+    def __len__(self) -> int:
+        """Retorna el número de libros del catálogo."""
+        return len(self._hashes)
+    
+    def values(self) -> Iterator[LibroColumnar]:
+        """Itera vistas de todos los libros en orden de inserción."""
+        return (LibroColumnar(self, fila) for fila in range(len(self._hashes)))
+    
+    def disponibles(self) -> Iterator[LibroColumnar]:
+        """
+        Itera los libros con algún ejemplar disponible en orden de inserción.
+        
+        Recorre la columna de disponibilidad con ``bytearray.find``, de modo que
+        solo se materializan vistas de los libros disponibles.
+        
+        Returns:
+            Iterator[LibroColumnar]: Vistas de los libros disponibles
+        """
+        columna = self._disponibles
+        fila = columna.find(1)
+        while fila != -1:
+            yield LibroColumnar(self, fila)
+            fila = columna.find(1, fila + 1)
+    
+    def contar_disponibles(self) -> int:
+        """Retorna el número de libros disponibles sin materializar vistas."""
+        return self._disponibles.count(1)
+    
+    def contar_ejemplares(self) -> Tuple[int, int]:
+        """Retorna el número total de ejemplares y el de ejemplares disponibles."""
+        return sum(self._ejemplares), sum(self._ejemplares_disponibles)
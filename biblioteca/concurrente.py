@@ -0,0 +1,244 @@
+"""
+Módulo que define una Biblioteca segura para uso desde varios hilos.
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .archivo import ArchivoPrestamos
+from .biblioteca import Biblioteca
+from .cache_consultas import CacheConsultas
+from .importacion import Origen
+from .indice_texto import IndiceTrigramas
+from .libro import Libro
+from .prestamo import Prestamo
+from .reloj import Reloj, fecha_a_epoch
+from .usuario import Usuario
+
+
+class CerrojosPorClave:
+    """
+    Conjunto fijo de cerrojos repartidos por el hash de una clave.
+    
+    Cada clave corresponde siempre al mismo cerrojo; dos claves distintas
+    pueden compartirlo, lo que solo reduce la concurrencia entre ellas. Así el
+    número de cerrojos no crece con el catálogo.
+    """
+    
+    def __init__(self, cantidad: int = 1024):
+        """
+        Inicializa los cerrojos.
+        
+        Args:
+            cantidad: Número de cerrojos
+        
+        Raises:
+            ValueError: Si la cantidad es menor que 1
+        """
+        if cantidad < 1:
+            raise ValueError("El número de cerrojos debe ser al menos 1")
+        self._cerrojos = [threading.Lock() for _ in range(cantidad)]
+    
+    def __call__(self, clave: str) -> threading.Lock:
+        """Retorna el cerrojo de una clave."""
+        return self._cerrojos[hash(clave) % len(self._cerrojos)]
+    
+    def varios(self, claves: Iterable[str]) -> List[threading.Lock]:
+        """
+        Retorna los cerrojos distintos de varias claves en un orden fijo.
+        
+        Args:
+            claves: Claves a bloquear
+        
+        Returns:
+            List[threading.Lock]: Cerrojos sin repetir, ordenados por posición
+        """
+        posiciones = sorted({hash(clave) % len(self._cerrojos) for clave in claves})
+        return [self._cerrojos[posicion] for posicion in posiciones]
+
+
+class BibliotecaConcurrente(Biblioteca):
+    """
+    Biblioteca que admite préstamos y devoluciones concurrentes.
+    
+    Las operaciones sobre un libro y un usuario toman el cerrojo del ISBN y
+    luego el del usuario, siempre en ese orden, por lo que no hay interbloqueos
+    y solo se serializan las operaciones que comparten libro o usuario. Los
+    IDs de préstamo se generan de forma atómica y las estructuras compartidas
+    (contadores, vencimientos, índices de texto) se protegen con cerrojos
+    internos que se mantienen solo durante la actualización.
+    
+    Los lotes toman todos los cerrojos de sus libros y luego todos los de sus
+    usuarios, cada grupo en un orden fijo. El orden completo de adquisición
+    es: libros, usuarios, IDs, catálogo, índices.
+    
+    Las lecturas por clave (``buscar_libro_por_isbn``, ``buscar_usuario``) y los
+    listados (``libros_disponibles``, ``prestamos_activos``) no toman
+    cerrojos: trabajan sobre una copia de las colecciones, por lo que no
+    esperan a las escrituras. Las búsquedas por título o autor solo esperan a
+    las altas de libros.
+    
+    El diario, si se usa, recibe llamadas desde varios hilos a la vez.
+    ``verificar_contadores`` solo es fiable sin operaciones en curso.
+    """
+    
+    def __init__(self, nombre: str = "Biblioteca Central", depuracion: bool = False,
+                 catalogo: Optional[Mapping[str, Libro]] = None, diario: Optional[Any] = None,
+                 archivo: Optional[ArchivoPrestamos] = None, cerrojos: int = 1024,
+                 reloj: Optional[Reloj] = None, cache_consultas: Optional[CacheConsultas] = None):
+        """
+        Inicializa una biblioteca concurrente.
+        
+        Args:
+            nombre: Nombre de la biblioteca
+            depuracion: Si es True, ``estadisticas`` verifica los contadores
+            catalogo: Almacenamiento para el catálogo
+            diario: Receptor opcional de las operaciones (debe ser seguro para hilos)
+            archivo: Archivo opcional de préstamos devueltos antiguos
+            cerrojos: Número de cerrojos para libros y para usuarios
+            reloj: Reloj a usar; por defecto, el del sistema
+            cache_consultas: Caché opcional de resultados de búsquedas y de disponibles
+        """
+        super().__init__(nombre, depuracion, catalogo, diario, archivo, reloj, cache_consultas)
+        self._cerrojos_libros = CerrojosPorClave(cerrojos)
+        self._cerrojos_usuarios = CerrojosPorClave(cerrojos)
+        self._bloqueo_ids = threading.Lock()
+        self._bloqueo_catalogo = threading.Lock()
+        self._bloqueo_usuarios = threading.Lock()
+        self._bloqueo_indices = threading.Lock()
+    
+    # ==================== LIBROS ====================
+    
+    def agregar_libro(self, libro: Libro) -> bool:
+        with self._cerrojos_libros(libro.isbn), self._bloqueo_catalogo:
+            return super().agregar_libro(libro)
+    
+    def _indexar_libro(self, libro: Libro) -> None:
+        with self._bloqueo_indices:
+            super()._indexar_libro(libro)
+    
+    def _construir_indices(self) -> None:
+        with self._bloqueo_catalogo:
+            super()._construir_indices()
+    
+    def libros_disponibles(self) -> List[Libro]:
+        if self.cache_consultas is None and isinstance(self.catalogo, dict):
+            if self._recorridos is not None:
+                self._recorridos.total += len(self.catalogo)
+            return [libro for libro in list(self.catalogo.values()) if libro.disponible]
+        return super().libros_disponibles()
+    
+    def _ordenar_isbns(self) -> List[str]:
+        with self._bloqueo_catalogo:
+            return super()._ordenar_isbns()
+    
+    def _buscar_isbns(self, indice: IndiceTrigramas, texto: str) -> List[str]:
+        self._construir_indices()
+        with self._bloqueo_catalogo:
+            return indice.buscar(texto)
+    
+    def _iter_isbns(self, indice: IndiceTrigramas, texto: str,
+                    despues: Optional[str]) -> Iterator[str]:
+        self._construir_indices()
+        with self._bloqueo_catalogo:
+            return indice.iterar(texto, despues)
+    
+    def _sugerencias(self, prefijo: str, campo: str, limite: Optional[int]) -> List[str]:
+        with self._bloqueo_indices:
+            return super()._sugerencias(prefijo, campo, limite)
+    
+    # ==================== USUARIOS ====================
+    
+    def registrar_usuario(self, usuario: Usuario) -> bool:
+        with self._bloqueo_usuarios:
+            return super().registrar_usuario(usuario)
+    
+    # ==================== PRÉSTAMOS ====================
+    
+    def prestar_libro(self, isbn: str, id_usuario: str, dias_prestamo: int = 14) -> Prestamo:
+        with self._cerrojos_libros(isbn), self._cerrojos_usuarios(id_usuario):
+            return super().prestar_libro(isbn, id_usuario, dias_prestamo)
+    
+    def devolver_libro(self, isbn: str, id_usuario: str) -> bool:
+        with self._cerrojos_libros(isbn), self._cerrojos_usuarios(id_usuario):
+            return super().devolver_libro(isbn, id_usuario)
+    
+    def restaurar_devolucion(self, isbn: str, id_usuario: str, fecha: datetime) -> None:
+        with self._cerrojos_libros(isbn), self._cerrojos_usuarios(id_usuario):
+            super().restaurar_devolucion(isbn, id_usuario, fecha)
+    
+    @contextmanager
+    def _bloquear_lote(self, pares: List[Tuple[str, str]]) -> Iterator[None]:
+        """Toma los cerrojos de todos los libros y luego de todos los usuarios de un lote."""
+        with ExitStack() as pila:
+            for cerrojo in self._cerrojos_libros.varios(isbn for isbn, _ in pares):
+                pila.enter_context(cerrojo)
+            for cerrojo in self._cerrojos_usuarios.varios(id_usuario for _, id_usuario in pares):
+                pila.enter_context(cerrojo)
+            yield
+    
+    def prestar_lote(self, pares: Iterable[Tuple[str, str]], dias_prestamo: int = 14,
+                     atomico: bool = True) -> Dict[str, Any]:
+        pares = list(pares)
+        with self._bloquear_lote(pares):
+            return super().prestar_lote(pares, dias_prestamo, atomico)
+    
+    def devolver_lote(self, pares: Iterable[Tuple[str, str]],
+                      atomico: bool = True) -> Dict[str, Any]:
+        pares = list(pares)
+        with self._bloquear_lote(pares):
+            return super().devolver_lote(pares, atomico)
+    
+    def restaurar_prestamo(self, prestamo: Prestamo) -> None:
+        with self._cerrojos_libros(prestamo.isbn_libro), \
+                self._cerrojos_usuarios(prestamo.id_usuario), self._bloqueo_ids:
+            super().restaurar_prestamo(prestamo)
+    
+    def _generar_id_prestamo(self) -> str:
+        with self._bloqueo_ids:
+            return super()._generar_id_prestamo()
+    
+    def restaurar_contador_prestamos(self, contador: int) -> None:
+        with self._bloqueo_ids:
+            super().restaurar_contador_prestamos(contador)
+    
+    def _registrar_prestamo(self, prestamo: Prestamo, libro: Libro, usuario: Usuario) -> None:
+        with self._bloqueo_indices:
+            super()._registrar_prestamo(prestamo, libro, usuario)
+    
+    def _cerrar_prestamo(self, prestamo: Prestamo, libro: Libro, usuario: Usuario,
+                         fecha: datetime) -> None:
+        with self._bloqueo_indices:
+            super()._cerrar_prestamo(prestamo, libro, usuario, fecha)
+    
+    def prestamos_activos(self) -> List[Prestamo]:
+        if self._recorridos is not None:
+            self._recorridos.total += len(self._indice_activos)
+        return [p for p in list(self._indice_activos.values()) if p.esta_activo()]
+    
+    def vencidos_hasta(self, fecha: datetime) -> List[Prestamo]:
+        with self._bloqueo_indices:
+            return super().vencidos_hasta(fecha)
+    
+    def _prestamos_archivables(self, hasta: datetime) -> List[Prestamo]:
+        limite = fecha_a_epoch(hasta)
+        if self._recorridos is not None:
+            self._recorridos.total += len(self.prestamos)
+        return [p for p in list(self.prestamos.values())
+                if p.epoch_devolucion is not None and p.epoch_devolucion < limite]
+    
+    def _retirar_prestamos(self, prestamos: List[Prestamo]) -> None:
+        with self._bloqueo_indices:
+            super()._retirar_prestamos(prestamos)
+    
+    # ==================== IMPORTACIÓN MASIVA ====================
+    
+    def importar_libros(self, origen: Origen, tamano_lote: int = 10000,
+                        indexar_al_final: bool = True) -> Dict[str, Any]:
+        with self._bloqueo_catalogo:
+            return super().importar_libros(origen, tamano_lote, indexar_al_final)
+    
+    def importar_usuarios(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        with self._bloqueo_usuarios:
+            return super().importar_usuarios(origen, tamano_lote)
@@ -0,0 +1,562 @@
+"""
+Módulo que define una biblioteca repartida entre varios procesos trabajadores.
+"""
+import heapq
+import multiprocessing
+import threading
+import zlib
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import chain
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .biblioteca import Biblioteca
+from .importacion import Origen, en_lotes, filas_de, libro_desde_fila, usuario_desde_fila
+from .libro import Libro
+from .prestamo import Prestamo
+from .reloj import RELOJ_SISTEMA, Reloj
+from .usuario import Usuario
+from .vencimientos import IndiceVencimientos
+
+
+class _Fragmento(Biblioteca):
+    """
+    Partición de una ``BibliotecaFragmentada`` que vive en un proceso trabajador.
+    
+    Además de la interfaz de ``Biblioteca`` (usada cuando el libro y el usuario
+    de un préstamo están en el mismo fragmento), ofrece las dos mitades de un
+    préstamo entre fragmentos: reservar o liberar un ejemplar en el fragmento
+    del libro, y anotar o cerrar el préstamo en el fragmento del usuario.
+    Las fechas las decide el coordinador y llegan como argumentos.
+    """
+    
+    def reservar_ejemplar(self, isbn: str) -> Libro:
+        """
+        Presta un ejemplar de un libro de este fragmento.
+        
+        Returns:
+            Libro: El libro reservado
+        
+        Raises:
+            ValueError: Si el libro no existe o no le quedan ejemplares
+        """
+        libro = self.buscar_libro_por_isbn(isbn)
+        if not libro:
+            raise ValueError(f"El libro con ISBN {isbn} no existe en el catálogo")
+        if not libro.disponible:
+            raise ValueError(f"El libro '{libro.titulo}' no está disponible")
+        self._prestar_ejemplar(libro)
+        return libro
+    
+    def liberar_ejemplar(self, isbn: str) -> None:
+        """Devuelve un ejemplar prestado de un libro de este fragmento."""
+        libro = self.catalogo[isbn]
+        if not libro.disponible:
+            self._total_disponibles += 1
+        libro.devolver()
+        self._ejemplares_disponibles += 1
+    
+    def anotar_prestamo(self, prestamo: Prestamo, libro: Libro) -> None:
+        """
+        Registra un préstamo en el fragmento de su usuario.
+        
+        Args:
+            prestamo: Préstamo a registrar
+            libro: Libro ya reservado en su fragmento
+        
+        Raises:
+            ValueError: Si el usuario no existe, alcanzó su límite o ya tiene el libro
+        """
+        usuario = self.buscar_usuario(prestamo.id_usuario)
+        if not usuario:
+            raise ValueError(f"El usuario con ID {prestamo.id_usuario} no está registrado")
+        self._anotar_prestamo(prestamo, libro, usuario)
+    
+    def cerrar_prestamo(self, isbn: str, id_usuario: str, fecha: Optional[datetime] = None) -> None:
+        """
+        Marca como devuelto, en ``fecha``, un préstamo del fragmento de su usuario.
+        
+        Raises:
+            ValueError: Si no hay un préstamo activo para el libro y el usuario
+        """
+        prestamo = self._buscar_prestamo_activo(isbn, id_usuario)
+        if not prestamo:
+            raise ValueError(f"No existe un préstamo activo para el libro {isbn} y usuario {id_usuario}")
+        prestamo.devolver(fecha)
+        self.usuarios[id_usuario].remover_prestamo(isbn)
+        del self._indice_activos[(isbn, id_usuario)]
+        self._indice_vencimientos.marcar_devuelto()
+        self._orden_activos.marcar_devuelto()
+        self._orden_vencimientos.marcar_devuelto()
+    
+    def prestar(self, prestamo: Prestamo) -> None:
+        """Registra un préstamo cuyo libro y usuario están en este fragmento."""
+        libro = self.reservar_ejemplar(prestamo.isbn_libro)
+        try:
+            self.anotar_prestamo(prestamo, libro)
+        except Exception:
+            self.liberar_ejemplar(prestamo.isbn_libro)
+            raise
+    
+    def devolver(self, isbn: str, id_usuario: str, fecha: Optional[datetime] = None) -> None:
+        """Cierra un préstamo cuyo libro y usuario están en este fragmento."""
+        self.cerrar_prestamo(isbn, id_usuario, fecha)
+        self.liberar_ejemplar(isbn)
+    
+    def estadisticas_a_fecha(self, fecha: datetime) -> Dict:
+        """Genera las estadísticas del fragmento evaluando los vencimientos en ``fecha``."""
+        with self.reloj.congelado(fecha):
+            return self.estadisticas()
+    
+    def prestados(self) -> int:
+        """Retorna el número de ejemplares prestados de los libros de este fragmento."""
+        contadores = self._contadores()
+        return contadores['total_ejemplares'] - contadores['ejemplares_disponibles']
+
+
+def _servir(conexion: Connection, nombre: str) -> None:
+    """
+    Bucle de un proceso trabajador: ejecuta los mensajes ``(método, argumentos)``
+    sobre su fragmento y responde ``(True, resultado)`` o ``(False, excepción)``.
+    
+    Termina al recibir ``None`` o al cerrarse la conexión.
+    """
+    fragmento = _Fragmento(nombre)
+    while True:
+        try:
+            mensaje = conexion.recv()
+        except EOFError:
+            break
+        if mensaje is None:
+            break
+        metodo, args = mensaje
+        try:
+            resultado = getattr(fragmento, metodo)(*args)
+        except Exception as error:
+            conexion.send((False, error))
+        else:
+            conexion.send((True, resultado))
+    conexion.close()
+
+
+class BibliotecaFragmentada:
+    """
+    Biblioteca lógica repartida entre varios procesos trabajadores locales.
+    
+    Cada proceso aloja un fragmento: los libros se reparten por un hash del
+    ISBN y los usuarios por un hash de su ID, de modo que un libro y su
+    usuario pueden estar en fragmentos distintos. Un préstamo entre fragmentos
+    se coordina en dos pasos: se reserva un ejemplar en el fragmento del libro
+    y se anota el préstamo en el del usuario; si el segundo paso falla, la
+    reserva se libera. Una devolución entre fragmentos cierra el préstamo en
+    el fragmento del usuario y luego libera el ejemplar en el del libro; si la
+    liberación falla, queda pendiente y se reintenta antes de la siguiente
+    operación de préstamo o devolución sobre ese fragmento. Los préstamos se
+    guardan en el fragmento del usuario.
+    
+    Las búsquedas, los listados y las estadísticas se envían a todos los
+    fragmentos a la vez, que las resuelven en paralelo, y sus resultados se
+    combinan. Las búsquedas y los libros disponibles se ordenan por ISBN.
+    
+    Los objetos retornados son copias: modificarlos no cambia la biblioteca.
+    Los IDs de préstamo son globales; un préstamo rechazado en el fragmento
+    del usuario consume un ID.
+    """
+    
+    def __init__(self, fragmentos: int = 4, nombre: str = "Biblioteca Central",
+                 contexto: Optional[str] = None, reloj: Optional[Reloj] = None):
+        """
+        Inicia los procesos trabajadores.
+        
+        Args:
+            fragmentos: Número de fragmentos (un proceso por fragmento)
+            nombre: Nombre de la biblioteca
+            contexto: Método de inicio de ``multiprocessing`` ('fork', 'spawn',
+                'forkserver'); por defecto, el de la plataforma
+            reloj: Reloj del coordinador, que fija las fechas de préstamos,
+                devoluciones y vencimientos; por defecto, el del sistema
+            
+        Raises:
+            ValueError: Si el número de fragmentos es menor que 1
+        """
+        if fragmentos < 1:
+            raise ValueError("El número de fragmentos debe ser al menos 1")
+        
+        self.nombre = nombre
+        self.reloj = reloj if reloj is not None else RELOJ_SISTEMA
+        self._contador_prestamos = 0
+        self._bloqueo_ids = threading.Lock()
+        self._liberaciones_pendientes: Dict[int, List[str]] = {}
+        self._bloqueo_pendientes = threading.Lock()
+        self._conexiones: List[Connection] = []
+        self._bloqueos: List[threading.Lock] = []
+        self._procesos = []
+        ctx = multiprocessing.get_context(contexto)
+        for i in range(fragmentos):
+            local, remota = ctx.Pipe()
+            proceso = ctx.Process(target=_servir, args=(remota, f"{nombre} #{i}"),
+                                  name=f"fragmento-{i}", daemon=True)
+            proceso.start()
+            remota.close()
+            self._conexiones.append(local)
+            self._bloqueos.append(threading.Lock())
+            self._procesos.append(proceso)
+    
+    @property
+    def fragmentos(self) -> int:
+        """Número de fragmentos."""
+        return len(self._conexiones)
+    
+    # ==================== COMUNICACIÓN ====================
+    
+    def _fragmento(self, clave: str) -> int:
+        """Retorna el fragmento de un ISBN o ID de usuario (estable entre ejecuciones)."""
+        return zlib.crc32(clave.encode('utf-8')) % len(self._conexiones)
+    
+    def _llamar(self, i: int, metodo: str, *args) -> Any:
+        """
+        Ejecuta un método en un fragmento y espera su resultado.
+        
+        Raises:
+            Exception: La excepción lanzada por el fragmento
+        """
+        conexion = self._conexiones[i]
+        with self._bloqueos[i]:
+            conexion.send((metodo, args))
+            correcto, resultado = conexion.recv()
+        if not correcto:
+            raise resultado
+        return resultado
+    
+    def _en_paralelo(self, llamadas: Dict[int, Tuple[str, tuple]]) -> Dict[int, Any]:
+        """
+        Envía una llamada a cada fragmento indicado y luego recoge las respuestas,
+        de modo que los fragmentos trabajan a la vez.
+        
+        Args:
+            llamadas: Fragmento -> (método, argumentos)
+            
+        Returns:
+            Dict[int, Any]: Fragmento -> resultado
+            
+        Raises:
+            Exception: La primera excepción lanzada por algún fragmento, una vez
+                recogidas todas las respuestas
+        """
+        resultados: Dict[int, Any] = {}
+        error: Optional[Exception] = None
+        with ExitStack() as pila:
+            for i in sorted(llamadas):
+                pila.enter_context(self._bloqueos[i])
+            for i in sorted(llamadas):
+                self._conexiones[i].send(llamadas[i])
+            for i in sorted(llamadas):
+                correcto, resultado = self._conexiones[i].recv()
+                if correcto:
+                    resultados[i] = resultado
+                elif error is None:
+                    error = resultado
+        if error is not None:
+            raise error
+        return resultados
+    
+    def _difundir(self, metodo: str, *args) -> List[Any]:
+        """Ejecuta un método en todos los fragmentos en paralelo y retorna sus resultados."""
+        resultados = self._en_paralelo({i: (metodo, args) for i in range(self.fragmentos)})
+        return [resultados[i] for i in range(self.fragmentos)]
+    
+    # ==================== GESTIÓN DE LIBROS ====================
+    
+    def agregar_libro(self, libro: Libro) -> bool:
+        """
+        Agrega un libro a su fragmento.
+        
+        Raises:
+            ValueError: Si el ISBN ya existe
+        """
+        return self._llamar(self._fragmento(libro.isbn), 'agregar_libro', libro)
+    
+    def buscar_libro_por_isbn(self, isbn: str) -> Optional[Libro]:
+        """Busca un libro por ISBN en su fragmento."""
+        return self._llamar(self._fragmento(isbn), 'buscar_libro_por_isbn', isbn)
+    
+    def buscar_libros_por_titulo(self, titulo: str) -> List[Libro]:
+        """Busca libros por título en todos los fragmentos en paralelo."""
+        return self._combinar_libros(self._difundir('buscar_libros_por_titulo', titulo))
+    
+    def buscar_libros_por_autor(self, autor: str) -> List[Libro]:
+        """Busca libros por autor en todos los fragmentos en paralelo."""
+        return self._combinar_libros(self._difundir('buscar_libros_por_autor', autor))
+    
+    def libros_disponibles(self) -> List[Libro]:
+        """Retorna los libros con algún ejemplar disponible de todos los fragmentos."""
+        return self._combinar_libros(self._difundir('libros_disponibles'))
+    
+    @staticmethod
+    def _combinar_libros(listas: List[List[Libro]]) -> List[Libro]:
+        return sorted(chain.from_iterable(listas), key=lambda libro: libro.isbn)
+    
+    def total_libros(self) -> int:
+        """Retorna el número total de libros."""
+        return sum(self._difundir('total_libros'))
+    
+    # ==================== GESTIÓN DE USUARIOS ====================
+    
+    def registrar_usuario(self, usuario: Usuario) -> bool:
+        """
+        Registra un usuario en su fragmento.
+        
+        Raises:
+            ValueError: Si el ID ya existe
+        """
+        return self._llamar(self._fragmento(usuario.id), 'registrar_usuario', usuario)
+    
+    def buscar_usuario(self, id_usuario: str) -> Optional[Usuario]:
+        """Busca un usuario por ID en su fragmento."""
+        return self._llamar(self._fragmento(id_usuario), 'buscar_usuario', id_usuario)
+    
+    def total_usuarios(self) -> int:
+        """Retorna el número total de usuarios registrados."""
+        return sum(self._difundir('total_usuarios'))
+    
+    # ==================== GESTIÓN DE PRÉSTAMOS ====================
+    
+    def prestar_libro(self, isbn: str, id_usuario: str, dias_prestamo: int = 14) -> Prestamo:
+        """
+        Realiza un préstamo, coordinando los fragmentos del libro y del usuario.
+        
+        Args:
+            isbn: ISBN del libro a prestar
+            id_usuario: ID del usuario que solicita el préstamo
+            dias_prestamo: Días de duración del préstamo
+            
+        Returns:
+            Prestamo: Copia del préstamo creado
+            
+        Raises:
+            ValueError: Si el libro no existe, no le quedan ejemplares,
+                       el usuario no existe, alcanzó el límite o ya tiene
+                       un ejemplar del libro
+        """
+        if dias_prestamo < 1:
+            raise ValueError("Los días de préstamo deben ser al menos 1")
+        fragmento_libro = self._fragmento(isbn)
+        fragmento_usuario = self._fragmento(id_usuario)
+        self._reintentar_liberaciones(fragmento_libro)
+        if fragmento_libro == fragmento_usuario:
+            prestamo = Prestamo(self._generar_id_prestamo(), isbn, id_usuario, dias_prestamo,
+                                self.reloj.ahora())
+            self._llamar(fragmento_libro, 'prestar', prestamo)
+            return prestamo
+        
+        libro = self._llamar(fragmento_libro, 'reservar_ejemplar', isbn)
+        try:
+            prestamo = Prestamo(self._generar_id_prestamo(), isbn, id_usuario, dias_prestamo,
+                                self.reloj.ahora())
+            self._llamar(fragmento_usuario, 'anotar_prestamo', prestamo, libro)
+        except Exception:
+            self._llamar(fragmento_libro, 'liberar_ejemplar', isbn)
+            raise
+        return prestamo
+    
+    def _generar_id_prestamo(self) -> str:
+        """Genera el ID global del siguiente préstamo."""
+        with self._bloqueo_ids:
+            self._contador_prestamos += 1
+            return f"PREST-{self._contador_prestamos:05d}"
+    
+    def devolver_libro(self, isbn: str, id_usuario: str) -> bool:
+        """
+        Procesa la devolución de un libro.
+        
+        Raises:
+            ValueError: Si no hay un préstamo activo para el libro y el usuario
+            Exception: El error del fragmento del libro si no se pudo liberar el
+                ejemplar; el préstamo ya quedó cerrado y la liberación pendiente
+        """
+        fragmento_libro = self._fragmento(isbn)
+        fragmento_usuario = self._fragmento(id_usuario)
+        self._reintentar_liberaciones(fragmento_libro)
+        ahora = self.reloj.ahora()
+        if fragmento_libro == fragmento_usuario:
+            self._llamar(fragmento_libro, 'devolver', isbn, id_usuario, ahora)
+        else:
+            self._llamar(fragmento_usuario, 'cerrar_prestamo', isbn, id_usuario, ahora)
+            try:
+                self._llamar(fragmento_libro, 'liberar_ejemplar', isbn)
+            except Exception:
+                with self._bloqueo_pendientes:
+                    self._liberaciones_pendientes.setdefault(fragmento_libro, []).append(isbn)
+                raise
+        return True
+    
+    def _reintentar_liberaciones(self, fragmento: int) -> None:
+        """
+        Libera los ejemplares de un fragmento cuya liberación falló al devolverlos.
+        
+        Raises:
+            Exception: El error del fragmento; las liberaciones no realizadas
+                siguen pendientes
+        """
+        if not self._liberaciones_pendientes:
+            return
+        with self._bloqueo_pendientes:
+            isbns = self._liberaciones_pendientes.pop(fragmento, [])
+        for posicion, isbn in enumerate(isbns):
+            try:
+                self._llamar(fragmento, 'liberar_ejemplar', isbn)
+            except Exception:
+                with self._bloqueo_pendientes:
+                    self._liberaciones_pendientes.setdefault(fragmento, []).extend(isbns[posicion:])
+                raise
+    
+    def prestamos_activos(self) -> List[Prestamo]:
+        """Retorna los préstamos activos de todos los fragmentos, del más antiguo al más reciente."""
+        return sorted(chain.from_iterable(self._difundir('prestamos_activos')),
+                      key=lambda prestamo: prestamo.epoch_prestamo)
+    
+    def prestamos_vencidos(self) -> List[Prestamo]:
+        """Retorna los préstamos vencidos de todos los fragmentos."""
+        return self.vencidos_hasta(self.reloj.ahora())
+    
+    def vencidos_hasta(self, fecha: datetime) -> List[Prestamo]:
+        """
+        Retorna los préstamos activos que estarán vencidos en una fecha dada.
+        
+        Returns:
+            List[Prestamo]: Préstamos vencidos, ordenados por vencimiento
+        """
+        return list(heapq.merge(*self._difundir('vencidos_hasta', fecha),
+                                key=IndiceVencimientos.vencimiento_epoch))
+    
+    def prestamos_usuario(self, id_usuario: str, desde: Optional[datetime] = None,
+                          hasta: Optional[datetime] = None) -> List[Prestamo]:
+        """Retorna los préstamos de un usuario, opcionalmente en un rango de fechas."""
+        return self._llamar(self._fragmento(id_usuario), 'prestamos_usuario',
+                            id_usuario, desde, hasta)
+    
+    def ultimos_prestamos_usuario(self, id_usuario: str, n: int) -> List[Prestamo]:
+        """Retorna los préstamos más recientes de un usuario."""
+        return self._llamar(self._fragmento(id_usuario), 'ultimos_prestamos_usuario',
+                            id_usuario, n)
+    
+    def total_prestamos(self) -> int:
+        """Retorna el número total de préstamos registrados."""
+        return sum(self._difundir('total_prestamos'))
+    
+    # ==================== IMPORTACIÓN MASIVA ====================
+    
+    def importar_libros(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        """
+        Importa libros en lotes, repartiendo cada lote entre los fragmentos.
+        
+        Los registros se validan en el coordinador, de modo que las posiciones
+        de los errores son las de la entrada; cada fragmento inserta su parte
+        del lote en paralelo con los demás.
+        
+        Returns:
+            Dict[str, Any]: ``importados``, ``duplicados`` y ``errores``, como
+                en ``Biblioteca.importar_libros``
+        """
+        return self._importar(origen, tamano_lote, libro_desde_fila,
+                              lambda libro: libro.isbn, 'importar_libros')
+    
+    def importar_usuarios(self, origen: Origen, tamano_lote: int = 10000) -> Dict[str, Any]:
+        """
+        Importa usuarios en lotes, repartiendo cada lote entre los fragmentos.
+        
+        Returns:
+            Dict[str, Any]: ``importados``, ``duplicados`` y ``errores``
+        """
+        return self._importar(origen, tamano_lote, usuario_desde_fila,
+                              lambda usuario: usuario.id, 'importar_usuarios')
+    
+    def _importar(self, origen: Origen, tamano_lote: int, convertir: Callable[[Any], Any],
+                  clave: Callable[[Any], str], metodo: str) -> Dict[str, Any]:
+        resultado: Dict[str, Any] = {'importados': 0, 'duplicados': [], 'errores': []}
+        posicion = 0
+        for lote in en_lotes(filas_de(origen), tamano_lote):
+            repartidos: Dict[int, List[Any]] = {}
+            for fila in lote:
+                posicion += 1
+                try:
+                    objeto = convertir(fila)
+                except (ValueError, TypeError, AttributeError) as error:
+                    resultado['errores'].append((posicion, str(error)))
+                    continue
+                repartidos.setdefault(self._fragmento(clave(objeto)), []).append(objeto)
+            
+            informes = self._en_paralelo({
+                i: (metodo, (objetos, len(objetos))) for i, objetos in repartidos.items()
+            })
+            for informe in informes.values():
+                resultado['importados'] += informe['importados']
+                resultado['duplicados'].extend(informe['duplicados'])
+        return resultado
+    
+    # ==================== ESTADÍSTICAS ====================
+    
+    def estadisticas(self) -> Dict:
+        """
+        Genera estadísticas sumando las de todos los fragmentos, calculadas en paralelo.
+        
+        Returns:
+            Dict: Diccionario con las mismas claves que ``Biblioteca.estadisticas``
+        """
+        parciales = self._difundir('estadisticas_a_fecha', self.reloj.ahora())
+        return {clave: sum(parcial[clave] for parcial in parciales) for clave in parciales[0]}
+    
+    def verificar_indice_activos(self) -> bool:
+        """Verifica el índice de préstamos activos de cada fragmento."""
+        return all(self._difundir('verificar_indice_activos'))
+    
+    def verificar_contadores(self) -> bool:
+        """
+        Verifica los contadores de cada fragmento y que los ejemplares prestados
+        en los fragmentos de los libros, descontadas las liberaciones
+        pendientes, coinciden con los préstamos activos anotados en los
+        fragmentos de los usuarios.
+        
+        Returns:
+            bool: True si los contadores son consistentes
+        """
+        if not all(self._difundir('verificar_contadores')):
+            return False
+        with self._bloqueo_pendientes:
+            pendientes = sum(len(isbns) for isbns in self._liberaciones_pendientes.values())
+        return sum(self._difundir('prestados')) - pendientes == len(self.prestamos_activos())
+    
+    # ==================== CICLO DE VIDA ====================
+    
+    def cerrar(self, timeout: float = 5) -> None:
+        """
+        Detiene los procesos trabajadores; el estado de los fragmentos se pierde.
+        
+        Args:
+            timeout: Segundos de espera por cada proceso antes de terminarlo
+        """
+        for conexion, bloqueo in zip(self._conexiones, self._bloqueos):
+            with bloqueo:
+                try:
+                    conexion.send(None)
+                except OSError:
+                    pass
+                conexion.close()
+        for proceso in self._procesos:
+            proceso.join(timeout)
+            if proceso.is_alive():
+                proceso.terminate()
+                proceso.join()
+        self._conexiones, self._bloqueos, self._procesos = [], [], []
+    
+    def __enter__(self) -> 'BibliotecaFragmentada':
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+    
+    def __str__(self) -> str:
+        """Representación en string de la biblioteca."""
+        return (f"{self.nombre} - {self.total_libros()} libros, {self.total_usuarios()} usuarios "
+                f"en {self.fragmentos} fragmentos")
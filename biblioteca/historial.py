@@ -0,0 +1,94 @@
+"""
+Módulo que define el historial de préstamos de un usuario.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import AbstractSet, List, Optional
+
+from .prestamo import Prestamo
+from .reloj import fecha_a_epoch
+
+
+class HistorialPrestamos:
+    """
+    Préstamos de un usuario ordenados por fecha de préstamo.
+    
+    Mantiene en paralelo las fechas y los préstamos para poder paginar con
+    búsqueda binaria sin recorrer el historial completo.
+    
+    Attributes:
+        _fechas (List[int]): Fecha de préstamo de cada entrada, en
+            microsegundos desde la época
+        _prestamos (List[Prestamo]): Préstamos en el mismo orden que ``_fechas``
+    """
+    
+    def __init__(self):
+        """Inicializa un historial vacío."""
+        self._fechas: List[int] = []
+        self._prestamos: List[Prestamo] = []
+    
+    def agregar(self, prestamo: Prestamo) -> None:
+        """
+        Agrega un préstamo manteniendo el orden por fecha.
+        
+        Args:
+            prestamo: Préstamo a agregar
+        """
+        fecha = prestamo.epoch_prestamo
+        if not self._fechas or fecha >= self._fechas[-1]:
+            self._fechas.append(fecha)
+            self._prestamos.append(prestamo)
+            return
+        posicion = bisect_right(self._fechas, fecha)
+        self._fechas.insert(posicion, fecha)
+        self._prestamos.insert(posicion, prestamo)
+    
+    def retirar(self, ids: AbstractSet[str]) -> None:
+        """
+        Quita del historial los préstamos con los IDs indicados.
+        
+        Args:
+            ids: IDs de los préstamos a quitar
+        """
+        conservar = [i for i, prestamo in enumerate(self._prestamos) if prestamo.id not in ids]
+        self._fechas = [self._fechas[i] for i in conservar]
+        self._prestamos = [self._prestamos[i] for i in conservar]
+    
+    def todos(self) -> List[Prestamo]:
+        """Retorna todos los préstamos, del más antiguo al más reciente."""
+        return list(self._prestamos)
+    
+    def ultimos(self, n: int) -> List[Prestamo]:
+        """
+        Retorna los ``n`` préstamos más recientes.
+        
+        Args:
+            n: Número máximo de préstamos
+        
+        Returns:
+            List[Prestamo]: Préstamos del más reciente al más antiguo
+        """
+        if n <= 0:
+            return []
+        return self._prestamos[:-n - 1:-1]
+    
+    def entre(self, desde: Optional[datetime] = None,
+              hasta: Optional[datetime] = None) -> List[Prestamo]:
+        """
+        Retorna los préstamos realizados en un rango de fechas (inclusivo).
+        
+        Args:
+            desde: Fecha mínima (opcional)
+            hasta: Fecha máxima (opcional)
+        
+        Returns:
+            List[Prestamo]: Préstamos del rango, del más antiguo al más reciente
+        """
+        inicio = bisect_left(self._fechas, fecha_a_epoch(desde)) if desde is not None else 0
+        fin = (bisect_right(self._fechas, fecha_a_epoch(hasta)) if hasta is not None
+               else len(self._fechas))
+        return self._prestamos[inicio:fin]
+    
+    def __len__(self) -> int:
+        """Retorna el número de préstamos del historial."""
+        return len(self._prestamos)
@@ -0,0 +1,130 @@
+"""
+Módulo con utilidades para la importación masiva de libros y usuarios.
+"""
+import csv
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Mapping, Union
+
+from .libro import Libro
+from .usuario import Usuario
+
+
+Origen = Union[str, os.PathLike, Iterable[Any]]
+
+
+def leer_csv(ruta: Union[str, os.PathLike], encoding: str = 'utf-8') -> Iterator[Mapping[str, str]]:
+    """
+    Lee un archivo CSV con encabezado fila a fila, sin cargarlo completo en memoria.
+    
+    Args:
+        ruta: Ruta del archivo CSV
+        encoding: Codificación del archivo
+    
+    Returns:
+        Iterator[Mapping[str, str]]: Filas indexadas por nombre de columna
+    """
+    with open(ruta, newline='', encoding=encoding) as archivo:
+        yield from csv.DictReader(archivo)
+
+
+def filas_de(origen: Origen) -> Iterable[Any]:
+    """
+    Retorna las filas de un origen de importación.
+    
+    Args:
+        origen: Ruta de un CSV o iterable de objetos/filas
+    
+    Returns:
+        Iterable[Any]: Filas a importar
+    """
+    if isinstance(origen, (str, os.PathLike)):
+        return leer_csv(origen)
+    return origen
+
+
+def en_lotes(filas: Iterable[Any], tamano: int) -> Iterator[List[Any]]:
+    """
+    Agrupa un iterable en listas de como máximo ``tamano`` elementos.
+    
+    Args:
+        filas: Elementos a agrupar
+        tamano: Tamaño máximo de cada lote
+    
+    Returns:
+        Iterator[List[Any]]: Lotes consecutivos
+    
+    Raises:
+        ValueError: Si el tamaño del lote es menor que 1
+    """
+    if tamano < 1:
+        raise ValueError("El tamaño del lote debe ser al menos 1")
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _texto_opcional(fila: Mapping[str, Any], campo: str) -> Any:
+    """Retorna el valor de un campo opcional, tratando cadenas vacías como ausentes."""
+    valor = fila.get(campo)
+    if isinstance(valor, str) and not valor.strip():
+        return None
+    return valor
+
+
+def libro_desde_fila(fila: Union[Libro, Mapping[str, Any]]) -> Libro:
+    """
+    Construye un libro a partir de un objeto Libro o de una fila con sus campos.
+    
+    Las filas deben tener ``isbn``, ``titulo`` y ``autor``; ``fecha_publicacion``
+    es opcional y puede ser un ``datetime`` o una fecha ISO 8601, y ``ejemplares``
+    es opcional (un ejemplar por defecto).
+    
+    Args:
+        fila: Libro o fila a convertir
+    
+    Returns:
+        Libro: Libro validado
+    
+    Raises:
+        ValueError: Si algún campo es inválido
+    """
+    if isinstance(fila, Libro):
+        return fila
+    fecha = _texto_opcional(fila, 'fecha_publicacion')
+    if isinstance(fecha, str):
+        fecha = datetime.fromisoformat(fecha.strip())
+    ejemplares = _texto_opcional(fila, 'ejemplares')
+    return Libro(fila.get('isbn'), fila.get('titulo'), fila.get('autor'), fecha,
+                 int(ejemplares) if ejemplares is not None else 1)
+
+
+def usuario_desde_fila(fila: Union[Usuario, Mapping[str, Any]]) -> Usuario:
+    """
+    Construye un usuario a partir de un objeto Usuario o de una fila con sus campos.
+    
+    Las filas deben tener ``id`` y ``nombre``; ``email`` y ``limite_prestamos``
+    son opcionales.
+    
+    Args:
+        fila: Usuario o fila a convertir
+    
+    Returns:
+        Usuario: Usuario validado
+    
+    Raises:
+        ValueError: Si algún campo es inválido
+    """
+    if isinstance(fila, Usuario):
+        return fila
+    limite = _texto_opcional(fila, 'limite_prestamos')
+    return Usuario(
+        fila.get('id'),
+        fila.get('nombre'),
+        _texto_opcional(fila, 'email'),
+        int(limite) if limite is not None else 3
+    )
@@ -0,0 +1,209 @@
+"""
+Módulo que define el índice invertido de trigramas usado en las búsquedas de texto.
+"""
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Set
+
+
+def normalizar(texto: str) -> str:
+    """
+    Calcula la clave de búsqueda de un texto: sin mayúsculas ni acentos.
+    
+    Aplica ``casefold`` y la descomposición NFKD, y descarta las marcas
+    combinantes, de modo que "María Rodríguez" y "maria rodriguez" coinciden.
+    Los textos ASCII solo se pasan a minúsculas, y si ya lo estaban se
+    retorna el mismo objeto para no duplicar memoria.
+    
+    Args:
+        texto: Texto original
+    
+    Returns:
+        str: Texto normalizado
+    """
+    if texto.isascii():
+        normalizado = texto.lower()
+    else:
+        descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+        normalizado = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return texto if normalizado == texto else normalizado
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido de trigramas para búsquedas parciales que no distinguen
+    mayúsculas ni acentos.
+    
+    Cada documento se identifica internamente por un entero secuencial, de modo
+    que los resultados conservan el orden de inserción. Las consultas de tres o
+    más caracteres intersectan las listas de trigramas y verifican los candidatos;
+    las más cortas recorren los textos ya normalizados.
+    
+    ``iterar`` retorna en cambio los resultados en orden de clave, de forma
+    perezosa: recorre la lista del trigrama menos frecuente de la consulta (o
+    la de todos los documentos, para consultas cortas) ordenada por clave.
+    Esas listas se ordenan al necesitarse y se guardan hasta que el trigrama
+    recibe un documento nuevo, como máximo ``MAX_LISTAS_ORDENADAS``.
+    
+    Attributes:
+        _claves (List[str]): Clave externa (por ejemplo, ISBN) de cada documento
+        _textos (List[str]): Texto normalizado de cada documento
+        _postings (Dict[str, Set[int]]): Documentos que contienen cada trigrama
+        _ordenados (OrderedDict[str, List[int]]): Documentos de cada trigrama
+            ordenados por clave, para los trigramas consultados recientemente
+        _docs_ordenados (List[int]): Todos los documentos ordenados por clave
+        recorridos (int): Documentos examinados por todas las consultas
+    """
+    
+    TAMANO_NGRAMA = 3
+    MAX_LISTAS_ORDENADAS = 256
+    
+    def __init__(self):
+        """Inicializa un índice vacío."""
+        self._claves: List[str] = []
+        self._textos: List[str] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._ordenados: 'OrderedDict[str, List[int]]' = OrderedDict()
+        self._docs_ordenados: List[int] = []
+        self.recorridos = 0
+    
+    normalizar = staticmethod(normalizar)
+    
+    @classmethod
+    def _trigramas(cls, texto: str) -> Iterator[str]:
+        """Genera los trigramas de un texto ya normalizado."""
+        n = cls.TAMANO_NGRAMA
+        for i in range(len(texto) - n + 1):
+            yield texto[i:i + n]
+    
+    def agregar(self, clave: str, texto: str) -> None:
+        """
+        Agrega un documento al índice.
+        
+        Args:
+            clave: Clave externa del documento
+            texto: Texto a indexar
+        """
+        self.agregar_normalizado(clave, self.normalizar(texto))
+    
+    def agregar_normalizado(self, clave: str, normalizado: str) -> None:
+        """
+        Agrega un documento cuyo texto ya está normalizado (ver ``normalizar``).
+        
+        El índice guarda el mismo objeto, sin copiarlo.
+        
+        Args:
+            clave: Clave externa del documento
+            normalizado: Texto normalizado a indexar
+        """
+        doc = len(self._claves)
+        self._claves.append(clave)
+        self._textos.append(normalizado)
+        for trigrama in set(self._trigramas(normalizado)):
+            self._postings.setdefault(trigrama, set()).add(doc)
+            if self._ordenados:
+                self._ordenados.pop(trigrama, None)
+    
+    def buscar(self, consulta: str) -> List[str]:
+        """
+        Busca los documentos cuyo texto contiene la consulta.
+        
+        Args:
+            consulta: Texto o parte del texto a buscar
+        
+        Returns:
+            List[str]: Claves de los documentos coincidentes, en orden de inserción
+        """
+        normalizada = self.normalizar(consulta)
+        if len(normalizada) < self.TAMANO_NGRAMA:
+            self.recorridos += len(self._textos)
+            return [
+                clave for clave, texto in zip(self._claves, self._textos)
+                if normalizada in texto
+            ]
+        
+        listas = []
+        for trigrama in set(self._trigramas(normalizada)):
+            lista = self._postings.get(trigrama)
+            if not lista:
+                return []
+            listas.append(lista)
+        listas.sort(key=len)
+        candidatos = listas[0].intersection(*listas[1:])
+        self.recorridos += len(candidatos)
+        
+        return [
+            self._claves[doc] for doc in sorted(candidatos)
+            if normalizada in self._textos[doc]
+        ]
+    
+    def iterar(self, consulta: str, despues: Optional[str] = None) -> Iterator[str]:
+        """
+        Itera de forma perezosa los documentos que contienen la consulta, en orden de clave.
+        
+        Las listas ordenadas se preparan al llamar, no al recorrer, y el
+        recorrido solo lee listas que el índice no modifica.
+        
+        Args:
+            consulta: Texto o parte del texto a buscar
+            despues: Clave a partir de la cual (exclusiva) se retornan documentos
+        
+        Returns:
+            Iterator[str]: Claves de los documentos coincidentes
+        """
+        normalizada = self.normalizar(consulta)
+        if len(normalizada) < self.TAMANO_NGRAMA:
+            docs = self._ordenar_todos()
+        else:
+            trigramas = set(self._trigramas(normalizada))
+            if any(trigrama not in self._postings for trigrama in trigramas):
+                return iter(())
+            docs = self._ordenar_postings(min(trigramas, key=lambda t: len(self._postings[t])))
+        
+        claves = self._claves
+        inicio, fin = 0, len(docs)
+        if despues is not None:
+            while inicio < fin:
+                medio = (inicio + fin) // 2
+                if claves[docs[medio]] <= despues:
+                    inicio = medio + 1
+                else:
+                    fin = medio
+        return self._recorrer(docs, inicio, normalizada)
+    
+    def _ordenar_todos(self) -> List[int]:
+        """Retorna todos los documentos ordenados por clave, ordenando solo los nuevos."""
+        ordenados = self._docs_ordenados
+        if len(ordenados) < len(self._claves):
+            nuevos = list(range(len(ordenados), len(self._claves)))
+            ordenados = self._docs_ordenados = sorted(ordenados + nuevos,
+                                                      key=self._claves.__getitem__)
+        return ordenados
+    
+    def _ordenar_postings(self, trigrama: str) -> List[int]:
+        """Retorna los documentos de un trigrama ordenados por clave."""
+        docs = self._ordenados.get(trigrama)
+        if docs is None:
+            docs = sorted(self._postings[trigrama], key=self._claves.__getitem__)
+            self._ordenados[trigrama] = docs
+            if len(self._ordenados) > self.MAX_LISTAS_ORDENADAS:
+                self._ordenados.popitem(last=False)
+        else:
+            self._ordenados.move_to_end(trigrama)
+        return docs
+    
+    def _recorrer(self, docs: List[int], inicio: int, normalizada: str) -> Iterator[str]:
+        """Genera las claves de los documentos de ``docs[inicio:]`` que contienen el texto."""
+        recorridos = 0
+        try:
+            for i in range(inicio, len(docs)):
+                recorridos += 1
+                doc = docs[i]
+                if normalizada in self._textos[doc]:
+                    yield self._claves[doc]
+        finally:
+            self.recorridos += recorridos
+    
+    def __len__(self) -> int:
+        """Retorna el número de documentos indexados."""
+        return len(self._claves)
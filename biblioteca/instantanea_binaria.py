@@ -0,0 +1,774 @@
+"""
+Módulo que define una instantánea binaria de una Biblioteca que se abre con
+``mmap`` para arrancar sin reconstruir todos los objetos.
+
+Formato (little-endian, versión 3)::
+
+    cabecera      magia, versión, posición/tamaño de cada sección y totales
+                  de ejemplares
+    libros        registros de ancho fijo: (posición, longitud) de ISBN,
+                  título, autor y sus claves de búsqueda en la arena, fecha
+                  de publicación y ejemplares
+    disponibles   un byte por libro (1 = le queda algún ejemplar disponible)
+    ejemplares    ejemplares disponibles por libro (entero de 32 bits)
+    tabla libros  tabla hash de direccionamiento abierto: fila + 1 por ranura
+    usuarios      registros de ancho fijo: ID, nombre, email, límite y el
+                  tramo de su historial en la sección historial
+    tabla usuarios
+    préstamos     préstamos devueltos, registros de ancho fijo: ID, ISBN,
+                  usuario, fechas y días
+    tabla préstamos
+    historial     filas de préstamos devueltos (entero de 32 bits) agrupadas
+                  por usuario y ordenadas por fecha de préstamo
+    activos       préstamos activos, con el formato de los devueltos
+    arena         textos UTF-8 concatenados
+"""
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .biblioteca import Biblioteca
+from .catalogo import CatalogoMemoria
+from .historial import HistorialPrestamos
+from .libro import Libro
+from .prestamo import Prestamo
+from .reloj import epoch_a_fecha, fecha_a_epoch
+from .usuario import Usuario
+
+
+MAGIA = b'BIBLIOBN'
+VERSION = 3
+
+_CAMPOS_CABECERA = (
+    'n_libros', 'libros', 'disponibles', 'ejemplares', 'total_ejemplares',
+    'total_ejemplares_disponibles', 'tabla_libros', 'tamano_tabla_libros',
+    'n_usuarios', 'usuarios', 'tabla_usuarios', 'tamano_tabla_usuarios',
+    'n_prestamos', 'prestamos', 'tabla_prestamos', 'tamano_tabla_prestamos', 'historial',
+    'n_activos', 'activos', 'arena', 'tamano_arena', 'contador_prestamos',
+)
+_CABECERA = struct.Struct('<8sI4x' + 'Q' * len(_CAMPOS_CABECERA))
+_REG_LIBRO = struct.Struct('<QIQIQIQIQIqI')
+_REG_USUARIO = struct.Struct('<QIQIQiIII')
+_REG_PRESTAMO = struct.Struct('<QIQIQIqqI')
+_RANURA = struct.Struct('<q')
+_EJEMPLARES = struct.Struct('<I')
+_SIN_EMAIL = -1
+
+
+# ==================== ESCRITURA ====================
+
+class _Arena:
+    """Acumula textos UTF-8 y retorna su posición y longitud."""
+    
+    def __init__(self):
+        self.datos = bytearray()
+    
+    def agregar(self, texto: str) -> Tuple[int, int]:
+        codificado = texto.encode('utf-8')
+        posicion = len(self.datos)
+        self.datos += codificado
+        return posicion, len(codificado)
+
+
+def _tamano_tabla(n: int) -> int:
+    """Retorna la potencia de dos más pequeña con factor de carga <= 2/3."""
+    tamano = 8
+    while n * 3 > tamano * 2:
+        tamano *= 2
+    return tamano
+
+
+def _tabla_hash(claves: List[bytes]) -> bytes:
+    """
+    Construye una tabla hash (sondeo lineal sobre crc32) para las claves.
+    
+    Cada ranura guarda la fila de la clave más uno; cero indica ranura vacía.
+    """
+    tabla = array('q', [0]) * _tamano_tabla(len(claves))
+    mascara = len(tabla) - 1
+    for fila, clave in enumerate(claves):
+        i = zlib.crc32(clave) & mascara
+        while tabla[i]:
+            i = (i + 1) & mascara
+        tabla[i] = fila + 1
+    if sys.byteorder != 'little':
+        tabla.byteswap()
+    return tabla.tobytes()
+
+
+def _alinear(datos: bytearray) -> None:
+    """Rellena con ceros hasta un múltiplo de 8 bytes."""
+    datos += bytes(-len(datos) % 8)
+
+
+def escribir_instantanea(biblioteca: Biblioteca, ruta: str) -> None:
+    """
+    Escribe el estado completo de una biblioteca en formato binario.
+    
+    El archivo se escribe en un temporal y se renombra, de modo que una
+    escritura interrumpida no deja una instantánea a medias.
+    
+    Args:
+        biblioteca: Biblioteca a guardar
+        ruta: Ruta del archivo de instantánea
+    """
+    arena = _Arena()
+    devueltos: List[Prestamo] = []
+    activos: List[Prestamo] = []
+    for prestamo in biblioteca.prestamos.values():
+        (activos if prestamo.esta_activo() else devueltos).append(prestamo)
+    prestados = Counter(p.isbn_libro for p in activos)
+    historiales: Dict[str, List[int]] = {}
+    for fila in sorted(range(len(devueltos)), key=lambda i: devueltos[i].epoch_prestamo):
+        historiales.setdefault(devueltos[fila].id_usuario, []).append(fila)
+    
+    libros = bytearray()
+    disponibles = bytearray()
+    ejemplares = array('I')
+    total_ejemplares = 0
+    isbns = []
+    for libro in biblioteca.catalogo.values():
+        isbn = arena.agregar(libro.isbn)
+        titulo = arena.agregar(libro.titulo)
+        autor = arena.agregar(libro.autor)
+        titulo_busqueda = arena.agregar(libro.titulo_busqueda)
+        autor_busqueda = arena.agregar(libro.autor_busqueda)
+        libros += _REG_LIBRO.pack(*isbn, *titulo, *autor, *titulo_busqueda, *autor_busqueda,
+                                  fecha_a_epoch(libro.fecha_publicacion), libro.ejemplares)
+        total_ejemplares += libro.ejemplares
+        sin_prestamos = libro.ejemplares_disponibles + prestados[libro.isbn]
+        ejemplares.append(sin_prestamos)
+        disponibles.append(1 if sin_prestamos else 0)
+        isbns.append(libro.isbn.encode('utf-8'))
+    total_disponibles = sum(ejemplares)
+    if sys.byteorder != 'little':
+        ejemplares.byteswap()
+    
+    usuarios = bytearray()
+    ids = []
+    historial = array('I')
+    for usuario in biblioteca.usuarios.values():
+        id_usuario = arena.agregar(usuario.id)
+        nombre = arena.agregar(usuario.nombre)
+        email = arena.agregar(usuario.email) if usuario.email is not None else (0, _SIN_EMAIL)
+        filas = historiales.get(usuario.id, ())
+        usuarios += _REG_USUARIO.pack(*id_usuario, *nombre, *email, usuario.limite_prestamos,
+                                      len(historial), len(filas))
+        historial.extend(filas)
+        ids.append(usuario.id.encode('utf-8'))
+    if sys.byteorder != 'little':
+        historial.byteswap()
+    
+    def registros(prestamos: List[Prestamo]) -> bytearray:
+        datos = bytearray()
+        for prestamo in prestamos:
+            datos += _REG_PRESTAMO.pack(
+                *arena.agregar(prestamo.id), *arena.agregar(prestamo.isbn_libro),
+                *arena.agregar(prestamo.id_usuario), prestamo.epoch_prestamo,
+                fecha_a_epoch(prestamo.fecha_devolucion), prestamo.dias_prestamo,
+            )
+        return datos
+    
+    cuerpo = bytearray()
+    posiciones: Dict[str, int] = {}
+    secciones = (
+        ('libros', libros), ('disponibles', disponibles), ('ejemplares', ejemplares.tobytes()),
+        ('tabla_libros', _tabla_hash(isbns)), ('usuarios', usuarios),
+        ('tabla_usuarios', _tabla_hash(ids)), ('prestamos', registros(devueltos)),
+        ('tabla_prestamos', _tabla_hash([p.id.encode('utf-8') for p in devueltos])),
+        ('historial', historial.tobytes()), ('activos', registros(activos)),
+        ('arena', arena.datos),
+    )
+    for nombre, datos in secciones:
+        posiciones[nombre] = _CABECERA.size + len(cuerpo)
+        cuerpo += datos
+        _alinear(cuerpo)
+    
+    posiciones.update(
+        n_libros=len(isbns), tamano_tabla_libros=_tamano_tabla(len(isbns)),
+        total_ejemplares=total_ejemplares, total_ejemplares_disponibles=total_disponibles,
+        n_usuarios=len(ids), tamano_tabla_usuarios=_tamano_tabla(len(ids)),
+        n_prestamos=len(devueltos), tamano_tabla_prestamos=_tamano_tabla(len(devueltos)),
+        n_activos=len(activos), tamano_arena=len(arena.datos),
+        contador_prestamos=biblioteca.contador_prestamos,
+    )
+    cabecera = _CABECERA.pack(MAGIA, VERSION, *(posiciones[campo] for campo in _CAMPOS_CABECERA))
+    
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(cabecera)
+        archivo.write(cuerpo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+
+# ==================== LECTURA ====================
+
+class InstantaneaBinaria:
+    """
+    Instantánea binaria abierta con ``mmap``.
+    
+    Abrir el archivo solo valida la cabecera: los registros se leen bajo
+    demanda. El mapeo es copia-en-escritura (``ACCESS_COPY``), así que los
+    cambios de ejemplares disponibles se hacen en memoria sin modificar el
+    archivo.
+    
+    Attributes:
+        ruta (str): Ruta del archivo
+        cabecera (Dict[str, int]): Campos de la cabecera
+        ejemplares_disponibles (int): Ejemplares disponibles actualmente entre
+            todos los libros de la instantánea
+    """
+    
+    def __init__(self, ruta: str):
+        """
+        Abre y valida una instantánea binaria.
+        
+        Args:
+            ruta: Ruta del archivo
+        
+        Raises:
+            ValueError: Si el archivo no es una instantánea o su versión no es soportada
+        """
+        self.ruta = ruta
+        with open(ruta, 'rb') as archivo:
+            if os.fstat(archivo.fileno()).st_size < _CABECERA.size:
+                raise ValueError(f"{ruta} no es una instantánea binaria")
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_COPY)
+        magia, version, *campos = _CABECERA.unpack_from(self._mapa)
+        if magia != MAGIA:
+            self._mapa.close()
+            raise ValueError(f"{ruta} no es una instantánea binaria")
+        if version != VERSION:
+            self._mapa.close()
+            raise ValueError(f"Versión de instantánea no soportada: {version}")
+        self.cabecera: Dict[str, int] = dict(zip(_CAMPOS_CABECERA, campos))
+        self.ejemplares_disponibles = self.cabecera['total_ejemplares_disponibles']
+    
+    def texto(self, posicion: int, longitud: int) -> str:
+        """Retorna un texto de la arena."""
+        inicio = self.cabecera['arena'] + posicion
+        return self._mapa[inicio:inicio + longitud].decode('utf-8')
+    
+    def buscar_fila(self, clave: str, registros: int, tabla: int, tamano_tabla: int,
+                    formato: struct.Struct) -> int:
+        """
+        Busca la fila de una clave en una de las tablas hash.
+        
+        Args:
+            clave: ISBN o ID a buscar
+            registros: Posición de la sección de registros
+            tabla: Posición de la tabla hash
+            tamano_tabla: Número de ranuras de la tabla
+            formato: Formato de los registros (la clave es su primer texto)
+        
+        Returns:
+            int: Fila de la clave, o -1 si no existe
+        """
+        if not isinstance(clave, str):
+            return -1
+        buscada = clave.encode('utf-8')
+        mapa = self._mapa
+        arena = self.cabecera['arena']
+        mascara = tamano_tabla - 1
+        i = zlib.crc32(buscada) & mascara
+        while True:
+            fila = _RANURA.unpack_from(mapa, tabla + i * 8)[0] - 1
+            if fila < 0:
+                return -1
+            posicion, longitud = struct.unpack_from('<QI', mapa, registros + fila * formato.size)
+            if longitud == len(buscada) and mapa[arena + posicion:arena + posicion + longitud] == buscada:
+                return fila
+            i = (i + 1) & mascara
+    
+    def _prestamo(self, id_p: int, id_l: int, isbn_p: int, isbn_l: int, usuario_p: int,
+                  usuario_l: int, fecha: int, devolucion: int, dias: int) -> Prestamo:
+        """Construye un préstamo a partir de los campos de su registro."""
+        prestamo = Prestamo(self.texto(id_p, id_l), self.texto(isbn_p, isbn_l),
+                            self.texto(usuario_p, usuario_l), dias)
+        prestamo.epoch_prestamo = fecha
+        prestamo.fecha_devolucion = epoch_a_fecha(devolucion)
+        return prestamo
+    
+    def prestamo_devuelto(self, fila: int) -> Prestamo:
+        """Construye el préstamo devuelto de una fila."""
+        return self._prestamo(*_REG_PRESTAMO.unpack_from(
+            self._mapa, self.cabecera['prestamos'] + fila * _REG_PRESTAMO.size))
+    
+    def prestamos_activos(self) -> Iterator[Prestamo]:
+        """Itera los préstamos activos en el orden en que se registraron."""
+        inicio = self.cabecera['activos']
+        for registro in _REG_PRESTAMO.iter_unpack(
+                self._mapa[inicio:inicio + self.cabecera['n_activos'] * _REG_PRESTAMO.size]):
+            yield self._prestamo(*registro)
+    
+    def filas_historial(self, id_usuario: str) -> List[int]:
+        """
+        Retorna las filas de los préstamos devueltos de un usuario, por fecha de préstamo.
+        
+        Args:
+            id_usuario: ID del usuario
+        
+        Returns:
+            List[int]: Filas de la sección de préstamos; vacía si el usuario no
+                está en la instantánea
+        """
+        cabecera = self.cabecera
+        fila = self.buscar_fila(id_usuario, cabecera['usuarios'], cabecera['tabla_usuarios'],
+                                cabecera['tamano_tabla_usuarios'], _REG_USUARIO)
+        if fila < 0:
+            return []
+        inicio, cantidad = _REG_USUARIO.unpack_from(
+            self._mapa, cabecera['usuarios'] + fila * _REG_USUARIO.size)[7:9]
+        posicion = cabecera['historial'] + inicio * 4
+        filas = array('I', self._mapa[posicion:posicion + cantidad * 4])
+        if sys.byteorder != 'little':
+            filas.byteswap()
+        return filas.tolist()
+    
+    def cerrar(self) -> None:
+        """Libera el mapeo; las vistas obtenidas dejan de ser válidas."""
+        self._mapa.close()
+
+
+class LibroMapeado(Libro):
+    """
+    Vista de un libro almacenado en una instantánea binaria.
+    
+    Los campos se leen del mapeo al acceder a ellos; los cambios de
+    ejemplares disponibles se escriben en la copia en memoria del mapeo.
+    """
+    
+    __slots__ = ('_instantanea', '_fila')
+    
+    def __init__(self, instantanea: InstantaneaBinaria, fila: int):
+        """
+        Inicializa una vista sobre un registro de libro.
+        
+        Args:
+            instantanea: Instantánea que contiene el libro
+            fila: Posición del libro en la sección de libros
+        """
+        self._instantanea = instantanea
+        self._fila = fila
+    
+    def _registro(self) -> Tuple[int, ...]:
+        """Retorna los campos del registro de ancho fijo del libro."""
+        instantanea = self._instantanea
+        return _REG_LIBRO.unpack_from(
+            instantanea._mapa, instantanea.cabecera['libros'] + self._fila * _REG_LIBRO.size)
+    
+    @property
+    def isbn(self) -> str:
+        return self._instantanea.texto(*self._registro()[0:2])
+    
+    @property
+    def titulo(self) -> str:
+        return self._instantanea.texto(*self._registro()[2:4])
+    
+    @property
+    def autor(self) -> str:
+        return self._instantanea.texto(*self._registro()[4:6])
+    
+    @property
+    def titulo_busqueda(self) -> str:
+        return self._instantanea.texto(*self._registro()[6:8])
+    
+    @property
+    def autor_busqueda(self) -> str:
+        return self._instantanea.texto(*self._registro()[8:10])
+    
+    @property
+    def fecha_publicacion(self) -> Optional[datetime]:
+        return epoch_a_fecha(self._registro()[10])
+    
+    @property
+    def ejemplares(self) -> int:
+        return self._registro()[11]
+    
+    @property
+    def ejemplares_disponibles(self) -> int:
+        instantanea = self._instantanea
+        return _EJEMPLARES.unpack_from(
+            instantanea._mapa, instantanea.cabecera['ejemplares'] + self._fila * 4)[0]
+    
+    @ejemplares_disponibles.setter
+    def ejemplares_disponibles(self, valor: int) -> None:
+        instantanea = self._instantanea
+        instantanea.ejemplares_disponibles += valor - self.ejemplares_disponibles
+        _EJEMPLARES.pack_into(instantanea._mapa, instantanea.cabecera['ejemplares'] + self._fila * 4,
+                              valor)
+        instantanea._mapa[instantanea.cabecera['disponibles'] + self._fila] = 1 if valor else 0
+    
+    @property
+    def disponible(self) -> bool:
+        instantanea = self._instantanea
+        return bool(instantanea._mapa[instantanea.cabecera['disponibles'] + self._fila])
+
+
+class CatalogoMapeado(Mapping):
+    """
+    Catálogo respaldado por una instantánea binaria.
+    
+    Los libros de la instantánea se sirven como vistas ``LibroMapeado``; los
+    agregados después de abrirla se guardan en un ``CatalogoMemoria``.
+    """
+    
+    def __init__(self, instantanea: InstantaneaBinaria):
+        """
+        Inicializa el catálogo sobre una instantánea abierta.
+        
+        Args:
+            instantanea: Instantánea binaria
+        """
+        self._instantanea = instantanea
+        self._n = instantanea.cabecera['n_libros']
+        self._nuevos = CatalogoMemoria()
+    
+    def _buscar_fila(self, isbn: str) -> int:
+        cabecera = self._instantanea.cabecera
+        return self._instantanea.buscar_fila(
+            isbn, cabecera['libros'], cabecera['tabla_libros'],
+            cabecera['tamano_tabla_libros'], _REG_LIBRO)
+    
+    def __setitem__(self, isbn: str, libro: Libro) -> None:
+        """
+        Agrega un libro que no está en la instantánea.
+        
+        Raises:
+            ValueError: Si el ISBN ya existe en el catálogo
+        """
+        if isbn in self:
+            raise ValueError(f"El libro con ISBN {isbn} ya existe en el catálogo")
+        self._nuevos[isbn] = libro
+    
+    def __getitem__(self, isbn: str) -> Libro:
+        """Retorna el libro con el ISBN indicado."""
+        fila = self._buscar_fila(isbn)
+        if fila >= 0:
+            return LibroMapeado(self._instantanea, fila)
+        return self._nuevos[isbn]
+    
+    def __contains__(self, isbn: object) -> bool:
+        """Verifica si un ISBN está en el catálogo."""
+        return self._buscar_fila(isbn) >= 0 or isbn in self._nuevos
+    
+    def __iter__(self) -> Iterator[str]:
+        """Itera los ISBN: primero los de la instantánea y luego los nuevos."""
+        for libro in self.values():
+            yield libro.isbn
+    
+    def __len__(self) -> int:
+        """Retorna el número de libros del catálogo."""
+        return self._n + len(self._nuevos)
+    
+    def values(self) -> Iterator[Libro]:
+        """Itera todos los libros en orden de inserción."""
+        for fila in range(self._n):
+            yield LibroMapeado(self._instantanea, fila)
+        yield from self._nuevos.values()
+    
+    def disponibles(self) -> Iterator[Libro]:
+        """
+        Itera los libros con algún ejemplar disponible en orden de inserción.
+        
+        Recorre la columna de disponibilidad del mapeo con ``mmap.find``, de
+        modo que solo se materializan vistas de los libros disponibles.
+        
+        Returns:
+            Iterator[Libro]: Libros disponibles
+        """
+        mapa = self._instantanea._mapa
+        inicio = self._instantanea.cabecera['disponibles']
+        fin = inicio + self._n
+        posicion = mapa.find(b'\x01', inicio, fin)
+        while posicion != -1:
+            yield LibroMapeado(self._instantanea, posicion - inicio)
+            posicion = mapa.find(b'\x01', posicion + 1, fin)
+        yield from self._nuevos.disponibles()
+    
+    def contar_disponibles(self) -> int:
+        """Retorna el número de libros disponibles sin materializar vistas."""
+        inicio = self._instantanea.cabecera['disponibles']
+        mapeados = self._instantanea._mapa[inicio:inicio + self._n].count(1)
+        return mapeados + self._nuevos.contar_disponibles()
+    
+    def contar_ejemplares(self) -> Tuple[int, int]:
+        """Retorna el número total de ejemplares y el de disponibles, sin recorrer libros."""
+        total, disponibles = self._nuevos.contar_ejemplares()
+        return (total + self._instantanea.cabecera['total_ejemplares'],
+                disponibles + self._instantanea.ejemplares_disponibles)
+
+
+class UsuariosMapeados(Mapping):
+    """
+    Usuarios respaldados por una instantánea binaria.
+    
+    Cada ``Usuario`` se construye la primera vez que se accede a él y se
+    conserva, ya que su conjunto de préstamos cambia con el uso. Los usuarios
+    registrados después de abrir la instantánea se guardan en un diccionario.
+    """
+    
+    def __init__(self, instantanea: InstantaneaBinaria):
+        """
+        Inicializa los usuarios sobre una instantánea abierta.
+        
+        Args:
+            instantanea: Instantánea binaria
+        """
+        self._instantanea = instantanea
+        self._n = instantanea.cabecera['n_usuarios']
+        self._hidratados: Dict[int, Usuario] = {}
+        self._nuevos: Dict[str, Usuario] = {}
+    
+    def _buscar_fila(self, id_usuario: str) -> int:
+        cabecera = self._instantanea.cabecera
+        return self._instantanea.buscar_fila(
+            id_usuario, cabecera['usuarios'], cabecera['tabla_usuarios'],
+            cabecera['tamano_tabla_usuarios'], _REG_USUARIO)
+    
+    def _hidratar(self, fila: int) -> Usuario:
+        """Retorna el usuario de una fila, construyéndolo si es necesario."""
+        usuario = self._hidratados.get(fila)
+        if usuario is None:
+            instantanea = self._instantanea
+            id_p, id_l, nombre_p, nombre_l, email_p, email_l, limite = _REG_USUARIO.unpack_from(
+                instantanea._mapa, instantanea.cabecera['usuarios'] + fila * _REG_USUARIO.size)[:7]
+            email = instantanea.texto(email_p, email_l) if email_l != _SIN_EMAIL else None
+            usuario = Usuario(instantanea.texto(id_p, id_l), instantanea.texto(nombre_p, nombre_l),
+                              email, limite)
+            self._hidratados[fila] = usuario
+        return usuario
+    
+    def __setitem__(self, id_usuario: str, usuario: Usuario) -> None:
+        """
+        Registra un usuario que no está en la instantánea.
+        
+        Raises:
+            ValueError: Si el ID ya está registrado
+        """
+        if id_usuario in self:
+            raise ValueError(f"El usuario con ID {id_usuario} ya está registrado")
+        self._nuevos[id_usuario] = usuario
+    
+    def __getitem__(self, id_usuario: str) -> Usuario:
+        """Retorna el usuario con el ID indicado."""
+        fila = self._buscar_fila(id_usuario)
+        if fila >= 0:
+            return self._hidratar(fila)
+        return self._nuevos[id_usuario]
+    
+    def __contains__(self, id_usuario: object) -> bool:
+        """Verifica si un ID está registrado."""
+        return self._buscar_fila(id_usuario) >= 0 or id_usuario in self._nuevos
+    
+    def __iter__(self) -> Iterator[str]:
+        """Itera los IDs: primero los de la instantánea y luego los nuevos."""
+        for usuario in self.values():
+            yield usuario.id
+    
+    def __len__(self) -> int:
+        """Retorna el número de usuarios registrados."""
+        return self._n + len(self._nuevos)
+    
+    def values(self) -> Iterator[Usuario]:
+        """Itera todos los usuarios en orden de registro."""
+        for fila in range(self._n):
+            yield self._hidratar(fila)
+        yield from self._nuevos.values()
+
+
+class PrestamosMapeados(Mapping):
+    """
+    Préstamos respaldados por una instantánea binaria.
+    
+    Los préstamos devueltos de la instantánea se construyen la primera vez
+    que se accede a ellos y se conservan; los registrados después de abrirla
+    (incluidos los activos de la instantánea, que se restauran al abrir) se
+    guardan en un diccionario. Los devueltos que se retiran (por ejemplo, al
+    archivarlos) se marcan como retirados.
+    """
+    
+    def __init__(self, instantanea: InstantaneaBinaria):
+        """
+        Inicializa los préstamos sobre una instantánea abierta.
+        
+        Args:
+            instantanea: Instantánea binaria
+        """
+        self._instantanea = instantanea
+        self._n = instantanea.cabecera['n_prestamos']
+        self._hidratados: Dict[int, Prestamo] = {}
+        self._retirados: Set[int] = set()
+        self._nuevos: Dict[str, Prestamo] = {}
+    
+    def _buscar_fila(self, id_prestamo: str) -> int:
+        cabecera = self._instantanea.cabecera
+        fila = self._instantanea.buscar_fila(
+            id_prestamo, cabecera['prestamos'], cabecera['tabla_prestamos'],
+            cabecera['tamano_tabla_prestamos'], _REG_PRESTAMO)
+        return -1 if fila in self._retirados else fila
+    
+    def hidratar(self, fila: int) -> Prestamo:
+        """Retorna el préstamo devuelto de una fila, construyéndolo si es necesario."""
+        prestamo = self._hidratados.get(fila)
+        if prestamo is None:
+            prestamo = self._hidratados[fila] = self._instantanea.prestamo_devuelto(fila)
+        return prestamo
+    
+    def retirado(self, fila: int) -> bool:
+        """Indica si el préstamo de una fila se retiró después de abrir la instantánea."""
+        return fila in self._retirados
+    
+    def __setitem__(self, id_prestamo: str, prestamo: Prestamo) -> None:
+        """
+        Registra un préstamo que no está entre los devueltos de la instantánea.
+        
+        Raises:
+            ValueError: Si el ID ya está registrado
+        """
+        if self._buscar_fila(id_prestamo) >= 0:
+            raise ValueError(f"El préstamo {id_prestamo} ya está registrado")
+        self._nuevos[id_prestamo] = prestamo
+    
+    def __delitem__(self, id_prestamo: str) -> None:
+        """Retira un préstamo."""
+        fila = self._buscar_fila(id_prestamo)
+        if fila < 0:
+            del self._nuevos[id_prestamo]
+            return
+        self._retirados.add(fila)
+        self._hidratados.pop(fila, None)
+    
+    def __getitem__(self, id_prestamo: str) -> Prestamo:
+        """Retorna el préstamo con el ID indicado."""
+        fila = self._buscar_fila(id_prestamo)
+        if fila >= 0:
+            return self.hidratar(fila)
+        return self._nuevos[id_prestamo]
+    
+    def __contains__(self, id_prestamo: object) -> bool:
+        """Verifica si un ID está registrado."""
+        return self._buscar_fila(id_prestamo) >= 0 or id_prestamo in self._nuevos
+    
+    def __iter__(self) -> Iterator[str]:
+        """Itera los IDs: primero los devueltos de la instantánea y luego los demás."""
+        for prestamo in self.values():
+            yield prestamo.id
+    
+    def __len__(self) -> int:
+        """Retorna el número de préstamos registrados."""
+        return self._n - len(self._retirados) + len(self._nuevos)
+    
+    def values(self) -> Iterator[Prestamo]:
+        """Itera los préstamos: primero los devueltos de la instantánea y luego los demás."""
+        for fila in range(self._n):
+            if fila not in self._retirados:
+                yield self.hidratar(fila)
+        yield from self._nuevos.values()
+
+
+class HistorialesMapeados:
+    """
+    Historiales de préstamos por usuario respaldados por una instantánea binaria.
+    
+    Se comporta como el diccionario de historiales de ``Biblioteca``: la
+    primera vez que se pide el historial de un usuario se le agregan sus
+    préstamos devueltos de la instantánea, que se leen del mapeo en orden de
+    fecha.
+    """
+    
+    def __init__(self, instantanea: InstantaneaBinaria, prestamos: PrestamosMapeados):
+        """
+        Inicializa los historiales sobre una instantánea abierta.
+        
+        Args:
+            instantanea: Instantánea binaria
+            prestamos: Préstamos de la biblioteca, que construyen los devueltos
+        """
+        self._instantanea = instantanea
+        self._prestamos = prestamos
+        self._historiales: Dict[str, HistorialPrestamos] = {}
+        self._cargados: Set[str] = set()
+    
+    def _cargar(self, id_usuario: str) -> None:
+        """Agrega al historial de un usuario sus préstamos devueltos de la instantánea."""
+        if id_usuario in self._cargados:
+            return
+        self._cargados.add(id_usuario)
+        filas = [fila for fila in self._instantanea.filas_historial(id_usuario)
+                 if not self._prestamos.retirado(fila)]
+        if not filas:
+            return
+        historial = self._historiales.get(id_usuario)
+        if historial is None:
+            historial = self._historiales[id_usuario] = HistorialPrestamos()
+        for fila in filas:
+            historial.agregar(self._prestamos.hidratar(fila))
+    
+    def get(self, id_usuario: str,
+            defecto: Optional[HistorialPrestamos] = None) -> Optional[HistorialPrestamos]:
+        """Retorna el historial de un usuario, o ``defecto`` si no tiene préstamos."""
+        self._cargar(id_usuario)
+        return self._historiales.get(id_usuario, defecto)
+    
+    def __getitem__(self, id_usuario: str) -> HistorialPrestamos:
+        """Retorna el historial de un usuario."""
+        self._cargar(id_usuario)
+        return self._historiales[id_usuario]
+    
+    def __setitem__(self, id_usuario: str, historial: HistorialPrestamos) -> None:
+        """Asigna el historial de un usuario."""
+        self._cargar(id_usuario)
+        self._historiales[id_usuario] = historial
+    
+    def __delitem__(self, id_usuario: str) -> None:
+        """Elimina el historial de un usuario sin volver a cargarlo de la instantánea."""
+        self._cargados.add(id_usuario)
+        del self._historiales[id_usuario]
+    
+    def __contains__(self, id_usuario: object) -> bool:
+        """Verifica si un usuario tiene historial."""
+        return self.get(id_usuario) is not None
+
+
+def cargar_instantanea(ruta: str, nombre: str = "Biblioteca Central",
+                       **opciones: Any) -> Biblioteca:
+    """
+    Abre una biblioteca desde una instantánea binaria.
+    
+    Libros, usuarios y préstamos devueltos se leen del mapeo bajo demanda, y
+    el historial de cada usuario se completa la primera vez que se consulta.
+    Al abrir solo se restauran los préstamos activos, que mantienen los
+    índices de activos y vencimientos, de modo que el arranque no depende del
+    tamaño del historial.
+    
+    Args:
+        ruta: Ruta de la instantánea
+        nombre: Nombre de la biblioteca
+        **opciones: Parámetros adicionales para ``Biblioteca`` (por ejemplo,
+            ``depuracion``)
+    
+    Returns:
+        Biblioteca: Biblioteca lista para atender consultas
+    
+    Raises:
+        ValueError: Si el archivo no es una instantánea válida
+    """
+    instantanea = InstantaneaBinaria(ruta)
+    biblioteca = Biblioteca(nombre, catalogo=CatalogoMapeado(instantanea), **opciones)
+    biblioteca.usuarios = UsuariosMapeados(instantanea)
+    biblioteca.prestamos = PrestamosMapeados(instantanea)
+    biblioteca._historiales = HistorialesMapeados(instantanea, biblioteca.prestamos)
+    for prestamo in instantanea.prestamos_activos():
+        biblioteca.restaurar_prestamo(prestamo)
+    biblioteca.restaurar_contador_prestamos(instantanea.cabecera['contador_prestamos'])
+    return biblioteca
@@ -0,0 +1,513 @@
+"""
+Módulo que define la instrumentación opcional de métodos de ``Biblioteca``.
+"""
+import cProfile
+import inspect
+import pstats
+import threading
+import time
+import tracemalloc
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .archivo import _escribir_atomico
+
+
+# Límites superiores (en segundos) de las cubetas exportadas a Prometheus
+LIMITES_PROMETHEUS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Métodos que nunca se envuelven: la propia API de instrumentación
+_NO_INSTRUMENTABLES = frozenset({'instrumentar', 'desinstrumentar', 'metricas'})
+
+
+class HistogramaLatencias:
+    """
+    Histograma de valores enteros con cubetas logarítmicas, al estilo HDR.
+    
+    Los valores menores que ``2 * SUBCUBETAS`` tienen una cubeta cada uno; a
+    partir de ahí cada potencia de dos se divide en ``SUBCUBETAS`` cubetas
+    iguales, de modo que cualquier percentil se obtiene con un error relativo
+    menor que ``1 / SUBCUBETAS`` sea cual sea la magnitud del valor. Registrar
+    un valor es O(1) y el número de cubetas crece con el logaritmo del máximo.
+    
+    Attributes:
+        total (int): Número de valores registrados
+        suma (int): Suma de los valores registrados
+        minimo (int): Menor valor registrado (0 si no hay valores)
+        maximo (int): Mayor valor registrado (0 si no hay valores)
+    """
+    
+    BITS = 5
+    SUBCUBETAS = 1 << BITS
+    
+    def __init__(self):
+        """Inicializa un histograma vacío."""
+        self._cuentas: List[int] = []
+        self.total = 0
+        self.suma = 0
+        self.minimo = 0
+        self.maximo = 0
+    
+    @classmethod
+    def _indice(cls, valor: int) -> int:
+        """Retorna la cubeta de un valor no negativo."""
+        if valor < 2 * cls.SUBCUBETAS:
+            return valor
+        desplazamiento = valor.bit_length() - cls.BITS - 1
+        return desplazamiento * cls.SUBCUBETAS + (valor >> desplazamiento)
+    
+    @classmethod
+    def _limite_inferior(cls, indice: int) -> int:
+        """Retorna el menor valor que cae en una cubeta."""
+        if indice < 2 * cls.SUBCUBETAS:
+            return indice
+        desplazamiento = indice // cls.SUBCUBETAS - 1
+        return (indice - desplazamiento * cls.SUBCUBETAS) << desplazamiento
+    
+    def registrar(self, valor: int) -> None:
+        """
+        Registra un valor.
+        
+        Args:
+            valor: Valor entero no negativo (por ejemplo, nanosegundos)
+        """
+        indice = self._indice(valor)
+        cuentas = self._cuentas
+        if indice >= len(cuentas):
+            cuentas.extend([0] * (indice + 1 - len(cuentas)))
+        cuentas[indice] += 1
+        if not self.total or valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        self.total += 1
+        self.suma += valor
+    
+    def cubetas(self) -> Iterator[Tuple[int, int]]:
+        """
+        Itera las cubetas no vacías en orden creciente.
+        
+        Returns:
+            Iterator[Tuple[int, int]]: Pares (mayor valor de la cubeta, cuenta)
+        """
+        for indice, cuenta in enumerate(self._cuentas):
+            if cuenta:
+                yield self._limite_inferior(indice + 1) - 1, cuenta
+    
+    def percentil(self, porcentaje: float) -> int:
+        """
+        Calcula un percentil de los valores registrados.
+        
+        Args:
+            porcentaje: Percentil entre 0 y 100
+        
+        Returns:
+            int: Mayor valor de la cubeta que contiene el percentil, acotado
+                por el máximo registrado (0 si no hay valores)
+        
+        Raises:
+            ValueError: Si el porcentaje está fuera de [0, 100]
+        """
+        if not 0 <= porcentaje <= 100:
+            raise ValueError("El percentil debe estar entre 0 y 100")
+        objetivo = max(1, -(-self.total * porcentaje // 100))
+        acumulado = 0
+        for limite, cuenta in self.cubetas():
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+    
+    def media(self) -> float:
+        """Retorna la media de los valores registrados (0 si no hay valores)."""
+        return self.suma / self.total if self.total else 0.0
+    
+    def copia(self) -> 'HistogramaLatencias':
+        """Retorna una copia independiente del histograma."""
+        copia = HistogramaLatencias()
+        copia._cuentas = list(self._cuentas)
+        copia.total, copia.suma = self.total, self.suma
+        copia.minimo, copia.maximo = self.minimo, self.maximo
+        return copia
+
+
+class _MetricasMetodo:
+    """Contadores de un método instrumentado, protegidos por un cerrojo."""
+    
+    __slots__ = ('llamadas', 'errores', 'latencias', 'registros', 'max_registros', 'bloqueo')
+    
+    def __init__(self):
+        self.llamadas = 0
+        self.errores = 0
+        self.latencias = HistogramaLatencias()
+        self.registros = 0
+        self.max_registros = 0
+        self.bloqueo = threading.Lock()
+    
+    def registrar(self, nanosegundos: int, registros: int, error: bool) -> None:
+        with self.bloqueo:
+            self.llamadas += 1
+            if error:
+                self.errores += 1
+            self.latencias.registrar(nanosegundos)
+            self.registros += registros
+            if registros > self.max_registros:
+                self.max_registros = registros
+
+
+class _Perfil:
+    """Muestreo con cProfile (y opcionalmente tracemalloc) de un método."""
+    
+    def __init__(self, cada: int, memoria: bool):
+        self.cada = cada
+        self.memoria = memoria
+        self.llamadas = 0
+        self.muestras = 0
+        self.perfil = cProfile.Profile()
+        self.memoria_pico = 0
+        self.memoria_neta = 0
+    
+    def toca(self) -> bool:
+        """Indica si la llamada actual debe muestrearse."""
+        self.llamadas += 1
+        return self.llamadas % self.cada == 0
+    
+    def ejecutar(self, metodo: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        """Ejecuta una llamada bajo el perfilador."""
+        iniciado = False
+        if self.memoria:
+            iniciado = not tracemalloc.is_tracing()
+            if iniciado:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+            inicial = tracemalloc.get_traced_memory()[0]
+        self.perfil.enable()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            self.perfil.disable()
+            self.muestras += 1
+            if self.memoria:
+                actual, pico = tracemalloc.get_traced_memory()
+                self.memoria_pico = max(self.memoria_pico, pico - inicial)
+                self.memoria_neta += actual - inicial
+                if iniciado:
+                    tracemalloc.stop()
+
+
+def _escapar(valor: str) -> str:
+    """Escapa el valor de una etiqueta del formato de texto de Prometheus."""
+    return valor.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class ContadorRecorridos(threading.local):
+    """
+    Registros recorridos por las consultas de una biblioteca instrumentada.
+    
+    Cada hilo acumula su propio total, de modo que los incrementos de
+    consultas concurrentes no se pierden. La biblioteca solo lo crea al
+    instrumentarse; sin él, las consultas no cuentan nada.
+    
+    Attributes:
+        total (int): Registros recorridos por el hilo actual
+    """
+    
+    total = 0
+
+
+class Instrumentacion:
+    """
+    Contadores de llamadas, latencias y registros recorridos por método.
+    
+    Al crearse sustituye los métodos indicados de una biblioteca por
+    envolturas que miden cada llamada (atributos de la instancia que ocultan
+    los de la clase); ``desinstalar`` las retira. Una biblioteca sin
+    instrumentar no paga ningún coste, porque sus métodos no se envuelven.
+    
+    Los registros recorridos de una llamada son la diferencia del contador
+    ``_registros_recorridos`` de la biblioteca antes y después de ella. Los
+    recorridos propios de la biblioteca se cuentan por hilo; con llamadas
+    anidadas, o concurrentes que recorren los índices de búsqueda, el
+    recorrido de una llamada se atribuye también a las que estaban en curso.
+    
+    Attributes:
+        biblioteca (Biblioteca): Biblioteca instrumentada
+        metodos (Tuple[str, ...]): Métodos instrumentados
+    """
+    
+    def __init__(self, biblioteca: Any, metodos: Optional[Iterable[str]] = None):
+        """
+        Instrumenta los métodos de una biblioteca.
+        
+        Args:
+            biblioteca: Biblioteca a instrumentar
+            metodos: Nombres de los métodos a medir; por defecto, todos los
+                métodos públicos
+        
+        Raises:
+            ValueError: Si algún nombre no es un método público de la biblioteca
+        """
+        publicos = self.metodos_publicos(biblioteca)
+        if metodos is None:
+            metodos = publicos
+        else:
+            metodos = tuple(metodos)
+            for nombre in metodos:
+                if nombre not in publicos:
+                    raise ValueError(f"La biblioteca no tiene un método público {nombre}")
+        
+        self.biblioteca = biblioteca
+        self.metodos = tuple(metodos)
+        self._metricas = {nombre: _MetricasMetodo() for nombre in self.metodos}
+        self._perfiles: Dict[str, _Perfil] = {}
+        # cProfile y tracemalloc no admiten varias mediciones anidadas a la vez
+        self._perfilando = threading.Lock()
+        for nombre in self.metodos:
+            setattr(biblioteca, nombre, self._envolver(nombre, getattr(biblioteca, nombre)))
+    
+    @staticmethod
+    def metodos_publicos(biblioteca: Any) -> Tuple[str, ...]:
+        """
+        Retorna los métodos públicos instrumentables de una biblioteca.
+        
+        Args:
+            biblioteca: Biblioteca a inspeccionar
+        
+        Returns:
+            Tuple[str, ...]: Nombres de los métodos, en orden alfabético
+        """
+        return tuple(
+            nombre for nombre, valor in inspect.getmembers(type(biblioteca), inspect.isfunction)
+            if not nombre.startswith('_') and nombre not in _NO_INSTRUMENTABLES
+        )
+    
+    def _envolver(self, nombre: str, metodo: Callable[..., Any]) -> Callable[..., Any]:
+        """Crea la envoltura que mide las llamadas a un método."""
+        metricas = self._metricas[nombre]
+        perfiles = self._perfiles
+        recorridos = self.biblioteca._registros_recorridos
+        reloj = time.perf_counter_ns
+        
+        @wraps(metodo)
+        def envoltura(*args, **kwargs):
+            error = False
+            antes = recorridos()
+            inicio = reloj()
+            try:
+                perfil = perfiles.get(nombre)
+                if perfil is not None and perfil.toca() and self._perfilando.acquire(blocking=False):
+                    try:
+                        return perfil.ejecutar(metodo, args, kwargs)
+                    finally:
+                        self._perfilando.release()
+                return metodo(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                metricas.registrar(reloj() - inicio, recorridos() - antes, error)
+        
+        return envoltura
+    
+    def desinstalar(self) -> None:
+        """Retira las envolturas y deja los métodos de la biblioteca como estaban."""
+        for nombre in self.metodos:
+            self.biblioteca.__dict__.pop(nombre, None)
+        self._perfiles.clear()
+    
+    # ==================== PERFILADO ====================
+    
+    def perfilar(self, metodo: str, cada: int = 1, memoria: bool = False) -> None:
+        """
+        Activa el muestreo con cProfile de un método instrumentado.
+        
+        Las llamadas muestreadas se ejecutan bajo ``cProfile`` y, si ``memoria``
+        es True, bajo ``tracemalloc``; su latencia incluye el coste del
+        perfilador. Solo se perfila una llamada a la vez: las que coinciden con
+        otra ya perfilada se ejecutan sin perfilar.
+        
+        Args:
+            metodo: Nombre del método
+            cada: Se perfila una de cada ``cada`` llamadas
+            memoria: Si es True, mide también la memoria asignada
+        
+        Raises:
+            ValueError: Si el método no está instrumentado o ``cada`` es menor que 1
+        """
+        if metodo not in self._metricas:
+            raise ValueError(f"El método {metodo} no está instrumentado")
+        if cada < 1:
+            raise ValueError("La frecuencia de muestreo debe ser al menos 1")
+        self._perfiles[metodo] = _Perfil(cada, memoria)
+    
+    def dejar_de_perfilar(self, metodo: str) -> None:
+        """Desactiva el muestreo de un método, descartando su perfil."""
+        self._perfiles.pop(metodo, None)
+    
+    def perfil(self, metodo: str) -> pstats.Stats:
+        """
+        Retorna el perfil acumulado de las llamadas muestreadas de un método.
+        
+        Args:
+            metodo: Nombre del método
+        
+        Returns:
+            pstats.Stats: Estadísticas de cProfile, listas para ``print_stats``
+        
+        Raises:
+            ValueError: Si el método no se está perfilando o aún no tiene muestras
+        """
+        perfil = self._perfiles.get(metodo)
+        if perfil is None:
+            raise ValueError(f"El método {metodo} no se está perfilando")
+        if not perfil.muestras:
+            raise ValueError(f"El método {metodo} aún no tiene muestras de perfil")
+        return pstats.Stats(perfil.perfil)
+    
+    # ==================== MÉTRICAS ====================
+    
+    def _copiar(self) -> List[Tuple[str, int, int, HistogramaLatencias, int, int]]:
+        """Copia de forma consistente los contadores de cada método."""
+        copias = []
+        for nombre, metricas in self._metricas.items():
+            with metricas.bloqueo:
+                copias.append((nombre, metricas.llamadas, metricas.errores,
+                               metricas.latencias.copia(), metricas.registros,
+                               metricas.max_registros))
+        return copias
+    
+    def metricas(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna una instantánea de las métricas de cada método instrumentado.
+        
+        Returns:
+            Dict[str, Dict[str, Any]]: Por método, ``llamadas``, ``errores``,
+                ``latencia`` (mínimo, media, p50, p90, p99, p999 y máximo en
+                segundos), ``registros_recorridos`` (total, media y máximo) y,
+                si se perfila, ``perfil`` (muestras y memoria en bytes)
+        """
+        resultado = {}
+        for nombre, llamadas, errores, latencias, registros, max_registros in self._copiar():
+            entrada = {
+                'llamadas': llamadas,
+                'errores': errores,
+                'latencia': {
+                    'minimo': latencias.minimo / 1e9,
+                    'media': latencias.media() / 1e9,
+                    'p50': latencias.percentil(50) / 1e9,
+                    'p90': latencias.percentil(90) / 1e9,
+                    'p99': latencias.percentil(99) / 1e9,
+                    'p999': latencias.percentil(99.9) / 1e9,
+                    'maximo': latencias.maximo / 1e9,
+                },
+                'registros_recorridos': {
+                    'total': registros,
+                    'media': registros / llamadas if llamadas else 0.0,
+                    'maximo': max_registros,
+                },
+            }
+            perfil = self._perfiles.get(nombre)
+            if perfil is not None:
+                entrada['perfil'] = {
+                    'muestras': perfil.muestras,
+                    'memoria_pico_bytes': perfil.memoria_pico,
+                    'memoria_neta_bytes': perfil.memoria_neta,
+                }
+            resultado[nombre] = entrada
+        return resultado
+    
+    # ==================== EXPORTACIÓN ====================
+    
+    def exportar_prometheus(self) -> str:
+        """
+        Genera las métricas en el formato de texto de Prometheus.
+        
+        Solo se incluyen los métodos que ya recibieron alguna llamada. Las
+        latencias se exportan como histograma con las cubetas de
+        ``LIMITES_PROMETHEUS``.
+        
+        Returns:
+            str: Texto de exposición (versión 0.0.4)
+        """
+        copias = [copia for copia in self._copiar() if copia[1]]
+        biblioteca = _escapar(self.biblioteca.nombre)
+        lineas = []
+        
+        def contador(metrica: str, ayuda: str, posicion: int) -> None:
+            lineas.append(f"# HELP {metrica} {ayuda}")
+            lineas.append(f"# TYPE {metrica} counter")
+            for copia in copias:
+                etiquetas = f'biblioteca="{biblioteca}",metodo="{_escapar(copia[0])}"'
+                lineas.append(f"{metrica}{{{etiquetas}}} {copia[posicion]}")
+        
+        contador('biblioteca_llamadas_total', "Llamadas a cada método de la biblioteca.", 1)
+        contador('biblioteca_errores_total', "Llamadas que terminaron con una excepción.", 2)
+        contador('biblioteca_registros_recorridos_total',
+                 "Registros recorridos por las llamadas a cada método.", 4)
+        
+        lineas.append("# HELP biblioteca_latencia_segundos Latencia de cada método de la biblioteca.")
+        lineas.append("# TYPE biblioteca_latencia_segundos histogram")
+        for nombre, llamadas, _, latencias, _, _ in copias:
+            etiquetas = f'biblioteca="{biblioteca}",metodo="{_escapar(nombre)}"'
+            cubetas = list(latencias.cubetas())
+            acumulado = i = 0
+            for limite in LIMITES_PROMETHEUS:
+                while i < len(cubetas) and cubetas[i][0] <= limite * 1e9:
+                    acumulado += cubetas[i][1]
+                    i += 1
+                lineas.append(f'biblioteca_latencia_segundos_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f'biblioteca_latencia_segundos_bucket{{{etiquetas},le="+Inf"}} {llamadas}')
+            lineas.append(f"biblioteca_latencia_segundos_sum{{{etiquetas}}} {latencias.suma / 1e9}")
+            lineas.append(f"biblioteca_latencia_segundos_count{{{etiquetas}}} {llamadas}")
+        return "\n".join(lineas) + "\n"
+    
+    def escribir_prometheus(self, ruta: str) -> None:
+        """
+        Escribe las métricas de forma atómica en un archivo de texto.
+        
+        Pensado para el colector de archivos de texto de ``node_exporter``: el
+        archivo se reemplaza completo, nunca se lee a medio escribir.
+        
+        Args:
+            ruta: Ruta del archivo (por convención, con extensión ``.prom``)
+        """
+        _escribir_atomico(ruta, self.exportar_prometheus().encode('utf-8'))
+    
+    def servir_prometheus(self, host: str = '127.0.0.1', puerto: int = 0) -> ThreadingHTTPServer:
+        """
+        Expone las métricas por HTTP en ``/metrics`` desde un hilo en segundo plano.
+        
+        Args:
+            host: Dirección en la que escuchar
+            puerto: Puerto en el que escuchar (0 elige uno libre)
+        
+        Returns:
+            ThreadingHTTPServer: Servidor en marcha; ``server_address`` indica el
+                puerto y ``shutdown`` lo detiene
+        """
+        instrumentacion = self
+        
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                cuerpo = instrumentacion.exportar_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+            
+            def log_message(self, formato, *args):
+                pass
+        
+        servidor = ThreadingHTTPServer((host, puerto), Manejador)
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        return servidor
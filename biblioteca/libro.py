@@ -4,6 +4,8 @@ Módulo que define la clase Libro para el sistema de biblioteca.
 from datetime import datetime
 from typing import Optional
 
+from .indice_texto import normalizar
+
 
 class Libro:
     """
@@ -13,12 +15,19 @@ class Libro:
         isbn (str): Código ISBN único del libro
         titulo (str): Título del libro
         autor (str): Autor del libro
-        disponible (bool): Estado de disponibilidad
+        ejemplares (int): Número total de ejemplares del título
+        ejemplares_disponibles (int): Ejemplares que no están prestados
         fecha_publicacion (Optional[datetime]): Fecha de publicación
+        titulo_busqueda (str): Título sin mayúsculas ni acentos, calculado al
+            crear el libro, con el que se comparan las búsquedas
+        autor_busqueda (str): Autor sin mayúsculas ni acentos
     """
     
+    __slots__ = ('isbn', 'titulo', 'autor', 'ejemplares', 'ejemplares_disponibles',
+                 'fecha_publicacion', 'titulo_busqueda', 'autor_busqueda')
+    
     def __init__(self, isbn: str, titulo: str, autor: str, 
-                 fecha_publicacion: Optional[datetime] = None):
+                 fecha_publicacion: Optional[datetime] = None, ejemplares: int = 1):
         """
         Inicializa un nuevo libro.
         
@@ -27,9 +36,10 @@ class Libro:
             titulo: Título del libro
             autor: Autor del libro
             fecha_publicacion: Fecha de publicación (opcional)
+            ejemplares: Número de ejemplares del título
             
         Raises:
-            ValueError: Si ISBN, título o autor están vacíos
+            ValueError: Si ISBN, título o autor están vacíos, o no hay ejemplares
         """
         if not isbn or not isbn.strip():
             raise ValueError("El ISBN no puede estar vacío")
@@ -37,40 +47,52 @@ class Libro:
             raise ValueError("El título no puede estar vacío")
         if not autor or not autor.strip():
             raise ValueError("El autor no puede estar vacío")
+        if ejemplares < 1:
+            raise ValueError("El número de ejemplares debe ser al menos 1")
             
         self.isbn = isbn.strip()
         self.titulo = titulo.strip()
         self.autor = autor.strip()
-        self.disponible = True
+        self.ejemplares = ejemplares
+        self.ejemplares_disponibles = ejemplares
         self.fecha_publicacion = fecha_publicacion
+        self.titulo_busqueda = normalizar(self.titulo)
+        self.autor_busqueda = normalizar(self.autor)
+    
+    @property
+    def disponible(self) -> bool:
+        """Indica si queda al menos un ejemplar sin prestar."""
+        return self.ejemplares_disponibles > 0
     
     def prestar(self) -> bool:
         """
-        Marca el libro como prestado.
+        Presta un ejemplar del libro.
         
         Returns:
-            bool: True si se pudo prestar, False si ya estaba prestado
+            bool: True si se pudo prestar, False si no quedaban ejemplares
         """
-        if not self.disponible:
+        if self.ejemplares_disponibles == 0:
             return False
-        self.disponible = False
+        self.ejemplares_disponibles -= 1
         return True
     
     def devolver(self) -> bool:
         """
-        Marca el libro como devuelto.
+        Registra la devolución de un ejemplar del libro.
         
         Returns:
-            bool: True si se pudo devolver, False si ya estaba disponible
+            bool: True si se pudo devolver, False si no había ejemplares prestados
         """
-        if self.disponible:
+        if self.ejemplares_disponibles == self.ejemplares:
             return False
-        self.disponible = True
+        self.ejemplares_disponibles += 1
         return True
     
     def __str__(self) -> str:
         """Representación en string del libro."""
         estado = "Disponible" if self.disponible else "Prestado"
+        if self.ejemplares > 1:
+            estado += f" ({self.ejemplares_disponibles}/{self.ejemplares} ejemplares)"
         return f"{self.titulo} por {self.autor} (ISBN: {self.isbn}) - {estado}"
     
     def __repr__(self) -> str:
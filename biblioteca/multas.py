@@ -0,0 +1,333 @@
+"""
+Módulo que define el cálculo de atrasos y multas de préstamos, por préstamo
+o vectorizado con NumPy sobre historiales completos.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: solo lo necesita el motor vectorizado
+    np = None
+
+from .prestamo import Prestamo
+from .reloj import MICROSEGUNDOS_POR_DIA, referencia_a_epoch
+
+
+# (primer día de atraso del tramo, céntimos por día): días 1-7, 8-30 y 31 en adelante
+TRAMOS_POR_DEFECTO: Tuple[Tuple[int, int], ...] = ((1, 25), (8, 50), (31, 100))
+
+# Fecha de devolución de los préstamos activos en las columnas exportadas
+_SIN_DEVOLUCION = -2 ** 63
+
+
+def _requerir_numpy() -> None:
+    """Lanza ImportError si NumPy, necesario para el motor vectorizado, no está instalado."""
+    if np is None:
+        raise ImportError("El cálculo vectorizado de multas requiere NumPy (pip install numpy)")
+
+
+class TarifaMultas:
+    """
+    Tarifa de multas por tramos de días de atraso.
+    
+    Cada tramo cobra su tarifa por cada día de atraso comprendido entre su
+    primer día y el anterior al siguiente tramo; el último tramo no tiene fin.
+    Los importes son enteros en céntimos, de modo que el cálculo por préstamo
+    y el vectorizado coinciden exactamente.
+    
+    Attributes:
+        tramos (Tuple[Tuple[int, int], ...]): Pares (primer día, céntimos por día)
+        tope (Optional[int]): Multa máxima por préstamo en céntimos
+    """
+    
+    def __init__(self, tramos: Sequence[Tuple[int, int]] = TRAMOS_POR_DEFECTO,
+                 tope: Optional[int] = None):
+        """
+        Inicializa la tarifa.
+        
+        Args:
+            tramos: Pares (primer día de atraso, céntimos por día), en orden
+                creciente de día y empezando en el día 1
+            tope: Multa máxima por préstamo en céntimos (opcional)
+        
+        Raises:
+            ValueError: Si los tramos no empiezan en el día 1, no son
+                crecientes o tienen tarifas negativas, o si el tope es negativo
+        """
+        tramos = tuple((int(dia), int(tarifa)) for dia, tarifa in tramos)
+        if not tramos or tramos[0][0] != 1:
+            raise ValueError("El primer tramo de multas debe empezar en el día 1")
+        if any(siguiente[0] <= actual[0] for actual, siguiente in zip(tramos, tramos[1:])):
+            raise ValueError("Los tramos de multas deben estar en orden creciente de día")
+        if any(tarifa < 0 for _, tarifa in tramos):
+            raise ValueError("Las tarifas de multa no pueden ser negativas")
+        if tope is not None and tope < 0:
+            raise ValueError("El tope de multa no puede ser negativo")
+        self.tramos = tramos
+        self.tope = tope
+    
+    def _limites(self) -> List[Tuple[int, Optional[int], int]]:
+        """Retorna (días previos al tramo, longitud o None, tarifa) de cada tramo."""
+        limites = []
+        for i, (dia, tarifa) in enumerate(self.tramos):
+            longitud = self.tramos[i + 1][0] - dia if i + 1 < len(self.tramos) else None
+            limites.append((dia - 1, longitud, tarifa))
+        return limites
+    
+    def multa(self, dias_atraso: int) -> int:
+        """
+        Calcula la multa de un préstamo.
+        
+        Args:
+            dias_atraso: Días de atraso (0 o más)
+        
+        Returns:
+            int: Multa en céntimos
+        """
+        total = 0
+        for previos, longitud, tarifa in self._limites():
+            dias = dias_atraso - previos
+            if dias <= 0:
+                break
+            if longitud is not None and dias > longitud:
+                dias = longitud
+            total += dias * tarifa
+        if self.tope is not None and total > self.tope:
+            total = self.tope
+        return total
+    
+    def multas(self, atrasos: 'np.ndarray') -> 'np.ndarray':
+        """
+        Calcula las multas de un array de días de atraso.
+        
+        Args:
+            atrasos: Días de atraso (enteros no negativos)
+        
+        Returns:
+            np.ndarray: Multas en céntimos (int64)
+        """
+        _requerir_numpy()
+        total = np.zeros(len(atrasos), dtype=np.int64)
+        for previos, longitud, tarifa in self._limites():
+            dias = np.subtract(atrasos, previos, dtype=np.int64)
+            np.clip(dias, 0, longitud, out=dias)
+            dias *= tarifa
+            total += dias
+        if self.tope is not None:
+            np.minimum(total, self.tope, out=total)
+        return total
+
+
+def evaluar_prestamo(prestamo: Prestamo, referencia: Union[datetime, int, None] = None,
+                     tarifa: Optional[TarifaMultas] = None) -> Tuple[int, bool, int]:
+    """
+    Calcula el atraso y la multa de un único préstamo.
+    
+    Los préstamos devueltos se evalúan en su fecha de devolución, de modo que
+    una devolución tardía conserva su multa; solo los activos pueden estar vencidos.
+    
+    Args:
+        prestamo: Préstamo a evaluar
+        referencia: Instante de evaluación de los préstamos activos (ver
+            ``Prestamo.dias_transcurridos``)
+        tarifa: Tarifa a aplicar; por defecto, ``TarifaMultas()``
+    
+    Returns:
+        Tuple[int, bool, int]: Días de atraso, si está vencido y multa en céntimos
+    """
+    tarifa = tarifa if tarifa is not None else TarifaMultas()
+    atraso = prestamo.dias_transcurridos(referencia) - prestamo.dias_prestamo
+    if atraso <= 0:
+        return 0, False, 0
+    return atraso, prestamo.esta_activo(), tarifa.multa(atraso)
+
+
+class ColumnasPrestamos:
+    """
+    Fechas y duraciones de préstamos exportadas a arrays de NumPy.
+    
+    Attributes:
+        ids (List[str]): ID de cada préstamo, en el orden de los arrays
+        inicio (np.ndarray): Fecha de préstamo en microsegundos (int64)
+        devolucion (np.ndarray): Fecha de devolución en microsegundos (int64),
+            con un centinela para los préstamos activos
+        dias (np.ndarray): Días permitidos de cada préstamo (int64)
+    """
+    
+    def __init__(self, ids: List[str], inicio: 'np.ndarray', devolucion: 'np.ndarray',
+                 dias: 'np.ndarray'):
+        """
+        Inicializa las columnas.
+        
+        Raises:
+            ValueError: Si las columnas no tienen la misma longitud
+        """
+        _requerir_numpy()
+        if not len(ids) == len(inicio) == len(devolucion) == len(dias):
+            raise ValueError("Las columnas de préstamos deben tener la misma longitud")
+        self.ids = ids
+        self.inicio = inicio
+        self.devolucion = devolucion
+        self.dias = dias
+    
+    @classmethod
+    def desde_prestamos(cls, prestamos: Iterable[Prestamo]) -> 'ColumnasPrestamos':
+        """
+        Exporta préstamos a columnas en una sola pasada.
+        
+        Args:
+            prestamos: Préstamos a exportar
+        
+        Returns:
+            ColumnasPrestamos: Columnas en el orden de ``prestamos``
+        """
+        _requerir_numpy()
+        prestamos = list(prestamos)
+        n = len(prestamos)
+        return cls(
+            [p.id for p in prestamos],
+            np.fromiter((p.epoch_prestamo for p in prestamos), dtype=np.int64, count=n),
+            np.fromiter((_SIN_DEVOLUCION if p.epoch_devolucion is None else p.epoch_devolucion
+                         for p in prestamos), dtype=np.int64, count=n),
+            np.fromiter((p.dias_prestamo for p in prestamos), dtype=np.int64, count=n),
+        )
+    
+    @classmethod
+    def desde_filas(cls, filas: Sequence[Tuple[str, int, Optional[int], int]]) -> 'ColumnasPrestamos':
+        """
+        Construye las columnas a partir de filas ya leídas (por ejemplo, de SQL).
+        
+        Args:
+            filas: Tuplas (id, fecha de préstamo, fecha de devolución o None,
+                días de préstamo), con las fechas en microsegundos
+        
+        Returns:
+            ColumnasPrestamos: Columnas en el orden de ``filas``
+        """
+        _requerir_numpy()
+        n = len(filas)
+        return cls(
+            [fila[0] for fila in filas],
+            np.fromiter((fila[1] for fila in filas), dtype=np.int64, count=n),
+            np.fromiter((_SIN_DEVOLUCION if fila[2] is None else fila[2] for fila in filas),
+                        dtype=np.int64, count=n),
+            np.fromiter((fila[3] for fila in filas), dtype=np.int64, count=n),
+        )
+    
+    def __len__(self) -> int:
+        """Retorna el número de préstamos exportados."""
+        return len(self.ids)
+
+
+class ResultadoMultas:
+    """
+    Atrasos y multas de un conjunto de préstamos, alineados con sus IDs.
+    
+    Attributes:
+        ids (List[str]): ID de cada préstamo
+        dias_transcurridos (np.ndarray): Días completos desde el préstamo
+        dias_atraso (np.ndarray): Días de atraso (0 si no hay atraso)
+        vencidos (np.ndarray): Si cada préstamo está activo y vencido
+        multas (np.ndarray): Multa de cada préstamo en céntimos
+    """
+    
+    def __init__(self, ids: List[str], dias_transcurridos: 'np.ndarray',
+                 dias_atraso: 'np.ndarray', vencidos: 'np.ndarray', multas: 'np.ndarray'):
+        self.ids = ids
+        self.dias_transcurridos = dias_transcurridos
+        self.dias_atraso = dias_atraso
+        self.vencidos = vencidos
+        self.multas = multas
+        self._posiciones: Optional[Dict[str, int]] = None
+    
+    def __len__(self) -> int:
+        """Retorna el número de préstamos evaluados."""
+        return len(self.ids)
+    
+    def __getitem__(self, id_prestamo: str) -> Tuple[int, bool, int]:
+        """
+        Retorna el resultado de un préstamo.
+        
+        Args:
+            id_prestamo: ID del préstamo
+        
+        Returns:
+            Tuple[int, bool, int]: Días de atraso, si está vencido y multa en
+                céntimos, como ``evaluar_prestamo``
+        
+        Raises:
+            KeyError: Si el préstamo no está en el resultado
+        """
+        if self._posiciones is None:
+            self._posiciones = {id: i for i, id in enumerate(self.ids)}
+        i = self._posiciones[id_prestamo]
+        return int(self.dias_atraso[i]), bool(self.vencidos[i]), int(self.multas[i])
+    
+    def por_id(self) -> Dict[str, int]:
+        """Retorna la multa en céntimos de cada préstamo con multa, por ID."""
+        posiciones = np.flatnonzero(self.multas)
+        return dict(zip((self.ids[i] for i in posiciones.tolist()),
+                        self.multas[posiciones].tolist()))
+    
+    def ids_vencidos(self) -> List[str]:
+        """Retorna los IDs de los préstamos activos vencidos."""
+        return [self.ids[i] for i in np.flatnonzero(self.vencidos).tolist()]
+    
+    def total(self) -> int:
+        """Retorna la suma de las multas en céntimos."""
+        return int(self.multas.sum())
+
+
+class MotorMultas:
+    """
+    Calcula atrasos, vencimientos y multas por tramos para muchos préstamos
+    a la vez con operaciones vectorizadas de NumPy.
+    
+    Sigue las reglas de ``evaluar_prestamo``: los activos se evalúan en un
+    único instante de referencia y los devueltos, en su fecha de devolución.
+    
+    Attributes:
+        tarifa (TarifaMultas): Tarifa a aplicar
+    """
+    
+    def __init__(self, tarifa: Optional[TarifaMultas] = None):
+        """
+        Inicializa el motor.
+        
+        Args:
+            tarifa: Tarifa a aplicar; por defecto, ``TarifaMultas()``
+        
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        _requerir_numpy()
+        self.tarifa = tarifa if tarifa is not None else TarifaMultas()
+    
+    def evaluar(self, prestamos: Union[ColumnasPrestamos, Iterable[Prestamo]],
+                referencia: Union[datetime, int, None] = None) -> ResultadoMultas:
+        """
+        Evalúa un conjunto de préstamos.
+        
+        Args:
+            prestamos: Columnas ya exportadas (para evaluarlas varias veces)
+                o préstamos, que se exportan primero
+            referencia: Instante de evaluación de los préstamos activos (fecha
+                o microsegundos); por defecto, el instante actual
+        
+        Returns:
+            ResultadoMultas: Resultados alineados con los IDs de los préstamos
+        """
+        if not isinstance(prestamos, ColumnasPrestamos):
+            prestamos = ColumnasPrestamos.desde_prestamos(prestamos)
+        ahora = referencia_a_epoch(referencia)
+        
+        activos = prestamos.devolucion == _SIN_DEVOLUCION
+        fin = np.where(activos, ahora, prestamos.devolucion)
+        fin -= prestamos.inicio
+        transcurridos = np.floor_divide(fin, MICROSEGUNDOS_POR_DIA, out=fin)
+        atrasos = np.subtract(transcurridos, prestamos.dias)
+        np.maximum(atrasos, 0, out=atrasos)
+        vencidos = activos & (atrasos > 0)
+        return ResultadoMultas(prestamos.ids, transcurridos, atrasos, vencidos,
+                               self.tarifa.multas(atrasos))
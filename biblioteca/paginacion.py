@@ -0,0 +1,116 @@
+"""
+Módulo que define las claves de orden y utilidades de la paginación por clave.
+
+Las consultas ``iter_*`` de ``Biblioteca`` retornan sus resultados en un orden
+total y estable, definido por una clave calculada a partir de cada elemento;
+el parámetro ``despues`` indica el último elemento de la página anterior y la
+consulta continúa por el siguiente en ese orden, aunque entretanto se hayan
+agregado o retirado elementos.
+"""
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .prestamo import Prestamo
+from .vencimientos import IndiceVencimientos
+
+
+def clave_prestamo(prestamo: Prestamo) -> Tuple[int, str]:
+    """Retorna la clave de orden de un préstamo: fecha de préstamo e ID."""
+    return prestamo.epoch_prestamo, prestamo.id
+
+
+def clave_vencimiento(prestamo: Prestamo) -> Tuple[int, str]:
+    """Retorna la clave de orden de un préstamo vencido: instante de vencimiento e ID."""
+    return IndiceVencimientos.vencimiento_epoch(prestamo), prestamo.id
+
+
+def validar_limite(limite: Optional[int]) -> None:
+    """
+    Valida el límite de una consulta paginada.
+    
+    Raises:
+        ValueError: Si el límite es negativo
+    """
+    if limite is not None and limite < 0:
+        raise ValueError("El límite no puede ser negativo")
+
+
+class PrestamosOrdenados:
+    """
+    Préstamos activos ordenados por una clave (valor de orden, ID) para las
+    consultas paginadas.
+    
+    Las entradas se guardan en una lista ordenada: los préstamos nuevos suelen
+    ir al final, de modo que agregar es casi siempre un ``append``. Como en
+    ``IndiceVencimientos``, los préstamos devueltos no se retiran en el
+    momento: se saltan al recorrer y la lista se reconstruye cuando la mitad
+    de sus entradas son de préstamos devueltos.
+    
+    ``iterar`` es perezoso y vuelve a localizar su posición con búsqueda
+    binaria en cada paso, por lo que tolera altas y devoluciones durante el
+    recorrido y no copia la lista.
+    
+    Attributes:
+        _entradas (List[Tuple]): Entradas (valor de orden, ID, préstamo) ordenadas
+        _inactivos (int): Entradas de préstamos devueltos aún en la lista
+    """
+    
+    def __init__(self, clave: Callable[[Prestamo], Tuple[int, str]]):
+        """
+        Inicializa un índice vacío.
+        
+        Args:
+            clave: Función que retorna la clave de orden de un préstamo
+        """
+        self.clave = clave
+        self._entradas: List[Tuple[int, str, Prestamo]] = []
+        self._inactivos = 0
+    
+    def agregar(self, prestamo: Prestamo) -> None:
+        """
+        Agrega un préstamo activo.
+        
+        Args:
+            prestamo: Préstamo a indexar
+        """
+        entrada = self.clave(prestamo) + (prestamo,)
+        entradas = self._entradas
+        if not entradas or entrada[:2] > entradas[-1][:2]:
+            entradas.append(entrada)
+        else:
+            entradas.insert(bisect_left(entradas, entrada[:2]), entrada)
+    
+    def marcar_devuelto(self) -> None:
+        """Registra que uno de los préstamos indexados fue devuelto."""
+        self._inactivos += 1
+        if self._inactivos * 2 > len(self._entradas):
+            self._entradas = [e for e in self._entradas if e[2].esta_activo()]
+            self._inactivos = 0
+    
+    def iterar(self, despues: Optional[Tuple[int, str]] = None,
+               hasta: Optional[int] = None) -> Iterator[Prestamo]:
+        """
+        Itera los préstamos activos en orden de clave.
+        
+        Args:
+            despues: Clave a partir de la cual (exclusiva) se retornan préstamos
+            hasta: Valor de orden máximo (inclusivo) de los préstamos retornados
+        
+        Returns:
+            Iterator[Prestamo]: Préstamos activos con clave posterior a ``despues``
+        """
+        while True:
+            entradas = self._entradas
+            i = bisect_right(entradas, despues) if despues is not None else 0
+            while i < len(entradas) and (
+                    (despues is not None and entradas[i][:2] <= despues)
+                    or not entradas[i][2].esta_activo()):
+                i += 1
+            if i == len(entradas) or (hasta is not None and entradas[i][0] > hasta):
+                return
+            despues = entradas[i][:2]
+            yield entradas[i][2]
+    
+    def __len__(self) -> int:
+        """Retorna el número de entradas, incluidas las de préstamos devueltos."""
+        return len(self._entradas)
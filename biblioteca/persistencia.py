@@ -0,0 +1,345 @@
+"""
+Módulo que define la persistencia de una Biblioteca mediante diario de
+operaciones (write-ahead log) e instantáneas periódicas.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, List, Optional
+
+from .biblioteca import Biblioteca
+from .libro import Libro
+from .prestamo import Prestamo
+from .usuario import Usuario
+
+
+def _fecha_a_texto(fecha: Optional[datetime]) -> Optional[str]:
+    return fecha.isoformat() if fecha is not None else None
+
+
+def _texto_a_fecha(texto: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(texto) if texto is not None else None
+
+
+class Persistencia:
+    """
+    Almacenamiento durable del estado de una Biblioteca en un directorio.
+    
+    Cada operación que modifica el estado se agrega como una línea JSON
+    compacta a ``diario.log`` antes de aplicarse a la biblioteca. Las escrituras se confirman en disco por grupos
+    (``fsync`` cada ``lote_fsync`` registros o cada ``intervalo_fsync``
+    segundos, lo que ocurra primero). Un hilo en segundo plano confirma los
+    registros pendientes ``intervalo_fsync`` segundos después del primero,
+    aunque no lleguen más operaciones. Cada ``instantanea_cada`` registros se
+    escribe ``instantanea.json`` con el estado completo y se trunca el diario;
+    la instantánea se toma al llegar el registro siguiente, cuando la
+    biblioteca ya aplicó todos los anteriores.
+    
+    Al abrir, se carga la instantánea y se reproducen las operaciones del
+    diario posteriores a ella. Los registros llevan un número de secuencia, de
+    modo que una caída entre la instantánea y el truncado no duplica
+    operaciones, y una última línea incompleta se descarta.
+    
+    Attributes:
+        directorio (str): Directorio donde se guardan diario e instantánea
+        lote_fsync (int): Registros máximos pendientes de confirmar en disco
+        intervalo_fsync (float): Segundos máximos que un registro queda sin
+            confirmar en disco
+        instantanea_cada (int): Registros del diario que disparan una instantánea
+    """
+    
+    ARCHIVO_DIARIO = 'diario.log'
+    ARCHIVO_INSTANTANEA = 'instantanea.json'
+    VERSION = 1
+    
+    def __init__(self, directorio: str, lote_fsync: int = 64,
+                 intervalo_fsync: float = 0.01, instantanea_cada: int = 100_000):
+        """
+        Inicializa la persistencia sobre un directorio.
+        
+        Args:
+            directorio: Directorio de datos (se crea si no existe)
+            lote_fsync: Registros máximos pendientes de confirmar en disco
+            intervalo_fsync: Segundos máximos que un registro queda sin confirmar
+            instantanea_cada: Registros del diario que disparan una instantánea
+        
+        Raises:
+            ValueError: Si algún parámetro es inválido
+        """
+        if lote_fsync < 1:
+            raise ValueError("El lote de fsync debe ser al menos 1")
+        if intervalo_fsync <= 0:
+            raise ValueError("El intervalo de fsync debe ser positivo")
+        if instantanea_cada < 1:
+            raise ValueError("La frecuencia de instantáneas debe ser al menos 1")
+        
+        self.directorio = directorio
+        self.lote_fsync = lote_fsync
+        self.intervalo_fsync = intervalo_fsync
+        self.instantanea_cada = instantanea_cada
+        self._ruta_diario = os.path.join(directorio, self.ARCHIVO_DIARIO)
+        self._ruta_instantanea = os.path.join(directorio, self.ARCHIVO_INSTANTANEA)
+        self._biblioteca: Optional[Biblioteca] = None
+        self._archivo = None
+        self._secuencia = 0
+        self._pendientes = 0
+        self._ultima_sincronizacion = time.monotonic()
+        self._registros_diario = 0
+        self._bloqueo = threading.RLock()
+        self._hay_pendientes = threading.Event()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+    
+    # ==================== APERTURA Y RECUPERACIÓN ====================
+    
+    def abrir(self, nombre: str = "Biblioteca Central", **opciones: Any) -> Biblioteca:
+        """
+        Recupera la biblioteca del directorio y empieza a registrar sus operaciones.
+        
+        Args:
+            nombre: Nombre de la biblioteca
+            **opciones: Argumentos adicionales para ``Biblioteca``
+        
+        Returns:
+            Biblioteca: Biblioteca con el estado recuperado
+        
+        Raises:
+            ValueError: Si la persistencia ya está abierta
+        """
+        if self._biblioteca is not None:
+            raise ValueError("La persistencia ya está abierta")
+        
+        os.makedirs(self.directorio, exist_ok=True)
+        biblioteca = Biblioteca(nombre, **opciones)
+        self._secuencia = self._cargar_instantanea(biblioteca)
+        self._reproducir_diario(biblioteca)
+        biblioteca.retirar_ya_archivados()
+        
+        self._archivo = open(self._ruta_diario, 'a', encoding='utf-8')
+        self._ultima_sincronizacion = time.monotonic()
+        biblioteca.diario = self
+        self._biblioteca = biblioteca
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._sincronizar_en_segundo_plano,
+                                      name="persistencia-fsync", daemon=True)
+        self._hilo.start()
+        return biblioteca
+    
+    def _cargar_instantanea(self, biblioteca: Biblioteca) -> int:
+        """
+        Carga la instantánea, si existe, en una biblioteca vacía.
+        
+        Returns:
+            int: Número de secuencia del último registro incluido en la instantánea
+        """
+        if not os.path.exists(self._ruta_instantanea):
+            return 0
+        with open(self._ruta_instantanea, encoding='utf-8') as archivo:
+            datos = json.load(archivo)
+        if datos.get('version') != self.VERSION:
+            raise ValueError(f"Versión de instantánea no soportada: {datos.get('version')}")
+        
+        biblioteca.importar_libros(
+            self._libro_desde_registro(*registro) for registro in datos['libros']
+        )
+        biblioteca.importar_usuarios(
+            (Usuario(id, nombre, email, limite) for id, nombre, email, limite in datos['usuarios'])
+        )
+        for registro in datos['prestamos']:
+            biblioteca.restaurar_prestamo(self._prestamo_desde_registro(*registro))
+        biblioteca.restaurar_contador_prestamos(datos['contador_prestamos'])
+        return datos['secuencia']
+    
+    @staticmethod
+    def _libro_desde_registro(isbn: str, titulo: str, autor: str, fecha: Optional[str],
+                              ejemplares: int = 1) -> Libro:
+        return Libro(isbn, titulo, autor, _texto_a_fecha(fecha), ejemplares)
+    
+    @staticmethod
+    def _prestamo_desde_registro(id: str, isbn: str, id_usuario: str, dias: int,
+                                 fecha_prestamo: str, fecha_devolucion: Optional[str] = None) -> Prestamo:
+        prestamo = Prestamo(id, isbn, id_usuario, dias)
+        prestamo.fecha_prestamo = _texto_a_fecha(fecha_prestamo)
+        prestamo.fecha_devolucion = _texto_a_fecha(fecha_devolucion)
+        return prestamo
+    
+    def _reproducir_diario(self, biblioteca: Biblioteca) -> None:
+        """
+        Aplica los registros del diario posteriores a la instantánea.
+        
+        Una última línea incompleta (escritura interrumpida) se descarta y el
+        diario se trunca tras el último registro válido.
+        """
+        if not os.path.exists(self._ruta_diario):
+            return
+        valido_hasta = 0
+        with open(self._ruta_diario, 'rb') as archivo:
+            for linea in archivo:
+                if not linea.endswith(b'\n'):
+                    break
+                try:
+                    secuencia, tipo, *campos = json.loads(linea)
+                except ValueError:
+                    break
+                valido_hasta += len(linea)
+                self._registros_diario += 1
+                if secuencia <= self._secuencia:
+                    continue
+                self._aplicar(biblioteca, tipo, campos)
+                self._secuencia = secuencia
+        if valido_hasta < os.path.getsize(self._ruta_diario):
+            with open(self._ruta_diario, 'r+b') as archivo:
+                archivo.truncate(valido_hasta)
+    
+    def _aplicar(self, biblioteca: Biblioteca, tipo: str, campos: List[Any]) -> None:
+        """Aplica un registro del diario a la biblioteca."""
+        if tipo == 'L':
+            biblioteca.agregar_libro(self._libro_desde_registro(*campos))
+        elif tipo == 'U':
+            biblioteca.registrar_usuario(Usuario(*campos))
+        elif tipo == 'P':
+            biblioteca.restaurar_prestamo(self._prestamo_desde_registro(*campos))
+        elif tipo == 'D':
+            isbn, id_usuario, fecha = campos
+            biblioteca.restaurar_devolucion(isbn, id_usuario, _texto_a_fecha(fecha))
+        else:
+            raise ValueError(f"Tipo de registro desconocido en el diario: {tipo}")
+    
+    # ==================== REGISTRO DE OPERACIONES ====================
+    
+    def libro_agregado(self, libro: Libro) -> None:
+        """Registra que se agregó un libro al catálogo."""
+        self._escribir(['L', libro.isbn, libro.titulo, libro.autor,
+                        _fecha_a_texto(libro.fecha_publicacion), libro.ejemplares])
+    
+    def usuario_registrado(self, usuario: Usuario) -> None:
+        """Registra que se registró un usuario."""
+        self._escribir(['U', usuario.id, usuario.nombre, usuario.email, usuario.limite_prestamos])
+    
+    def prestamo_realizado(self, prestamo: Prestamo) -> None:
+        """Registra que se realizó un préstamo."""
+        self._escribir(['P', prestamo.id, prestamo.isbn_libro, prestamo.id_usuario,
+                        prestamo.dias_prestamo, _fecha_a_texto(prestamo.fecha_prestamo)])
+    
+    def libro_devuelto(self, prestamo: Prestamo, fecha: datetime) -> None:
+        """Registra que se devuelve, en ``fecha``, el libro de un préstamo."""
+        self._escribir(['D', prestamo.isbn_libro, prestamo.id_usuario, _fecha_a_texto(fecha)])
+    
+    def _escribir(self, registro: List[Any]) -> None:
+        """
+        Agrega un registro al diario y confirma en disco según la política de grupo.
+        
+        Si el diario alcanzó ``instantanea_cada`` registros, antes se escribe la
+        instantánea: todas las operaciones registradas ya se aplicaron.
+        """
+        with self._bloqueo:
+            if self._registros_diario >= self.instantanea_cada:
+                self.instantanea()
+            self._secuencia += 1
+            self._archivo.write(json.dumps([self._secuencia] + registro, ensure_ascii=False,
+                                           separators=(',', ':')) + '\n')
+            self._pendientes += 1
+            self._registros_diario += 1
+            if (self._pendientes >= self.lote_fsync or
+                    time.monotonic() - self._ultima_sincronizacion >= self.intervalo_fsync):
+                self.sincronizar()
+            elif self._pendientes == 1:
+                self._hay_pendientes.set()
+    
+    def sincronizar(self) -> None:
+        """Confirma en disco los registros pendientes del diario."""
+        with self._bloqueo:
+            if self._archivo is None:
+                return
+            self._archivo.flush()
+            os.fsync(self._archivo.fileno())
+            self._pendientes = 0
+            self._ultima_sincronizacion = time.monotonic()
+    
+    def _sincronizar_en_segundo_plano(self) -> None:
+        """Confirma los registros pendientes ``intervalo_fsync`` segundos después del primero."""
+        while True:
+            self._hay_pendientes.wait()
+            if self._detener.wait(self.intervalo_fsync):
+                return
+            with self._bloqueo:
+                self._hay_pendientes.clear()
+                if self._pendientes:
+                    self.sincronizar()
+    
+    # ==================== INSTANTÁNEAS ====================
+    
+    def instantanea(self) -> None:
+        """
+        Escribe una instantánea del estado completo y trunca el diario.
+        
+        La instantánea se escribe en un archivo temporal que luego reemplaza al
+        anterior de forma atómica. El diario solo se trunca después de confirmar
+        en disco el reemplazo, de modo que una caída no pierde ambos.
+        
+        Raises:
+            ValueError: Si la persistencia no está abierta
+        """
+        with self._bloqueo:
+            biblioteca = self._biblioteca
+            if biblioteca is None:
+                raise ValueError("La persistencia no está abierta")
+            self.sincronizar()
+            
+            datos = {
+                'version': self.VERSION,
+                'secuencia': self._secuencia,
+                'contador_prestamos': biblioteca.contador_prestamos,
+                'libros': [
+                    [l.isbn, l.titulo, l.autor, _fecha_a_texto(l.fecha_publicacion), l.ejemplares]
+                    for l in biblioteca.catalogo.values()
+                ],
+                'usuarios': [
+                    [u.id, u.nombre, u.email, u.limite_prestamos]
+                    for u in biblioteca.usuarios.values()
+                ],
+                'prestamos': [
+                    [p.id, p.isbn_libro, p.id_usuario, p.dias_prestamo,
+                     _fecha_a_texto(p.fecha_prestamo), _fecha_a_texto(p.fecha_devolucion)]
+                    for p in biblioteca.prestamos.values()
+                ],
+            }
+            temporal = self._ruta_instantanea + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo, ensure_ascii=False, separators=(',', ':'))
+                archivo.flush()
+                os.fsync(archivo.fileno())
+            os.replace(temporal, self._ruta_instantanea)
+            self._sincronizar_directorio()
+            
+            self._archivo.close()
+            self._archivo = open(self._ruta_diario, 'w', encoding='utf-8')
+            self._registros_diario = 0
+    
+    def _sincronizar_directorio(self) -> None:
+        """Confirma en disco las entradas del directorio, como el reemplazo de la instantánea."""
+        if os.name != 'posix':
+            return
+        descriptor = os.open(self.directorio, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+    
+    def cerrar(self) -> None:
+        """Confirma los registros pendientes y deja de registrar operaciones."""
+        if self._hilo is not None:
+            self._detener.set()
+            self._hay_pendientes.set()
+            self._hilo.join()
+            self._hilo = None
+            self._hay_pendientes.clear()
+        if self._archivo is not None:
+            self.sincronizar()
+            self._archivo.close()
+            self._archivo = None
+        if self._biblioteca is not None:
+            self._biblioteca.diario = None
+            self._biblioteca = None
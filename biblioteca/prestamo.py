@@ -1,25 +1,37 @@
 """
 Módulo que define la clase Prestamo para el sistema de biblioteca.
 """
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Union
+
+from .reloj import MICROSEGUNDOS_POR_DIA, epoch_a_fecha, fecha_a_epoch, referencia_a_epoch
 
 
 class Prestamo:
     """
     Representa un préstamo de libro en la biblioteca.
     
+    Las fechas se almacenan como enteros (microsegundos desde 1970-01-01), de
+    modo que el cálculo de días no crea objetos ``datetime`` ni ``timedelta``;
+    ``fecha_prestamo`` y ``fecha_devolucion`` las exponen como ``datetime``.
+    Los cálculos de días aceptan un instante de referencia para evaluar
+    muchos préstamos con una sola lectura del reloj.
+    
     Attributes:
         id (str): Identificador único del préstamo
         isbn_libro (str): ISBN del libro prestado
         id_usuario (str): ID del usuario que realiza el préstamo
-        fecha_prestamo (datetime): Fecha en que se realizó el préstamo
-        fecha_devolucion (Optional[datetime]): Fecha de devolución del libro
+        epoch_prestamo (int): Fecha del préstamo en microsegundos desde la época
+        epoch_devolucion (Optional[int]): Fecha de devolución en microsegundos
+            desde la época, o None si el préstamo está activo
         dias_prestamo (int): Días permitidos para el préstamo
     """
     
+    __slots__ = ('id', 'isbn_libro', 'id_usuario', 'epoch_prestamo',
+                 'epoch_devolucion', 'dias_prestamo')
+    
     def __init__(self, id: str, isbn_libro: str, id_usuario: str, 
-                 dias_prestamo: int = 14):
+                 dias_prestamo: int = 14, fecha_prestamo: Optional[datetime] = None):
         """
         Inicializa un nuevo préstamo.
         
@@ -28,6 +40,7 @@ class Prestamo:
             isbn_libro: ISBN del libro
             id_usuario: ID del usuario
             dias_prestamo: Días permitidos para el préstamo
+            fecha_prestamo: Fecha del préstamo; por defecto, el instante actual
             
         Raises:
             ValueError: Si algún parámetro es inválido
@@ -44,10 +57,31 @@ class Prestamo:
         self.id = id.strip()
         self.isbn_libro = isbn_libro.strip()
         self.id_usuario = id_usuario.strip()
-        self.fecha_prestamo = datetime.now()
-        self.fecha_devolucion: Optional[datetime] = None
+        self.epoch_prestamo = fecha_a_epoch(fecha_prestamo if fecha_prestamo is not None
+                                            else datetime.now())
+        self.epoch_devolucion: Optional[int] = None
         self.dias_prestamo = dias_prestamo
     
+    @property
+    def fecha_prestamo(self) -> datetime:
+        """Fecha en que se realizó el préstamo."""
+        return epoch_a_fecha(self.epoch_prestamo)
+    
+    @fecha_prestamo.setter
+    def fecha_prestamo(self, fecha: datetime) -> None:
+        self.epoch_prestamo = fecha_a_epoch(fecha)
+    
+    @property
+    def fecha_devolucion(self) -> Optional[datetime]:
+        """Fecha de devolución del libro, o None si el préstamo está activo."""
+        if self.epoch_devolucion is None:
+            return None
+        return epoch_a_fecha(self.epoch_devolucion)
+    
+    @fecha_devolucion.setter
+    def fecha_devolucion(self, fecha: Optional[datetime]) -> None:
+        self.epoch_devolucion = fecha_a_epoch(fecha) if fecha is not None else None
+    
     def esta_activo(self) -> bool:
         """
         Verifica si el préstamo está activo.
@@ -55,12 +89,15 @@ class Prestamo:
         Returns:
             bool: True si el préstamo no ha sido devuelto
         """
-        return self.fecha_devolucion is None
+        return self.epoch_devolucion is None
     
-    def devolver(self) -> bool:
+    def devolver(self, fecha: Optional[datetime] = None) -> bool:
         """
         Registra la devolución del libro.
         
+        Args:
+            fecha: Fecha de devolución; por defecto, el instante actual
+        
         Returns:
             bool: True si se devolvió exitosamente
             
@@ -70,41 +107,53 @@ class Prestamo:
         if not self.esta_activo():
             raise ValueError("Este préstamo ya fue devuelto")
             
-        self.fecha_devolucion = datetime.now()
+        self.epoch_devolucion = fecha_a_epoch(fecha if fecha is not None else datetime.now())
         return True
     
-    def dias_transcurridos(self) -> int:
+    def dias_transcurridos(self, referencia: Union[datetime, int, None] = None) -> int:
         """
         Calcula los días transcurridos desde el préstamo.
         
+        Args:
+            referencia: Instante de evaluación para un préstamo activo (fecha o
+                microsegundos desde la época); por defecto, el instante actual.
+                Los préstamos devueltos se evalúan en su fecha de devolución
+        
         Returns:
-            int: Número de días transcurridos
+            int: Número de días completos transcurridos
         """
-        fecha_referencia = self.fecha_devolucion if self.fecha_devolucion else datetime.now()
-        delta = fecha_referencia - self.fecha_prestamo
-        return delta.days
+        fin = self.epoch_devolucion
+        if fin is None:
+            fin = referencia_a_epoch(referencia)
+        return (fin - self.epoch_prestamo) // MICROSEGUNDOS_POR_DIA
     
-    def esta_vencido(self) -> bool:
+    def esta_vencido(self, referencia: Union[datetime, int, None] = None) -> bool:
         """
         Verifica si el préstamo está vencido.
         
+        Args:
+            referencia: Instante de evaluación (ver ``dias_transcurridos``)
+        
         Returns:
             bool: True si el préstamo superó los días permitidos
         """
         if not self.esta_activo():
             return False
-        return self.dias_transcurridos() > self.dias_prestamo
+        return self.dias_transcurridos(referencia) > self.dias_prestamo
     
-    def dias_restantes(self) -> int:
+    def dias_restantes(self, referencia: Union[datetime, int, None] = None) -> int:
         """
         Calcula los días restantes del préstamo.
         
+        Args:
+            referencia: Instante de evaluación (ver ``dias_transcurridos``)
+        
         Returns:
             int: Días restantes (negativo si está vencido)
         """
         if not self.esta_activo():
             return 0
-        return self.dias_prestamo - self.dias_transcurridos()
+        return self.dias_prestamo - self.dias_transcurridos(referencia)
     
     def __str__(self) -> str:
         """Representación en string del préstamo."""
@@ -0,0 +1,164 @@
+"""
+Módulo que define el reloj inyectable y la conversión de fechas a enteros.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Union
+
+
+MICROSEGUNDOS_POR_DIA = 86400 * 10 ** 6
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSEGUNDO = timedelta(microseconds=1)
+_SIN_FECHA = -2 ** 63
+
+
+def fecha_a_epoch(fecha: Optional[datetime]) -> int:
+    """
+    Convierte una fecha sin zona horaria a microsegundos desde 1970-01-01.
+    
+    Args:
+        fecha: Fecha a convertir (opcional)
+    
+    Returns:
+        int: Microsegundos desde la época, o un centinela si no hay fecha
+    """
+    if fecha is None:
+        return _SIN_FECHA
+    return (fecha - _EPOCH) // _MICROSEGUNDO
+
+
+def epoch_a_fecha(valor: int) -> Optional[datetime]:
+    """
+    Convierte microsegundos desde 1970-01-01 a fecha.
+    
+    Args:
+        valor: Microsegundos desde la época, o el centinela de fecha ausente
+    
+    Returns:
+        Optional[datetime]: Fecha correspondiente
+    """
+    if valor == _SIN_FECHA:
+        return None
+    return _EPOCH + timedelta(microseconds=valor)
+
+
+def referencia_a_epoch(referencia: Union[datetime, int, None]) -> int:
+    """
+    Normaliza un instante de referencia a microsegundos desde la época.
+    
+    Args:
+        referencia: Fecha, microsegundos ya convertidos, o None para el
+            instante actual del sistema
+    
+    Returns:
+        int: Microsegundos desde la época
+    """
+    if referencia is None:
+        return fecha_a_epoch(datetime.now())
+    if isinstance(referencia, int):
+        return referencia
+    return fecha_a_epoch(referencia)
+
+
+class Reloj:
+    """
+    Fuente del instante actual para una biblioteca.
+    
+    Por defecto lee el reloj del sistema. ``congelado`` fija un único instante
+    mientras dura un bloque (en el hilo que lo abre), de modo que todas las
+    consultas de un informe se evalúan con la misma referencia; con una fecha
+    explícita, el informe se evalúa "a fecha de" ese instante.
+    """
+    
+    def __init__(self):
+        """Inicializa un reloj sin instantes congelados."""
+        self._local = threading.local()
+    
+    def _leer(self) -> datetime:
+        """Lee el instante actual de la fuente del reloj."""
+        return datetime.now()
+    
+    def ahora(self) -> datetime:
+        """
+        Retorna el instante actual, o el congelado si hay un bloque ``congelado`` abierto.
+        
+        Returns:
+            datetime: Instante de referencia
+        """
+        congelado = getattr(self._local, 'instante', None)
+        return congelado if congelado is not None else self._leer()
+    
+    def ahora_epoch(self) -> int:
+        """Retorna ``ahora()`` en microsegundos desde la época."""
+        return fecha_a_epoch(self.ahora())
+    
+    @contextmanager
+    def congelado(self, fecha: Optional[datetime] = None) -> Iterator[datetime]:
+        """
+        Fija el instante que retorna ``ahora`` durante un bloque ``with``.
+        
+        Los bloques anidados sin fecha conservan el instante del exterior.
+        
+        Args:
+            fecha: Instante a fijar; por defecto, el instante actual
+        
+        Yields:
+            datetime: Instante fijado
+        """
+        anterior = getattr(self._local, 'instante', None)
+        if fecha is None:
+            fecha = anterior if anterior is not None else self._leer()
+        self._local.instante = fecha
+        try:
+            yield fecha
+        finally:
+            self._local.instante = anterior
+
+
+class RelojSimulado(Reloj):
+    """
+    Reloj que solo avanza cuando se le indica, para simular semanas o meses
+    de actividad en pruebas y benchmarks.
+    """
+    
+    def __init__(self, inicio: Optional[datetime] = None):
+        """
+        Inicializa el reloj simulado.
+        
+        Args:
+            inicio: Instante inicial; por defecto, el instante actual del sistema
+        """
+        super().__init__()
+        self._instante = inicio if inicio is not None else datetime.now()
+    
+    def _leer(self) -> datetime:
+        return self._instante
+    
+    def avanzar(self, **duracion: float) -> datetime:
+        """
+        Adelanta el reloj.
+        
+        Args:
+            **duracion: Argumentos de ``timedelta`` (``days``, ``hours``...)
+        
+        Returns:
+            datetime: Nuevo instante del reloj
+        
+        Raises:
+            ValueError: Si la duración es negativa
+        """
+        delta = timedelta(**duracion)
+        if delta < timedelta(0):
+            raise ValueError("El reloj simulado no puede retroceder")
+        self._instante += delta
+        return self._instante
+    
+    def fijar(self, fecha: datetime) -> None:
+        """Coloca el reloj en un instante dado."""
+        self._instante = fecha
+
+
+# Reloj compartido por las bibliotecas que no reciben uno propio
+RELOJ_SISTEMA = Reloj()
@@ -1,7 +1,13 @@
 """
 Módulo que define la clase Usuario para el sistema de biblioteca.
 """
-from typing import List, Optional
+from typing import Optional, Set, cast
+
+
+# Conjunto vacío compartido por los usuarios sin préstamos activos. Es
+# inmutable, pero nunca se modifica: agregar_prestamo lo reemplaza por un
+# conjunto propio antes de agregar el primer ISBN
+_SIN_PRESTAMOS = cast(Set[str], frozenset())
 
 
 class Usuario:
@@ -12,10 +18,13 @@ class Usuario:
         id (str): Identificador único del usuario
         nombre (str): Nombre completo del usuario
         email (Optional[str]): Email del usuario
-        libros_prestados (List[str]): Lista de ISBNs de libros prestados
+        libros_prestados (Set[str]): Conjunto de ISBNs de libros prestados;
+            los usuarios sin préstamos comparten un conjunto vacío inmutable
         limite_prestamos (int): Número máximo de préstamos simultáneos
     """
     
+    __slots__ = ('id', 'nombre', 'email', 'libros_prestados', 'limite_prestamos')
+    
     def __init__(self, id: str, nombre: str, email: Optional[str] = None, 
                  limite_prestamos: int = 3):
         """
@@ -40,7 +49,7 @@ class Usuario:
         self.id = id.strip()
         self.nombre = nombre.strip()
         self.email = email.strip() if email else None
-        self.libros_prestados: List[str] = []
+        self.libros_prestados: Set[str] = _SIN_PRESTAMOS
         self.limite_prestamos = limite_prestamos
     
     def puede_prestar(self) -> bool:
@@ -70,7 +79,11 @@ class Usuario:
         if isbn in self.libros_prestados:
             raise ValueError("El usuario ya tiene este libro prestado")
             
-        self.libros_prestados.append(isbn)
+        if not self.libros_prestados:
+            # Conjunto vacío compartido (o una copia suya tras deserializar)
+            self.libros_prestados = {isbn}
+        else:
+            self.libros_prestados.add(isbn)
         return True
     
     def remover_prestamo(self, isbn: str) -> bool:
@@ -90,6 +103,8 @@ class Usuario:
             raise ValueError("El usuario no tiene este libro prestado")
             
         self.libros_prestados.remove(isbn)
+        if not self.libros_prestados:
+            self.libros_prestados = _SIN_PRESTAMOS
         return True
     
     def numero_prestamos(self) -> int:
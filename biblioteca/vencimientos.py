@@ -0,0 +1,115 @@
+"""
+Módulo que define el índice de vencimientos de préstamos.
+"""
+import heapq
+from datetime import datetime
+from itertools import count
+from typing import List, Tuple
+
+from .prestamo import Prestamo
+from .reloj import MICROSEGUNDOS_POR_DIA, epoch_a_fecha, fecha_a_epoch
+
+
+class IndiceVencimientos:
+    """
+    Montículo mínimo de préstamos ordenado por el instante en que vencen.
+    
+    Un préstamo vence cuando han transcurrido más de ``dias_prestamo`` días
+    completos desde ``fecha_prestamo`` (ver ``Prestamo.esta_vencido``). Los
+    préstamos devueltos no se extraen del montículo en el momento: se descartan
+    al consultar y el montículo se compacta cuando la mitad de sus entradas
+    corresponden a préstamos ya devueltos.
+    
+    Attributes:
+        _monticulo (List[Tuple[int, int, Prestamo]]): Entradas (instante de
+            vencimiento en microsegundos desde la época, secuencia, préstamo)
+        _inactivos (int): Entradas de préstamos devueltos aún en el montículo
+        recorridos (int): Entradas examinadas por todas las consultas
+    """
+    
+    def __init__(self):
+        """Inicializa un índice vacío."""
+        self._monticulo: List[Tuple[int, int, Prestamo]] = []
+        self._secuencia = count()
+        self._inactivos = 0
+        self.recorridos = 0
+    
+    @staticmethod
+    def instante_vencimiento(prestamo: Prestamo) -> datetime:
+        """
+        Calcula el instante a partir del cual un préstamo está vencido.
+        
+        Args:
+            prestamo: Préstamo a evaluar
+        
+        Returns:
+            datetime: Primer instante en que ``esta_vencido`` sería True
+        """
+        return epoch_a_fecha(IndiceVencimientos.vencimiento_epoch(prestamo))
+    
+    @staticmethod
+    def vencimiento_epoch(prestamo: Prestamo) -> int:
+        """Retorna ``instante_vencimiento`` en microsegundos desde la época."""
+        return prestamo.epoch_prestamo + (prestamo.dias_prestamo + 1) * MICROSEGUNDOS_POR_DIA
+    
+    def agregar(self, prestamo: Prestamo) -> None:
+        """
+        Agrega un préstamo activo al índice.
+        
+        Args:
+            prestamo: Préstamo a indexar
+        """
+        entrada = (self.vencimiento_epoch(prestamo), next(self._secuencia), prestamo)
+        heapq.heappush(self._monticulo, entrada)
+    
+    def marcar_devuelto(self) -> None:
+        """Registra que uno de los préstamos indexados fue devuelto."""
+        self._inactivos += 1
+        if self._inactivos * 2 > len(self._monticulo):
+            self._compactar()
+    
+    def _compactar(self) -> None:
+        """Elimina del montículo las entradas de préstamos devueltos."""
+        self._monticulo = [e for e in self._monticulo if e[2].esta_activo()]
+        heapq.heapify(self._monticulo)
+        self._inactivos = 0
+    
+    def hasta(self, fecha: datetime) -> List[Prestamo]:
+        """
+        Retorna los préstamos activos que estarán vencidos en una fecha.
+        
+        Solo recorre las entradas cuyo instante de vencimiento es anterior o
+        igual a ``fecha``.
+        
+        Args:
+            fecha: Fecha de referencia
+        
+        Returns:
+            List[Prestamo]: Préstamos vencidos, ordenados por vencimiento
+        """
+        limite = fecha_a_epoch(fecha)
+        monticulo = self._monticulo
+        while monticulo and not monticulo[0][2].esta_activo():
+            heapq.heappop(monticulo)
+            self._inactivos = max(0, self._inactivos - 1)
+        
+        vencidas = []
+        pendientes = [0]
+        expandidas = 0
+        while pendientes:
+            i = pendientes.pop()
+            if i >= len(monticulo) or monticulo[i][0] > limite:
+                continue
+            expandidas += 1
+            if monticulo[i][2].esta_activo():
+                vencidas.append(monticulo[i])
+            pendientes.append(2 * i + 1)
+            pendientes.append(2 * i + 2)
+        self.recorridos += expandidas
+        
+        vencidas.sort()
+        return [prestamo for _, _, prestamo in vencidas]
+    
+    def __len__(self) -> int:
+        """Retorna el número de entradas en el montículo, incluidas las inactivas."""
+        return len(self._monticulo)
@@ -0,0 +1,164 @@
+"""
+Tests del archivo en disco de préstamos devueltos
+"""
+import os
+import pytest
+from datetime import datetime, timedelta
+from biblioteca.archivo import ArchivoPrestamos
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.libro import Libro
+from biblioteca.persistencia import Persistencia
+from biblioteca.prestamo import Prestamo
+from biblioteca.usuario import Usuario
+
+
+HACE_UN_ANIO = datetime.now() - timedelta(days=400)
+
+
+def restaurar(biblioteca, id, isbn, id_usuario, dia, dias_hasta_devolucion=None):
+    """Restaura un préstamo realizado HACE_UN_ANIO + dia días, devuelto o no"""
+    prestamo = Prestamo(id, isbn, id_usuario)
+    prestamo.fecha_prestamo = HACE_UN_ANIO + timedelta(days=dia)
+    if dias_hasta_devolucion is not None:
+        prestamo.fecha_devolucion = prestamo.fecha_prestamo + timedelta(days=dias_hasta_devolucion)
+    biblioteca.restaurar_prestamo(prestamo)
+
+
+def poblar(biblioteca):
+    """Por usuario: tres préstamos devueltos hace un año y uno activo; U001 tiene uno devuelto reciente"""
+    for i in range(4):
+        biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+    biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+    biblioteca.registrar_usuario(Usuario("U002", "Carlos López"))
+    numero = 0
+    for k, id_usuario in enumerate(["U001", "U002"]):
+        for dia in range(3):
+            numero += 1
+            restaurar(biblioteca, f"PREST-{numero:05d}", f"ISBN-00{dia}", id_usuario, dia, 10)
+        numero += 1
+        restaurar(biblioteca, f"PREST-{numero:05d}", f"ISBN-00{k}", id_usuario, 3)
+    restaurar(biblioteca, "PREST-00009", "ISBN-003", "U001", 390, 5)
+
+
+class TestArchivoPrestamos:
+    """Suite de tests para ArchivoPrestamos y Biblioteca.archivar_prestamos"""
+    
+    @pytest.fixture
+    def biblioteca(self, tmp_path):
+        """Fixture: Biblioteca con archivo y préstamos de distintas antigüedades"""
+        biblioteca = Biblioteca(archivo=ArchivoPrestamos(str(tmp_path / "archivo")))
+        poblar(biblioteca)
+        return biblioteca
+    
+    def test_archiva_solo_devueltos_antiguos(self, biblioteca):
+        """Test: Se archivan los préstamos devueltos hace más de la antigüedad configurada"""
+        estadisticas = biblioteca.estadisticas()
+        historial = [p.id for p in biblioteca.prestamos_usuario("U001")]
+        
+        archivados = biblioteca.archivar_prestamos()
+        
+        assert archivados == 6
+        assert len(biblioteca.prestamos) == 3
+        assert all(p.esta_activo() or p.isbn_libro == "ISBN-003" for p in biblioteca.prestamos.values())
+        assert biblioteca.estadisticas() == estadisticas
+        assert [p.id for p in biblioteca.prestamos_usuario("U001")] == historial
+        assert biblioteca.verificar_indice_activos()
+        assert biblioteca.verificar_contadores()
+        assert biblioteca.archivar_prestamos() == 0
+    
+    def test_consultas_de_historial_combinan_ambos_niveles(self, biblioteca):
+        """Test: Rangos y últimos préstamos incluyen los archivados, con sus fechas"""
+        originales = {p.id: p for p in biblioteca.prestamos_usuario("U002")}
+        biblioteca.archivar_prestamos()
+        
+        todos = biblioteca.prestamos_usuario("U002")
+        rango = biblioteca.prestamos_usuario("U002", desde=HACE_UN_ANIO + timedelta(hours=1),
+                                             hasta=HACE_UN_ANIO + timedelta(days=1, hours=1))
+        
+        assert [(p.id, p.fecha_prestamo, p.fecha_devolucion) for p in todos] == [
+            (p.id, p.fecha_prestamo, p.fecha_devolucion) for p in originales.values()]
+        assert [p.id for p in rango] == [todos[1].id]
+        assert [p.id for p in biblioteca.ultimos_prestamos_usuario("U002", 2)] == [
+            todos[-1].id, todos[-2].id]
+        assert biblioteca.prestamos_usuario("U999") == []
+    
+    def test_iter_prestamos_usuario_cruza_el_archivo(self, biblioteca):
+        """Test: La paginación del historial continúa desde préstamos archivados o en memoria"""
+        ids = [p.id for p in biblioteca.prestamos_usuario("U001")]
+        biblioteca.archivar_prestamos()
+        
+        paginas, despues = [], None
+        while True:
+            pagina = [p.id for p in biblioteca.iter_prestamos_usuario("U001", 2, despues)]
+            paginas.append(pagina)
+            if len(pagina) < 2:
+                break
+            despues = pagina[-1]
+        
+        assert paginas == [ids[:2], ids[2:4], ids[4:]]
+    
+    def test_reabrir_archivo(self, biblioteca, tmp_path):
+        """Test: Un archivo reabierto desde disco sirve el historial archivado"""
+        biblioteca.archivar_prestamos()
+        
+        reabierto = ArchivoPrestamos(str(tmp_path / "archivo"), segmentos_en_cache=0)
+        
+        assert len(reabierto) == 6
+        assert [p.id for p in reabierto.prestamos_usuario("U001")] == [
+            "PREST-00001", "PREST-00002", "PREST-00003"]
+        assert sorted(os.listdir(tmp_path / "archivo")) == [
+            ArchivoPrestamos.ARCHIVO_MANIFIESTO, "segmento-000001.json.gz"]
+    
+    def test_prestamos_repetidos_en_memoria_no_se_duplican(self, biblioteca):
+        """Test: Un préstamo archivado que vuelve a memoria aparece una sola vez"""
+        devuelto = next(p for p in biblioteca.prestamos.values() if not p.esta_activo())
+        biblioteca.archivar_prestamos()
+        biblioteca.restaurar_prestamo(devuelto)
+        
+        ids = [p.id for p in biblioteca.prestamos_usuario(devuelto.id_usuario)]
+        
+        assert ids.count(devuelto.id) == 1
+    
+    def test_reabrir_persistencia_tras_archivar_no_duplica(self, tmp_path):
+        """Test: Los préstamos archivados que el diario recarga no se cuentan ni archivan dos veces"""
+        def abrir():
+            persistencia = Persistencia(str(tmp_path / "datos"))
+            return persistencia, persistencia.abrir(
+                archivo=ArchivoPrestamos(str(tmp_path / "archivo")))
+        
+        persistencia, biblioteca = abrir()
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        assert biblioteca.archivar_prestamos(datetime.now() + timedelta(days=1)) == 1
+        assert biblioteca.total_prestamos() == 1
+        persistencia.cerrar()
+        
+        persistencia, reabierta = abrir()
+        
+        assert reabierta.total_prestamos() == 1
+        assert [p.id for p in reabierta.prestamos_usuario("U001")] == ["PREST-00001"]
+        assert reabierta.archivar_prestamos(datetime.now() + timedelta(days=1)) == 0
+        assert reabierta.prestar_libro("ISBN-001", "U001").id == "PREST-00002"
+        assert sorted(os.listdir(tmp_path / "archivo")) == [
+            ArchivoPrestamos.ARCHIVO_MANIFIESTO, "segmento-000001.json.gz"]
+        persistencia.cerrar()
+    
+    def test_archivar_omite_prestamos_ya_archivados(self, biblioteca):
+        """Test: Un préstamo que vuelve a memoria se retira sin escribir otro segmento"""
+        devuelto = next(p for p in biblioteca.prestamos.values() if not p.esta_activo())
+        biblioteca.archivar_prestamos()
+        biblioteca.restaurar_prestamo(devuelto)
+        
+        assert biblioteca.archivar_prestamos() == 0
+        assert devuelto.id not in biblioteca.prestamos
+        assert len(biblioteca.archivo) == 6
+        assert biblioteca.total_prestamos() == 9
+    
+    def test_sin_archivo_falla(self):
+        """Test: Archivar sin archivo configurado o con antigüedad negativa falla"""
+        with pytest.raises(ValueError, match="no tiene un archivo"):
+            Biblioteca().archivar_prestamos()
+        with pytest.raises(ValueError, match="no puede ser negativa"):
+            ArchivoPrestamos("no-usado", antiguedad=timedelta(days=-1))
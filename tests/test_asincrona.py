@@ -0,0 +1,200 @@
+"""
+Tests de la fachada asíncrona de la biblioteca
+"""
+import asyncio
+import threading
+import pytest
+from datetime import datetime, timedelta
+from biblioteca.archivo import ArchivoPrestamos
+from biblioteca.asincrona import AsyncBiblioteca
+from biblioteca.concurrente import BibliotecaConcurrente
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class BibliotecaConHilos(BibliotecaConcurrente):
+    """Biblioteca que anota el hilo de cada consulta de historial"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hilos = []
+    
+    def prestamos_usuario(self, *args):
+        self.hilos.append(threading.current_thread())
+        return super().prestamos_usuario(*args)
+    
+    def ultimos_prestamos_usuario(self, *args):
+        self.hilos.append(threading.current_thread())
+        return super().ultimos_prestamos_usuario(*args)
+
+
+class BibliotecaContada(BibliotecaConcurrente):
+    """Biblioteca que cuenta las búsquedas por autor y puede retenerlas"""
+    
+    def __init__(self):
+        super().__init__()
+        self.busquedas = 0
+        self.liberar = threading.Event()
+        self.liberar.set()
+    
+    def buscar_libros_por_autor(self, autor):
+        self.busquedas += 1
+        self.liberar.wait(5)
+        return super().buscar_libros_por_autor(autor)
+
+
+class TestAsyncBiblioteca:
+    """Suite de tests para la clase AsyncBiblioteca"""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca con libros y usuarios de prueba"""
+        biblioteca = BibliotecaContada()
+        biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin"))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Clean Architecture", "Robert C. Martin"))
+        biblioteca.agregar_libro(Libro("ISBN-003", "Refactoring", "Martin Fowler"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        return biblioteca
+    
+    def test_operaciones_basicas(self, biblioteca):
+        """Test: Las operaciones de la fachada delegan en la biblioteca"""
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            prestamo = await fachada.prestar_libro("ISBN-001", "U001")
+            disponible = (await fachada.buscar_libro_por_isbn("ISBN-001")).disponible
+            disponibles = await fachada.libros_disponibles()
+            activos = await fachada.prestamos_activos()
+            estadisticas = await fachada.estadisticas()
+            await fachada.devolver_libro("ISBN-001", "U001")
+            return prestamo, disponible, disponibles, activos, estadisticas
+        
+        prestamo, disponible, disponibles, activos, estadisticas = asyncio.run(escenario())
+        
+        assert prestamo.id == "PREST-00001"
+        assert not disponible
+        assert [l.isbn for l in disponibles] == ["ISBN-002", "ISBN-003"]
+        assert activos == [prestamo]
+        assert estadisticas['prestamos_activos'] == 1
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+    
+    def test_errores_se_propagan(self, biblioteca):
+        """Test: Los errores de validación llegan al llamador"""
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            await fachada.prestar_libro("ISBN-999", "U001")
+        
+        with pytest.raises(ValueError, match="no existe en el catálogo"):
+            asyncio.run(escenario())
+    
+    def test_consultas_identicas_se_comparten(self, biblioteca):
+        """Test: Consultas idénticas simultáneas se calculan una sola vez"""
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            biblioteca.liberar.clear()
+            tareas = [asyncio.create_task(fachada.buscar_libros_por_autor("martin"))
+                      for _ in range(10)]
+            otra = asyncio.create_task(fachada.buscar_libros_por_autor("fowler"))
+            await asyncio.sleep(0.05)
+            biblioteca.liberar.set()
+            return await asyncio.gather(*tareas), await otra
+        
+        resultados, otra = asyncio.run(escenario())
+        
+        assert biblioteca.busquedas == 2
+        assert all([l.isbn for l in r] == ["ISBN-001", "ISBN-002", "ISBN-003"] for r in resultados)
+        assert resultados[0] is not resultados[1]
+        assert [l.isbn for l in otra] == ["ISBN-003"]
+    
+    def test_no_comparte_consultas_anteriores_a_una_modificacion(self, biblioteca):
+        """Test: Una consulta posterior a un alta no reutiliza el cálculo en curso"""
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            biblioteca.liberar.clear()
+            anterior = asyncio.create_task(fachada.buscar_libros_por_autor("herbert"))
+            await asyncio.sleep(0.01)
+            await fachada.agregar_libro(Libro("ISBN-004", "Dune", "Frank Herbert"))
+            posterior = asyncio.create_task(fachada.buscar_libros_por_autor("herbert"))
+            await asyncio.sleep(0.01)
+            biblioteca.liberar.set()
+            return await anterior, await posterior
+        
+        _, posterior = asyncio.run(escenario())
+        
+        assert biblioteca.busquedas == 2
+        assert [l.isbn for l in posterior] == ["ISBN-004"]
+    
+    def test_prestamo_no_impide_compartir_busquedas(self, biblioteca):
+        """Test: Un préstamo no afecta las búsquedas por texto en curso"""
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            biblioteca.liberar.clear()
+            anterior = asyncio.create_task(fachada.buscar_libros_por_autor("fowler"))
+            await asyncio.sleep(0.01)
+            await fachada.prestar_libro("ISBN-003", "U001")
+            posterior = asyncio.create_task(fachada.buscar_libros_por_autor("fowler"))
+            await asyncio.sleep(0.01)
+            biblioteca.liberar.set()
+            return await anterior, await posterior
+        
+        anterior, posterior = asyncio.run(escenario())
+        
+        assert biblioteca.busquedas == 1
+        assert [l.isbn for l in posterior] == [l.isbn for l in anterior] == ["ISBN-003"]
+    
+    def test_importar_en_executor(self):
+        """Test: La importación masiva se ejecuta fuera del bucle de eventos"""
+        async def escenario():
+            fachada = AsyncBiblioteca()
+            resultado = await fachada.importar_libros(
+                Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor") for i in range(100))
+            return resultado, await fachada.total_libros()
+        
+        resultado, total = asyncio.run(escenario())
+        
+        assert resultado['importados'] == 100
+        assert total == 100
+    
+    def test_lotes_en_executor(self, biblioteca):
+        """Test: Los préstamos y devoluciones en lote se ejecutan fuera del bucle de eventos"""
+        hilos = []
+        
+        def pares(isbns):
+            hilos.append(threading.current_thread())
+            for isbn in isbns:
+                yield isbn, "U001"
+        
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            prestados = await fachada.prestar_lote(pares(["ISBN-001", "ISBN-002"]))
+            disponibles = await fachada.libros_disponibles()
+            devueltos = await fachada.devolver_lote(pares(["ISBN-001"]))
+            return prestados, disponibles, devueltos
+        
+        prestados, disponibles, devueltos = asyncio.run(escenario())
+        
+        assert len(prestados['realizados']) == 2 and len(devueltos['realizados']) == 1
+        assert [l.isbn for l in disponibles] == ["ISBN-003"]
+        assert hilos and threading.main_thread() not in hilos
+    
+    @pytest.mark.parametrize("con_archivo", [False, True])
+    def test_historial_en_executor_solo_con_archivo(self, tmp_path, con_archivo):
+        """Test: Los historiales se consultan en el executor solo si hay un archivo en disco"""
+        archivo = ArchivoPrestamos(str(tmp_path)) if con_archivo else None
+        biblioteca = BibliotecaConHilos(archivo=archivo)
+        biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        if con_archivo:
+            biblioteca.archivar_prestamos(datetime.now() + timedelta(days=1))
+        
+        async def escenario():
+            fachada = AsyncBiblioteca(biblioteca)
+            return (await fachada.prestamos_usuario("U001"),
+                    await fachada.ultimos_prestamos_usuario("U001", 1))
+        
+        todos, ultimos = asyncio.run(escenario())
+        
+        assert [p.id for p in todos] == [p.id for p in ultimos] == ["PREST-00001"]
+        en_bucle = [hilo is threading.main_thread() for hilo in biblioteca.hilos]
+        assert en_bucle == [not con_archivo] * 2
@@ -0,0 +1,164 @@
+"""
+Tests del autocompletado de títulos y autores
+"""
+import random
+import pytest
+from biblioteca import Biblioteca, Libro, Usuario
+from biblioteca.autocompletado import IndicePrefijos
+from biblioteca.biblioteca_sqlite import BibliotecaSQLite
+from biblioteca.catalogo_columnar import CatalogoColumnar
+from biblioteca.indice_texto import normalizar
+
+
+LIBROS = [
+    ("978-0", "Clean Code", "Robert C. Martin"),
+    ("978-1", "Clean Architecture", "Robert C. Martin"),
+    ("978-2", "The Clean Coder", "Robert C. Martin"),
+    ("978-3", "Código limpio", "Martín Pérez"),
+    ("978-4", "Refactoring", "Martin Fowler"),
+]
+
+
+class TestIndicePrefijos:
+    """Suite de tests para IndicePrefijos"""
+    
+    @pytest.fixture
+    def indice(self):
+        """Fixture: Índice con los títulos de prueba"""
+        indice = IndicePrefijos()
+        for _, titulo, _ in LIBROS:
+            indice.agregar(titulo)
+        return indice
+    
+    def test_prefijo_de_cualquier_palabra(self, indice):
+        """Test: El prefijo coincide con el comienzo de cualquier palabra"""
+        assert set(indice.buscar("clean")) == {"Clean Code", "Clean Architecture", "The Clean Coder"}
+        assert indice.buscar("arch") == ["Clean Architecture"]
+        assert indice.buscar("lean") == []
+    
+    def test_sin_mayusculas_ni_acentos(self, indice):
+        """Test: El prefijo se normaliza como los textos indexados"""
+        assert indice.buscar("  CÓDIGO") == ["Código limpio"]
+        assert indice.buscar("codigo l") == ["Código limpio"]
+    
+    def test_orden_por_popularidad(self, indice):
+        """Test: Las sugerencias se ordenan de más a menos populares"""
+        indice.sumar("the clean coder", 3)
+        indice.sumar("clean architecture")
+        
+        assert indice.buscar("clean") == ["The Clean Coder", "Clean Architecture", "Clean Code"]
+        assert indice.buscar("clean", limite=1) == ["The Clean Coder"]
+        assert indice.popularidad("The Clean Coder") == 3
+    
+    def test_textos_repetidos_son_una_sugerencia(self, indice):
+        """Test: Textos con la misma forma normalizada comparten sugerencia"""
+        assert indice.agregar("CLEAN CODE") == indice.agregar("Clean Code")
+        assert len(indice) == len(LIBROS)
+    
+    @pytest.mark.parametrize("nuevos", [1, IndicePrefijos.MAX_INSERCIONES * 2])
+    def test_agregar_tras_consultar(self, indice, nuevos):
+        """Test: Los textos agregados después de una consulta aparecen en las siguientes"""
+        indice.buscar("c")
+        for i in range(nuevos):
+            indice.agregar(f"Clojure {i}")
+        
+        sugerencias = indice.buscar("c")
+        
+        assert len(sugerencias) == 4 + nuevos
+        assert indice.buscar("clo") == [f"Clojure {i}" for i in sorted(range(nuevos), key=str)]
+    
+    def test_mejores_guardadas_coinciden_con_la_consulta_completa(self):
+        """Test: Las listas guardadas de los prefijos frecuentes siguen exactas tras altas y préstamos"""
+        azar = random.Random(0)
+        palabras = ["amor", "ámbar", "mar", "mares", "sol", "sombra", "y", "de", "la"]
+        con_listas, sin_listas = IndicePrefijos(), IndicePrefijos()
+        con_listas.MIN_ENTRADAS_MEJORES = 20
+        sin_listas.MIN_ENTRADAS_MEJORES = float("inf")
+        textos = []
+        
+        for paso in range(3000):
+            azar_paso = azar.random()
+            if azar_paso < 0.2 or not textos:
+                texto = " ".join(azar.choice(palabras) for _ in range(azar.randint(1, 4))) + f" {paso}"
+                con_listas.agregar(texto)
+                sin_listas.agregar(texto)
+                textos.append(texto)
+            elif azar_paso < 0.6:
+                normalizado = normalizar(azar.choice(textos))
+                con_listas.sumar(normalizado)
+                sin_listas.sumar(normalizado)
+            else:
+                prefijo = azar.choice(["a", "m", "ma", "so", "y", "", "de l", "mar"])
+                limite = azar.randint(0, IndicePrefijos.MAX_MEJORES)
+                assert con_listas.buscar(prefijo, limite) == sin_listas.buscar(prefijo, limite)
+        
+        assert con_listas._mejores
+
+
+class TestBibliotecaAutocompletar:
+    """Suite de tests de Biblioteca.autocompletar"""
+    
+    @pytest.fixture(params=["memoria", "columnar", "sqlite"])
+    def biblioteca(self, request):
+        """Fixture: Biblioteca con los libros de prueba y préstamos de 'Clean Architecture'"""
+        if request.param == "sqlite":
+            biblioteca = BibliotecaSQLite()
+        else:
+            catalogo = CatalogoColumnar() if request.param == "columnar" else None
+            biblioteca = Biblioteca(catalogo=catalogo)
+        for isbn, titulo, autor in LIBROS:
+            biblioteca.agregar_libro(Libro(isbn, titulo, autor, ejemplares=3))
+        for i in range(3):
+            biblioteca.registrar_usuario(Usuario(f"U{i}", f"Usuario {i}"))
+        biblioteca.prestar_libro("978-1", "U0")
+        biblioteca.prestar_libro("978-1", "U1")
+        yield biblioteca
+        if request.param == "sqlite":
+            biblioteca.cerrar()
+    
+    def test_titulos_por_popularidad(self, biblioteca):
+        """Test: Los títulos más prestados se sugieren primero"""
+        assert biblioteca.autocompletar("cle") == ["Clean Architecture", "Clean Code", "The Clean Coder"]
+    
+    def test_prestamos_nuevos_actualizan_el_orden(self, biblioteca):
+        """Test: Un préstamo posterior a la primera consulta cambia la popularidad"""
+        biblioteca.autocompletar("cle")
+        for i in range(3):
+            biblioteca.prestar_libro("978-2", f"U{i}")
+        
+        assert biblioteca.autocompletar("cle", limite=2) == ["The Clean Coder", "Clean Architecture"]
+    
+    def test_libros_nuevos(self, biblioteca):
+        """Test: Un libro agregado después de la primera consulta se sugiere"""
+        biblioteca.autocompletar("cle")
+        biblioteca.agregar_libro(Libro("978-9", "Clean Agile", "Robert C. Martin"))
+        
+        assert "Clean Agile" in biblioteca.autocompletar("clean a")
+    
+    def test_autores_suman_los_prestamos_de_sus_libros(self, biblioteca):
+        """Test: Un autor es una sola sugerencia con los préstamos de todos sus libros"""
+        biblioteca.prestar_libro("978-4", "U2")
+        
+        assert biblioteca.autocompletar("mart", campo="autor") == [
+            "Robert C. Martin", "Martin Fowler", "Martín Pérez"]
+    
+    @pytest.mark.parametrize("campo,limite,mensaje", [
+        ("isbn", 10, "Campo de autocompletado no válido"),
+        ("titulo", -1, "El límite no puede ser negativo"),
+    ])
+    def test_parametros_invalidos(self, biblioteca, campo, limite, mensaje):
+        """Test: Un campo desconocido o un límite negativo lanzan ValueError"""
+        with pytest.raises(ValueError, match=mensaje):
+            biblioteca.autocompletar("c", campo=campo, limite=limite)
+    
+    def test_prestamos_anteriores_a_la_construccion(self):
+        """Test: El índice construido tarde cuenta los préstamos ya registrados"""
+        biblioteca = Biblioteca()
+        for isbn, titulo, autor in LIBROS:
+            biblioteca.agregar_libro(Libro(isbn, titulo, autor))
+        biblioteca.registrar_usuario(Usuario("U0", "Usuario"))
+        biblioteca.prestar_libro("978-2", "U0")
+        biblioteca.importar_libros([Libro("978-8", "Clean Craftsmanship", "Robert C. Martin")])
+        
+        assert biblioteca.autocompletar("clean")[0] == "The Clean Coder"
+        assert "Clean Craftsmanship" in biblioteca.autocompletar("clean c")
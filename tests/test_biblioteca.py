@@ -2,8 +2,10 @@
 Tests unitarios para la clase Biblioteca
 """
 import pytest
+from datetime import datetime, timedelta
 from biblioteca.biblioteca import Biblioteca
 from biblioteca.libro import Libro
+from biblioteca.reloj import RelojSimulado
 from biblioteca.usuario import Usuario
 
 
@@ -83,6 +85,16 @@ class TestBiblioteca:
         
         assert len(resultados) == 2
     
+    def test_buscar_sin_acentos(self, biblioteca):
+        """Test: Las búsquedas usan las claves sin acentos calculadas al crear el libro"""
+        libro = Libro("ISBN-001", "El Código de García", "María Rodríguez")
+        biblioteca.agregar_libro(libro)
+        
+        assert libro.autor_busqueda == "maria rodriguez"
+        assert biblioteca.buscar_libros_por_autor("maria rodriguez") == [libro]
+        assert biblioteca.buscar_libros_por_titulo("garcia") == [libro]
+        assert biblioteca.buscar_libros_por_titulo("CÓDIGO") == [libro]
+    
     def test_libros_disponibles(self, biblioteca):
         """Test: Obtener libros disponibles"""
         libro1 = Libro("ISBN-001", "Libro 1", "Autor 1")
@@ -197,6 +209,30 @@ class TestBiblioteca:
         with pytest.raises(ValueError, match="No existe un préstamo activo"):
             biblioteca.devolver_libro("978-3-16-148410-0", "U001")
     
+    def test_restaurar_devolucion_conserva_la_fecha(self, biblioteca, libro_ejemplo, usuario_ejemplo):
+        """Test: Restaurar una devolución usa la fecha indicada y no la notifica al diario"""
+        biblioteca.agregar_libro(libro_ejemplo)
+        biblioteca.registrar_usuario(usuario_ejemplo)
+        prestamo = biblioteca.prestar_libro("978-3-16-148410-0", "U001")
+        notificadas = []
+        biblioteca.diario = type("Diario", (), {"libro_devuelto": lambda _, *args: notificadas.append(args)})()
+        
+        biblioteca.restaurar_devolucion("978-3-16-148410-0", "U001", datetime(2024, 1, 5))
+        
+        assert prestamo.fecha_devolucion == datetime(2024, 1, 5)
+        assert libro_ejemplo.disponible
+        assert notificadas == []
+        with pytest.raises(ValueError, match="No existe un préstamo activo"):
+            biblioteca.restaurar_devolucion("978-3-16-148410-0", "U001", datetime(2024, 1, 6))
+    
+    def test_restaurar_contador_prestamos_no_retrocede(self, biblioteca_con_datos):
+        """Test: El contador restaurado solo avanza"""
+        biblioteca_con_datos.restaurar_contador_prestamos(41)
+        biblioteca_con_datos.restaurar_contador_prestamos(7)
+        
+        assert biblioteca_con_datos.contador_prestamos == 41
+        assert biblioteca_con_datos.prestar_libro("ISBN-000", "U001").id == "PREST-00042"
+    
     def test_prestamos_activos(self, biblioteca):
         """Test: Obtener préstamos activos"""
         biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor 1"))
@@ -247,4 +283,372 @@ class TestBiblioteca:
         assert stats['libros_disponibles'] == 1
         assert stats['libros_prestados'] == 1
         assert stats['total_usuarios'] == 1
-        assert stats['prestamos_activos'] == 1
\ No newline at end of file
+        assert stats['prestamos_activos'] == 1
+    
+    # ==================== TESTS DE EJEMPLARES ====================
+    
+    def test_libro_con_ejemplares_invalidos_falla(self):
+        """Test: Un libro debe tener al menos un ejemplar"""
+        with pytest.raises(ValueError, match="al menos 1"):
+            Libro("ISBN-001", "Libro", "Autor", ejemplares=0)
+    
+    def test_prestar_varios_ejemplares(self, biblioteca):
+        """Test: Un título sigue disponible mientras le quede algún ejemplar"""
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor", ejemplares=2))
+        for i in range(1, 4):
+            biblioteca.registrar_usuario(Usuario(f"U00{i}", f"Usuario {i}"))
+        
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        libro = biblioteca.buscar_libro_por_isbn("ISBN-001")
+        assert libro.disponible
+        assert libro.ejemplares_disponibles == 1
+        with pytest.raises(ValueError, match="ya tiene este libro prestado"):
+            biblioteca.prestar_libro("ISBN-001", "U001")
+        
+        biblioteca.prestar_libro("ISBN-001", "U002")
+        assert not libro.disponible
+        with pytest.raises(ValueError, match="no está disponible"):
+            biblioteca.prestar_libro("ISBN-001", "U003")
+        
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        assert libro.ejemplares_disponibles == 1
+        assert biblioteca.libros_disponibles() == [libro]
+        assert biblioteca.verificar_indice_activos()
+        assert biblioteca.verificar_contadores()
+    
+    def test_estadisticas_con_ejemplares(self, biblioteca):
+        """Test: Las estadísticas cuentan títulos y ejemplares por separado"""
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor", ejemplares=3))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Libro 2", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1"))
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        biblioteca.prestar_libro("ISBN-002", "U001")
+        
+        stats = biblioteca.estadisticas()
+        
+        assert stats['libros_disponibles'] == 1
+        assert stats['libros_prestados'] == 1
+        assert stats['total_ejemplares'] == 4
+        assert stats['ejemplares_disponibles'] == 2
+        assert stats['prestamos_activos'] == 2
+    
+    def test_prestar_lote_con_ejemplares(self, biblioteca):
+        """Test: Un lote puede prestar varios ejemplares del mismo título"""
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor", ejemplares=2))
+        for i in range(1, 4):
+            biblioteca.registrar_usuario(Usuario(f"U00{i}", f"Usuario {i}"))
+        
+        resultado = biblioteca.prestar_lote(
+            [("ISBN-001", "U001"), ("ISBN-001", "U001"), ("ISBN-001", "U002"), ("ISBN-001", "U003")],
+            atomico=False)
+        
+        assert [p.id_usuario for p in resultado['realizados']] == ["U001", "U002"]
+        assert resultado['errores'] == [
+            (2, "El usuario ya tiene este libro prestado"),
+            (4, "El libro 'Libro 1' no está disponible"),
+        ]
+        assert biblioteca.verificar_contadores()
+    
+    # ==================== TESTS DE ÍNDICES ====================
+    
+    def test_indice_activos_tras_prestamo_y_devolucion(self, biblioteca, libro_ejemplo, usuario_ejemplo):
+        """Test: El índice de préstamos activos se mantiene al prestar y devolver"""
+        biblioteca.agregar_libro(libro_ejemplo)
+        biblioteca.registrar_usuario(usuario_ejemplo)
+        
+        prestamo = biblioteca.prestar_libro("978-3-16-148410-0", "U001")
+        assert biblioteca._buscar_prestamo_activo("978-3-16-148410-0", "U001") is prestamo
+        assert biblioteca.verificar_indice_activos()
+        
+        biblioteca.devolver_libro("978-3-16-148410-0", "U001")
+        assert biblioteca._buscar_prestamo_activo("978-3-16-148410-0", "U001") is None
+        assert biblioteca.verificar_indice_activos()
+    
+    def test_represtar_tras_devolucion_usa_nuevo_prestamo(self, biblioteca, libro_ejemplo, usuario_ejemplo):
+        """Test: Un segundo préstamo del mismo libro reemplaza la entrada del índice"""
+        biblioteca.agregar_libro(libro_ejemplo)
+        biblioteca.registrar_usuario(usuario_ejemplo)
+        biblioteca.prestar_libro("978-3-16-148410-0", "U001")
+        biblioteca.devolver_libro("978-3-16-148410-0", "U001")
+        
+        segundo = biblioteca.prestar_libro("978-3-16-148410-0", "U001")
+        biblioteca.devolver_libro("978-3-16-148410-0", "U001")
+        
+        assert segundo.fecha_devolucion is not None
+        assert biblioteca.total_prestamos() == 2
+        assert biblioteca.verificar_indice_activos()
+    
+    def test_verificar_indice_activos_detecta_inconsistencia(self, biblioteca, libro_ejemplo, usuario_ejemplo):
+        """Test: La verificación detecta un índice desincronizado"""
+        biblioteca.agregar_libro(libro_ejemplo)
+        biblioteca.registrar_usuario(usuario_ejemplo)
+        biblioteca.prestar_libro("978-3-16-148410-0", "U001")
+        
+        biblioteca._indice_activos.clear()
+        
+        assert not biblioteca.verificar_indice_activos()
+    
+    def test_contadores_coinciden_con_recuento(self, biblioteca):
+        """Test: Los contadores incrementales coinciden con un recuento completo"""
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor 1"))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Libro 2", "Autor 2"))
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1"))
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        biblioteca.prestar_libro("ISBN-002", "U001")
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        
+        assert biblioteca.verificar_contadores()
+        stats = biblioteca.estadisticas()
+        assert stats['libros_disponibles'] == 1
+        assert stats['libros_prestados'] == 1
+        assert stats['prestamos_activos'] == 1
+        assert stats['total_prestamos'] == 2
+    
+    def test_modo_depuracion_detecta_contadores_inconsistentes(self):
+        """Test: En modo depuración, estadísticas falla si los contadores divergen"""
+        biblioteca = Biblioteca("Depuración", depuracion=True)
+        libro = Libro("ISBN-001", "Libro 1", "Autor 1")
+        biblioteca.agregar_libro(libro)
+        biblioteca.estadisticas()
+        
+        libro.prestar()  # Cambio de estado fuera de la biblioteca
+        
+        assert not biblioteca.verificar_contadores()
+        with pytest.raises(RuntimeError, match="Contadores inconsistentes"):
+            biblioteca.estadisticas()
+    
+    def test_vencidos_hasta_excluye_devueltos(self, biblioteca):
+        """Test: vencidos_hasta incluye solo préstamos activos vencidos a esa fecha"""
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor 1"))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Libro 2", "Autor 2"))
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1"))
+        biblioteca.prestar_libro("ISBN-001", "U001", dias_prestamo=7)
+        prestamo2 = biblioteca.prestar_libro("ISBN-002", "U001", dias_prestamo=7)
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        
+        assert biblioteca.prestamos_vencidos() == []
+        assert biblioteca.vencidos_hasta(datetime.now() + timedelta(days=30)) == [prestamo2]
+    
+    def test_prestamos_usuario_paginados(self, biblioteca):
+        """Test: Historial de un usuario por rango de fechas y últimos N"""
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1"))
+        for i in range(3):
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+            biblioteca.prestar_libro(f"ISBN-00{i}", "U001")
+        
+        todos = biblioteca.prestamos_usuario("U001")
+        
+        assert [p.isbn_libro for p in todos] == ["ISBN-000", "ISBN-001", "ISBN-002"]
+        assert biblioteca.ultimos_prestamos_usuario("U001", 2) == [todos[2], todos[1]]
+        assert biblioteca.prestamos_usuario("U001", desde=datetime.now() + timedelta(days=1)) == []
+        assert biblioteca.prestamos_usuario("U999") == []
+        assert biblioteca.ultimos_prestamos_usuario("U999", 5) == []
+    
+    # ==================== TESTS DE LOTES ====================
+    
+    @pytest.fixture
+    def biblioteca_con_datos(self, biblioteca):
+        """Fixture: Biblioteca con cuatro libros y dos usuarios"""
+        for i in range(4):
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1", limite_prestamos=2))
+        biblioteca.registrar_usuario(Usuario("U002", "Usuario 2"))
+        return biblioteca
+    
+    def test_prestar_lote_exitoso(self, biblioteca_con_datos):
+        """Test: Un lote válido crea todos los préstamos en orden"""
+        resultado = biblioteca_con_datos.prestar_lote(
+            [("ISBN-000", "U001"), ("ISBN-001", "U001"), ("ISBN-002", "U002")])
+        
+        assert [p.id for p in resultado['realizados']] == ["PREST-00001", "PREST-00002", "PREST-00003"]
+        assert resultado['errores'] == []
+        assert biblioteca_con_datos.buscar_usuario("U001").libros_prestados == {"ISBN-000", "ISBN-001"}
+        assert biblioteca_con_datos.verificar_indice_activos()
+        assert biblioteca_con_datos.verificar_contadores()
+    
+    def test_prestar_lote_atomico_no_aplica_nada(self, biblioteca_con_datos):
+        """Test: En modo atómico, un error en el lote no deja préstamos a medias"""
+        with pytest.raises(ValueError, match="Lote rechazado con 2 error"):
+            biblioteca_con_datos.prestar_lote(
+                [("ISBN-000", "U001"), ("ISBN-000", "U002"), ("ISBN-999", "U002")])
+        
+        assert biblioteca_con_datos.total_prestamos() == 0
+        assert biblioteca_con_datos.buscar_libro_por_isbn("ISBN-000").disponible
+    
+    def test_prestar_lote_parcial_reporta_errores(self, biblioteca_con_datos):
+        """Test: En modo parcial se aplican los válidos y se reporta cada error"""
+        resultado = biblioteca_con_datos.prestar_lote(
+            [("ISBN-000", "U001"), ("ISBN-000", "U002"), ("ISBN-001", "U001"),
+             ("ISBN-002", "U001"), ("ISBN-003", "U999")],
+            atomico=False)
+        
+        assert [p.isbn_libro for p in resultado['realizados']] == ["ISBN-000", "ISBN-001"]
+        assert resultado['errores'] == [
+            (2, "El libro 'Libro 0' no está disponible"),
+            (4, "El usuario ha alcanzado el límite de 2 préstamos"),
+            (5, "El usuario con ID U999 no está registrado"),
+        ]
+        assert biblioteca_con_datos.verificar_contadores()
+    
+    def test_devolver_lote(self, biblioteca_con_datos):
+        """Test: Devolución en lote, con pares repetidos o inexistentes reportados"""
+        biblioteca_con_datos.prestar_lote([("ISBN-000", "U001"), ("ISBN-001", "U002")])
+        
+        with pytest.raises(ValueError, match="Lote rechazado"):
+            biblioteca_con_datos.devolver_lote([("ISBN-000", "U001"), ("ISBN-000", "U001")])
+        assert len(biblioteca_con_datos.prestamos_activos()) == 2
+        
+        resultado = biblioteca_con_datos.devolver_lote(
+            [("ISBN-000", "U001"), ("ISBN-002", "U001"), ("ISBN-001", "U002")], atomico=False)
+        
+        assert [p.isbn_libro for p in resultado['realizados']] == ["ISBN-000", "ISBN-001"]
+        assert [posicion for posicion, _ in resultado['errores']] == [2]
+        assert all(not p.esta_activo() for p in resultado['realizados'])
+        assert biblioteca_con_datos.prestamos_activos() == []
+        assert biblioteca_con_datos.verificar_contadores()
+    
+    # ==================== TESTS DE RELOJ ====================
+    
+    @pytest.fixture
+    def biblioteca_simulada(self):
+        """Fixture: Biblioteca con reloj simulado, un libro y un usuario"""
+        biblioteca = Biblioteca(reloj=RelojSimulado(datetime(2024, 1, 1, 9, 0)))
+        biblioteca.agregar_libro(Libro("ISBN-001", "Libro 1", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        return biblioteca
+    
+    def test_reloj_simulado_fija_fechas_y_vencimientos(self, biblioteca_simulada):
+        """Test: Préstamos, devoluciones y vencimientos usan el reloj de la biblioteca"""
+        reloj = biblioteca_simulada.reloj
+        prestamo = biblioteca_simulada.prestar_libro("ISBN-001", "U001", dias_prestamo=14)
+        assert prestamo.fecha_prestamo == datetime(2024, 1, 1, 9, 0)
+        
+        reloj.avanzar(days=14)
+        assert biblioteca_simulada.prestamos_vencidos() == []
+        reloj.avanzar(days=1)
+        assert biblioteca_simulada.prestamos_vencidos() == [prestamo]
+        assert prestamo.dias_restantes(reloj.ahora()) == -1
+        
+        reloj.avanzar(days=30)
+        biblioteca_simulada.devolver_libro("ISBN-001", "U001")
+        assert prestamo.fecha_devolucion == datetime(2024, 2, 15, 9, 0)
+        assert prestamo.dias_transcurridos() == 45
+    
+    def test_estadisticas_a_fecha(self, biblioteca_simulada):
+        """Test: Dentro de reloj.congelado(fecha) el informe se evalúa en esa fecha"""
+        biblioteca_simulada.prestar_libro("ISBN-001", "U001", dias_prestamo=7)
+        reloj = biblioteca_simulada.reloj
+        
+        with reloj.congelado(datetime(2024, 1, 9, 9, 0)):
+            assert biblioteca_simulada.estadisticas()['prestamos_vencidos'] == 1
+        with reloj.congelado(datetime(2024, 1, 8, 9, 0)):
+            assert biblioteca_simulada.estadisticas()['prestamos_vencidos'] == 0
+        assert biblioteca_simulada.estadisticas()['prestamos_vencidos'] == 0
+    
+    def test_devolver_lote_con_un_solo_instante(self, biblioteca_con_datos):
+        """Test: Todas las devoluciones de un lote comparten la misma fecha"""
+        biblioteca_con_datos.prestar_lote([("ISBN-000", "U001"), ("ISBN-001", "U002")])
+        
+        resultado = biblioteca_con_datos.devolver_lote([("ISBN-000", "U001"), ("ISBN-001", "U002")])
+        
+        fechas = {p.fecha_devolucion for p in resultado['realizados']}
+        assert len(fechas) == 1
+    
+    # ==================== TESTS DE CONSULTAS PAGINADAS ====================
+    
+    @staticmethod
+    def paginar(consulta, tamano, clave):
+        """Recorre una consulta iter_* página a página y retorna las páginas"""
+        paginas, despues = [], None
+        while True:
+            pagina = list(consulta(limite=tamano, despues=despues))
+            paginas.append(pagina)
+            if len(pagina) < tamano:
+                return paginas
+            despues = clave(pagina[-1])
+    
+    def test_iter_libros_disponibles_por_isbn(self, biblioteca):
+        """Test: Los libros disponibles se paginan en orden de ISBN"""
+        for i in [5, 3, 9, 1, 7, 2, 8, 0, 6, 4]:
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", f"Autor {i % 2}"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        biblioteca.prestar_libro("ISBN-003", "U001")
+        
+        paginas = self.paginar(biblioteca.iter_libros_disponibles, 4, lambda l: l.isbn)
+        
+        assert [[l.isbn[-1] for l in p] for p in paginas] == [list("0124"), list("5678"), ["9"]]
+        biblioteca.agregar_libro(Libro("ISBN-0055", "Nuevo", "Autor"))
+        assert [l.isbn for l in biblioteca.iter_libros_disponibles(2, despues="ISBN-005")] == [
+            "ISBN-0055", "ISBN-006"]
+    
+    def test_iter_busquedas_paginadas(self, biblioteca):
+        """Test: Las búsquedas por título y autor se paginan en orden de ISBN"""
+        for i in [5, 3, 9, 1, 7]:
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", f"Autor {i % 3}"))
+        
+        paginas = self.paginar(lambda **k: biblioteca.iter_buscar_libros_por_titulo("libro", **k),
+                               2, lambda l: l.isbn)
+        
+        assert [[l.isbn for l in p] for p in paginas] == [
+            ["ISBN-001", "ISBN-003"], ["ISBN-005", "ISBN-007"], ["ISBN-009"]]
+        assert [l.isbn for l in biblioteca.iter_buscar_libros_por_autor(
+            "autor 1", despues="ISBN-001")] == ["ISBN-007"]
+    
+    def test_iter_prestamos_paginados(self, biblioteca_simulada):
+        """Test: Activos, vencidos e historial se paginan por fecha e ID sin repetir"""
+        biblioteca = biblioteca_simulada
+        for i in range(2, 7):
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U002", "Carlos López", limite_prestamos=6))
+        biblioteca.prestar_libro("ISBN-001", "U002", dias_prestamo=30)
+        biblioteca.reloj.avanzar(days=1)
+        # Un lote comparte fecha: el ID desempata
+        biblioteca.prestar_lote([(f"ISBN-00{i}", "U002") for i in range(2, 7)], dias_prestamo=1)
+        biblioteca.reloj.avanzar(days=5)
+        biblioteca.devolver_libro("ISBN-004", "U002")
+        
+        activos = self.paginar(biblioteca.iter_prestamos_activos, 2, lambda p: p.id)
+        vencidos = self.paginar(biblioteca.iter_prestamos_vencidos, 3, lambda p: p.id)
+        historial = self.paginar(lambda **k: biblioteca.iter_prestamos_usuario("U002", **k),
+                                 4, lambda p: p.id)
+        
+        ids = [p.id for p in biblioteca.prestamos_usuario("U002")]
+        assert [p.id for pagina in historial for p in pagina] == ids
+        assert [p.id for pagina in activos for p in pagina] == [i for i in ids if i != ids[3]]
+        assert [p.id for pagina in vencidos for p in pagina] == [i for i in ids[1:] if i != ids[3]]
+    
+    def test_iter_paginas_sin_recorrer_el_resto(self, biblioteca):
+        """Test: Una página de búsqueda examina solo los documentos que necesita"""
+        for i in range(500):
+            biblioteca.agregar_libro(Libro(f"ISBN-{i:04d}", f"Libro {i}", "Autor"))
+        biblioteca.buscar_libros_por_titulo("libro")
+        antes = biblioteca._indice_titulos.recorridos
+        
+        pagina = list(biblioteca.iter_buscar_libros_por_titulo("libro", limite=3, despues="ISBN-0250"))
+        
+        assert [l.isbn for l in pagina] == ["ISBN-0251", "ISBN-0252", "ISBN-0253"]
+        assert biblioteca._indice_titulos.recorridos - antes == 3
+    
+    def test_iter_prestamos_con_devoluciones_durante_el_recorrido(self, biblioteca):
+        """Test: Los iteradores de préstamos saltan los devueltos aunque ya estén abiertos"""
+        for i in range(6):
+            biblioteca.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García", limite_prestamos=6))
+        prestamos = [biblioteca.prestar_libro(f"ISBN-00{i}", "U001") for i in range(6)]
+        
+        activos = biblioteca.iter_prestamos_activos()
+        assert next(activos) is prestamos[0]
+        for i in (1, 2, 3, 5):
+            biblioteca.devolver_libro(f"ISBN-00{i}", "U001")
+        
+        assert list(activos) == [prestamos[4]]
+        assert [p.id for p in biblioteca.iter_prestamos_activos()] == [
+            prestamos[0].id, prestamos[4].id]
+    
+    def test_iter_limite_y_cursor_invalidos(self, biblioteca):
+        """Test: Un límite negativo o un préstamo desconocido como cursor fallan al llamar"""
+        with pytest.raises(ValueError, match="El límite no puede ser negativo"):
+            biblioteca.iter_libros_disponibles(limite=-1)
+        with pytest.raises(ValueError, match="El préstamo PREST-99999 no existe"):
+            biblioteca.iter_prestamos_activos(despues="PREST-99999")
+        assert list(biblioteca.iter_prestamos_usuario("U999")) == []
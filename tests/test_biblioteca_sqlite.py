@@ -0,0 +1,270 @@
+"""
+Tests para BibliotecaSQLite
+"""
+import pytest
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from biblioteca import biblioteca_sqlite
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.biblioteca_sqlite import BibliotecaSQLite
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class TestBibliotecaSQLite:
+    """Suite de tests para la clase BibliotecaSQLite"""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca SQLite en memoria con libros y usuarios"""
+        biblioteca = BibliotecaSQLite(nombre="SQLite")
+        biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin",
+                                       fecha_publicacion=datetime(2008, 8, 1)))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Clean Architecture", "Robert C. Martin"))
+        biblioteca.agregar_libro(Libro("ISBN-003", "Refactoring", "Martin Fowler"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García", "ana@email.com"))
+        biblioteca.registrar_usuario(Usuario("U002", "Carlos López", limite_prestamos=1))
+        yield biblioteca
+        biblioteca.cerrar()
+    
+    def test_libros_y_busquedas(self, biblioteca):
+        """Test: Búsquedas por ISBN, título y autor"""
+        libro = biblioteca.buscar_libro_por_isbn("ISBN-001")
+        
+        assert libro == Libro("ISBN-001", "Clean Code", "Robert C. Martin")
+        assert libro.fecha_publicacion == datetime(2008, 8, 1)
+        assert biblioteca.buscar_libro_por_isbn("ISBN-999") is None
+        assert [l.isbn for l in biblioteca.buscar_libros_por_titulo("CLEAN")] == ["ISBN-001", "ISBN-002"]
+        assert [l.isbn for l in biblioteca.buscar_libros_por_autor("martin")] == ["ISBN-001", "ISBN-002", "ISBN-003"]
+        assert len(biblioteca.buscar_libros_por_titulo("")) == 3
+        assert "ISBN-003" in biblioteca.catalogo
+        assert list(biblioteca.catalogo) == ["ISBN-001", "ISBN-002", "ISBN-003"]
+    
+    def test_duplicados_fallan(self, biblioteca):
+        """Test: Libros y usuarios duplicados deben fallar"""
+        with pytest.raises(ValueError, match="ya existe en el catálogo"):
+            biblioteca.agregar_libro(Libro("ISBN-001", "Otro", "Otro"))
+        with pytest.raises(ValueError, match="ya está registrado"):
+            biblioteca.registrar_usuario(Usuario("U001", "Otro"))
+    
+    def test_flujo_prestamo_y_devolucion(self, biblioteca):
+        """Test: Prestar y devolver actualiza libros, usuarios y estadísticas"""
+        biblioteca.buscar_libro_por_isbn("ISBN-001")
+        prestamo = biblioteca.prestar_libro("ISBN-001", "U001")
+        
+        assert prestamo.id == "PREST-00001"
+        assert not biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+        assert biblioteca.buscar_usuario("U001").libros_prestados == {"ISBN-001"}
+        assert [p.id for p in biblioteca.prestamos_activos()] == ["PREST-00001"]
+        with pytest.raises(ValueError, match="no está disponible"):
+            biblioteca.prestar_libro("ISBN-001", "U002")
+        
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+        assert biblioteca.prestamos["PREST-00001"].fecha_devolucion is not None
+        assert biblioteca.prestamos_activos() == []
+        with pytest.raises(ValueError, match="No existe un préstamo activo"):
+            biblioteca.devolver_libro("ISBN-001", "U001")
+    
+    def test_validaciones_de_prestamo_no_dejan_cambios(self, biblioteca):
+        """Test: Un préstamo rechazado no consume IDs ni modifica el estado"""
+        biblioteca.prestar_libro("ISBN-001", "U002")
+        
+        with pytest.raises(ValueError, match="ha alcanzado el límite"):
+            biblioteca.prestar_libro("ISBN-002", "U002")
+        with pytest.raises(ValueError, match="no está registrado"):
+            biblioteca.prestar_libro("ISBN-002", "U999")
+        with pytest.raises(ValueError, match="no existe en el catálogo"):
+            biblioteca.prestar_libro("ISBN-999", "U001")
+        
+        assert biblioteca.prestar_libro("ISBN-002", "U001").id == "PREST-00002"
+        assert biblioteca.verificar_indice_activos()
+    
+    def test_prestar_y_devolver_lote(self, biblioteca):
+        """Test: Los lotes se validan y aplican en una sola transacción"""
+        with pytest.raises(ValueError, match="Lote rechazado"):
+            biblioteca.prestar_lote([("ISBN-001", "U002"), ("ISBN-002", "U002")])
+        assert biblioteca.total_prestamos() == 0
+        
+        resultado = biblioteca.prestar_lote(
+            [("ISBN-001", "U002"), ("ISBN-002", "U002"), ("ISBN-003", "U001")], atomico=False)
+        
+        assert [p.id for p in resultado['realizados']] == ["PREST-00001", "PREST-00002"]
+        assert resultado['errores'] == [(2, "El usuario ha alcanzado el límite de 1 préstamos")]
+        assert not biblioteca.buscar_libro_por_isbn("ISBN-003").disponible
+        
+        devueltos = biblioteca.devolver_lote([("ISBN-001", "U002"), ("ISBN-003", "U001")])
+        
+        assert all(not p.esta_activo() for p in devueltos['realizados'])
+        assert biblioteca.prestamos_activos() == []
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+        assert biblioteca.prestar_libro("ISBN-001", "U001").id == "PREST-00003"
+    
+    def test_vencidos_e_historial(self, biblioteca):
+        """Test: Vencimientos e historial por usuario"""
+        biblioteca.prestar_libro("ISBN-001", "U001", dias_prestamo=7)
+        biblioteca.prestar_libro("ISBN-002", "U001", dias_prestamo=30)
+        biblioteca.devolver_libro("ISBN-002", "U001")
+        
+        assert biblioteca.prestamos_vencidos() == []
+        assert [p.id for p in biblioteca.vencidos_hasta(datetime.now() + timedelta(days=60))] == ["PREST-00001"]
+        assert [p.id for p in biblioteca.prestamos_usuario("U001")] == ["PREST-00001", "PREST-00002"]
+        assert [p.id for p in biblioteca.ultimos_prestamos_usuario("U001", 1)] == ["PREST-00002"]
+        assert biblioteca.prestamos_usuario("U001", desde=datetime.now() + timedelta(days=1)) == []
+    
+    def test_estadisticas(self, biblioteca):
+        """Test: Estadísticas calculadas con consultas agregadas"""
+        biblioteca.depuracion = True
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        
+        stats = biblioteca.estadisticas()
+        
+        assert stats == {
+            'total_libros': 3, 'libros_disponibles': 2, 'libros_prestados': 1,
+            'total_ejemplares': 3, 'ejemplares_disponibles': 2, 'total_usuarios': 2, 'total_prestamos': 1, 'prestamos_activos': 1,
+            'prestamos_vencidos': 0
+        }
+    
+    def test_importar_con_duplicados(self, biblioteca):
+        """Test: La importación masiva reporta duplicados"""
+        libros = [Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor") for i in range(1, 11)]
+        
+        resultado = biblioteca.importar_libros(libros, tamano_lote=4)
+        
+        assert resultado['importados'] == 7
+        assert resultado['duplicados'] == ["ISBN-001", "ISBN-002", "ISBN-003"]
+        assert biblioteca.total_libros() == 10
+    
+    def test_varios_ejemplares(self, biblioteca):
+        """Test: Los ejemplares disponibles se descuentan en la base de datos"""
+        biblioteca.depuracion = True
+        biblioteca.agregar_libro(Libro("ISBN-004", "Dune", "Frank Herbert", ejemplares=2))
+        
+        biblioteca.prestar_libro("ISBN-004", "U001")
+        with pytest.raises(ValueError, match="ya tiene este libro prestado"):
+            biblioteca.prestar_libro("ISBN-004", "U001")
+        assert biblioteca.buscar_libro_por_isbn("ISBN-004").ejemplares_disponibles == 1
+        assert [l.isbn for l in biblioteca.libros_disponibles()][-1] == "ISBN-004"
+        
+        biblioteca.prestar_lote([("ISBN-004", "U002")])
+        assert not biblioteca.buscar_libro_por_isbn("ISBN-004").disponible
+        assert biblioteca.estadisticas()['ejemplares_disponibles'] == 3
+        
+        biblioteca.devolver_libro("ISBN-004", "U001")
+        assert biblioteca.buscar_libro_por_isbn("ISBN-004").ejemplares_disponibles == 1
+        assert biblioteca.verificar_indice_activos()
+    
+    def test_version_de_esquema_no_soportada(self, tmp_path):
+        """Test: Una base con una versión de esquema desconocida no se abre"""
+        ruta = str(tmp_path / "biblioteca.db")
+        BibliotecaSQLite(ruta).cerrar()
+        conexion = sqlite3.connect(ruta)
+        conexion.execute("PRAGMA user_version = 99")
+        conexion.close()
+        
+        with pytest.raises(ValueError, match="Versión de esquema no soportada: 99"):
+            BibliotecaSQLite(ruta)
+    
+    def test_persistencia_en_archivo(self, tmp_path):
+        """Test: El estado se conserva al reabrir el archivo de base de datos"""
+        ruta = str(tmp_path / "biblioteca.db")
+        biblioteca = BibliotecaSQLite(ruta)
+        biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        biblioteca.cerrar()
+        
+        reabierta = BibliotecaSQLite(ruta)
+        
+        assert not reabierta.buscar_libro_por_isbn("ISBN-001").disponible
+        assert reabierta.prestamos_activos()[0].id_usuario == "U001"
+        reabierta.devolver_libro("ISBN-001", "U001")
+        assert reabierta.prestar_libro("ISBN-001", "U001").id == "PREST-00002"
+        reabierta.cerrar()
+    
+    def test_cache_descarta_lecturas_anteriores_a_una_escritura(self, biblioteca, monkeypatch):
+        """Test: Una fila leída antes de un COMMIT no queda en la caché de libros"""
+        consultar_uno = biblioteca._consultar_uno
+        
+        def leer_y_prestar(sql, parametros=()):
+            fila = consultar_uno(sql, parametros)
+            monkeypatch.setattr(biblioteca, "_consultar_uno", consultar_uno)
+            biblioteca.prestar_libro("ISBN-001", "U001")
+            return fila
+        
+        monkeypatch.setattr(biblioteca, "_consultar_uno", leer_y_prestar)
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+        
+        libro = biblioteca.buscar_libro_por_isbn("ISBN-001")
+        assert not libro.disponible
+        libro.ejemplares_disponibles = 5
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").ejemplares_disponibles == 0
+    
+    def test_lecturas_concurrentes(self, tmp_path):
+        """Test: Varios hilos leen en paralelo a través del pool de conexiones"""
+        biblioteca = BibliotecaSQLite(str(tmp_path / "biblioteca.db"), tamano_pool=2, tamano_cache=0)
+        biblioteca.importar_libros(Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor") for i in range(100))
+        
+        with ThreadPoolExecutor(max_workers=8) as ejecutor:
+            titulos = list(ejecutor.map(
+                lambda i: biblioteca.buscar_libro_por_isbn(f"ISBN-{i:03d}").titulo, range(100)))
+        
+        assert titulos == [f"Libro {i}" for i in range(100)]
+        biblioteca.cerrar()
+    
+    def test_lecturas_y_escrituras_concurrentes_en_memoria(self):
+        """Test: En la base por defecto, los lectores del pool no fallan mientras otros hilos escriben"""
+        biblioteca = BibliotecaSQLite()
+        biblioteca.importar_libros(Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor") for i in range(40))
+        biblioteca.importar_usuarios(Usuario(f"U{i}", f"Usuario {i}", limite_prestamos=40)
+                                     for i in range(4))
+        
+        def escribir(i):
+            for _ in range(5):
+                for j in range(i, 40, 4):
+                    biblioteca.prestar_libro(f"ISBN-{j:03d}", f"U{i}")
+                for j in range(i, 40, 4):
+                    biblioteca.devolver_libro(f"ISBN-{j:03d}", f"U{i}")
+        
+        def leer(_):
+            for _ in range(50):
+                biblioteca.prestamos_activos()
+                biblioteca.libros_disponibles()
+                biblioteca.prestamos_usuario("U0")
+        
+        with ThreadPoolExecutor(max_workers=8) as ejecutor:
+            futuros = [ejecutor.submit(escribir, i) for i in range(4)]
+            futuros += [ejecutor.submit(leer, i) for i in range(4)]
+            for futuro in futuros:
+                futuro.result()
+        
+        assert biblioteca.prestamos_activos() == []
+        assert biblioteca.total_prestamos() == 200
+        assert biblioteca.verificar_contadores()
+        biblioteca.cerrar()
+    
+    def test_consultas_paginadas_como_en_memoria(self, biblioteca, monkeypatch):
+        """Test: Las consultas iter_* recorren bloques y coinciden con la biblioteca en memoria"""
+        monkeypatch.setattr(biblioteca_sqlite, "_FILAS_POR_BLOQUE", 2)
+        memoria = Biblioteca()
+        for libro in biblioteca.catalogo.values():
+            memoria.agregar_libro(libro)
+        for usuario in biblioteca.usuarios.values():
+            memoria.registrar_usuario(usuario)
+        for objetivo in (biblioteca, memoria):
+            for i in range(4, 9):
+                objetivo.agregar_libro(Libro(f"ISBN-00{i}", f"Libro {i}", "Autor"))
+            objetivo.prestar_lote([(f"ISBN-00{i}", "U001") for i in (5, 4, 3)], dias_prestamo=1)
+        
+        for consulta, argumentos in [("iter_libros_disponibles", ()),
+                                     ("iter_buscar_libros_por_autor", ("martin",)),
+                                     ("iter_prestamos_activos", ()),
+                                     ("iter_prestamos_usuario", ("U001",))]:
+            esperado = [repr(x) for x in getattr(memoria, consulta)(*argumentos)]
+            assert [repr(x) for x in getattr(biblioteca, consulta)(*argumentos)] == esperado
+            assert [repr(x) for x in getattr(biblioteca, consulta)(*argumentos, 3)] == esperado[:3]
+        
+        ids = [p.id for p in biblioteca.iter_prestamos_activos()]
+        assert [p.id for p in biblioteca.iter_prestamos_activos(despues=ids[0])] == ids[1:]
@@ -0,0 +1,208 @@
+"""
+Tests de la caché de resultados de las consultas del catálogo
+"""
+import random
+import sys
+import threading
+import pytest
+from biblioteca import Biblioteca, Libro, Usuario
+from biblioteca.cache_consultas import CacheConsultas
+from biblioteca.catalogo_columnar import CatalogoColumnar
+from biblioteca.concurrente import BibliotecaConcurrente
+
+
+def _poblar(biblioteca, libros=60, usuarios=5):
+    """Agrega libros con títulos y autores repetidos y usuarios sin límite práctico"""
+    for i in range(libros):
+        biblioteca.agregar_libro(Libro(f"ISBN-{i:03d}", f"Código {i % 7}", f"Autor {i % 5}",
+                                       ejemplares=1 + i % 2))
+    for i in range(usuarios):
+        biblioteca.registrar_usuario(Usuario(f"U{i}", f"Usuario {i}", limite_prestamos=100))
+    return biblioteca
+
+
+class TestCacheConsultas:
+    """Suite de tests para CacheConsultas"""
+    
+    def test_acierto_tras_fallo(self):
+        """Test: La segunda consulta igual se sirve de la caché sin recalcular"""
+        cache = CacheConsultas()
+        llamadas = []
+        
+        def calcular():
+            llamadas.append(1)
+            return ["a"]
+        
+        assert cache.consultar(('titulo', 'x'), calcular) == ["a"]
+        assert cache.consultar(('titulo', 'x'), calcular) == ["a"]
+        
+        assert len(llamadas) == 1
+        estadisticas = cache.estadisticas()
+        assert estadisticas['aciertos'] == 1
+        assert estadisticas['fallos'] == 1
+        assert estadisticas['tasa_aciertos'] == 0.5
+    
+    def test_resultado_es_copia(self):
+        """Test: Modificar la lista retornada no altera la entrada guardada"""
+        cache = CacheConsultas()
+        cache.consultar(('titulo', 'x'), lambda: ["a"]).append("b")
+        
+        assert cache.consultar(('titulo', 'x'), lambda: []) == ["a"]
+    
+    def test_desalojo_lru(self):
+        """Test: Al superar la capacidad sale la entrada usada hace más tiempo"""
+        cache = CacheConsultas(capacidad=2)
+        cache.consultar(('titulo', 'a'), lambda: [1])
+        cache.consultar(('titulo', 'b'), lambda: [2])
+        cache.consultar(('titulo', 'a'), lambda: [])
+        cache.consultar(('titulo', 'c'), lambda: [3])
+        
+        assert cache.consultar(('titulo', 'a'), lambda: []) == [1]
+        assert cache.consultar(('titulo', 'b'), lambda: []) == []
+        assert cache.estadisticas()['desalojadas'] == 2
+        assert len(cache) == 2
+    
+    def test_ttl(self):
+        """Test: Una entrada caducada se recalcula"""
+        ahora = [0.0]
+        cache = CacheConsultas(ttl=10, tiempo=lambda: ahora[0])
+        cache.consultar(('titulo', 'a'), lambda: [1])
+        
+        ahora[0] = 9.9
+        assert cache.consultar(('titulo', 'a'), lambda: [2]) == [1]
+        ahora[0] = 10
+        assert cache.consultar(('titulo', 'a'), lambda: [2]) == [2]
+        assert cache.estadisticas()['expiradas'] == 1
+    
+    def test_no_guarda_resultados_de_una_version_anterior(self):
+        """Test: Un resultado calculado mientras cambia la biblioteca no se guarda"""
+        cache = CacheConsultas()
+        
+        def calcular():
+            cache.vaciar()
+            return [1]
+        
+        cache.consultar(('titulo', 'a'), calcular)
+        
+        assert len(cache) == 0
+    
+    @pytest.mark.parametrize("capacidad,ttl,mensaje", [
+        (0, None, "capacidad"),
+        (10, 0, "ttl"),
+    ])
+    def test_parametros_invalidos(self, capacidad, ttl, mensaje):
+        """Test: Capacidad menor que 1 o ttl no positivo lanzan ValueError"""
+        with pytest.raises(ValueError, match=mensaje):
+            CacheConsultas(capacidad=capacidad, ttl=ttl)
+
+
+class TestBibliotecaConCache:
+    """Suite de tests de la caché integrada en Biblioteca"""
+    
+    @pytest.fixture(params=["memoria", "columnar"])
+    def bibliotecas(self, request):
+        """Fixture: Biblioteca con caché y otra igual sin caché"""
+        def crear(cache):
+            catalogo = CatalogoColumnar() if request.param == "columnar" else None
+            return _poblar(Biblioteca(catalogo=catalogo, cache_consultas=cache))
+        return crear(CacheConsultas()), crear(None)
+    
+    @staticmethod
+    def _consultas(biblioteca):
+        return (
+            [libro.isbn for libro in biblioteca.buscar_libros_por_titulo("codigo 3")],
+            [libro.isbn for libro in biblioteca.buscar_libros_por_autor("AUTOR")],
+            [libro.isbn for libro in biblioteca.buscar_libros_por_titulo("ó")],
+            [libro.isbn for libro in biblioteca.libros_disponibles()],
+        )
+    
+    def test_misma_respuesta_que_sin_cache(self, bibliotecas):
+        """Test: Tras préstamos, devoluciones y altas los resultados coinciden con los de la biblioteca sin caché"""
+        con_cache, sin_cache = bibliotecas
+        azar = random.Random(0)
+        activos = []
+        
+        for paso in range(300):
+            if paso % 25 == 0:
+                libro = Libro(f"NUEVO-{paso}", f"Código {paso % 4} nuevo", f"Autora {paso}")
+                con_cache.agregar_libro(libro)
+                sin_cache.agregar_libro(Libro(libro.isbn, libro.titulo, libro.autor))
+            elif activos and azar.random() < 0.4:
+                par = activos.pop(azar.randrange(len(activos)))
+                con_cache.devolver_libro(*par)
+                sin_cache.devolver_libro(*par)
+            else:
+                disponibles = sin_cache.libros_disponibles()
+                par = (azar.choice(disponibles).isbn, f"U{azar.randrange(5)}")
+                if par in activos:
+                    continue
+                con_cache.prestar_libro(*par)
+                sin_cache.prestar_libro(*par)
+                activos.append(par)
+            assert self._consultas(con_cache) == self._consultas(sin_cache)
+        
+        estadisticas = con_cache.cache_consultas.estadisticas()
+        assert estadisticas['fallos'] == 4
+        assert estadisticas['actualizaciones'] > 0
+    
+    def test_agregar_libro_solo_afecta_a_las_consultas_que_coinciden(self, bibliotecas):
+        """Test: Un libro nuevo se agrega a las búsquedas que lo incluyen y no toca las demás"""
+        biblioteca, _ = bibliotecas
+        biblioteca.buscar_libros_por_titulo("Código 1")
+        biblioteca.buscar_libros_por_titulo("Código 2")
+        
+        biblioteca.agregar_libro(Libro("NUEVO", "Código 1 bis", "Otro"))
+        
+        assert biblioteca.cache_consultas.estadisticas()['actualizaciones'] == 1
+        assert biblioteca.buscar_libros_por_titulo("codigo 1")[-1].isbn == "NUEVO"
+        assert "NUEVO" not in [l.isbn for l in biblioteca.buscar_libros_por_titulo("Código 2")]
+        assert biblioteca.cache_consultas.estadisticas()['fallos'] == 2
+    
+    def test_prestamo_actualiza_disponibles_sin_invalidar(self, bibliotecas):
+        """Test: Prestar el último ejemplar y devolverlo actualiza la lista de disponibles guardada"""
+        biblioteca, _ = bibliotecas
+        total = len(biblioteca.libros_disponibles())
+        
+        biblioteca.prestar_libro("ISBN-000", "U0")
+        
+        assert len(biblioteca.libros_disponibles()) == total - 1
+        biblioteca.devolver_libro("ISBN-000", "U0")
+        assert [l.isbn for l in biblioteca.libros_disponibles()][0] == "ISBN-000"
+        assert biblioteca.cache_consultas.estadisticas()['fallos'] == 1
+    
+    def test_importacion_vacia_la_cache(self):
+        """Test: Una importación masiva descarta las entradas guardadas"""
+        biblioteca = _poblar(Biblioteca(cache_consultas=CacheConsultas()))
+        biblioteca.buscar_libros_por_titulo("Código")
+        
+        biblioteca.importar_libros([Libro("IMP-1", "Código importado", "Autor")])
+        
+        assert biblioteca.buscar_libros_por_titulo("importado")[0].isbn == "IMP-1"
+        assert biblioteca.buscar_libros_por_titulo("Código")[-1].isbn == "IMP-1"
+    
+    def test_concurrente(self):
+        """Test: Con préstamos y consultas simultáneas la caché termina igual que un recuento"""
+        anterior = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            biblioteca = _poblar(BibliotecaConcurrente(cache_consultas=CacheConsultas()),
+                                 libros=100, usuarios=8)
+            barrera = threading.Barrier(8)
+            
+            def trabajar(i):
+                barrera.wait()
+                for j in range(i, 100, 8):
+                    biblioteca.prestar_libro(f"ISBN-{j:03d}", f"U{i}")
+                    biblioteca.libros_disponibles()
+                    biblioteca.buscar_libros_por_autor("Autor 1")
+            
+            hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(8)]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+        finally:
+            sys.setswitchinterval(anterior)
+        
+        esperado = [libro.isbn for libro in biblioteca.catalogo.values() if libro.disponible]
+        assert [libro.isbn for libro in biblioteca.libros_disponibles()] == esperado
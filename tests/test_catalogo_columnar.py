@@ -0,0 +1,105 @@
+"""
+Tests unitarios para el catálogo columnar
+"""
+import pytest
+from datetime import datetime
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.catalogo_columnar import CatalogoColumnar, LibroColumnar
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class TestCatalogoColumnar:
+    """Suite de tests para la clase CatalogoColumnar"""
+    
+    @pytest.fixture
+    def catalogo(self):
+        """Fixture: Catálogo columnar con dos libros"""
+        catalogo = CatalogoColumnar()
+        catalogo["ISBN-001"] = Libro("ISBN-001", "Cien años de soledad", "Gabriel García Márquez",
+                                     fecha_publicacion=datetime(1967, 5, 30))
+        catalogo["ISBN-002"] = Libro("ISBN-002", "Clean Code", "Robert C. Martin")
+        return catalogo
+    
+    def test_materializa_vistas_con_los_campos(self, catalogo):
+        """Test: Las vistas exponen los campos almacenados en columnas"""
+        libro = catalogo["ISBN-001"]
+        
+        assert isinstance(libro, LibroColumnar)
+        assert libro.titulo == "Cien años de soledad"
+        assert libro.autor == "Gabriel García Márquez"
+        assert libro.autor_busqueda == "gabriel garcia marquez"
+        assert libro.fecha_publicacion == datetime(1967, 5, 30)
+        assert libro.disponible
+        assert catalogo["ISBN-002"].fecha_publicacion is None
+    
+    def test_claves_de_busqueda_en_columnas(self, catalogo):
+        """Test: Las claves de búsqueda se guardan en sus columnas al insertar"""
+        libro = catalogo["ISBN-001"]
+        
+        assert libro.titulo_busqueda == catalogo._titulos_busqueda[0] == "cien anos de soledad"
+        assert libro.autor_busqueda == catalogo._autores_busqueda[0] == "gabriel garcia marquez"
+    
+    def test_busqueda_por_isbn(self, catalogo):
+        """Test: Pertenencia y búsqueda con get"""
+        assert "ISBN-001" in catalogo
+        assert "ISBN-999" not in catalogo
+        assert catalogo.get("ISBN-999") is None
+        assert list(catalogo) == ["ISBN-001", "ISBN-002"]
+        assert len(catalogo) == 2
+    
+    def test_isbn_duplicado_falla(self, catalogo):
+        """Test: Agregar un ISBN existente debe fallar"""
+        with pytest.raises(ValueError, match="ya existe en el catálogo"):
+            catalogo["ISBN-001"] = Libro("ISBN-001", "Otro", "Otro")
+    
+    def test_prestar_escribe_en_la_columna(self, catalogo):
+        """Test: Prestar una vista actualiza la disponibilidad del catálogo"""
+        catalogo["ISBN-001"].prestar()
+        
+        assert not catalogo["ISBN-001"].disponible
+        assert catalogo.contar_disponibles() == 1
+        assert [libro.isbn for libro in catalogo.disponibles()] == ["ISBN-002"]
+    
+    def test_varios_ejemplares(self, catalogo):
+        """Test: Las columnas de ejemplares siguen los préstamos de cada copia"""
+        catalogo["ISBN-003"] = Libro("ISBN-003", "Dune", "Frank Herbert", ejemplares=2)
+        libro = catalogo["ISBN-003"]
+        
+        libro.prestar()
+        assert libro.disponible
+        assert libro.ejemplares == 2
+        assert libro.ejemplares_disponibles == 1
+        libro.prestar()
+        
+        assert not libro.disponible
+        assert catalogo.contar_ejemplares() == (4, 2)
+        assert [l.isbn for l in catalogo.disponibles()] == ["ISBN-001", "ISBN-002"]
+    
+    def test_muchos_libros_redimensiona_tabla(self):
+        """Test: El índice hash sigue funcionando tras varias redimensiones"""
+        catalogo = CatalogoColumnar()
+        for i in range(1000):
+            catalogo[f"ISBN-{i:04d}"] = Libro(f"ISBN-{i:04d}", f"Libro {i}", "Autor")
+        
+        assert len(catalogo) == 1000
+        assert all(catalogo[f"ISBN-{i:04d}"].titulo == f"Libro {i}" for i in range(1000))
+        assert "ISBN-1000" not in catalogo
+    
+    def test_biblioteca_con_catalogo_columnar(self):
+        """Test: Flujo de préstamo y devolución sobre el catálogo columnar"""
+        biblioteca = Biblioteca("Columnar", catalogo=CatalogoColumnar())
+        biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin"))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Refactoring", "Martin Fowler"))
+        biblioteca.registrar_usuario(Usuario("U001", "Usuario 1"))
+        
+        biblioteca.prestar_libro("ISBN-001", "U001")
+        
+        assert not biblioteca.buscar_libro_por_isbn("ISBN-001").disponible
+        assert biblioteca.libros_disponibles() == [Libro("ISBN-002", "Refactoring", "Martin Fowler")]
+        assert [l.isbn for l in biblioteca.buscar_libros_por_autor("martin")] == ["ISBN-001", "ISBN-002"]
+        assert biblioteca.verificar_contadores()
+        
+        biblioteca.devolver_libro("ISBN-001", "U001")
+        
+        assert biblioteca.estadisticas()['libros_disponibles'] == 2
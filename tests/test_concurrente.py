@@ -0,0 +1,168 @@
+"""
+Tests de estrés para la biblioteca concurrente
+"""
+import random
+import sys
+import threading
+import pytest
+from biblioteca.concurrente import BibliotecaConcurrente, CerrojosPorClave
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+HILOS = 8
+
+
+def en_hilos(funcion, hilos=HILOS):
+    """Ejecuta ``funcion(i)`` en varios hilos que arrancan a la vez y propaga errores"""
+    barrera = threading.Barrier(hilos)
+    errores = []
+    
+    def ejecutar(i):
+        barrera.wait()
+        try:
+            funcion(i)
+        except Exception as error:  # pragma: no cover - solo si falla el test
+            errores.append(error)
+    
+    trabajadores = [threading.Thread(target=ejecutar, args=(i,)) for i in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    assert errores == []
+
+
+class TestBibliotecaConcurrente:
+    """Suite de tests de estrés para BibliotecaConcurrente"""
+    
+    @pytest.fixture(autouse=True)
+    def cambios_de_hilo_frecuentes(self):
+        """Fixture: Fuerza cambios de hilo frecuentes para exponer condiciones de carrera"""
+        anterior = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(anterior)
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca concurrente con 200 libros y 50 usuarios"""
+        biblioteca = BibliotecaConcurrente()
+        for i in range(200):
+            biblioteca.agregar_libro(Libro(f"ISBN-{i:03d}", f"Libro {i}", f"Autor {i % 10}"))
+        for i in range(50):
+            biblioteca.registrar_usuario(Usuario(f"U{i:03d}", f"Usuario {i}", limite_prestamos=200))
+        return biblioteca
+    
+    def test_un_solo_prestamo_por_libro(self, biblioteca):
+        """Test: Varios hilos compiten por el mismo libro y solo uno lo obtiene"""
+        exitos = []
+        
+        def prestar(i):
+            try:
+                exitos.append(biblioteca.prestar_libro("ISBN-000", f"U{i:03d}"))
+            except ValueError:
+                pass
+        
+        en_hilos(prestar)
+        
+        assert len(exitos) == 1
+        assert len(biblioteca.prestamos_activos()) == 1
+        assert biblioteca.verificar_contadores()
+    
+    def test_limite_de_usuario_con_hilos(self, biblioteca):
+        """Test: Préstamos simultáneos a un usuario respetan su límite"""
+        biblioteca.registrar_usuario(Usuario("LIM", "Usuario limitado", limite_prestamos=2))
+        exitos = []
+        
+        def prestar(i):
+            try:
+                exitos.append(biblioteca.prestar_libro(f"ISBN-{i:03d}", "LIM"))
+            except ValueError:
+                pass
+        
+        en_hilos(prestar)
+        
+        assert len(exitos) == 2
+        assert biblioteca.buscar_usuario("LIM").numero_prestamos() == 2
+    
+    def test_ids_unicos(self, biblioteca):
+        """Test: Los préstamos simultáneos reciben IDs distintos y consecutivos"""
+        def prestar(i):
+            for j in range(i, 200, HILOS):
+                biblioteca.prestar_libro(f"ISBN-{j:03d}", f"U{i:03d}")
+        
+        en_hilos(prestar)
+        
+        ids = sorted(biblioteca.prestamos)
+        assert ids == [f"PREST-{n:05d}" for n in range(1, 201)]
+        assert biblioteca.libros_disponibles() == []
+        assert biblioteca.verificar_contadores()
+    
+    def test_prestamos_devoluciones_y_lecturas_concurrentes(self, biblioteca):
+        """Test: Préstamos, devoluciones y lecturas simultáneas dejan un estado consistente"""
+        def operar(i):
+            azar = random.Random(i)
+            if i == 0:
+                for _ in range(300):
+                    biblioteca.libros_disponibles()
+                    biblioteca.prestamos_activos()
+                    biblioteca.prestamos_vencidos()
+                    biblioteca.buscar_libros_por_autor("autor 3")
+                    biblioteca.estadisticas()
+                return
+            for _ in range(500):
+                isbn = f"ISBN-{azar.randrange(200):03d}"
+                id_usuario = f"U{azar.randrange(50):03d}"
+                try:
+                    if azar.random() < 0.6:
+                        biblioteca.prestar_libro(isbn, id_usuario)
+                    else:
+                        biblioteca.devolver_libro(isbn, id_usuario)
+                except ValueError:
+                    pass
+        
+        en_hilos(operar)
+        
+        assert biblioteca.verificar_contadores()
+        assert biblioteca.verificar_indice_activos()
+        prestados = {p.isbn_libro for p in biblioteca.prestamos_activos()}
+        assert len(prestados) == len(biblioteca.prestamos_activos())
+        assert all(not biblioteca.buscar_libro_por_isbn(isbn).disponible for isbn in prestados)
+    
+    def test_lotes_concurrentes(self, biblioteca):
+        """Test: Lotes simultáneos que se solapan no prestan dos veces un libro"""
+        realizados = []
+        
+        def prestar(i):
+            pares = [(f"ISBN-{j:03d}", f"U{i:03d}") for j in range(i * 10, i * 10 + 40)]
+            realizados.extend(biblioteca.prestar_lote(pares, atomico=False)['realizados'])
+        
+        en_hilos(prestar)
+        
+        assert len(realizados) == 110
+        assert len({p.isbn_libro for p in realizados}) == 110
+        assert len({p.id for p in realizados}) == 110
+        assert biblioteca.verificar_contadores()
+    
+    def test_altas_concurrentes_sin_duplicados(self):
+        """Test: Altas simultáneas del mismo ISBN solo registran un libro"""
+        biblioteca = BibliotecaConcurrente()
+        exitos = []
+        
+        def agregar(i):
+            try:
+                exitos.append(biblioteca.agregar_libro(Libro("ISBN-X", f"Libro {i}", "Autor")))
+            except ValueError:
+                pass
+        
+        en_hilos(agregar)
+        
+        assert len(exitos) == 1
+        assert biblioteca.total_libros() == 1
+        assert len(biblioteca.buscar_libros_por_autor("autor")) == 1
+    
+    def test_cerrojos_invalidos_falla(self):
+        """Test: Crear cerrojos con cantidad menor que 1 debe fallar"""
+        with pytest.raises(ValueError, match="al menos 1"):
+            CerrojosPorClave(0)
@@ -0,0 +1,204 @@
+"""
+Tests de la biblioteca repartida entre procesos
+"""
+import threading
+import pytest
+from datetime import datetime
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.fragmentada import BibliotecaFragmentada
+from biblioteca.libro import Libro
+from biblioteca.reloj import RelojSimulado
+from biblioteca.usuario import Usuario
+
+
+def libros():
+    """Libros de prueba, algunos con dos ejemplares"""
+    return [Libro(f"ISBN-{i:03d}", f"Libro {i}", f"Autor {i % 4}", ejemplares=1 + i % 2)
+            for i in range(20)]
+
+
+def usuarios():
+    """Usuarios de prueba con límite de dos préstamos"""
+    return [Usuario(f"U{i:02d}", f"Usuario {i}", limite_prestamos=2) for i in range(12)]
+
+
+class TestBibliotecaFragmentada:
+    """Suite de tests para BibliotecaFragmentada"""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca de tres fragmentos con libros y usuarios"""
+        biblioteca = BibliotecaFragmentada(3, nombre="Red")
+        biblioteca.importar_libros(libros())
+        biblioteca.importar_usuarios(usuarios())
+        yield biblioteca
+        biblioteca.cerrar()
+    
+    def par_entre_fragmentos(self, biblioteca, isbn):
+        """Retorna un usuario alojado en un fragmento distinto al del libro"""
+        return next(u.id for u in usuarios()
+                    if biblioteca._fragmento(u.id) != biblioteca._fragmento(isbn))
+    
+    def test_reparte_libros_y_usuarios(self, biblioteca):
+        """Test: Cada fragmento aloja una parte y las búsquedas por clave los encuentran"""
+        assert all(total > 0 for total in biblioteca._difundir('total_libros'))
+        assert biblioteca.total_libros() == 20
+        assert biblioteca.total_usuarios() == 12
+        assert biblioteca.buscar_libro_por_isbn("ISBN-007").titulo == "Libro 7"
+        assert biblioteca.buscar_usuario("U03").nombre == "Usuario 3"
+        assert biblioteca.buscar_libro_por_isbn("ISBN-999") is None
+        assert str(biblioteca) == "Red - 20 libros, 12 usuarios en 3 fragmentos"
+        with pytest.raises(ValueError, match="ya existe en el catálogo"):
+            biblioteca.agregar_libro(Libro("ISBN-007", "Otro", "Otro"))
+    
+    def test_importar_reporta_con_posiciones_globales(self, biblioteca):
+        """Test: La importación repartida reporta duplicados y errores de la entrada"""
+        resultado = biblioteca.importar_libros(
+            [Libro("ISBN-100", "Nuevo", "Autor"), {'isbn': ''}, Libro("ISBN-001", "Repetido", "Autor")])
+        
+        assert resultado == {'importados': 1, 'duplicados': ["ISBN-001"],
+                             'errores': [(2, "El ISBN no puede estar vacío")]}
+    
+    def test_prestamo_entre_fragmentos(self, biblioteca):
+        """Test: Préstamo y devolución con el libro y el usuario en fragmentos distintos"""
+        id_usuario = self.par_entre_fragmentos(biblioteca, "ISBN-004")
+        
+        prestamo = biblioteca.prestar_libro("ISBN-004", id_usuario)
+        
+        assert prestamo.id == "PREST-00001"
+        assert not biblioteca.buscar_libro_por_isbn("ISBN-004").disponible
+        assert biblioteca.buscar_usuario(id_usuario).libros_prestados == {"ISBN-004"}
+        assert [p.id for p in biblioteca.prestamos_usuario(id_usuario)] == ["PREST-00001"]
+        assert biblioteca.verificar_contadores()
+        with pytest.raises(ValueError, match="no está disponible"):
+            biblioteca.prestar_libro("ISBN-004", "U00")
+        
+        biblioteca.devolver_libro("ISBN-004", id_usuario)
+        
+        assert biblioteca.buscar_libro_por_isbn("ISBN-004").disponible
+        assert biblioteca.prestamos_activos() == []
+        assert biblioteca.verificar_contadores()
+        with pytest.raises(ValueError, match="No existe un préstamo activo"):
+            biblioteca.devolver_libro("ISBN-004", id_usuario)
+    
+    def test_prestamo_rechazado_libera_reserva(self, biblioteca):
+        """Test: Si el fragmento del usuario rechaza el préstamo, el ejemplar se libera"""
+        id_usuario = self.par_entre_fragmentos(biblioteca, "ISBN-002")
+        biblioteca.prestar_libro("ISBN-000", id_usuario)
+        biblioteca.prestar_libro("ISBN-001", id_usuario)
+        
+        with pytest.raises(ValueError, match="límite de 2 préstamos"):
+            biblioteca.prestar_libro("ISBN-002", id_usuario)
+        with pytest.raises(ValueError, match="no está registrado"):
+            biblioteca.prestar_libro("ISBN-002", "U99")
+        
+        assert biblioteca.buscar_libro_por_isbn("ISBN-002").disponible
+        assert biblioteca.estadisticas()['prestamos_activos'] == 2
+        assert biblioteca.verificar_contadores()
+    
+    def test_fallo_de_comunicacion_libera_reserva(self, biblioteca, monkeypatch):
+        """Test: Un error que no es de validación al anotar el préstamo también libera el ejemplar"""
+        id_usuario = self.par_entre_fragmentos(biblioteca, "ISBN-002")
+        llamar = biblioteca._llamar
+        
+        def anotar_falla(i, metodo, *args):
+            if metodo == 'anotar_prestamo':
+                raise BrokenPipeError("conexión cerrada")
+            return llamar(i, metodo, *args)
+        
+        monkeypatch.setattr(biblioteca, "_llamar", anotar_falla)
+        with pytest.raises(BrokenPipeError):
+            biblioteca.prestar_libro("ISBN-002", id_usuario)
+        
+        assert biblioteca.buscar_libro_por_isbn("ISBN-002").disponible
+        assert biblioteca.verificar_contadores()
+    
+    def test_liberacion_fallida_queda_pendiente(self, biblioteca, monkeypatch):
+        """Test: Si falla liberar el ejemplar al devolver, la liberación se reintenta después"""
+        id_usuario = self.par_entre_fragmentos(biblioteca, "ISBN-002")
+        biblioteca.prestar_libro("ISBN-002", id_usuario)
+        llamar = biblioteca._llamar
+        
+        def liberar_falla(i, metodo, *args):
+            if metodo == 'liberar_ejemplar':
+                raise BrokenPipeError("conexión cerrada")
+            return llamar(i, metodo, *args)
+        
+        monkeypatch.setattr(biblioteca, "_llamar", liberar_falla)
+        with pytest.raises(BrokenPipeError):
+            biblioteca.devolver_libro("ISBN-002", id_usuario)
+        
+        assert biblioteca.prestamos_activos() == []
+        assert biblioteca.verificar_contadores()
+        monkeypatch.setattr(biblioteca, "_llamar", llamar)
+        
+        assert biblioteca.prestar_libro("ISBN-002", "U00").isbn_libro == "ISBN-002"
+        assert biblioteca._liberaciones_pendientes == {}
+        assert biblioteca.verificar_contadores()
+    
+    def test_consultas_combinadas_coinciden_con_una_biblioteca(self, biblioteca):
+        """Test: Búsquedas, listados y estadísticas combinados equivalen a un único proceso"""
+        unica = Biblioteca("Única")
+        unica.importar_libros(libros())
+        unica.importar_usuarios(usuarios())
+        for i in range(8):
+            for destino in (unica, biblioteca):
+                destino.prestar_libro(f"ISBN-{i:03d}", f"U{i:02d}", dias_prestamo=1 + i)
+        biblioteca.devolver_libro("ISBN-003", "U03")
+        unica.devolver_libro("ISBN-003", "U03")
+        
+        def isbns(resultado):
+            return sorted(libro.isbn for libro in resultado)
+        
+        assert biblioteca.estadisticas() == unica.estadisticas()
+        assert [l.isbn for l in biblioteca.buscar_libros_por_autor("autor 1")] == isbns(
+            unica.buscar_libros_por_autor("autor 1"))
+        assert [l.isbn for l in biblioteca.libros_disponibles()] == isbns(unica.libros_disponibles())
+        assert [p.id for p in biblioteca.prestamos_activos()] == [p.id for p in unica.prestamos_activos()]
+        fecha = datetime(2100, 1, 1)
+        assert [p.id for p in biblioteca.vencidos_hasta(fecha)] == [p.id for p in unica.vencidos_hasta(fecha)]
+        assert biblioteca.verificar_indice_activos()
+    
+    def test_prestamos_simultaneos_de_un_ejemplar(self, biblioteca):
+        """Test: Varios hilos piden el último ejemplar y solo uno lo obtiene"""
+        barrera = threading.Barrier(6)
+        obtenidos = []
+        
+        def pedir(i):
+            barrera.wait()
+            try:
+                obtenidos.append(biblioteca.prestar_libro("ISBN-000", f"U{i:02d}"))
+            except ValueError:
+                pass
+        
+        hilos = [threading.Thread(target=pedir, args=(i,)) for i in range(6)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        assert len(obtenidos) == 1
+        assert biblioteca.estadisticas()['prestamos_activos'] == 1
+        assert biblioteca.verificar_contadores()
+    
+    def test_reloj_del_coordinador(self):
+        """Test: Las fechas y los vencimientos de los fragmentos siguen el reloj del coordinador"""
+        reloj = RelojSimulado(datetime(2024, 1, 1))
+        with BibliotecaFragmentada(2, reloj=reloj) as biblioteca:
+            biblioteca.importar_libros(libros())
+            biblioteca.importar_usuarios(usuarios())
+            prestamo = biblioteca.prestar_libro("ISBN-000", "U00", dias_prestamo=7)
+            
+            reloj.avanzar(days=8)
+            
+            assert prestamo.fecha_prestamo == datetime(2024, 1, 1)
+            assert [p.id for p in biblioteca.prestamos_vencidos()] == [prestamo.id]
+            assert biblioteca.estadisticas()['prestamos_vencidos'] == 1
+            biblioteca.devolver_libro("ISBN-000", "U00")
+            historial = biblioteca.prestamos_usuario("U00")
+            assert historial[0].fecha_devolucion == datetime(2024, 1, 9)
+    
+    def test_fragmentos_invalidos(self):
+        """Test: Se necesita al menos un fragmento"""
+        with pytest.raises(ValueError, match="al menos 1"):
+            BibliotecaFragmentada(0)
@@ -0,0 +1,70 @@
+"""
+Tests unitarios para el historial de préstamos
+"""
+from datetime import datetime, timedelta
+from biblioteca.historial import HistorialPrestamos
+from biblioteca.prestamo import Prestamo
+
+
+BASE = datetime(2025, 1, 1)
+
+
+def crear_prestamo(id, dia):
+    """Crea un préstamo con fecha BASE + dia días"""
+    prestamo = Prestamo(id, f"ISBN-{id}", "U001")
+    prestamo.fecha_prestamo = BASE + timedelta(days=dia)
+    return prestamo
+
+
+class TestHistorialPrestamos:
+    """Suite de tests para la clase HistorialPrestamos"""
+    
+    def test_historial_vacio(self):
+        """Test: Un historial vacío no tiene préstamos"""
+        historial = HistorialPrestamos()
+        
+        assert len(historial) == 0
+        assert historial.todos() == []
+        assert historial.ultimos(5) == []
+        assert historial.entre(BASE, BASE + timedelta(days=1)) == []
+    
+    def test_inserciones_fuera_de_orden_quedan_ordenadas(self):
+        """Test: Los préstamos se mantienen ordenados por fecha"""
+        historial = HistorialPrestamos()
+        for id, dia in [("P1", 1), ("P3", 3), ("P2", 2), ("P0", 0)]:
+            historial.agregar(crear_prestamo(id, dia))
+        
+        assert [p.id for p in historial.todos()] == ["P0", "P1", "P2", "P3"]
+    
+    def test_ultimos_n(self):
+        """Test: ultimos retorna los más recientes primero"""
+        historial = HistorialPrestamos()
+        for dia in range(5):
+            historial.agregar(crear_prestamo(f"P{dia}", dia))
+        
+        assert [p.id for p in historial.ultimos(2)] == ["P4", "P3"]
+        assert len(historial.ultimos(10)) == 5
+        assert historial.ultimos(0) == []
+    
+    def test_entre_rango_inclusivo(self):
+        """Test: entre retorna los préstamos del rango, con límites inclusivos"""
+        historial = HistorialPrestamos()
+        for dia in range(10):
+            historial.agregar(crear_prestamo(f"P{dia}", dia))
+        
+        rango = historial.entre(BASE + timedelta(days=3), BASE + timedelta(days=5))
+        
+        assert [p.id for p in rango] == ["P3", "P4", "P5"]
+        assert len(historial.entre(desde=BASE + timedelta(days=8))) == 2
+        assert len(historial.entre(hasta=BASE + timedelta(days=1))) == 2
+    
+    def test_retirar_conserva_el_orden(self):
+        """Test: Retirar préstamos por ID mantiene ordenados los restantes"""
+        historial = HistorialPrestamos()
+        for i, dia in enumerate([5, 1, 3, 2]):
+            historial.agregar(crear_prestamo(f"P{i}", dia))
+        
+        historial.retirar({"P1", "P2"})
+        
+        assert [p.id for p in historial.todos()] == ["P3", "P0"]
+        assert [p.id for p in historial.entre(BASE + timedelta(days=2))] == ["P3", "P0"]
@@ -0,0 +1,77 @@
+"""
+Tests de importación masiva de libros y usuarios
+"""
+import pytest
+from datetime import datetime
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.importacion import en_lotes
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class TestImportacion:
+    """Suite de tests para importar_libros e importar_usuarios"""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca con un libro y un usuario"""
+        biblioteca = Biblioteca("Importación")
+        biblioteca.agregar_libro(Libro("ISBN-000", "Existente", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U000", "Existente"))
+        return biblioteca
+    
+    def test_en_lotes(self):
+        """Test: Agrupar en lotes de tamaño fijo"""
+        assert list(en_lotes(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        with pytest.raises(ValueError, match="al menos 1"):
+            list(en_lotes(range(5), 0))
+    
+    def test_importar_libros_desde_csv(self, biblioteca, tmp_path):
+        """Test: Importar un CSV reporta duplicados y errores sin detenerse"""
+        ruta = tmp_path / "libros.csv"
+        ruta.write_text(
+            "isbn,titulo,autor,fecha_publicacion\n"
+            "ISBN-001,Clean Code,Robert C. Martin,2008-08-01\n"
+            "ISBN-000,Repetido en catálogo,Autor,\n"
+            "ISBN-002,,Sin Título,\n"
+            "ISBN-003,Refactoring,Martin Fowler,\n"
+            "ISBN-001,Repetido en archivo,Autor,\n",
+            encoding="utf-8"
+        )
+        
+        resultado = biblioteca.importar_libros(ruta, tamano_lote=2)
+        
+        assert resultado['importados'] == 2
+        assert resultado['duplicados'] == ["ISBN-000", "ISBN-001"]
+        assert resultado['errores'] == [(3, "El título no puede estar vacío")]
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").fecha_publicacion == datetime(2008, 8, 1)
+        assert biblioteca.total_libros() == 3
+    
+    @pytest.mark.parametrize("indexar_al_final", [True, False])
+    def test_importar_libros_indexa_busquedas(self, biblioteca, indexar_al_final):
+        """Test: Los libros importados aparecen en búsquedas y estadísticas"""
+        libros = [Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor Importado") for i in range(1, 51)]
+        
+        biblioteca.importar_libros(iter(libros), tamano_lote=7, indexar_al_final=indexar_al_final)
+        
+        assert len(biblioteca.buscar_libros_por_autor("importado")) == 50
+        assert biblioteca.buscar_libros_por_titulo("Libro 42") == [libros[41]]
+        assert biblioteca.estadisticas()['libros_disponibles'] == 51
+        assert biblioteca.verificar_contadores()
+    
+    def test_importar_usuarios_desde_diccionarios(self, biblioteca):
+        """Test: Importar usuarios desde filas con campos opcionales"""
+        filas = [
+            {'id': "U001", 'nombre': "Ana García", 'email': "ana@email.com"},
+            {'id': "U002", 'nombre': "Carlos López", 'limite_prestamos': "5"},
+            {'id': "U000", 'nombre': "Duplicado"},
+            {'id': "U003", 'nombre': "Límite inválido", 'limite_prestamos': "0"},
+        ]
+        
+        resultado = biblioteca.importar_usuarios(filas)
+        
+        assert resultado['importados'] == 2
+        assert resultado['duplicados'] == ["U000"]
+        assert resultado['errores'] == [(4, "El límite de préstamos debe ser al menos 1")]
+        assert biblioteca.buscar_usuario("U002").limite_prestamos == 5
+        assert biblioteca.buscar_usuario("U001").email == "ana@email.com"
@@ -0,0 +1,87 @@
+"""
+Tests unitarios para el índice de trigramas
+"""
+import pytest
+from biblioteca.indice_texto import IndiceTrigramas, normalizar
+
+
+class TestIndiceTrigramas:
+    """Suite de tests para la clase IndiceTrigramas"""
+    
+    @pytest.fixture
+    def indice(self):
+        """Fixture: Índice con algunos títulos"""
+        indice = IndiceTrigramas()
+        indice.agregar("ISBN-001", "Clean Code")
+        indice.agregar("ISBN-002", "Clean Architecture")
+        indice.agregar("ISBN-003", "Dirty Code")
+        return indice
+    
+    def test_indice_vacio(self):
+        """Test: Un índice vacío no retorna resultados"""
+        indice = IndiceTrigramas()
+        
+        assert len(indice) == 0
+        assert indice.buscar("Clean") == []
+        assert indice.buscar("") == []
+    
+    def test_buscar_case_insensitive(self, indice):
+        """Test: La búsqueda ignora mayúsculas y minúsculas"""
+        assert indice.buscar("CLEAN") == ["ISBN-001", "ISBN-002"]
+    
+    def test_buscar_subcadena_interna(self, indice):
+        """Test: La búsqueda encuentra subcadenas en cualquier posición"""
+        assert indice.buscar("an co") == ["ISBN-001"]
+        assert indice.buscar("tecture") == ["ISBN-002"]
+    
+    def test_trigramas_sin_subcadena_no_coinciden(self):
+        """Test: Compartir todos los trigramas no basta si la subcadena no aparece"""
+        indice = IndiceTrigramas()
+        indice.agregar("ISBN-001", "abcd bcde")
+        
+        assert indice.buscar("abcde") == []
+    
+    @pytest.mark.parametrize("consulta,esperados", [
+        ("", ["ISBN-001", "ISBN-002", "ISBN-003"]),
+        ("c", ["ISBN-001", "ISBN-002", "ISBN-003"]),
+        ("de", ["ISBN-001", "ISBN-003"]),
+        ("Python", []),
+    ])
+    def test_buscar_consultas_cortas_y_sin_resultados(self, indice, consulta, esperados):
+        """Test: Consultas de menos de tres caracteres y sin coincidencias"""
+        assert indice.buscar(consulta) == esperados
+    
+    def test_resultados_en_orden_de_insercion(self):
+        """Test: Los resultados conservan el orden de inserción"""
+        indice = IndiceTrigramas()
+        for i in range(20):
+            indice.agregar(f"ISBN-{i:03d}", f"Libro {i}")
+        
+        assert indice.buscar("libro") == [f"ISBN-{i:03d}" for i in range(20)]
+    
+    @pytest.mark.parametrize("texto,esperado", [
+        ("María Rodríguez", "maria rodriguez"),
+        ("GARCÍA", "garcia"),
+        ("Straße", "strasse"),
+        ("Ｃｏｄｅ ﬁnal", "code final"),
+        ("Ñandú", "nandu"),
+    ])
+    def test_normalizar_sin_mayusculas_ni_acentos(self, texto, esperado):
+        """Test: La normalización aplica casefold y NFKD y quita los acentos"""
+        assert normalizar(texto) == esperado
+    
+    def test_normalizar_reutiliza_texto_ya_normalizado(self):
+        """Test: Un texto ASCII ya en minúsculas no se copia"""
+        texto = "".join(["clean ", "code"])
+        
+        assert normalizar(texto) is texto
+    
+    def test_buscar_ignora_acentos(self):
+        """Test: Consultas con o sin acentos encuentran los mismos documentos"""
+        indice = IndiceTrigramas()
+        indice.agregar("ISBN-001", "María Rodríguez")
+        indice.agregar("ISBN-002", "Mario Rodriguez")
+        
+        assert indice.buscar("maria rodriguez") == ["ISBN-001"]
+        assert indice.buscar("RODRÍGUEZ") == ["ISBN-001", "ISBN-002"]
+        assert indice.buscar("ía") == ["ISBN-001"]
@@ -0,0 +1,180 @@
+"""
+Tests de la instantánea binaria mapeada en memoria
+"""
+import pytest
+from datetime import datetime
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.instantanea_binaria import (
+    CatalogoMapeado, LibroMapeado, PrestamosMapeados, cargar_instantanea, escribir_instantanea
+)
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class TestInstantaneaBinaria:
+    """Suite de tests para la instantánea binaria"""
+    
+    @pytest.fixture
+    def original(self):
+        """Fixture: Biblioteca con libros, usuarios y préstamos activos y devueltos"""
+        biblioteca = Biblioteca()
+        biblioteca.agregar_libro(Libro("ISBN-001", "Cien años de soledad", "Gabriel García Márquez",
+                                       fecha_publicacion=datetime(1967, 5, 30)))
+        biblioteca.agregar_libro(Libro("ISBN-002", "Clean Code", "Robert C. Martin"))
+        biblioteca.agregar_libro(Libro("ISBN-003", "Refactoring", "Martin Fowler"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García", "ana@email.com"))
+        biblioteca.registrar_usuario(Usuario("U002", "Carlos López", limite_prestamos=2))
+        biblioteca.prestar_libro("ISBN-001", "U001", dias_prestamo=7)
+        biblioteca.prestar_libro("ISBN-002", "U002")
+        biblioteca.devolver_libro("ISBN-002", "U002")
+        return biblioteca
+    
+    @pytest.fixture
+    def cargada(self, original, tmp_path):
+        """Fixture: Biblioteca abierta desde la instantánea de ``original``"""
+        ruta = str(tmp_path / "biblioteca.bin")
+        escribir_instantanea(original, ruta)
+        return cargar_instantanea(ruta)
+    
+    def test_recupera_el_estado(self, original, cargada):
+        """Test: La biblioteca cargada tiene el mismo estado que la original"""
+        assert cargada.estadisticas() == original.estadisticas()
+        assert isinstance(cargada.catalogo, CatalogoMapeado)
+        assert cargada.buscar_usuario("U001").email == "ana@email.com"
+        assert cargada.buscar_usuario("U002").email is None
+        assert cargada.buscar_usuario("U002").limite_prestamos == 2
+        assert cargada.buscar_usuario("U001").libros_prestados == {"ISBN-001"}
+        for id, prestamo in original.prestamos.items():
+            recuperado = cargada.prestamos[id]
+            assert recuperado.fecha_prestamo == prestamo.fecha_prestamo
+            assert recuperado.fecha_devolucion == prestamo.fecha_devolucion
+            assert recuperado.dias_prestamo == prestamo.dias_prestamo
+        assert cargada.verificar_indice_activos()
+        assert cargada.verificar_contadores()
+    
+    def test_busqueda_por_isbn_y_disponibles(self, cargada):
+        """Test: Se sirven búsquedas por ISBN y libros disponibles desde el mapeo"""
+        libro = cargada.buscar_libro_por_isbn("ISBN-001")
+        
+        assert isinstance(libro, LibroMapeado)
+        assert libro.titulo == "Cien años de soledad"
+        assert libro.autor == "Gabriel García Márquez"
+        assert libro.fecha_publicacion == datetime(1967, 5, 30)
+        assert not libro.disponible
+        assert cargada.buscar_libro_por_isbn("ISBN-999") is None
+        assert [l.isbn for l in cargada.libros_disponibles()] == ["ISBN-002", "ISBN-003"]
+    
+    def test_operaciones_tras_cargar(self, cargada):
+        """Test: Préstamos, devoluciones y altas funcionan sobre la instantánea"""
+        cargada.devolver_libro("ISBN-001", "U001")
+        prestamo = cargada.prestar_libro("ISBN-003", "U002")
+        cargada.agregar_libro(Libro("ISBN-004", "Dune", "Frank Herbert"))
+        cargada.registrar_usuario(Usuario("U003", "Luis Pérez"))
+        
+        assert prestamo.id == "PREST-00003"
+        assert cargada.buscar_libro_por_isbn("ISBN-001").disponible
+        assert not cargada.buscar_libro_por_isbn("ISBN-003").disponible
+        assert [l.isbn for l in cargada.libros_disponibles()] == ["ISBN-001", "ISBN-002", "ISBN-004"]
+        assert [l.isbn for l in cargada.buscar_libros_por_autor("herbert")] == ["ISBN-004"]
+        assert [l.isbn for l in cargada.buscar_libros_por_titulo("clean")] == ["ISBN-002"]
+        assert cargada.total_usuarios() == 3
+        assert cargada.verificar_contadores()
+    
+    def test_historial_se_carga_bajo_demanda(self, original, cargada):
+        """Test: Los préstamos devueltos no se construyen al abrir, sino al consultarlos"""
+        original.prestar_libro("ISBN-003", "U002")
+        original.devolver_libro("ISBN-003", "U002")
+        
+        assert isinstance(cargada.prestamos, PrestamosMapeados)
+        assert cargada.prestamos._hidratados == {}
+        assert [p.id for p in cargada.prestamos_usuario("U002")] == ["PREST-00002"]
+        assert len(cargada.prestamos._hidratados) == 1
+        assert [p.id for p in cargada.prestamos_usuario("U001")] == ["PREST-00001"]
+        assert cargada.total_prestamos() == 2
+        assert sorted(cargada.prestamos) == ["PREST-00001", "PREST-00002"]
+    
+    def test_historial_combina_devueltos_y_nuevos(self, cargada):
+        """Test: El historial de un usuario incluye los devueltos de la instantánea y los nuevos"""
+        cargada.prestar_libro("ISBN-003", "U002")
+        cargada.devolver_libro("ISBN-003", "U002")
+        cargada.prestar_libro("ISBN-002", "U002")
+        
+        assert [p.id for p in cargada.prestamos_usuario("U002")] == [
+            "PREST-00002", "PREST-00003", "PREST-00004"]
+        assert [p.id for p in cargada.ultimos_prestamos_usuario("U002", 1)] == ["PREST-00004"]
+        with pytest.raises(ValueError, match="ya está registrado"):
+            cargada.prestamos["PREST-00002"] = cargada.prestamos["PREST-00002"]
+    
+    def test_busqueda_por_claves_guardadas(self, cargada):
+        """Test: Las claves de búsqueda normalizadas se leen de la instantánea"""
+        libro = cargada.buscar_libro_por_isbn("ISBN-001")
+        
+        assert libro.titulo_busqueda == "cien anos de soledad"
+        assert libro.autor_busqueda == "gabriel garcia marquez"
+    
+    def test_duplicados_tras_cargar_fallan(self, cargada):
+        """Test: No se pueden agregar ISBN ni usuarios ya presentes en la instantánea"""
+        with pytest.raises(ValueError, match="ya existe en el catálogo"):
+            cargada.agregar_libro(Libro("ISBN-001", "Otro", "Otro"))
+        with pytest.raises(ValueError, match="ya está registrado"):
+            cargada.registrar_usuario(Usuario("U001", "Otro"))
+    
+    def test_reescribir_instantanea_cargada(self, cargada, tmp_path):
+        """Test: Una biblioteca cargada se puede volver a guardar"""
+        cargada.prestar_libro("ISBN-003", "U002")
+        ruta = str(tmp_path / "segunda.bin")
+        
+        escribir_instantanea(cargada, ruta)
+        recargada = cargar_instantanea(ruta)
+        
+        assert recargada.estadisticas() == cargada.estadisticas()
+        assert recargada.buscar_usuario("U002").libros_prestados == {"ISBN-003"}
+    
+    def test_varios_ejemplares(self, original, tmp_path):
+        """Test: Se conservan los ejemplares totales y prestados de cada libro"""
+        original.agregar_libro(Libro("ISBN-004", "Dune", "Frank Herbert", ejemplares=3))
+        original.prestar_libro("ISBN-004", "U001")
+        original.prestar_libro("ISBN-004", "U002")
+        ruta = str(tmp_path / "biblioteca.bin")
+        escribir_instantanea(original, ruta)
+        
+        cargada = cargar_instantanea(ruta)
+        libro = cargada.buscar_libro_por_isbn("ISBN-004")
+        
+        assert cargada.estadisticas() == original.estadisticas()
+        assert (libro.ejemplares, libro.ejemplares_disponibles) == (3, 1)
+        cargada.devolver_libro("ISBN-004", "U001")
+        assert libro.ejemplares_disponibles == 2
+        assert cargada.estadisticas()['ejemplares_disponibles'] == 4
+        assert cargada.verificar_contadores()
+    
+    def test_muchos_registros(self, tmp_path):
+        """Test: La tabla hash encuentra todas las claves con muchos registros"""
+        biblioteca = Biblioteca()
+        biblioteca.importar_libros(Libro(f"ISBN-{i:04d}", f"Libro {i}", "Autor") for i in range(1000))
+        ruta = str(tmp_path / "biblioteca.bin")
+        escribir_instantanea(biblioteca, ruta)
+        
+        cargada = cargar_instantanea(ruta)
+        
+        assert all(cargada.buscar_libro_por_isbn(f"ISBN-{i:04d}").titulo == f"Libro {i}"
+                   for i in range(1000))
+        assert cargada.buscar_libro_por_isbn("ISBN-1000") is None
+    
+    def test_biblioteca_vacia(self, tmp_path):
+        """Test: Se puede guardar y cargar una biblioteca vacía"""
+        ruta = str(tmp_path / "vacia.bin")
+        escribir_instantanea(Biblioteca(), ruta)
+        
+        cargada = cargar_instantanea(ruta)
+        
+        assert cargada.total_libros() == 0
+        assert cargada.libros_disponibles() == []
+    
+    def test_archivo_invalido_falla(self, tmp_path):
+        """Test: Abrir un archivo que no es una instantánea debe fallar"""
+        ruta = tmp_path / "otro.bin"
+        ruta.write_bytes(b"no es una instantanea" * 10)
+        
+        with pytest.raises(ValueError, match="no es una instantánea binaria"):
+            cargar_instantanea(str(ruta))
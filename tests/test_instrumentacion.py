@@ -0,0 +1,184 @@
+"""
+Tests de la instrumentación de métodos de la biblioteca
+"""
+import urllib.request
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from biblioteca.biblioteca import Biblioteca
+from biblioteca.biblioteca_sqlite import BibliotecaSQLite
+from biblioteca.concurrente import BibliotecaConcurrente
+from biblioteca.instrumentacion import HistogramaLatencias
+from biblioteca.libro import Libro
+from biblioteca.usuario import Usuario
+
+
+class TestHistogramaLatencias:
+    """Suite de tests para HistogramaLatencias"""
+    
+    def test_percentiles_con_error_acotado(self):
+        """Test: Los percentiles tienen un error relativo menor que 1/SUBCUBETAS"""
+        histograma = HistogramaLatencias()
+        for valor in range(1, 100001):
+            histograma.registrar(valor)
+        
+        for porcentaje, exacto in [(50, 50000), (90, 90000), (99, 99000)]:
+            aproximado = histograma.percentil(porcentaje)
+            assert exacto <= aproximado <= exacto * (1 + 1 / HistogramaLatencias.SUBCUBETAS)
+        assert histograma.percentil(100) == 100000
+        assert histograma.minimo == 1
+        assert histograma.total == 100000
+    
+    def test_valores_pequenos_exactos(self):
+        """Test: Los valores menores que 2 * SUBCUBETAS tienen su propia cubeta"""
+        histograma = HistogramaLatencias()
+        for valor in [0, 3, 3, 7]:
+            histograma.registrar(valor)
+        
+        assert list(histograma.cubetas()) == [(0, 1), (3, 2), (7, 1)]
+        assert histograma.percentil(50) == 3
+    
+    def test_percentil_invalido_falla(self):
+        """Test: Un percentil fuera de [0, 100] lanza ValueError"""
+        with pytest.raises(ValueError, match="entre 0 y 100"):
+            HistogramaLatencias().percentil(101)
+
+
+class TestInstrumentacion:
+    """Suite de tests para Biblioteca.instrumentar y Biblioteca.metricas"""
+    
+    @pytest.fixture
+    def biblioteca(self):
+        """Fixture: Biblioteca con 20 libros y un usuario"""
+        biblioteca = Biblioteca("Instrumentada")
+        for i in range(20):
+            biblioteca.agregar_libro(Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        return biblioteca
+    
+    def test_sin_instrumentar_no_envuelve_metodos(self, biblioteca):
+        """Test: Sin instrumentar no hay métricas ni envolturas en la instancia"""
+        assert biblioteca.metricas() == {}
+        assert 'prestar_libro' not in vars(biblioteca)
+    
+    def test_cuenta_llamadas_errores_y_latencias(self, biblioteca):
+        """Test: Se cuentan las llamadas, los errores y sus latencias"""
+        biblioteca.instrumentar()
+        
+        biblioteca.prestar_libro("ISBN-000", "U001")
+        with pytest.raises(ValueError):
+            biblioteca.prestar_libro("ISBN-999", "U001")
+        metricas = biblioteca.metricas()
+        
+        assert metricas['prestar_libro']['llamadas'] == 2
+        assert metricas['prestar_libro']['errores'] == 1
+        latencia = metricas['prestar_libro']['latencia']
+        assert 0 < latencia['minimo'] <= latencia['p50'] <= latencia['p99'] <= latencia['maximo']
+        assert metricas['devolver_libro']['llamadas'] == 0
+    
+    def test_registros_recorridos(self, biblioteca):
+        """Test: Se cuentan los registros recorridos por las consultas"""
+        biblioteca.instrumentar(['libros_disponibles', 'buscar_libro_por_isbn'])
+        
+        biblioteca.libros_disponibles()
+        biblioteca.buscar_libro_por_isbn("ISBN-001")
+        metricas = biblioteca.metricas()
+        
+        assert metricas['libros_disponibles']['registros_recorridos']['total'] == 20
+        assert metricas['buscar_libro_por_isbn']['registros_recorridos']['total'] == 0
+        assert set(metricas) == {'libros_disponibles', 'buscar_libro_por_isbn'}
+    
+    def test_sin_instrumentar_no_cuenta_recorridos(self, biblioteca):
+        """Test: Sin instrumentación las consultas no acumulan registros recorridos"""
+        biblioteca.libros_disponibles()
+        biblioteca.instrumentar()
+        biblioteca.desinstrumentar()
+        biblioteca.libros_disponibles()
+        
+        assert biblioteca._recorridos is None
+        assert biblioteca._registros_recorridos() == 0
+    
+    def test_registros_recorridos_concurrentes(self):
+        """Test: Los recorridos de consultas concurrentes no se pierden"""
+        biblioteca = BibliotecaConcurrente()
+        biblioteca.importar_libros(Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor") for i in range(50))
+        biblioteca.instrumentar(['libros_disponibles'])
+        
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: biblioteca.libros_disponibles(), range(400)))
+        
+        assert biblioteca.metricas()['libros_disponibles']['registros_recorridos']['total'] == 400 * 50
+    
+    def test_desinstrumentar_restaura_metodos(self, biblioteca):
+        """Test: Desinstrumentar retira las envolturas y las métricas"""
+        biblioteca.instrumentar()
+        biblioteca.desinstrumentar()
+        
+        assert biblioteca.metricas() == {}
+        assert 'prestar_libro' not in vars(biblioteca)
+        biblioteca.instrumentar()
+    
+    def test_instrumentar_dos_veces_falla(self, biblioteca):
+        """Test: Instrumentar una biblioteca ya instrumentada lanza ValueError"""
+        biblioteca.instrumentar()
+        
+        with pytest.raises(ValueError, match="ya está instrumentada"):
+            biblioteca.instrumentar()
+    
+    def test_metodo_inexistente_falla(self, biblioteca):
+        """Test: Instrumentar un método que no existe lanza ValueError"""
+        with pytest.raises(ValueError, match="no tiene un método público"):
+            biblioteca.instrumentar(['_recontar'])
+    
+    def test_perfilar_metodo(self, biblioteca):
+        """Test: Se perfila una de cada N llamadas con cProfile y tracemalloc"""
+        instrumentacion = biblioteca.instrumentar()
+        instrumentacion.perfilar('libros_disponibles', cada=2, memoria=True)
+        
+        for _ in range(4):
+            biblioteca.libros_disponibles()
+        perfil = biblioteca.metricas()['libros_disponibles']['perfil']
+        
+        assert perfil['muestras'] == 2
+        assert perfil['memoria_pico_bytes'] > 0
+        assert instrumentacion.perfil('libros_disponibles').total_calls > 0
+    
+    def test_exportar_prometheus(self, biblioteca, tmp_path):
+        """Test: Las métricas se escriben en formato de texto de Prometheus"""
+        instrumentacion = biblioteca.instrumentar()
+        biblioteca.prestar_libro("ISBN-000", "U001")
+        ruta = tmp_path / "biblioteca.prom"
+        
+        instrumentacion.escribir_prometheus(str(ruta))
+        texto = ruta.read_text(encoding='utf-8')
+        
+        etiquetas = 'biblioteca="Instrumentada",metodo="prestar_libro"'
+        assert f'biblioteca_llamadas_total{{{etiquetas}}} 1' in texto
+        assert f'biblioteca_latencia_segundos_bucket{{{etiquetas},le="+Inf"}} 1' in texto
+        assert 'metodo="devolver_libro"' not in texto
+    
+    def test_servir_prometheus(self, biblioteca):
+        """Test: Las métricas se sirven por HTTP en /metrics"""
+        instrumentacion = biblioteca.instrumentar()
+        biblioteca.total_libros()
+        servidor = instrumentacion.servir_prometheus()
+        try:
+            host, puerto = servidor.server_address
+            with urllib.request.urlopen(f"http://{host}:{puerto}/metrics", timeout=5) as respuesta:
+                texto = respuesta.read().decode('utf-8')
+        finally:
+            servidor.shutdown()
+            servidor.server_close()
+        
+        assert 'metodo="total_libros"' in texto
+    
+    def test_biblioteca_sqlite(self):
+        """Test: BibliotecaSQLite cuenta las filas leídas como registros recorridos"""
+        biblioteca = BibliotecaSQLite()
+        for i in range(5):
+            biblioteca.agregar_libro(Libro(f"ISBN-{i:03d}", f"Libro {i}", "Autor"))
+        biblioteca.instrumentar(['libros_disponibles'])
+        
+        biblioteca.libros_disponibles()
+        
+        assert biblioteca.metricas()['libros_disponibles']['registros_recorridos']['total'] == 5
+        biblioteca.cerrar()
@@ -0,0 +1,134 @@
+"""
+Tests del cálculo de atrasos y multas por tramos
+"""
+import random
+import pytest
+from datetime import datetime, timedelta
+from biblioteca import Biblioteca, Libro, Prestamo, Usuario
+from biblioteca.biblioteca_sqlite import BibliotecaSQLite
+from biblioteca.multas import ColumnasPrestamos, MotorMultas, TarifaMultas, evaluar_prestamo
+from biblioteca.reloj import RelojSimulado
+
+np = pytest.importorskip("numpy")
+
+
+REFERENCIA = datetime(2024, 6, 1, 12, 0)
+
+
+def _prestamos(n, semilla=0):
+    """Genera préstamos activos y devueltos con atrasos variados"""
+    azar = random.Random(semilla)
+    prestamos = []
+    for i in range(n):
+        inicio = REFERENCIA - timedelta(seconds=azar.randint(0, 200 * 86400))
+        prestamo = Prestamo(f"P{i}", "ISBN", "U001", azar.randint(1, 30), inicio)
+        if azar.random() < 0.5:
+            prestamo.devolver(inicio + timedelta(seconds=azar.randint(0, 100 * 86400)))
+        prestamos.append(prestamo)
+    return prestamos
+
+
+class TestTarifaMultas:
+    """Suite de tests para TarifaMultas"""
+    
+    @pytest.mark.parametrize("dias,esperado", [
+        (0, 0), (1, 25), (7, 175), (8, 225), (30, 175 + 23 * 50), (31, 175 + 23 * 50 + 100),
+    ])
+    def test_multa_por_tramos(self, dias, esperado):
+        """Test: Cada tramo cobra su tarifa solo por sus días de atraso"""
+        assert TarifaMultas().multa(dias) == esperado
+    
+    def test_tope(self):
+        """Test: El tope limita la multa por préstamo"""
+        tarifa = TarifaMultas(tope=1000)
+        
+        assert tarifa.multa(5) == 125
+        assert tarifa.multa(100) == 1000
+        assert tarifa.multas(np.array([5, 100])).tolist() == [125, 1000]
+    
+    @pytest.mark.parametrize("tramos,tope,mensaje", [
+        ([(2, 10)], None, "empezar en el día 1"),
+        ([(1, 10), (1, 20)], None, "orden creciente"),
+        ([(1, -10)], None, "negativas"),
+        ([(1, 10)], -1, "tope"),
+    ])
+    def test_tarifa_invalida_falla(self, tramos, tope, mensaje):
+        """Test: Tramos o tope inválidos deben lanzar ValueError"""
+        with pytest.raises(ValueError, match=mensaje):
+            TarifaMultas(tramos, tope)
+    
+    def test_multas_vectorizadas_coinciden(self):
+        """Test: El cálculo vectorizado coincide con el escalar"""
+        tarifa = TarifaMultas(((1, 10), (3, 30), (10, 5)), tope=400)
+        atrasos = np.arange(0, 60)
+        
+        assert tarifa.multas(atrasos).tolist() == [tarifa.multa(d) for d in range(60)]
+
+
+class TestMotorMultas:
+    """Suite de tests para MotorMultas"""
+    
+    def test_coincide_con_evaluacion_por_prestamo(self):
+        """Test: El motor obtiene exactamente lo mismo que evaluar_prestamo"""
+        prestamos = _prestamos(2000)
+        tarifa = TarifaMultas(tope=2000)
+        
+        resultado = MotorMultas(tarifa).evaluar(prestamos, REFERENCIA)
+        
+        assert len(resultado) == 2000
+        for prestamo in prestamos:
+            assert resultado[prestamo.id] == evaluar_prestamo(prestamo, REFERENCIA, tarifa)
+    
+    def test_resultados_por_id(self):
+        """Test: Los resultados se asocian a los IDs de los préstamos"""
+        prestamos = _prestamos(500, semilla=1)
+        resultado = MotorMultas().evaluar(ColumnasPrestamos.desde_prestamos(prestamos), REFERENCIA)
+        
+        esperado = {p.id: evaluar_prestamo(p, REFERENCIA)[2] for p in prestamos}
+        assert resultado.por_id() == {id: m for id, m in esperado.items() if m}
+        assert resultado.total() == sum(esperado.values())
+        assert resultado.ids_vencidos() == [p.id for p in prestamos
+                                           if p.esta_activo() and p.esta_vencido(REFERENCIA)]
+    
+    def test_devolucion_tardia_conserva_multa(self):
+        """Test: Un préstamo devuelto con retraso tiene multa pero no está vencido"""
+        prestamo = Prestamo("P1", "ISBN", "U001", 7, REFERENCIA - timedelta(days=30))
+        prestamo.devolver(REFERENCIA - timedelta(days=20))
+        
+        resultado = MotorMultas().evaluar([prestamo], REFERENCIA)
+        
+        assert resultado["P1"] == (3, False, 75)
+    
+    def test_sin_prestamos(self):
+        """Test: Evaluar una lista vacía retorna un resultado vacío"""
+        resultado = MotorMultas().evaluar([], REFERENCIA)
+        
+        assert len(resultado) == 0
+        assert resultado.total() == 0
+        assert resultado.por_id() == {}
+
+
+class TestMultasBiblioteca:
+    """Suite de tests para Biblioteca.calcular_multas"""
+    
+    @pytest.mark.parametrize("clase", [Biblioteca, BibliotecaSQLite])
+    def test_calcular_multas(self, clase):
+        """Test: La biblioteca evalúa activos y devueltos con su reloj"""
+        reloj = RelojSimulado(datetime(2024, 1, 1))
+        biblioteca = clase(reloj=reloj)
+        for isbn in ("ISBN-001", "ISBN-002", "ISBN-003"):
+            biblioteca.agregar_libro(Libro(isbn, "Libro", "Autor"))
+        biblioteca.registrar_usuario(Usuario("U001", "Ana García"))
+        activo = biblioteca.prestar_libro("ISBN-001", "U001", dias_prestamo=14)
+        devuelto = biblioteca.prestar_libro("ISBN-002", "U001", dias_prestamo=3)
+        a_tiempo = biblioteca.prestar_libro("ISBN-003", "U001", dias_prestamo=30)
+        reloj.avanzar(days=10)
+        biblioteca.devolver_libro("ISBN-002", "U001")
+        reloj.avanzar(days=10)
+        
+        resultado = biblioteca.calcular_multas()
+        
+        assert resultado.por_id() == {activo.id: 150, devuelto.id: 175}
+        assert resultado.ids_vencidos() == [activo.id]
+        assert resultado[a_tiempo.id] == (0, False, 0)
+        assert biblioteca.calcular_multas(fecha=datetime(2024, 1, 15)).por_id() == {devuelto.id: 175}
@@ -0,0 +1,166 @@
+"""
+Tests de persistencia con diario de operaciones e instantáneas
+"""
+import os
+import time
+import pytest
+from datetime import datetime
+from biblioteca.libro import Libro
+from biblioteca.persistencia import Persistencia
+from biblioteca.usuario import Usuario
+
+
+def poblar(biblioteca):
+    """Agrega libros, usuarios y préstamos de prueba"""
+    biblioteca.agregar_libro(Libro("ISBN-001", "Clean Code", "Robert C. Martin",
+                                   fecha_publicacion=datetime(2008, 8, 1)))
+    biblioteca.agregar_libro(Libro("ISBN-002", "Refactoring", "Martin Fowler", ejemplares=2))
+    biblioteca.registrar_usuario(Usuario("U001", "Ana García", "ana@email.com"))
+    biblioteca.registrar_usuario(Usuario("U002", "Carlos López", limite_prestamos=2))
+    biblioteca.prestar_libro("ISBN-001", "U001", dias_prestamo=7)
+    biblioteca.prestar_libro("ISBN-002", "U002")
+    biblioteca.devolver_libro("ISBN-002", "U002")
+
+
+class TestPersistencia:
+    """Suite de tests para la clase Persistencia"""
+    
+    def verificar_estado(self, biblioteca, original):
+        """Compara el estado recuperado con el original"""
+        assert biblioteca.estadisticas() == original.estadisticas()
+        assert biblioteca.buscar_libro_por_isbn("ISBN-001").fecha_publicacion == datetime(2008, 8, 1)
+        assert biblioteca.buscar_usuario("U002").limite_prestamos == 2
+        assert biblioteca.buscar_libro_por_isbn("ISBN-002").ejemplares == 2
+        assert biblioteca.buscar_usuario("U001").libros_prestados == {"ISBN-001"}
+        for id, prestamo in original.prestamos.items():
+            recuperado = biblioteca.prestamos[id]
+            assert recuperado.fecha_prestamo == prestamo.fecha_prestamo
+            assert recuperado.fecha_devolucion == prestamo.fecha_devolucion
+            assert recuperado.dias_prestamo == prestamo.dias_prestamo
+        assert biblioteca.verificar_indice_activos()
+        assert biblioteca.verificar_contadores()
+    
+    def test_recuperar_desde_diario(self, tmp_path):
+        """Test: El estado se recupera reproduciendo el diario"""
+        persistencia = Persistencia(str(tmp_path))
+        original = persistencia.abrir()
+        poblar(original)
+        persistencia.cerrar()
+        
+        recuperada = Persistencia(str(tmp_path)).abrir()
+        
+        self.verificar_estado(recuperada, original)
+        assert recuperada.prestar_libro("ISBN-002", "U001").id == "PREST-00003"
+    
+    def test_instantanea_trunca_diario(self, tmp_path):
+        """Test: La instantánea periódica trunca el diario y se usa al recuperar"""
+        persistencia = Persistencia(str(tmp_path), instantanea_cada=5)
+        original = persistencia.abrir()
+        poblar(original)
+        persistencia.cerrar()
+        
+        assert os.path.exists(tmp_path / Persistencia.ARCHIVO_INSTANTANEA)
+        with open(tmp_path / Persistencia.ARCHIVO_DIARIO, encoding="utf-8") as archivo:
+            assert len(archivo.readlines()) == 2
+        
+        self.verificar_estado(Persistencia(str(tmp_path)).abrir(), original)
+    
+    def test_diario_no_truncado_tras_instantanea_no_duplica(self, tmp_path):
+        """Test: Los registros ya incluidos en la instantánea no se reaplican"""
+        persistencia = Persistencia(str(tmp_path))
+        original = persistencia.abrir()
+        poblar(original)
+        persistencia.sincronizar()
+        with open(tmp_path / Persistencia.ARCHIVO_DIARIO, encoding="utf-8") as archivo:
+            diario = archivo.read()
+        persistencia.instantanea()
+        persistencia.cerrar()
+        # Simula una caída entre escribir la instantánea y truncar el diario
+        with open(tmp_path / Persistencia.ARCHIVO_DIARIO, "w", encoding="utf-8") as archivo:
+            archivo.write(diario)
+        
+        self.verificar_estado(Persistencia(str(tmp_path)).abrir(), original)
+    
+    @pytest.mark.skipif(os.name != "posix", reason="fsync de directorios solo en POSIX")
+    def test_instantanea_confirma_directorio_antes_de_truncar(self, tmp_path, monkeypatch):
+        """Test: Tras reemplazar la instantánea se confirma el directorio antes de truncar el diario"""
+        persistencia = Persistencia(str(tmp_path))
+        poblar(persistencia.abrir())
+        eventos = []
+        reemplazar, confirmar = os.replace, os.fsync
+        
+        def registrar_reemplazo(origen, destino):
+            eventos.append("reemplazo")
+            reemplazar(origen, destino)
+        
+        def registrar_fsync(descriptor):
+            if os.path.samestat(os.fstat(descriptor), os.stat(tmp_path)):
+                diario = os.path.getsize(tmp_path / Persistencia.ARCHIVO_DIARIO)
+                eventos.append("directorio" if diario else "directorio tras truncar")
+            confirmar(descriptor)
+        
+        monkeypatch.setattr(os, "replace", registrar_reemplazo)
+        monkeypatch.setattr(os, "fsync", registrar_fsync)
+        persistencia.instantanea()
+        persistencia.cerrar()
+        
+        assert eventos == ["reemplazo", "directorio"]
+    
+    def test_registra_antes_de_aplicar(self, tmp_path):
+        """Test: Cada operación se escribe en el diario antes de aplicarse a la biblioteca"""
+        persistencia = Persistencia(str(tmp_path))
+        biblioteca = persistencia.abrir()
+        escribir, observados = persistencia._escribir, []
+        
+        def observar(registro):
+            observados.append((registro[0], biblioteca.total_libros(), biblioteca.total_usuarios(),
+                               len(biblioteca.prestamos_activos())))
+            escribir(registro)
+        
+        persistencia._escribir = observar
+        poblar(biblioteca)
+        persistencia.cerrar()
+        
+        assert observados == [("L", 0, 0, 0), ("L", 1, 0, 0), ("U", 2, 0, 0), ("U", 2, 1, 0),
+                              ("P", 2, 2, 0), ("P", 2, 2, 1), ("D", 2, 2, 2)]
+    
+    def test_linea_incompleta_se_descarta(self, tmp_path):
+        """Test: Una escritura interrumpida al final del diario se descarta"""
+        persistencia = Persistencia(str(tmp_path))
+        original = persistencia.abrir()
+        poblar(original)
+        persistencia.cerrar()
+        with open(tmp_path / Persistencia.ARCHIVO_DIARIO, "a", encoding="utf-8") as archivo:
+            archivo.write('[8,"L","ISBN-9')
+        
+        persistencia = Persistencia(str(tmp_path))
+        recuperada = persistencia.abrir()
+        self.verificar_estado(recuperada, original)
+        recuperada.agregar_libro(Libro("ISBN-003", "Design Patterns", "Gang of Four"))
+        persistencia.cerrar()
+        
+        assert Persistencia(str(tmp_path)).abrir().total_libros() == 3
+    
+    def test_registros_pendientes_se_confirman_sin_mas_operaciones(self, tmp_path):
+        """Test: Un lote incompleto se confirma en disco tras intervalo_fsync aunque cese el tráfico"""
+        persistencia = Persistencia(str(tmp_path), lote_fsync=1000, intervalo_fsync=0.2)
+        biblioteca = persistencia.abrir()
+        poblar(biblioteca)
+        assert persistencia._pendientes > 0
+        
+        limite = time.monotonic() + 5
+        while persistencia._pendientes and time.monotonic() < limite:
+            time.sleep(0.01)
+        
+        assert persistencia._pendientes == 0
+        persistencia.cerrar()
+        assert persistencia._hilo is None
+    
+    def test_parametros_invalidos(self, tmp_path):
+        """Test: Parámetros inválidos deben fallar"""
+        with pytest.raises(ValueError, match="al menos 1"):
+            Persistencia(str(tmp_path), lote_fsync=0)
+        with pytest.raises(ValueError, match="debe ser positivo"):
+            Persistencia(str(tmp_path), intervalo_fsync=0)
+        with pytest.raises(ValueError, match="no está abierta"):
+            Persistencia(str(tmp_path)).instantanea()
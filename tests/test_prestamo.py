@@ -124,4 +124,27 @@ class TestPrestamo:
         
         str_prestamo = str(prestamo)
         
-        assert "Devuelto" in str_prestamo
\ No newline at end of file
+        assert "Devuelto" in str_prestamo
+    
+    def test_fechas_almacenadas_como_enteros(self):
+        """Test: Las fechas se guardan como microsegundos y se exponen como datetime"""
+        fecha = datetime(2024, 3, 1, 12, 30, 15, 250)
+        prestamo = Prestamo("P001", "ISBN-001", "U001", fecha_prestamo=fecha)
+        
+        assert isinstance(prestamo.epoch_prestamo, int)
+        assert prestamo.fecha_prestamo == fecha
+        assert prestamo.epoch_devolucion is None
+        prestamo.devolver(fecha + timedelta(days=3))
+        assert prestamo.fecha_devolucion == fecha + timedelta(days=3)
+        assert prestamo.dias_transcurridos() == 3
+    
+    def test_evaluar_con_referencia(self):
+        """Test: Los días se calculan respecto a la referencia, como fecha o entero"""
+        prestamo = Prestamo("P001", "ISBN-001", "U001", dias_prestamo=14,
+                            fecha_prestamo=datetime(2024, 1, 1))
+        referencia = datetime(2024, 1, 16, 0, 0, 1)
+        
+        assert prestamo.dias_transcurridos(referencia) == 15
+        assert prestamo.esta_vencido(referencia) is True
+        assert prestamo.dias_restantes(prestamo.epoch_prestamo) == 14
+        assert prestamo.esta_vencido(datetime(2024, 1, 15, 23, 59)) is False
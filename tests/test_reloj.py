@@ -0,0 +1,56 @@
+"""
+Tests del reloj inyectable y la conversión de fechas
+"""
+import threading
+import pytest
+from datetime import datetime, timedelta
+from biblioteca.reloj import Reloj, RelojSimulado, epoch_a_fecha, fecha_a_epoch
+
+
+class TestReloj:
+    """Suite de tests para Reloj y RelojSimulado"""
+    
+    def test_fecha_a_epoch_ida_y_vuelta(self):
+        """Test: La conversión a microsegundos es exacta y reversible"""
+        for fecha in [datetime(1970, 1, 1), datetime(1969, 12, 31, 23, 59, 59, 999999),
+                      datetime(2024, 2, 29, 13, 45, 7, 123456), datetime(1, 1, 1)]:
+            epoch = fecha_a_epoch(fecha)
+            assert epoch == (fecha - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+            assert epoch_a_fecha(epoch) == fecha
+        assert epoch_a_fecha(fecha_a_epoch(None)) is None
+    
+    def test_congelado_fija_un_instante(self):
+        """Test: Dentro de congelado, ahora() retorna siempre el mismo instante"""
+        reloj = Reloj()
+        
+        with reloj.congelado() as instante:
+            assert reloj.ahora() == instante
+            with reloj.congelado() as anidado:
+                assert anidado == instante
+            with reloj.congelado(datetime(2020, 1, 1)):
+                assert reloj.ahora() == datetime(2020, 1, 1)
+            assert reloj.ahora() == instante
+        assert reloj.ahora() >= instante
+    
+    def test_congelado_solo_afecta_a_su_hilo(self):
+        """Test: Un instante congelado en un hilo no cambia el de los demás"""
+        reloj = RelojSimulado(datetime(2024, 1, 1))
+        vistos = []
+        
+        with reloj.congelado(datetime(2000, 1, 1)):
+            hilo = threading.Thread(target=lambda: vistos.append(reloj.ahora()))
+            hilo.start()
+            hilo.join()
+        
+        assert vistos == [datetime(2024, 1, 1)]
+    
+    def test_reloj_simulado(self):
+        """Test: El reloj simulado avanza solo cuando se le indica y no retrocede"""
+        reloj = RelojSimulado(datetime(2024, 1, 1))
+        
+        assert reloj.avanzar(days=30, hours=2) == datetime(2024, 1, 31, 2)
+        assert reloj.ahora_epoch() == fecha_a_epoch(datetime(2024, 1, 31, 2))
+        with pytest.raises(ValueError, match="no puede retroceder"):
+            reloj.avanzar(days=-1)
+        reloj.fijar(datetime(2023, 6, 1))
+        assert reloj.ahora() == datetime(2023, 6, 1)
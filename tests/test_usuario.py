@@ -1,6 +1,7 @@
 """
 Tests unitarios para la clase Usuario
 """
+import pickle
 import pytest
 from biblioteca.usuario import Usuario
 
@@ -15,7 +16,7 @@ class TestUsuario:
         assert usuario.id == "U001"
         assert usuario.nombre == "Juan Pérez"
         assert usuario.email == "juan@email.com"
-        assert usuario.libros_prestados == []
+        assert usuario.libros_prestados == set()
         assert usuario.limite_prestamos == 3
     
     def test_crear_usuario_sin_email(self):
@@ -129,4 +130,32 @@ class TestUsuario:
         usuario1 = Usuario("U001", "Juan Pérez")
         usuario2 = Usuario("U001", "Otro Nombre")
         
-        assert usuario1 == usuario2
\ No newline at end of file
+        assert usuario1 == usuario2
+    
+    def test_usuario_sin_dict(self):
+        """Test: Usuario usa __slots__ y no admite atributos arbitrarios"""
+        usuario = Usuario("U001", "Juan Pérez")
+        
+        assert not hasattr(usuario, "__dict__")
+        with pytest.raises(AttributeError):
+            usuario.atributo_extra = 1
+    
+    def test_libros_prestados_no_comparte_estado_entre_usuarios(self):
+        """Test: Prestar a un usuario no afecta los préstamos de otro"""
+        usuario1 = Usuario("U001", "Juan Pérez")
+        usuario2 = Usuario("U002", "Ana García")
+        
+        usuario1.agregar_prestamo("ISBN-001")
+        usuario1.remover_prestamo("ISBN-001")
+        usuario1.agregar_prestamo("ISBN-002")
+        
+        assert usuario1.libros_prestados == {"ISBN-002"}
+        assert usuario2.libros_prestados == set()
+    
+    def test_prestar_tras_deserializar(self):
+        """Test: Un usuario sin préstamos copiado con pickle puede tomar libros"""
+        usuario = pickle.loads(pickle.dumps(Usuario("U001", "Juan Pérez")))
+        
+        usuario.agregar_prestamo("ISBN-001")
+        
+        assert usuario.libros_prestados == {"ISBN-001"}
@@ -0,0 +1,73 @@
+"""
+Tests unitarios para el índice de vencimientos
+"""
+from datetime import datetime, timedelta
+from biblioteca.prestamo import Prestamo
+from biblioteca.vencimientos import IndiceVencimientos
+
+
+def crear_prestamo(id, dias_atras, dias_prestamo=14):
+    """Crea un préstamo con fecha de inicio desplazada hacia el pasado"""
+    prestamo = Prestamo(id, f"ISBN-{id}", "U001", dias_prestamo)
+    prestamo.fecha_prestamo = datetime.now() - timedelta(days=dias_atras)
+    return prestamo
+
+
+class TestIndiceVencimientos:
+    """Suite de tests para la clase IndiceVencimientos"""
+    
+    def test_indice_vacio(self):
+        """Test: Un índice vacío no tiene vencidos"""
+        indice = IndiceVencimientos()
+        
+        assert indice.hasta(datetime.now()) == []
+        assert len(indice) == 0
+    
+    def test_hasta_coincide_con_esta_vencido(self):
+        """Test: Los vencidos del índice coinciden con Prestamo.esta_vencido"""
+        indice = IndiceVencimientos()
+        prestamos = [crear_prestamo(f"P{d:03d}", d, dias_prestamo=10) for d in range(25)]
+        for prestamo in prestamos:
+            indice.agregar(prestamo)
+        
+        vencidos = indice.hasta(datetime.now())
+        
+        assert set(vencidos) == {p for p in prestamos if p.esta_vencido()}
+        assert len(vencidos) == 14
+    
+    def test_hasta_ordenado_por_vencimiento(self):
+        """Test: Los vencidos se retornan del más antiguo al más reciente"""
+        indice = IndiceVencimientos()
+        for id, dias_atras in [("P1", 20), ("P2", 40), ("P3", 30)]:
+            indice.agregar(crear_prestamo(id, dias_atras, dias_prestamo=7))
+        
+        vencidos = indice.hasta(datetime.now())
+        
+        assert [p.id for p in vencidos] == ["P2", "P3", "P1"]
+    
+    def test_hasta_fecha_futura(self):
+        """Test: Consultar una fecha futura incluye préstamos aún vigentes"""
+        indice = IndiceVencimientos()
+        prestamo = crear_prestamo("P1", 0, dias_prestamo=7)
+        indice.agregar(prestamo)
+        
+        assert indice.hasta(datetime.now() + timedelta(days=7)) == []
+        assert indice.hasta(datetime.now() + timedelta(days=8)) == [prestamo]
+    
+    def test_prestamos_devueltos_se_descartan_y_compactan(self):
+        """Test: Los préstamos devueltos no aparecen y el montículo se compacta"""
+        indice = IndiceVencimientos()
+        prestamos = [crear_prestamo(f"P{i}", 30) for i in range(4)]
+        for prestamo in prestamos:
+            indice.agregar(prestamo)
+        
+        prestamos[0].devolver()
+        indice.marcar_devuelto()
+        assert prestamos[0] not in indice.hasta(datetime.now())
+        
+        for prestamo in prestamos[1:3]:
+            prestamo.devolver()
+            indice.marcar_devuelto()
+        
+        assert len(indice) == 1
+        assert indice.hasta(datetime.now()) == [prestamos[3]]